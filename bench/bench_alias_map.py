@@ -0,0 +1,124 @@
+"""
+Benchmark the compiled entity alias map (kgprep.alias_map).
+
+For synthetic logs of 10^5 and 10^6 aliases (with chained renames), reports
+compile and build time, file size, load time (mmap open vs json.load of a
+plain dict), and lookup throughput for single and batched resolution. The
+real normalization log is then applied both the notebook way (pandas masks
+per update over the quadruple CSV) and as the streaming stage.
+
+    python bench/bench_alias_map.py --sizes 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "data", "preparation"))
+
+from kgprep.alias_map import AliasMap, compile_alias_map, load_updates, normalize_records
+
+DEFAULT_LOG = os.path.join(ROOT, "data", "preparation", "notebooks", "entity_normalization_log.json")
+DEFAULT_CSV = os.path.join(ROOT, "data", "preparation", "notebooks", "raw", "IndovestDKG_FORCEDROP.csv")
+
+
+def synthetic_updates(aliases, seed=0):
+    # Groups of 1-4 variants; ~10% of later updates rename an earlier canonical (a chain)
+    rng = random.Random(seed)
+    updates = []
+    canonicals = []
+    made = 0
+    while made < aliases:
+        canonical = f"entitas {len(updates)} {rng.randrange(10 ** 6)}"
+        variants = [f"Entitas {len(updates)} varian {v}" for v in range(rng.randint(1, 4))]
+        if canonicals and rng.random() < 0.1:
+            variants.append(rng.choice(canonicals))
+        updates.append({"canonical_name": canonical, "entities_updated": variants})
+        canonicals.append(canonical)
+        made += len(variants)
+    return updates
+
+
+def timed(fn):
+    started = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - started
+
+
+def bench_size(tmp, size, lookups):
+    updates = synthetic_updates(size)
+    mapping, compile_s = timed(lambda: compile_alias_map(updates))
+    path = os.path.join(tmp, f"aliases-{size}.amap")
+    alias_map, build_s = timed(lambda: AliasMap.build(mapping, path))
+    alias_map.close()
+    json_path = os.path.join(tmp, f"aliases-{size}.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(mapping, f, ensure_ascii=False)
+
+    alias_map, open_s = timed(lambda: AliasMap(path))
+    plain, json_s = timed(lambda: json.load(open(json_path, encoding="utf-8")))
+
+    rng = random.Random(1)
+    aliases = list(mapping)
+    # Half of the queried names are aliases (mixed case, as extracted), half are unknown
+    queries = [rng.choice(aliases).title() if i % 2 else f"tidak dikenal {i}" for i in range(lookups)]
+    _, single_s = timed(lambda: [alias_map.resolve(name) for name in queries])
+    _, batch_s = timed(lambda: alias_map.resolve_many(queries))
+    _, dict_s = timed(lambda: [plain.get(" ".join(name.casefold().split()), name) for name in queries])
+    alias_map.close()
+    print(f"{len(mapping):>9} {compile_s:>9.2f} {build_s:>8.2f} {os.path.getsize(path) / 2 ** 20:>8.1f} "
+          f"{open_s * 1000:>8.2f} {json_s * 1000:>9.0f} {lookups / single_s:>11.0f} {lookups / batch_s:>11.0f} "
+          f"{lookups / dict_s:>11.0f}")
+
+
+def bench_real(tmp, log_path, csv_path):
+    updates = load_updates(log_path)
+    df = pd.read_csv(csv_path)
+
+    def notebook_replay():
+        # SmartEntityNormalizer._apply_entity_updates: one mask per variant over the whole frame
+        frame = df.copy()
+        for update in updates:
+            for old in update["entities_updated"]:
+                if old == update["canonical_name"]:
+                    continue
+                frame.loc[frame["subject"] == old, "subject"] = update["canonical_name"]
+                frame.loc[frame["object"] == old, "object"] = update["canonical_name"]
+        return frame
+
+    _, replay_s = timed(notebook_replay)
+    path = os.path.join(tmp, "log.amap")
+    alias_map, build_s = timed(lambda: AliasMap.build(compile_alias_map(updates), path))
+    records = df.to_dict("records")
+    normalized, stream_s = timed(lambda: list(normalize_records(records, alias_map)))
+    alias_map.close()
+    print(f"\nreal log: {len(updates)} updates, {len(alias_map)} aliases, {len(df)} quadruples")
+    print(f"  notebook replay over the CSV  {replay_s:8.2f} s")
+    print(f"  compile + build alias map     {build_s:8.2f} s")
+    print(f"  streaming stage over the rows {stream_s:8.2f} s ({len(normalized) / stream_s:,.0f} quads/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--lookups", type=int, default=200000)
+    parser.add_argument("--log", default=DEFAULT_LOG)
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'aliases':>9} {'compile s':>9} {'build s':>8} {'file MB':>8} {'open ms':>8} {'json ms':>9} "
+              f"{'single/s':>11} {'batch/s':>11} {'dict/s':>11}")
+        for size in args.sizes:
+            bench_size(tmp, size, args.lookups)
+        if os.path.exists(args.log) and os.path.exists(args.csv):
+            bench_real(tmp, args.log, args.csv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark the sparse graph analytics (kgprep.analytics) vs the notebook analyzer loops.
+
+The legacy path replays what `IndovestDKGAnalyzer` / `SparsityAnalyzer` in
+cleaning.ipynb do for the same numbers: one `pd.to_datetime` per row for
+the parse error count, Counter degrees, `iterrows` connection sets, a
+DFS over them (iterative here; the notebook's recursive one overflows the
+stack on the full graph), and a Python loop over the sorted missing days.
+The sparse path builds `IncidenceGraph` once and computes the full
+`sparsity_report`, clustering included. Scale k concatenates k copies of
+the CSV with entity names suffixed per copy.
+
+    python bench/bench_analytics.py --scales 1 10
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "data", "preparation"))
+
+from kgprep.analytics import IncidenceGraph, parse_dates, sparsity_report
+
+SOURCE = os.path.join(ROOT, "data", "preparation", "notebooks", "raw", "IndovestDKG_FORCEDROP.csv")
+
+
+def scaled(df, scale):
+    copies = [df]
+    for copy in range(1, scale):
+        part = df.copy()
+        part["subject"] = part["subject"] + f" #{copy}"
+        part["object"] = part["object"] + f" #{copy}"
+        copies.append(part)
+    return pd.concat(copies, ignore_index=True)
+
+
+def legacy(df):
+    errors = 0
+    for value in df["date"]:
+        try:
+            pd.to_datetime(value)
+        except Exception:
+            errors += 1
+    dates = pd.to_datetime(df["date"])
+
+    appearances = Counter()
+    for entity in df["subject"]:
+        appearances[entity] += 1
+    for entity in df["object"]:
+        appearances[entity] += 1
+
+    connections, degree = defaultdict(set), defaultdict(int)
+    for _, row in df.iterrows():
+        connections[row["subject"]].add((row["object"], row["relation"]))
+        connections[row["object"]].add((row["subject"], row["relation"]))
+        degree[row["subject"]] += 1
+        degree[row["object"]] += 1
+    diversity = {entity: len({relation for _, relation in pairs}) for entity, pairs in connections.items()}
+
+    visited, components = set(), []
+    for node in connections:
+        if node in visited:
+            continue
+        stack, size = [node], 0
+        visited.add(node)
+        while stack:
+            current = stack.pop()
+            size += 1
+            for neighbor, _ in connections[current]:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    stack.append(neighbor)
+        components.append(size)
+
+    days = dates.dt.date.value_counts().sort_index()
+    missing = sorted(set(pd.date_range(days.index.min(), days.index.max(), freq="D").date) - set(days.index))
+    gaps, current = [], 1
+    for i in range(1, len(missing)):
+        if (missing[i] - missing[i - 1]).days == 1:
+            current += 1
+        else:
+            gaps.append(current)
+            current = 1
+    if missing:
+        gaps.append(current)
+    return {"date_errors": errors, "components": len(components), "largest": max(components),
+            "max_diversity": max(diversity.values()), "gaps": len(gaps)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=SOURCE)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--no-legacy", action="store_true", help="only time the sparse path")
+    args = parser.parse_args()
+
+    base = pd.read_csv(args.csv)
+    print(f"{'rows':>9} {'path':<8} {'seconds':>8}  components / largest / gaps")
+    for scale in args.scales:
+        df = scaled(base, scale)
+        started = time.perf_counter()
+        dates, errors = parse_dates(df["date"])
+        graph = IncidenceGraph.from_frame(df.assign(date=dates))
+        report = sparsity_report(graph)
+        sparse_s = time.perf_counter() - started
+        connectivity = report["connectivity"]
+        print(f"{len(df):>9} {'sparse':<8} {sparse_s:>8.2f}  {connectivity['components']} / "
+              f"{connectivity['largest_component_size']} / {report['temporal']['gap_periods']}"
+              f"  (build {graph.adjacency.nnz:,} adjacency nonzeros, {errors} date errors)")
+        if args.no_legacy:
+            continue
+        started = time.perf_counter()
+        result = legacy(df)
+        legacy_s = time.perf_counter() - started
+        print(f"{len(df):>9} {'legacy':<8} {legacy_s:>8.2f}  {result['components']} / {result['largest']} / "
+              f"{result['gaps']}  ({legacy_s / sparse_s:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
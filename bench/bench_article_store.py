@@ -0,0 +1,85 @@
+"""
+Benchmark merge artikel: read-modify-write CSV lama vs ArticleStore (SQLite).
+
+Untuk setiap ukuran N artikel yang sudah ada, M artikel baru di-merge
+(setengah update link lama, setengah link baru).
+
+    python bench/bench_article_store.py --sizes 10000 100000 1000000 --new 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "construction", "news-scrap"))
+
+from modules.article_store import ArticleStore
+
+
+def legacy_write_to_csv(file_path, news_list):
+    # Salinan write_to_csv lama dari scraper, hanya untuk pembanding
+    if os.path.exists(file_path):
+        df = pd.read_csv(file_path, sep=";")
+    else:
+        df = pd.DataFrame(columns=["tanggal", "judul", "link", "isi"])
+    existing_links = set(df["link"].values)
+    for news in news_list:
+        if news["link"] in existing_links:
+            df.loc[df["link"] == news["link"], ["tanggal", "judul", "isi"]] = [news["tanggal"], news["judul"], news["isi"]]
+        else:
+            df = pd.concat([df, pd.DataFrame([news])], ignore_index=True)
+            existing_links.add(news["link"])
+    df.to_csv(file_path, sep=";", index=False)
+
+
+def make_articles(start, count, body_words=40):
+    body = " ".join(["investasi"] * body_words)
+    return [{"tanggal": "Kompas.com - 01/01/2024, 10:00 WIB", "judul": f"Berita {i}",
+             "link": f"https://money.kompas.com/read/{i}", "isi": body} for i in range(start, start + count)]
+
+
+def new_batch(size, count):
+    return make_articles(size - count // 2, count)
+
+
+def bench_legacy(workdir, size, count):
+    path = os.path.join(workdir, f"legacy_{size}.csv")
+    pd.DataFrame(make_articles(0, size)).to_csv(path, sep=";", index=False)
+    start = time.perf_counter()
+    legacy_write_to_csv(path, new_batch(size, count))
+    return time.perf_counter() - start
+
+
+def bench_store(workdir, size, count):
+    store = ArticleStore(os.path.join(workdir, f"store_{size}.sqlite"), batch_size=count)
+    for i in range(0, size, 100000):
+        store.upsert_many(make_articles(i, min(100000, size - i)))
+    start = time.perf_counter()
+    for news in new_batch(size, count):
+        store.add(news)
+    store.flush()
+    elapsed = time.perf_counter() - start
+    assert len(store) == size + count - count // 2
+    store.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--new", type=int, default=200, help="jumlah artikel yang di-merge")
+    parser.add_argument("--skip-legacy-above", type=int, default=1000000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as workdir:
+        print(f"{'existing':>10} {'legacy csv (s)':>15} {'store (s)':>10}")
+        for size in args.sizes:
+            legacy = bench_legacy(workdir, size, args.new) if size <= args.skip_legacy_above else float("nan")
+            store = bench_store(workdir, size, args.new)
+            print(f"{size:>10} {legacy:>15.3f} {store:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark crawl: thread-pool NewsExtractor vs asyncio CrawlEngine.
+
+Kedua jalur mengambil artikel yang sama dari stub server lokal sehingga
+hasil articles/sec dapat dibandingkan tanpa akses jaringan.
+
+    python bench/bench_crawl.py --pages 4 --per-page 20 --latency 0.05
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "construction", "news-scrap"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import StubServer
+from modules.news_extractor import NewsExtractor
+from modules.crawl_engine import run_crawl
+from modules.sites import KompasSite
+
+
+def bench_thread_pool(base_url, links, workers):
+    extractor = NewsExtractor(f"{base_url}/tag/investasi", max_retries=3, timeout=10)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        news = list(executor.map(lambda t: extractor.get_news_data(t[1], t[0], len(links)),
+                                 enumerate(links, start=1)))
+    elapsed = time.perf_counter() - start
+    extractor.close()
+    return news, elapsed
+
+
+def bench_engine(base_url, pages, per_host, rate):
+    site = KompasSite(f"{base_url}/tag/investasi", force_https=False)
+    start = time.perf_counter()
+    news = run_crawl(site, 1, pages, per_host=per_host, rate=rate, burst=per_host)
+    return news, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="latency stub server per request (detik)")
+    parser.add_argument("--workers", type=int, default=16, help="thread NewsExtractor")
+    parser.add_argument("--per-host", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=50.0, help="token bucket request/detik per host")
+    parser.add_argument("--skip-thread-pool", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    with StubServer(per_page=args.per_page, latency=args.latency) as server:
+        news, elapsed = bench_engine(server.base_url, args.pages, args.per_host, args.rate)
+        ok = sum(1 for n in news if n["isi"] != "error")
+        print(f"asyncio engine : {ok} articles in {elapsed:.2f}s -> {ok / elapsed:.1f} articles/sec")
+        if not args.skip_thread_pool:
+            links = [n["link"] for n in news]
+            news, elapsed = bench_thread_pool(server.base_url, links, args.workers)
+            ok = sum(1 for n in news if n["isi"] != "error")
+            print(f"thread pool    : {ok} articles in {elapsed:.2f}s -> {ok / elapsed:.1f} articles/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark loading IndovestDKG from the text layout vs the binary mmap layout (kgprep.dataset).
+
+The dataset is replicated 1x / 10x / 100x (entity ids and names shifted
+per replica) and loaded in a fresh subprocess per path, reporting wall time
+and peak RSS above the interpreter baseline:
+
+    text/python   line-by-line parsing as in load_id_to_name_map / process_icews_triplets
+    text/pandas   kgprep.dataset.load_text (C parser)
+    binary/copy   load_dataset(mmap=False)
+    binary/mmap   load_dataset() -> np.memmap views
+
+Every path sums all quadruples and decodes 1000 entity names, so the mmap
+numbers include actually touching the data.
+
+    python bench/bench_dataset_format.py --scales 1 10 100
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "data", "preparation"))
+
+from kgprep.dataset import SPLITS, StringTable, QuadrupleDataset, export_binary, export_text, load_dataset, load_text
+
+SOURCE = os.path.join(ROOT, "data", "IndovestDKG")
+PATHS = ["text/python", "text/pandas", "binary/copy", "binary/mmap"]
+
+
+def replicate(dataset, scale):
+    entities = dataset.entities.names()
+    num_entities = len(entities)
+    splits = {}
+    for split, quads in dataset.splits.items():
+        copies = np.tile(quads, (scale, 1))
+        offsets = np.repeat(np.arange(scale, dtype=np.int32) * num_entities, len(quads))
+        copies[:, 0] += offsets
+        copies[:, 2] += offsets
+        splits[split] = copies
+    names = [name if k == 0 else f"{name}#{k}" for k in range(scale) for name in entities]
+    return QuadrupleDataset(splits, StringTable.from_names(names), dataset.relations)
+
+
+def python_load(directory):
+    # The notebook loaders: one str.split and int() per field, names into a dict
+    def id_map(path):
+        mapping = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.strip().split("\t")
+                if len(parts) == 2:
+                    mapping[int(parts[1].strip())] = parts[0].strip()
+        return mapping
+
+    splits = {}
+    for split in SPLITS:
+        rows = []
+        with open(os.path.join(directory, f"{split}.txt"), "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.strip().split()
+                rows.append((int(parts[0]), int(parts[1]), int(parts[2]), int(parts[3])))
+        splits[split] = np.array(rows, dtype=np.int32)
+    entities = id_map(os.path.join(directory, "entity2id.txt"))
+    relations = id_map(os.path.join(directory, "relation2id.txt"))
+    return splits, entities.__getitem__, relations
+
+
+def peak_rss_kb():
+    # ru_maxrss survives exec on Linux (it would report the parent's peak); VmHWM is per address space
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(path, directory):
+    baseline = peak_rss_kb()
+    started = time.perf_counter()
+    if path == "text/python":
+        splits, entity_name, _ = python_load(os.path.join(directory, "text"))
+    else:
+        if path == "text/pandas":
+            dataset = load_text(os.path.join(directory, "text"))
+        else:
+            dataset = load_dataset(os.path.join(directory, "binary"), mmap=path == "binary/mmap")
+        splits, entity_name = dataset.splits, dataset.entities.__getitem__
+    loaded = time.perf_counter() - started
+    total = sum(int(quads.sum(dtype=np.int64)) for quads in splits.values())
+    names = [entity_name(i) for i in range(0, 1000)]
+    elapsed = time.perf_counter() - started
+    peak = peak_rss_kb() - baseline
+    print(json.dumps({"load": loaded, "total": elapsed, "rss_mb": peak / 1024, "checksum": total,
+                      "names": len(names)}))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+        return
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--source", default=SOURCE)
+    args = parser.parse_args()
+
+    source = load_text(args.source)
+    print(f"{'scale':>5} {'quads':>10} {'path':<12} {'load s':>8} {'load+use s':>11} {'peak RSS MB':>12} "
+          f"{'on disk MB':>11}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            dataset = replicate(source, scale) if scale > 1 else source
+            export_text(dataset, os.path.join(tmp, "text"))
+            export_binary(dataset, os.path.join(tmp, "binary"))
+            quads = sum(len(q) for q in dataset.splits.values())
+            del dataset
+            checksums = set()
+            for path in PATHS:
+                layout = os.path.join(tmp, path.split("/")[0])
+                size = sum(os.path.getsize(os.path.join(layout, f)) for f in os.listdir(layout)) / 2 ** 20
+                out = subprocess.run([sys.executable, __file__, "--child", path, tmp], capture_output=True,
+                                     text=True, check=True).stdout
+                result = json.loads(out)
+                checksums.add(result["checksum"])
+                print(f"{scale:>5} {quads:>10,} {path:<12} {result['load']:>8.3f} {result['total']:>11.3f} "
+                      f"{result['rss_mb']:>12.1f} {size:>11.1f}")
+            assert len(checksums) == 1, "layouts disagree"
+
+
+if __name__ == "__main__":
+    main()
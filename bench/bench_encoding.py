@@ -0,0 +1,114 @@
+"""
+Benchmark stable incremental encoding (kgprep.encoding) vs prep.ipynb's full re-encode.
+
+Synthetic quadruples (Zipf-distributed entities, dates over eight years) are
+encoded once as the existing dataset. A daily crawl is then encoded two
+ways: the notebook way (drop_duplicates + dict map + weeks back from
+max_date over base + delta), and incrementally (load persisted vocabularies,
+encode only the delta, append). Also reports how many existing temporal ids
+the notebook scheme shifts.
+
+    python bench/bench_encoding.py --rows 5000000 --daily 20000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "data", "preparation"))
+
+from kgprep.encoding import StableEncoder
+
+TYPES = np.array(["PERUSAHAAN", "ORANG", "KONSEP", "PEMERINTAHAN", "SAHAM", "LOKASI"], dtype=object)
+
+
+def synthetic_quads(rows, entities, relations, start, days, seed):
+    rng = np.random.default_rng(seed)
+    names = np.array([f"entitas {i}" for i in range(entities)], dtype=object)
+    subjects = np.minimum(rng.zipf(1.3, rows) - 1, entities - 1)
+    objects = np.minimum(rng.zipf(1.3, rows) - 1, entities - 1)
+    # Shift the tail so the delta also brings unseen entities
+    subjects = (subjects + seed * 7919) % entities
+    dates = pd.Timestamp(start) + pd.to_timedelta(np.sort(rng.integers(0, days * 86400, rows)), unit="s")
+    return pd.DataFrame({
+        "subject": names[subjects], "subject_type": TYPES[subjects % len(TYPES)],
+        "relation": np.array([f"Relasi{i}" for i in range(relations)], dtype=object)[rng.integers(0, relations, rows)],
+        "object": names[objects], "object_type": TYPES[objects % len(TYPES)],
+        "date": dates.strftime("%Y-%m-%d %H:%M:%S"),
+    })
+
+
+def notebook_encode(df):
+    # prep.ipynb: temporal_id back from max_date, ids by first appearance, dict map
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"])
+    df.sort_values("date", ascending=False, inplace=True)
+    max_date = df["date"].max()
+    df["temporal_id"] = ((max_date - df["date"]).dt.days // 7).astype(int)
+    subjects = df[["subject", "subject_type"]].rename(columns={"subject": "entity_name", "subject_type": "entity_type"})
+    objects = df[["object", "object_type"]].rename(columns={"object": "entity_name", "object_type": "entity_type"})
+    entities = pd.concat([subjects, objects]).drop_duplicates(subset="entity_name").reset_index(drop=True)
+    entity2id = dict(zip(entities["entity_name"], entities.index))
+    relation2id = {rel: idx for idx, rel in enumerate(df["relation"].unique())}
+    df["subject_entity_id"] = df["subject"].map(entity2id)
+    df["object_entity_id"] = df["object"].map(entity2id)
+    df["relation_id"] = df["relation"].map(relation2id)
+    return df[["subject_entity_id", "relation_id", "object_entity_id", "temporal_id"]].sort_index()
+
+
+def timed(fn):
+    started = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--daily", type=int, default=20_000)
+    parser.add_argument("--entities", type=int, default=1_000_000)
+    parser.add_argument("--relations", type=int, default=1200)
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    base, gen_s = timed(lambda: synthetic_quads(args.rows, args.entities, args.relations, "2017-01-02", 8 * 365, 1))
+    delta = synthetic_quads(args.daily, args.entities, args.relations, "2025-01-01", 1, 2)
+    print(f"generated {len(base):,} base + {len(delta):,} daily quadruples in {gen_s:.1f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state = os.path.join(tmp, "state")
+        base_path = os.path.join(tmp, "base.csv")
+        delta_path = os.path.join(tmp, "delta.csv")
+        base.to_csv(base_path, index=False)
+        delta.to_csv(delta_path, index=False)
+
+        encoder = StableEncoder(state)
+        _, initial_s = timed(lambda: encoder.encode_csv(base_path, chunksize=args.chunksize))
+        print(f"initial stable encode (CSV, chunked)    {initial_s:8.2f} s  "
+              f"{len(encoder.entities):,} entities")
+
+        full = pd.concat([base, delta], ignore_index=True)
+        before, _ = timed(lambda: notebook_encode(base))
+        after, notebook_s = timed(lambda: notebook_encode(full))
+        shifted = np.mean(before["temporal_id"].to_numpy() != after["temporal_id"].to_numpy()[:len(base)])
+        renumbered = np.mean(before["subject_entity_id"].to_numpy() != after["subject_entity_id"].to_numpy()[:len(base)])
+        print(f"notebook full re-encode (base + daily)   {notebook_s:8.2f} s  "
+              f"{shifted:.1%} of old temporal ids shifted, {renumbered:.1%} of old subject ids renumbered")
+
+        encoder, load_s = timed(lambda: StableEncoder(state))
+        _, daily_s = timed(lambda: encoder.encode_csv(delta_path, chunksize=args.chunksize))
+        print(f"incremental daily encode                 {load_s + daily_s:8.2f} s  "
+              f"(load state {load_s:.2f} s + encode/append {daily_s:.2f} s), "
+              f"{len(encoder.entities):,} entities")
+
+        in_memory = synthetic_quads(args.rows, args.entities, args.relations, "2017-01-02", 8 * 365, 3)
+        _, vector_s = timed(lambda: StableEncoder(os.path.join(tmp, "memory")).encode(in_memory))
+        print(f"in-memory encode throughput             {len(in_memory) / vector_s:12,.0f} quads/s")
+
+
+if __name__ == "__main__":
+    main()
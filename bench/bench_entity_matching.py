@@ -0,0 +1,95 @@
+"""
+Benchmark blocked entity matching vs the all-pairs SequenceMatcher loops of cleaning.ipynb.
+
+On a random sample per category, the notebook rules are run on every pair
+(the legacy path) and the recall of the blocked matcher's accepted pairs
+is measured against them. The full vocabulary is then matched with the
+blocked engine, and the legacy time is extrapolated from the per-pair cost.
+
+    python bench/bench_entity_matching.py --csv data/preparation/notebooks/raw/IndovestDKG_FORCEDROP.csv
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "data", "preparation"))
+
+from kgprep.entity_matching import (RULES, EntityMatcher, categorize_entities, core_name, entity_frequencies,
+                                    is_acronym_match, is_initial_match)
+
+DEFAULT_CSV = os.path.join(ROOT, "data", "preparation", "notebooks", "raw", "IndovestDKG_FORCEDROP.csv")
+
+
+def legacy_same(core1, core2, rules):
+    # EntityConsistencyAnalyzer._are_same_person / _are_same_organization / _find_general_variations
+    if SequenceMatcher(None, core1, core2).ratio() > rules['ratio']:
+        return True
+    if rules['acronym'] and is_acronym_match(core1, core2):
+        return True
+    if rules['overlap'] is not None:
+        words1, words2 = set(core1.split()), set(core2.split())
+        if len(words1) > 1 and len(words2) > 1 and len(words1 & words2) / min(len(words1), len(words2)) > rules['overlap']:
+            return True
+    if rules['initials'] and is_initial_match(core1, core2):
+        return True
+    if rules['contain'] is not None:
+        short, long_ = sorted((core1, core2), key=len)
+        if len(short) < len(long_) and short in long_ and len(short) > rules['contain']:
+            return True
+    return False
+
+
+def legacy_pairs(cores, rules):
+    pairs = set()
+    for i in range(len(cores)):
+        for j in range(i + 1, len(cores)):
+            if legacy_same(cores[i], cores[j], rules):
+                pairs.add((i, j))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--sample", type=int, default=1500, help="entities per category for the legacy all-pairs run")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    frequencies = entity_frequencies(df)
+    categories = categorize_entities(df)
+    print(f"{'category':<14} {'entities':>9} {'legacy pairs':>13} {'recall':>7} {'legacy s':>9} "
+          f"{'blocked s':>10} {'full blocked s':>15} {'full legacy est.':>17}")
+    for category, entities in categories.items():
+        rules = RULES[category]
+        entities = sorted(entities)
+        sample = sorted(random.Random(0).sample(entities, min(args.sample, len(entities))))
+        cores = [core_name(e, category) for e in sample]
+
+        started = time.perf_counter()
+        expected = legacy_pairs(cores, rules)
+        legacy_seconds = time.perf_counter() - started
+
+        matcher = EntityMatcher(category)
+        started = time.perf_counter()
+        found = {tuple(p) for p in matcher.match_pairs(cores, matcher.candidate_pairs(cores)).tolist()}
+        blocked_seconds = time.perf_counter() - started
+        # Identical core names are one entity for the legacy rules too
+        recall = len(expected & found) / len(expected) if expected else 1.0
+
+        started = time.perf_counter()
+        EntityMatcher(category).find_variations(entities, frequencies)
+        full_seconds = time.perf_counter() - started
+        per_pair = legacy_seconds / max(1, len(cores) * (len(cores) - 1) / 2)
+        full_legacy = per_pair * len(entities) * (len(entities) - 1) / 2
+        print(f"{category:<14} {len(entities):>9} {len(expected):>13} {recall:>7.1%} {legacy_seconds:>9.2f} "
+              f"{blocked_seconds:>10.2f} {full_seconds:>15.2f} {full_legacy / 3600:>15.1f} h")
+
+
+if __name__ == "__main__":
+    main()
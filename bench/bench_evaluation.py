@@ -0,0 +1,91 @@
+"""
+Benchmark the streaming filtered ranking evaluator (kgprep.evaluation) vs per-query filtering.
+
+The per-query path is the usual evaluation loop: for every query, look up
+the (s, r, t) and (s, r) filter sets in Python dicts, mask those objects in
+a copy of the score row, and count higher scores. The evaluator consumes
+the same scores in row chunks. Random float32 scores stand in for a model;
+one pre-generated chunk is reused so only ranking is timed.
+
+    python bench/bench_evaluation.py --queries 6822 100000 --batch-size 512
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "data", "preparation"))
+
+from kgprep.dataset import SPLITS, load_text
+from kgprep.evaluation import RankingEvaluator, TimeAwareFilter
+
+SOURCE = os.path.join(ROOT, "data", "IndovestDKG")
+
+
+def per_query(queries, scores_block, static_sets, time_sets):
+    ranks = []
+    for i, (s, r, o, t) in enumerate(queries.tolist()):
+        row = scores_block[i % len(scores_block)]
+        target = row[o]
+        for filter_set in (static_sets[(s, r)], time_sets[(s, r, t)]):
+            masked = row.copy()
+            masked[[e for e in filter_set if e != o]] = -np.inf
+            ranks.append(int((masked > target).sum()) + 1)
+    return ranks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, nargs="+", default=[6822, 100000])
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--legacy-sample", type=int, default=1000, help="queries timed on the per-query path")
+    args = parser.parse_args()
+
+    dataset = load_text(SOURCE)
+    started = time.perf_counter()
+    filters = TimeAwareFilter.from_dataset(dataset)
+    filter_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    quads = np.concatenate([dataset[split] for split in SPLITS]).astype(np.int64)
+    static_sets, time_sets = defaultdict(set), defaultdict(set)
+    num_relations = dataset.num_relations
+    for s, r, o, t in quads.tolist():
+        static_sets[(s, r)].add(o)
+        time_sets[(s, r, t)].add(o)
+        static_sets[(o, r + num_relations)].add(s)
+        time_sets[(o, r + num_relations, t)].add(s)
+    dict_s = time.perf_counter() - started
+    print(f"filter sets: {filter_s:.2f} s vectorized, {dict_s:.2f} s as Python dicts of sets")
+
+    rng = np.random.default_rng(0)
+    block = rng.standard_normal((args.batch_size, dataset.num_entities)).astype(np.float32)
+    all_queries = filters.queries(quads)
+    test_queries = filters.queries(dataset["test"], inverse=False)
+    print(f"{'queries':>8} {'path':<10} {'seconds':>9} {'queries/s':>10}")
+    for count in args.queries:
+        # The first size is the real test split; larger sizes sample all known queries
+        if count <= len(test_queries):
+            queries = test_queries[:count]
+        else:
+            queries = all_queries[rng.integers(0, len(all_queries), count)]
+        sample = queries[:args.legacy_sample]
+        started = time.perf_counter()
+        per_query(sample, block, static_sets, time_sets)
+        legacy_s = (time.perf_counter() - started) * len(queries) / len(sample)
+        print(f"{len(queries):>8} {'per-query':<10} {legacy_s:>9.2f} {len(queries) / legacy_s:>10.0f}"
+              f"  (extrapolated from {len(sample)})")
+
+        evaluator = RankingEvaluator(filters, queries)
+        started = time.perf_counter()
+        metrics = evaluator.evaluate(lambda batch: block[:len(batch)], args.batch_size)
+        evaluator_s = time.perf_counter() - started
+        print(f"{len(queries):>8} {'streaming':<10} {evaluator_s:>9.2f} {len(queries) / evaluator_s:>10.0f}"
+              f"  time-aware MRR {metrics['time']['mrr']:.5f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark ekstraksi HTML per backend atas korpus fixture tersimpan.
+
+Backend:
+  bs4-html.parser   ekstraksi CNBC lama (BeautifulSoup pure-Python)
+  selectolax-full   selectolax atas dokumen penuh (jalur Kompas lama)
+  spec-truncated    ExtractionSpec: selector per situs + pemotongan byte setelah isi
+
+Setiap backend dijalankan di proses terpisah agar peak RSS terukur bersih.
+
+    python bench/bench_extraction.py --fixtures bench/fixtures/html
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "construction", "news-scrap"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import ensure_fixtures, load_fixtures
+
+BACKENDS = ["bs4-html.parser", "selectolax-full", "spec-truncated"]
+
+
+def bs4_extract(site, data, link):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(data.decode("utf-8"), "html.parser")
+    if site == "cnbc":
+        title_tag = soup.find("h1", class_="mb-4 text-32 font-extrabold")
+        date_tag = soup.find("div", class_="text-cm text-gray")
+        content_div = soup.find("div", class_="detail-text")
+        content = "\n".join(p.get_text(strip=True) for p in content_div.find_all("p")) if content_div else ""
+        return {"tanggal": date_tag.get_text(strip=True) if date_tag else "",
+                "judul": title_tag.get_text(strip=True) if title_tag else "", "link": link, "isi": content}
+    title_tag = soup.select_one("h1.read__title")
+    date_tag = soup.select_one("div.read__time")
+    paragraphs = soup.select("div.read__content p")
+    return {"tanggal": date_tag.get_text() if date_tag else "N/A", "judul": title_tag.get_text() if title_tag else "N/A",
+            "link": link, "isi": " ".join(p.get_text() for p in paragraphs) if paragraphs else "N/A"}
+
+
+def make_extractor(backend, site):
+    from selectolax.parser import HTMLParser
+    from modules.extraction_spec import KOMPAS_SPEC, CNBC_SPEC
+    spec = KOMPAS_SPEC if site == "kompas" else CNBC_SPEC
+    if backend == "bs4-html.parser":
+        return lambda data, link: bs4_extract(site, data, link)
+    if backend == "selectolax-full":
+        return lambda data, link: spec.extract_tree(HTMLParser(data), link)
+    return spec.extract
+
+
+def run_worker(backend, site, fixtures, rounds):
+    pages = load_fixtures(fixtures, site)
+    extract = make_extractor(backend, site)
+    start = time.perf_counter()
+    results = []
+    for _ in range(rounds):
+        results = [extract(data, name) for name, data in pages]
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    checksum = sum(len(r["isi"]) + len(r["judul"]) + len(r["tanggal"]) for r in results)
+    print(json.dumps({"articles_per_sec": len(pages) * rounds / elapsed, "peak_rss_mb": peak_kb / 1024,
+                      "checksum": checksum}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=None, help="direktori berisi kompas/ dan cnbc/ (default: sintetis)")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--worker", nargs=2, metavar=("BACKEND", "SITE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker(args.worker[0], args.worker[1], args.fixtures, args.rounds)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = ensure_fixtures(args.fixtures or tmp)
+        print(f"{'site':<7} {'backend':<17} {'articles/sec':>13} {'peak RSS (MB)':>14} {'checksum':>10}")
+        for site in ("kompas", "cnbc"):
+            for backend in BACKENDS:
+                out = subprocess.run([sys.executable, __file__, "--fixtures", fixtures, "--rounds", str(args.rounds),
+                                      "--worker", backend, site], capture_output=True, text=True, check=True)
+                stats = json.loads(out.stdout)
+                print(f"{site:<7} {backend:<17} {stats['articles_per_sec']:>13.1f} {stats['peak_rss_mb']:>14.1f} "
+                      f"{stats['checksum']:>10}")
+
+
+if __name__ == "__main__":
+    main()
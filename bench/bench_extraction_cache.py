@@ -0,0 +1,88 @@
+"""
+Benchmark ExtractionCache: request ke LLM yang dihemat oleh cache content-addressed.
+
+Korpus sintetis berisi salinan persis (beda whitespace) dan salinan
+sindikasi (ditambah kalimat "Baca juga"). Run pertama dengan cache kosong,
+run kedua mensimulasikan re-run setelah re-scrape. Keduanya memakai server
+chat-completions tiruan lokal.
+
+    python bench/bench_extraction_cache.py --articles 400 --near reuse
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "construction", "LLM"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_llm_server import FakeLLMServer
+from extraction.cache import ExtractionCache
+from extraction.scheduler import ExtractionScheduler
+from extraction.workers import ChatCompletionsWorker
+
+
+def make_corpus(count, exact_ratio, near_ratio, seed=0):
+    rng = random.Random(seed)
+    words = [f"kata{i}" for i in range(5000)]
+    originals = []
+    items = []
+    for i in range(count):
+        roll = rng.random()
+        if originals and roll < exact_ratio:
+            text = "  ".join(rng.choice(originals).split(" ")) + "\n"
+        elif originals and roll < exact_ratio + near_ratio:
+            text = rng.choice(originals) + " Baca juga: berita terkait lainnya di kanal ekonomi."
+        else:
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(300, 700)))
+            originals.append(text)
+        items.append({"index": i, "text": text, "date": "2024-01-01"})
+    return items
+
+
+async def run_once(server, cache, items, rpm):
+    worker = ChatCompletionsWorker(server.base_url)
+    scheduler = ExtractionScheduler(worker, max_in_flight=32, rpm=rpm, tpm=10 ** 9, cache=cache)
+    before = server.stats["requests"]
+    async for _ in scheduler.run([dict(item) for item in items]):
+        pass
+    await worker.aclose()
+    stats = scheduler.stats()
+    return stats, server.stats["requests"] - before
+
+
+async def run(args):
+    items = make_corpus(args.articles, args.exact, args.near_ratio)
+    near = None if args.near == "off" else args.near
+    print(f"{'run':<8} {'requests':>9} {'hit rate':>9} {'tokens saved':>13} {'articles/min':>13}")
+    with tempfile.TemporaryDirectory() as tmp, FakeLLMServer(latency=args.latency, rpm=args.rpm) as server:
+        cache = ExtractionCache(os.path.join(tmp, "cache.sqlite"), "gpt-4o-mini", near_duplicates=near)
+        for name in ("cold", "warm"):
+            started = time.perf_counter()
+            stats, requests = await run_once(server, cache, items, args.rpm)
+            elapsed = time.perf_counter() - started
+            cache_stats = stats["cache"]
+            print(f"{name:<8} {requests:>9} {cache_stats['hit_rate']:>9.1%} {cache_stats['tokens_saved']:>13} "
+                  f"{60 * len(items) / elapsed:>13.1f}")
+            cache.hits = cache.near_hits = cache.misses = cache.tokens_saved = 0
+        print(f"cache entries={cache_stats['entries']} size={cache_stats['size_bytes'] / 1024:.1f} KiB")
+        cache.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=400)
+    parser.add_argument("--exact", type=float, default=0.25, help="proporsi salinan persis")
+    parser.add_argument("--near-ratio", type=float, default=0.15, help="proporsi salinan sindikasi")
+    parser.add_argument("--near", choices=["off", "reuse", "skip"], default="reuse")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--rpm", type=int, default=3000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark JSONL -> Parquet ingestion (kgprep.ingest) vs the hand-assembled CSV path.
+
+The input is extraction JSONL rebuilt from the raw IndovestDKG CSV (scale
+k repeats it with entity names suffixed per copy) with one
+`{"error": "parsing error", ...}` record every 50 quadruples, as
+dynamic-graph-construction.py writes them.
+
+    csv       json.loads per line, error records dropped, DataFrame of the
+              dicts written with to_csv; downstream reads it with read_csv
+              (+ pd.to_datetime), which is what the analyzer classes do
+    parquet   ingest_jsonl (orjson, enum validation, error side file, year
+              partitions); downstream read_quads in full, with a column
+              projection, and for the last 8 weeks only
+
+    python bench/bench_ingest.py --scales 1 10
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "data", "preparation"))
+
+from kgprep.ingest import ingest_jsonl, read_quads
+
+SOURCE = os.path.join(ROOT, "data", "preparation", "notebooks", "raw", "IndovestDKG_FORCEDROP.csv")
+
+
+def write_jsonl(base, scale, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for copy in range(scale):
+            records = base.to_dict("records")
+            for i, record in enumerate(records):
+                if copy:
+                    record["subject"] = f"{record['subject']} #{copy}"
+                    record["object"] = f"{record['object']} #{copy}"
+                if i % 50 == 0:
+                    f.write(json.dumps({"error": "parsing error", "date": record["date"], "content": "{"}) + "\n")
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def csv_path(source, output):
+    records = []
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if "error" not in record:
+                records.append(record)
+    pd.DataFrame(records).to_csv(output, index=False)
+    return len(records)
+
+
+def size_mb(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 2 ** 20
+    return sum(os.path.getsize(os.path.join(d, name)) for d, _, names in os.walk(path) for name in names
+               if not name.startswith("_")) / 2 ** 20
+
+
+def timed(run):
+    started = time.perf_counter()
+    result = run()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--csv", default=SOURCE)
+    args = parser.parse_args()
+
+    base = pd.read_csv(args.csv)
+    last = pd.to_datetime(base["date"]).max().normalize() - pd.Timedelta(weeks=8)
+    print(f"{'rows':>9} {'path':<8} {'ingest rows/s':>14} {'MB':>7} {'full load s':>12} "
+          f"{'3 columns s':>12} {'8 weeks s':>10}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "extraction.jsonl")
+            write_jsonl(base, scale, source)
+
+            csv = os.path.join(tmp, "IndovestDKG_FULL.csv")
+            rows, ingest_s = timed(lambda: csv_path(source, csv))
+            _, full_s = timed(lambda: pd.read_csv(csv).assign(date=lambda df: pd.to_datetime(df["date"])))
+            _, projected_s = timed(lambda: pd.read_csv(csv, usecols=["subject", "relation", "date"]))
+            _, window_s = timed(lambda: (lambda df: df[pd.to_datetime(df["date"]) >= last])(pd.read_csv(csv)))
+            print(f"{rows:>9,} {'csv':<8} {rows / ingest_s:>14,.0f} {size_mb(csv):>7.1f} {full_s:>12.3f} "
+                  f"{projected_s:>12.3f} {window_s:>10.3f}")
+
+            output = os.path.join(tmp, "parquet")
+            summary, ingest_s = timed(lambda: ingest_jsonl(source, output))
+            _, full_s = timed(lambda: read_quads(output))
+            _, projected_s = timed(lambda: read_quads(output, ["subject", "relation", "date"]))
+            window, window_s = timed(lambda: read_quads(output, start=last))
+            print(f"{summary['rows']:>9,} {'parquet':<8} {summary['rows'] / ingest_s:>14,.0f} "
+                  f"{size_mb(output):>7.1f} {full_s:>12.3f} {projected_s:>12.3f} {window_s:>10.3f}"
+                  f"  ({sum(summary['rejected'].values())} records to the error file, {len(window)} rows in window)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark output ekstraksi: flush per baris + rewrite checkpoint per artikel vs ExtractionJournal.
+
+Juga menguji crash-safety: proses anak menulis lewat journal dan dimatikan
+paksa (os._exit) di tengah jalan, lalu resume dan cek setiap artikel
+tertulis tepat sekali.
+
+    python bench/bench_journal.py --articles 20000 --quads 8
+"""
+import argparse
+import collections
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "construction", "LLM"))
+
+from extraction.journal import ExtractionJournal
+
+
+def make_records(article, quads):
+    return [{"subject": f"entitas {article}", "subject_type": "PERUSAHAAN", "relation": "Mengumumkan",
+             "object": f"objek {article}-{q}", "object_type": "KONSEP", "date": "2024-01-01 10:00:00",
+             "article": article} for q in range(quads)]
+
+
+def legacy_write(out_path, checkpoint_path, order, quads):
+    # Meniru loop lama: flush setiap baris, checkpoint JSON ditulis ulang setiap artikel
+    with open(out_path, "a", encoding="utf-8") as f_out:
+        for article in order:
+            for entity in make_records(article, quads):
+                f_out.write(json.dumps(entity, ensure_ascii=False) + "\n")
+                f_out.flush()
+            with open(checkpoint_path, "w", encoding="utf-8") as f:
+                json.dump({"last_processed_index": article}, f, ensure_ascii=False, indent=4)
+
+
+def journal_write(out_path, checkpoint_path, order, quads, commit_every, fsync, crash_after=None):
+    journal = ExtractionJournal(out_path, checkpoint_path, commit_every=commit_every, fsync=fsync)
+    for n, article in enumerate(order):
+        if article in journal:
+            continue
+        journal.write(article, make_records(article, quads))
+        if crash_after is not None and n == crash_after:
+            journal.file.write(b'{"partial": ')  # tulisan setengah jadi sebelum crash
+            journal.file.flush()
+            os._exit(1)
+    journal.close()
+
+
+def check_exactly_once(out_path, articles, quads):
+    counts = collections.Counter()
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            counts[json.loads(line)["article"]] += 1
+    return len(counts) == articles and all(count == quads for count in counts.values())
+
+
+def crash_test(tmp, articles, quads, commit_every, crashes=3):
+    out_path = os.path.join(tmp, "crash.jsonl")
+    checkpoint_path = os.path.join(tmp, "crash_checkpoint.json")
+    order = list(range(articles))
+    random.Random(1).shuffle(order)  # selesai tidak berurutan seperti scheduler
+    for crash in range(crashes):
+        crash_after = random.Random(crash).randrange(articles)
+        subprocess.run([sys.executable, __file__, "--child", out_path, checkpoint_path, str(articles), str(quads),
+                        str(commit_every), str(crash_after)])
+    journal_write(out_path, checkpoint_path, order, quads, commit_every, True)
+    return check_exactly_once(out_path, articles, quads)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        out_path, checkpoint_path = sys.argv[2], sys.argv[3]
+        articles, quads, commit_every, crash_after = map(int, sys.argv[4:8])
+        order = list(range(articles))
+        random.Random(1).shuffle(order)
+        journal_write(out_path, checkpoint_path, order, quads, commit_every, True, crash_after)
+        return
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--quads", type=int, default=8)
+    parser.add_argument("--commit-every", type=int, default=256)
+    args = parser.parse_args()
+
+    order = list(range(args.articles))
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = [
+            ("per-row flush", lambda o, c: legacy_write(o, c, order, args.quads)),
+            ("journal", lambda o, c: journal_write(o, c, order, args.quads, args.commit_every, True)),
+            ("journal/nofsync", lambda o, c: journal_write(o, c, order, args.quads, args.commit_every, False)),
+        ]
+        print(f"{'path':<16} {'seconds':>8} {'articles/s':>11} {'rows/s':>10}")
+        for name, fn in runs:
+            out_path = os.path.join(tmp, name.replace("/", "_") + ".jsonl")
+            started = time.perf_counter()
+            fn(out_path, out_path + ".checkpoint.json")
+            elapsed = time.perf_counter() - started
+            print(f"{name:<16} {elapsed:>8.2f} {args.articles / elapsed:>11.0f} "
+                  f"{args.articles * args.quads / elapsed:>10.0f}")
+        ok = crash_test(tmp, min(args.articles, 5000), args.quads, args.commit_every)
+        print(f"crash/resume exactly-once: {'OK' if ok else 'FAILED'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark ekstraksi LLM: batch `abatch` 20 artikel lama vs ExtractionScheduler.
+
+Keduanya memanggil server chat-completions tiruan lokal (latency lognormal,
+ekor lambat, dan 429 saat budget RPM habis), sehingga articles/min dan
+tail latency bisa dibandingkan tanpa API key.
+
+    python bench/bench_llm_scheduler.py --articles 300 --rpm 600 --latency 0.3
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "construction", "LLM"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_llm_server import FakeLLMServer
+from extraction.scheduler import ExtractionScheduler
+from extraction.workers import ChatCompletionsWorker
+
+
+def make_items(count, seed=0):
+    rng = random.Random(seed)
+    words = "bank indonesia suku bunga ihsg investasi saham obligasi rupiah".split()
+    return [{"index": i, "text": " ".join(rng.choice(words) for _ in range(rng.randint(200, 800))), "date": "2024-01-01"}
+            for i in range(count)]
+
+
+async def legacy_batches(worker, items, batch_size, retry_delay, max_retries, timeout):
+    # Meniru loop lama: tunggu seluruh batch, sleep 0.3-0.7 detik, fallback satu per satu dengan delay tetap
+    latencies = []
+    for start in range(0, len(items), batch_size):
+        batch = items[start:start + batch_size]
+        batch_started = time.monotonic()
+        results = await asyncio.gather(*(worker(item) for item in batch), return_exceptions=True)
+        if any(isinstance(r, Exception) for r in results):
+            results = [None] * len(batch)
+        for item, result in zip(batch, results):
+            if result is None:
+                for attempt in range(max_retries):
+                    try:
+                        await asyncio.wait_for(worker(item), timeout)
+                        break
+                    except Exception:
+                        await asyncio.sleep(retry_delay)
+            latencies.append(time.monotonic() - batch_started)
+        await asyncio.sleep(random.uniform(0.3, 0.7))
+    return latencies
+
+
+def summarize(name, count, elapsed, latencies):
+    latencies = sorted(latencies)
+    pick = lambda p: latencies[min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))]
+    print(f"{name:<10} {60 * count / elapsed:>12.1f} {pick(0.5):>8.2f} {pick(0.95):>8.2f} {pick(0.99):>8.2f} "
+          f"{latencies[-1]:>8.2f}")
+
+
+async def run(args):
+    items = make_items(args.articles)
+    print(f"{'path':<10} {'articles/min':>12} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8} {'max (s)':>8}")
+    if not args.skip_legacy:
+        with FakeLLMServer(latency=args.latency, rpm=args.rpm, tpm=args.tpm) as server:
+            worker = ChatCompletionsWorker(server.base_url)
+            start = time.monotonic()
+            latencies = await legacy_batches(worker, items, 20, args.retry_delay, 5, 300)
+            summarize("batch-20", len(items), time.monotonic() - start, latencies)
+            await worker.aclose()
+    with FakeLLMServer(latency=args.latency, rpm=args.rpm, tpm=args.tpm) as server:
+        worker = ChatCompletionsWorker(server.base_url)
+        scheduler = ExtractionScheduler(worker, max_in_flight=args.max_in_flight, rpm=args.rpm, tpm=args.tpm,
+                                        base_delay=0.2)
+        async for _ in scheduler.run(items):
+            pass
+        stats = scheduler.stats()
+        summarize("scheduler", len(items), stats["elapsed_sec"], scheduler.latencies)
+        print(f"scheduler: retries={stats['retries']} throttled={stats['throttled']} "
+              f"final_window={stats['final_window']} server={server.stats}")
+        await worker.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.3, help="median latency server tiruan (detik)")
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--tpm", type=int, default=2000000)
+    parser.add_argument("--max-in-flight", type=int, default=32)
+    parser.add_argument("--retry-delay", type=float, default=10.0, help="RETRY_DELAY jalur lama")
+    parser.add_argument("--skip-legacy", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark packing/chunking artikel untuk ekstraksi LLM.
+
+Menghitung request per artikel dan overhead token prompt (system prompt
+yang dikirim ulang + overlap chunk) untuk beberapa konfigurasi ArticlePacker
+pada CSV artikel (`tanggal;judul;link;isi`). Tanpa --csv dipakai korpus
+sintetis dengan distribusi panjang lognormal. `--server` juga menjalankan
+end-to-end ke server LLM tiruan.
+
+    python bench/bench_packing.py --articles 5000
+    python bench/bench_packing.py --csv result/kompas.csv --server
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "construction", "LLM"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_llm_server import FakeLLMServer
+from extraction.packing import ArticlePacker, make_token_counter, run_packed
+from extraction.scheduler import ExtractionScheduler
+from extraction.schema import packed_system_prompt, system_prompt
+from extraction.workers import ChatCompletionsWorker
+
+CONFIGS = [
+    ("per-article", dict(max_tokens=10 ** 9, pack_tokens=0)),
+    ("chunk 2k", dict(max_tokens=2000, overlap_tokens=150, pack_tokens=0)),
+    ("chunk+pack 1.5k", dict(max_tokens=2000, overlap_tokens=150, pack_tokens=1500, max_articles=8)),
+    ("chunk+pack 3k", dict(max_tokens=4000, overlap_tokens=150, pack_tokens=3000, max_articles=8)),
+]
+
+
+def synthetic_articles(count, seed=0):
+    rng = random.Random(seed)
+    words = [f"kata{i}" for i in range(3000)]
+    rows = []
+    for i in range(count):
+        sentences = []
+        for _ in range(max(2, int(rng.lognormvariate(3.0, 0.8)))):
+            sentence = " ".join(rng.choice(words) for _ in range(rng.randint(8, 25)))
+            sentences.append(sentence[0].upper() + sentence[1:] + ".")
+        rows.append({"tanggal": "2024-01-01 10:00:00", "judul": f"judul {i}", "link": f"https://x/{i}",
+                     "isi": " ".join(sentences)})
+    return pd.DataFrame(rows)
+
+
+def plan_stats(articles, config, counter):
+    packer = ArticlePacker(token_counter=counter, **config)
+    requests = list(packer.plan({"index": i, "text": text} for i, text in enumerate(articles)))
+    article_tokens = sum(counter(text) for text in articles)
+    prompt_tokens = 0
+    max_request = 0
+    for request in requests:
+        prompt = packed_system_prompt if request.get("packed") else system_prompt
+        tokens = counter(prompt) + counter(request["text"])
+        prompt_tokens += tokens
+        max_request = max(max_request, tokens)
+    return {
+        "requests": len(requests),
+        "requests_per_article": len(requests) / len(articles),
+        "prompt_tokens": prompt_tokens,
+        "overhead": (prompt_tokens - article_tokens) / article_tokens,
+        "max_request": max_request,
+    }
+
+
+async def run_server(articles, config, counter, rpm):
+    with FakeLLMServer(latency=0.2, rpm=rpm) as server:
+        worker = ChatCompletionsWorker(server.base_url)
+        scheduler = ExtractionScheduler(worker, max_in_flight=32, rpm=rpm, tpm=10 ** 9, token_counter=counter)
+        packer = ArticlePacker(token_counter=counter, **config)
+        started = time.perf_counter()
+        done = 0
+        items = [{"index": i, "text": text} for i, text in enumerate(articles)]
+        async for item, result, error in run_packed(scheduler, items, packer):
+            done += error is None and bool(result)
+        elapsed = time.perf_counter() - started
+        await worker.aclose()
+        return done, 60 * len(articles) / elapsed, server.stats["prompt_tokens"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", help="CSV artikel `;` (kolom isi)")
+    parser.add_argument("--articles", type=int, default=5000)
+    parser.add_argument("--server", action="store_true", help="jalankan juga end-to-end ke server tiruan")
+    parser.add_argument("--server-articles", type=int, default=400)
+    parser.add_argument("--rpm", type=int, default=600)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv, sep=";") if args.csv else synthetic_articles(args.articles)
+    articles = df["isi"].fillna("").astype(str).tolist()
+    counter = make_token_counter()
+    print(f"{len(articles)} articles, counter={'tiktoken' if counter.__name__ == '<lambda>' else 'estimate'}")
+    print(f"{'config':<16} {'requests':>9} {'req/article':>12} {'prompt tok':>11} {'overhead':>9} {'max req':>8}")
+    for name, config in CONFIGS:
+        stats = plan_stats(articles, config, counter)
+        print(f"{name:<16} {stats['requests']:>9} {stats['requests_per_article']:>12.3f} "
+              f"{stats['prompt_tokens']:>11} {stats['overhead']:>9.1%} {stats['max_request']:>8}")
+    if args.server:
+        sample = articles[:args.server_articles]
+        print(f"\nend-to-end, {len(sample)} articles, rpm={args.rpm}")
+        print(f"{'config':<16} {'ok':>6} {'articles/min':>13} {'server tok':>11}")
+        for name, config in CONFIGS:
+            ok, rate, tokens = asyncio.run(run_server(sample, config, counter, args.rpm))
+            print(f"{name:<16} {ok:>6} {rate:>13.1f} {tokens:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark pipeline offline per stage dengan kgprep.metrics.
+
+Satu run menjalankan tahap nightly secara berurutan tanpa jaringan:
+fixture HTML Kompas dan CNBC (bench/fixtures.py) disajikan stub server
+lokal dan di-fetch CrawlEngine, artikel disimpan ke ArticleStore lalu
+di-export ke CSV dan dibersihkan clean_articles_csv, kemudian isi artikel
+diekstraksi ExtractionScheduler terhadap server chat-completions tiruan.
+Semua komponen menerima `metrics` yang sama, sehingga snapshot JSON berisi
+latency HTTP, parsing, cleaning, antrean dan latency LLM, retry, serta
+stage_seconds per tahap. Seed tetap dan commit git dicatat di snapshot;
+`--compare` membandingkan p50 / total dengan snapshot commit sebelumnya.
+
+    python bench/bench_pipeline.py --out bench_pipeline.json
+    python bench/bench_pipeline.py --out bench_pipeline.json --compare bench_pipeline.previous.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "construction", "news-scrap"))
+sys.path.insert(0, os.path.join(ROOT, "construction", "LLM"))
+sys.path.insert(0, os.path.join(ROOT, "data", "preparation"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import ensure_fixtures, load_fixtures
+from stub_server import StubServer
+from fake_llm_server import FakeLLMServer
+from modules.article_store import ArticleStore
+from modules.crawl_engine import run_fetch_articles
+from modules.redundant_cleaning import clean_articles_csv
+from modules.sites import KompasSite, CNBCSite
+from extraction.scheduler import ExtractionScheduler
+from extraction.workers import ChatCompletionsWorker
+from kgprep.metrics import Metrics, load_snapshot, summary_rows
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def crawl_stage(metrics, pages, store, args):
+    with StubServer(latency=args.http_latency, throttle_every=args.throttle_every, fixtures=pages) as server:
+        sites = {
+            "kompas": KompasSite(f"{server.base_url}/tag/investasi", force_https=False),
+            "cnbc": CNBCSite(f"{server.base_url}/investment/indeks/6", link_prefix=server.base_url),
+        }
+        for name, site in sites.items():
+            links = [f"{server.base_url}/fixture/{name}/{page}" for page in pages[name]]
+            with metrics.stage(f"fetch_{name}"):
+                run_fetch_articles(site, links, on_article=store.add, max_retries=3, timeout=10,
+                                   per_host=args.per_host, rate=args.rate, burst=args.per_host, metrics=metrics)
+
+
+async def extract_stage(metrics, articles, args):
+    items = [{"index": i, "text": f"{judul}\n{isi}", "date": tanggal}
+             for i, (tanggal, judul, isi) in enumerate(articles)]
+    with FakeLLMServer(latency=args.llm_latency, rpm=args.rpm, tpm=args.tpm, seed=args.seed) as server:
+        worker = ChatCompletionsWorker(server.base_url)
+        scheduler = ExtractionScheduler(worker, max_in_flight=args.max_in_flight, rpm=args.rpm, tpm=args.tpm,
+                                        base_delay=0.2, metrics=metrics)
+        async for _ in scheduler.run(items):
+            pass
+        await worker.aclose()
+    return scheduler.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=None, help="direktori berisi kompas/ dan cnbc/ (default: sintetis)")
+    parser.add_argument("--per-site", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--http-latency", type=float, default=0.02, help="latency stub server per request (detik)")
+    parser.add_argument("--throttle-every", type=int, default=50, help="429 setiap N request (0 = tidak pernah)")
+    parser.add_argument("--per-host", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=50.0, help="token bucket request/detik per host")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="median latency server LLM tiruan (detik)")
+    parser.add_argument("--rpm", type=int, default=1200)
+    parser.add_argument("--tpm", type=int, default=2000000)
+    parser.add_argument("--max-in-flight", type=int, default=32)
+    parser.add_argument("--out", default="bench_pipeline.json", help="snapshot JSON (atau .prom)")
+    parser.add_argument("--compare", help="snapshot JSON run sebelumnya")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    metrics = Metrics()
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = ensure_fixtures(args.fixtures or os.path.join(tmp, "fixtures"), args.per_site, args.seed)
+        pages = {site: dict(load_fixtures(fixtures, site)) for site in ("kompas", "cnbc")}
+        store = ArticleStore(os.path.join(tmp, "articles.sqlite"))
+        csv_path = os.path.join(tmp, "articles.csv")
+        with metrics.stage("crawl"):
+            crawl_stage(metrics, pages, store, args)
+        with metrics.stage("export_csv"):
+            store.export_csv(csv_path)
+        store.close()
+        with metrics.stage("clean"):
+            clean_articles_csv(csv_path, metrics=metrics)
+        articles = pd.read_csv(csv_path, sep=";")[["tanggal", "judul", "isi"]].astype(str).itertuples(index=False)
+        with metrics.stage("extract"):
+            stats = asyncio.run(extract_stage(metrics, list(articles), args))
+
+    metrics.set("run_info", 1, commit=git_commit(), seed=args.seed, per_site=args.per_site)
+    metrics.write(args.out)
+    baseline = load_snapshot(args.compare)["histograms"] if args.compare else {}
+    print(f"{'series':<56} {'count':>7} {'total s':>9} {'p50':>9} {'p95':>9} {'p99':>9}"
+          + (f" {'p50 vs base':>11}" if baseline else ""))
+    snapshot = metrics.snapshot()
+    for key, count, total, p50, p95, p99 in summary_rows(snapshot):
+        line = f"{key:<56} {count:>7} {total:>9.3f} {p50:>9.4f} {p95:>9.4f} {p99:>9.4f}"
+        if baseline.get(key, {}).get("p50"):
+            line += f" {p50 / baseline[key]['p50']:>10.2f}x"
+        print(line)
+    for key, value in snapshot["counters"].items():
+        print(f"{key:<56} {value:>7}")
+    print(f"extraction: {json.dumps(stats)}")
+    print(f"snapshot  : {args.out} (commit {git_commit()[:10]})")
+
+
+if __name__ == "__main__":
+    main()
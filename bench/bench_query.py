@@ -0,0 +1,117 @@
+"""
+Benchmark the temporal query index (kgprep.query) vs pandas boolean filtering.
+
+The pandas path is what the analysis notebooks do per question: load the
+named quadruples from CSV once, then filter the whole frame with boolean
+masks on subject / object name, relation and temporal_id. The index path
+builds QueryIndex once, saves it, and times `QueryIndex.load` (memory
+maps) plus the same queries answered from the posting lists. Scale k
+concatenates k copies of data/IndovestDKG with entity ids shifted and
+names suffixed per copy; queried entities are drawn uniformly.
+
+    python bench/bench_query.py --scales 1 10 --queries 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "data", "preparation"))
+
+from kgprep.dataset import SPLITS, StringTable, load_text
+from kgprep.query import QueryIndex
+
+SOURCE = os.path.join(ROOT, "data", "IndovestDKG")
+
+
+def scaled(dataset, scale):
+    quads = np.concatenate([dataset[split] for split in SPLITS]).astype(np.int64)
+    names = dataset.entities.names()
+    copies, entity_names = [], []
+    for copy in range(scale):
+        part = quads.copy()
+        part[:, [0, 2]] += copy * len(names)
+        copies.append(part)
+        entity_names += names if copy == 0 else [f"{name} #{copy}" for name in names]
+    return np.concatenate(copies), entity_names
+
+
+def timed(queries, run):
+    """Median and p99 latency in microseconds."""
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        run(query)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return np.median(latencies), np.percentile(latencies, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--window", type=int, default=8, help="temporal ids in the windowed query")
+    args = parser.parse_args()
+
+    dataset = load_text(SOURCE)
+    relations = dataset.relations.names()
+    rng = np.random.default_rng(0)
+    print(f"{'quads':>9} {'query':<22} {'pandas us (p50/p99)':>21} {'index us (p50/p99)':>20} {'speedup':>8}")
+    for scale in args.scales:
+        quads, names = scaled(dataset, scale)
+        with tempfile.TemporaryDirectory() as tmp:
+            frame = pd.DataFrame({"subject": np.asarray(names, dtype=object)[quads[:, 0]],
+                                  "relation": np.asarray(relations, dtype=object)[quads[:, 1]],
+                                  "object": np.asarray(names, dtype=object)[quads[:, 2]],
+                                  "temporal_id": quads[:, 3]})
+            csv = os.path.join(tmp, "quads.csv")
+            frame.to_csv(csv, index=False)
+            del frame
+            started = time.perf_counter()
+            df = pd.read_csv(csv)
+            csv_s = time.perf_counter() - started
+
+            started = time.perf_counter()
+            QueryIndex.build(quads, StringTable.from_names(names), dataset.relations).save(os.path.join(tmp, "q"))
+            build_s = time.perf_counter() - started
+            started = time.perf_counter()
+            index = QueryIndex.load(os.path.join(tmp, "q"))
+            load_s = time.perf_counter() - started
+            print(f"{len(quads):>9,} {'load':<22} {csv_s * 1e6:>21,.0f} {load_s * 1e6:>20,.0f} "
+                  f"{csv_s / load_s:>7.0f}x  (index build {build_s:.2f} s, once)")
+
+            picks = rng.integers(0, len(names), args.queries)
+            entities = [names[i] for i in picks.tolist()]
+            windowed = [(names[i], relations[r]) for i, r in
+                        zip(picks.tolist(), quads[rng.integers(0, len(quads), args.queries), 1].tolist())]
+            # data/IndovestDKG counts temporal_id back from the newest week (the index default, `backward`)
+            start, end = index.newest(args.window)
+            cases = [
+                ("timeline(entity)",
+                 lambda e: df[(df["subject"] == e) | (df["object"] == e)].sort_values("temporal_id", ascending=False,
+                                                                                   kind="stable"),
+                 lambda e: index.facts(e)),
+                (f"subject+rel, newest {args.window}",
+                 lambda q: df[(df["subject"] == q[0]) & (df["relation"] == q[1]) & (df["temporal_id"] >= start)
+                              & (df["temporal_id"] < end)],
+                 lambda q: index.facts(q[0], "subject", q[1], start, end)),
+                ("prefix search, 20",
+                 lambda e: df.loc[df["subject"].str.startswith(e[:5]), "subject"].unique()[:20],
+                 lambda e: index.search(e[:5], 20)),
+            ]
+            for label, pandas_query, index_query in cases:
+                queries = windowed if "rel" in label else entities
+                pandas_p50, pandas_p99 = timed(queries[:max(1, args.queries // 10)], pandas_query)
+                index_p50, index_p99 = timed(queries, index_query)
+                print(f"{len(quads):>9,} {label:<22} {pandas_p50:>10,.0f} / {pandas_p99:>8,.0f} "
+                      f"{index_p50:>9,.0f} / {index_p99:>8,.0f} {pandas_p50 / index_p50:>7.0f}x")
+            hop_p50, hop_p99 = timed(entities, lambda e: index.k_hop(e, 2, *index.newest(args.window + 52)))
+            print(f"{len(quads):>9,} {f'2-hop, newest {args.window + 52}':<22} {'-':>21} {hop_p50:>9,.0f} / {hop_p99:>8,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark the snapshot / history index (kgprep.snapshots) vs per-model dict loops.
+
+The legacy path is what the TKGC codebases do at startup: one Python pass
+building `{t: [(s, r, o)]}` snapshots and `{(s, r): [(t, o)]}` histories,
+with history queries filtered in Python. Reports build time, cached
+(mmap) load time, and mean latency of snapshot(t), history(s, r, t, k),
+and the history vocabulary matrix of a k-window, at 1x and 10x the data.
+
+    python bench/bench_snapshot_index.py --scales 1 10 --window 10
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "data", "preparation"))
+
+from kgprep.dataset import load_text
+from kgprep.snapshots import GraphIndex
+
+SOURCE = os.path.join(ROOT, "data", "IndovestDKG")
+
+
+def legacy_build(quads, num_relations):
+    snapshots = defaultdict(list)
+    history = defaultdict(list)
+    for s, r, o, t in quads.tolist():
+        snapshots[t].append((s, r, o))
+        snapshots[t].append((o, r + num_relations, s))
+        history[(s, r)].append((t, o))
+        history[(o, r + num_relations)].append((t, s))
+    return snapshots, history
+
+
+def legacy_history(history, s, r, t, k):
+    return [o for time_id, o in history.get((s, r), ()) if t - k <= time_id < t]
+
+
+def mean_latency(fn, queries):
+    started = time.perf_counter()
+    for query in queries:
+        fn(*query)
+    return (time.perf_counter() - started) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--window", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args()
+
+    dataset = load_text(SOURCE)
+    base = np.concatenate([dataset[split] for split in ("train", "valid", "test")]).astype(np.int64)
+    print(f"{'scale':>5} {'quads':>9} {'path':<7} {'build s':>8} {'load ms':>8} {'snapshot us':>12} "
+          f"{'history us':>11} {'window matrix us':>17}")
+    for scale in args.scales:
+        # Replicas use disjoint entity ids, so every snapshot and history grows with the scale
+        offsets = np.repeat(np.arange(scale) * dataset.num_entities, len(base))
+        quads = np.tile(base, (scale, 1))
+        quads[:, 0] += offsets
+        quads[:, 2] += offsets
+        num_entities = dataset.num_entities * scale
+        rng = np.random.default_rng(0)
+        picks = quads[rng.integers(0, len(quads), args.queries)]
+        history_queries = [(int(s), int(r), int(t) + 1, args.window) for s, r, _, t in picks]
+        times = [(int(t),) for t in rng.integers(0, int(quads[:, 3].max()) + 1, args.queries)]
+
+        started = time.perf_counter()
+        snapshots, history = legacy_build(quads, dataset.num_relations)
+        legacy_s = time.perf_counter() - started
+        snapshot_us = mean_latency(lambda t: snapshots.get(t, []), times)
+        history_us = mean_latency(lambda s, r, t, k: legacy_history(history, s, r, t, k), history_queries)
+
+        def legacy_matrix(t, k=args.window):
+            counts = defaultdict(int)
+            for time_id in range(max(0, t - k), t):
+                for s, r, o in snapshots.get(time_id, ()):
+                    counts[(s, r, o)] += 1
+            return counts
+
+        matrix_us = mean_latency(legacy_matrix, times[:200])
+        print(f"{scale:>5} {len(quads):>9,} {'dicts':<7} {legacy_s:>8.2f} {'-':>8} {snapshot_us:>12.2f} "
+              f"{history_us:>11.2f} {matrix_us:>17.0f}")
+        del snapshots, history
+
+        with tempfile.TemporaryDirectory() as tmp:
+            started = time.perf_counter()
+            GraphIndex.build(quads, num_entities, dataset.num_relations).save(tmp)
+            build_s = time.perf_counter() - started
+            started = time.perf_counter()
+            index = GraphIndex.load(tmp)
+            load_ms = (time.perf_counter() - started) * 1000
+            snapshot_us = mean_latency(index.snapshot, times)
+            history_us = mean_latency(index.history, history_queries)
+            matrix_us = mean_latency(lambda t: index.history_matrix(t, args.window), times[:200])
+            print(f"{scale:>5} {len(quads):>9,} {'index':<7} {build_s:>8.2f} {load_ms:>8.2f} {snapshot_us:>12.2f} "
+                  f"{history_us:>11.2f} {matrix_us:>17.0f}")
+            del index
+
+
+if __name__ == "__main__":
+    main()
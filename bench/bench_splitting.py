@@ -0,0 +1,117 @@
+"""
+Benchmark the out-of-core temporal split / export (kgprep.splitting) vs the split.ipynb flow.
+
+The encoded quadruple CSV is replicated 1x / 10x / 100x (entity ids
+shifted per replica, temporal ids kept) and each path runs in a fresh
+subprocess, reporting wall time and peak RSS above the interpreter
+baseline:
+
+    notebook    read_csv, sort_values, ratio iloc cut, to_csv per split, then
+                re-read every CSV for the space-separated text export
+    streaming   split_and_export: temporal_id histogram, counting sort into a
+                memory-mapped scratch array, CSV + text + binary writers
+
+The notebook's row cut is also checked for timestamps that land in two splits.
+
+    python bench/bench_splitting.py --scales 1 10 100 --chunksize 1000000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "data", "preparation"))
+
+from kgprep.splitting import split_and_export
+
+SOURCE = os.path.join(ROOT, "data", "preparation", "notebooks", "preprocessed", "experiments", "result",
+                      "norm_IndovestDKG_encoded_indovest.csv")
+PATHS = ["notebook", "streaming"]
+
+
+def peak_rss_kb():
+    # ru_maxrss survives exec on Linux (it would report the parent's peak); VmHWM is per address space
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def notebook(source, output):
+    df = pd.read_csv(source)
+    df_sorted = df.sort_values(by="temporal_id").reset_index(drop=True)
+    train_size, val_size = int(len(df_sorted) * 0.8), int(len(df_sorted) * 0.1)
+    splits = {"train": df_sorted.iloc[:train_size], "valid": df_sorted.iloc[train_size:train_size + val_size],
+              "test": df_sorted.iloc[train_size + val_size:]}
+    os.makedirs(os.path.join(output, "final_txt_format"))
+    for name, split in splits.items():
+        split.to_csv(os.path.join(output, f"{name}.csv"), index=False)
+    for name in splits:
+        pd.read_csv(os.path.join(output, f"{name}.csv")).to_csv(
+            os.path.join(output, "final_txt_format", f"{name}.txt"), sep=" ", index=False, header=False)
+    times = [set(split["temporal_id"].unique()) for split in splits.values()]
+    leaked = len((times[0] & times[1]) | (times[1] & times[2]))
+    return {name: len(split) for name, split in splits.items()}, leaked
+
+
+def child(path, source, output, workers, chunksize):
+    baseline = peak_rss_kb()
+    started = time.perf_counter()
+    if path == "notebook":
+        rows, leaked = notebook(source, output)
+    else:
+        summary = split_and_export(source, output, workers=workers, chunksize=chunksize)
+        rows, leaked = {name: info["rows"] for name, info in summary["plans"]["."].items()}, 0
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"seconds": elapsed, "rss_mb": (peak_rss_kb() - baseline) / 1024, "rows": rows,
+                      "leaked": leaked}))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3], sys.argv[4], int(sys.argv[5]), int(sys.argv[6]))
+        return
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--source", default=SOURCE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    base = pd.read_csv(args.source)
+    num_entities = int(max(base["subject_entity_id"].max(), base["object_entity_id"].max())) + 1
+    print(f"{'scale':>5} {'quads':>11} {'path':<10} {'seconds':>8} {'peak RSS MB':>12}  train / valid / test rows")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "encoded.csv")
+            copies = pd.concat([base] * scale, ignore_index=True)
+            shift = np.repeat(np.arange(scale) * num_entities, len(base))
+            copies["subject_entity_id"] += shift
+            copies["object_entity_id"] += shift
+            # A shuffled input, so the streaming path has to sort as well
+            copies.sample(frac=1, random_state=0).to_csv(source, index=False)
+            del copies, shift
+            for path in PATHS:
+                output = os.path.join(tmp, path)
+                out = subprocess.run([sys.executable, __file__, "--child", path, source, output, str(args.workers),
+                                      str(args.chunksize)], capture_output=True, text=True, check=True).stdout
+                result = json.loads(out)
+                rows = " / ".join(str(result["rows"][name]) for name in ("train", "valid", "test"))
+                note = f"  ({result['leaked']} temporal ids in two splits)" if result["leaked"] else ""
+                print(f"{scale:>5} {len(base) * scale:>11,} {path:<10} {result['seconds']:>8.2f} "
+                      f"{result['rss_mb']:>12.1f}  {rows}{note}")
+
+
+if __name__ == "__main__":
+    main()
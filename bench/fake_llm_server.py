@@ -0,0 +1,139 @@
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+CANNED_ENTITIES = [
+    {"subject": "bank indonesia", "subject_type": "BADAN_REGULATOR", "relation": "Mengendalikan",
+     "object": "suku bunga", "object_type": "INSTRUMEN_FINANSIAL"},
+    {"subject": "ihsg", "subject_type": "INDIKATOR_EKONOMI", "relation": "Meningkatkan",
+     "object": "investasi", "object_type": "KONSEP"},
+]
+
+ARTICLE_MARKER = re.compile(r"\[ARTIKEL (\d+)\]")
+
+
+def canned_entities(messages):
+    """Entitas tetap; untuk input multi-artikel setiap artikel ([ARTIKEL n]) mendapat salinan dengan article_id."""
+    text = (messages[-1].get("content") or "") if messages else ""
+    article_ids = [int(n) for n in ARTICLE_MARKER.findall(text)]
+    if not article_ids:
+        return CANNED_ENTITIES
+    return [dict(entity, article_id=n) for n in article_ids for entity in CANNED_ENTITIES]
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Endpoint `/chat/completions` tiruan dengan latency acak dan rate limit RPM/TPM ala OpenAI."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        messages = body.get("messages", [])
+        prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+        now = time.monotonic()
+        with server.lock:
+            while server.window and now - server.window[0][0] >= 60:
+                server.window_tokens -= server.window.popleft()[1]
+            remaining_requests = server.rpm - len(server.window)
+            remaining_tokens = server.tpm - server.window_tokens
+            reset = 60 - (now - server.window[0][0]) if server.window else 0.0
+            throttled = remaining_requests <= 0 or remaining_tokens < prompt_tokens
+            if not throttled:
+                server.window.append((now, prompt_tokens))
+                server.window_tokens += prompt_tokens
+                remaining_requests -= 1
+                remaining_tokens -= prompt_tokens
+            server.requests += 1
+            server.prompt_tokens += prompt_tokens if not throttled else 0
+            server.throttled += int(throttled)
+        headers = {
+            "x-ratelimit-limit-requests": str(server.rpm),
+            "x-ratelimit-remaining-requests": str(max(0, remaining_requests)),
+            "x-ratelimit-reset-requests": f"{reset:.3f}s",
+            "x-ratelimit-limit-tokens": str(server.tpm),
+            "x-ratelimit-remaining-tokens": str(max(0, remaining_tokens)),
+            "x-ratelimit-reset-tokens": f"{reset:.3f}s",
+        }
+        if throttled:
+            headers["retry-after"] = f"{max(reset, 0.05):.3f}"
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}}, headers)
+            return
+        latency = server.rng.lognormvariate(math.log(server.latency), server.sigma)
+        if server.rng.random() < server.slow_fraction:
+            latency *= server.slow_factor
+        time.sleep(latency)
+        arguments = json.dumps({"entities": server.entities_for(messages)}, ensure_ascii=False)
+        tool_name = (body.get("tool_choice") or {}).get("function", {}).get("name", "InvestmentNewsEntities")
+        payload = {
+            "id": f"chatcmpl-{server.requests}",
+            "object": "chat.completion",
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "finish_reason": "tool_calls", "message": {
+                "role": "assistant", "content": None,
+                "tool_calls": [{"id": "call_0", "type": "function",
+                                "function": {"name": tool_name, "arguments": arguments}}]}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(arguments) // 4,
+                      "total_tokens": prompt_tokens + len(arguments) // 4},
+        }
+        self._send_json(200, payload, headers)
+
+
+class FakeLLMServer:
+    """
+    Server chat-completions lokal untuk benchmark offline.
+
+    `latency` adalah median latency (detik, lognormal dengan `sigma`), dan
+    `slow_fraction` request dibuat `slow_factor` kali lebih lambat untuk
+    mensimulasikan ekor latency. `rpm`/`tpm` memicu respons 429.
+    """
+
+    def __init__(self, latency=0.5, sigma=0.4, slow_fraction=0.02, slow_factor=10, rpm=600, tpm=1000000,
+                 seed=0, entities_for=None):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeLLMHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.request_queue_size = 1024
+        for key, value in dict(latency=latency, sigma=sigma, slow_fraction=slow_fraction, slow_factor=slow_factor,
+                               rpm=rpm, tpm=tpm).items():
+            setattr(self.httpd, key, value)
+        self.httpd.rng = random.Random(seed)
+        self.httpd.lock = threading.Lock()
+        self.httpd.window = deque()
+        self.httpd.window_tokens = 0
+        self.httpd.requests = 0
+        self.httpd.prompt_tokens = 0
+        self.httpd.throttled = 0
+        self.httpd.entities_for = entities_for or canned_entities
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    @property
+    def stats(self):
+        return {"requests": self.httpd.requests, "prompt_tokens": self.httpd.prompt_tokens,
+                "throttled": self.httpd.throttled}
@@ -0,0 +1,72 @@
+"""
+Fixture HTML sintetis berformat Kompas dan CNBC untuk benchmark offline.
+
+Simpan halaman asli ke `<dir>/kompas/*.html` dan `<dir>/cnbc/*.html` untuk
+benchmark dengan korpus nyata; fungsi di sini hanya mengisi direktori
+kosong dengan halaman tiruan berukuran realistis.
+"""
+import os
+import random
+
+WORDS = "bank indonesia suku bunga ihsg investasi saham obligasi rupiah inflasi ekspor emiten dividen".split()
+
+KOMPAS_PAGE = """<!DOCTYPE html><html><head><title>{title}</title>
+<link rel="stylesheet" href="/static/read__content.css">{head}</head><body>
+<header><nav>{nav}</nav></header>
+<div class="container"><div class="read__header"><h1 class="read__title">{title}</h1>
+<div class="read__time">Kompas.com - {date} WIB</div></div>
+<div class="read__content"><div class="clearfix">{paragraphs}</div></div>
+<div class="read__bottom">{related}</div></div><footer>{footer}</footer>{scripts}</body></html>"""
+
+CNBC_PAGE = """<!DOCTYPE html><html><head><title>{title}</title>{head}</head><body>
+<header><nav>{nav}</nav></header><article>
+<h1 class="mb-4 text-32 font-extrabold">{title}</h1>
+<div class="text-cm text-gray">CNBC Indonesia {date}</div>
+<div class="detail-text">{paragraphs}</div></article>
+<section class="related">{related}</section><footer>{footer}</footer>{scripts}</body></html>"""
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def make_page(site, rng):
+    title = _sentence(rng, 8).title()
+    paragraphs = "".join(f"<p>{_sentence(rng, rng.randint(20, 60))}.</p>" for _ in range(rng.randint(8, 25)))
+    related = "".join(f'<div class="item"><a href="/read/{rng.randint(1, 10**6)}">{_sentence(rng, 8)}</a>'
+                      f"<p>{_sentence(rng, 20)}</p></div>" for _ in range(60))
+    context = {
+        "title": title,
+        "date": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024, {rng.randint(0, 23):02d}:00",
+        "paragraphs": paragraphs,
+        "head": "".join(f'<meta name="m{i}" content="{_sentence(rng, 10)}">' for i in range(30)),
+        "nav": "".join(f'<a href="/k/{i}">{rng.choice(WORDS)}</a>' for i in range(80)),
+        "related": related,
+        "footer": "".join(f"<p>{_sentence(rng, 15)}</p>" for _ in range(20)),
+        "scripts": "".join(f"<script>var x{i} = '{_sentence(rng, 30)}';</script>" for i in range(20)),
+    }
+    return (KOMPAS_PAGE if site == "kompas" else CNBC_PAGE).format(**context)
+
+
+def ensure_fixtures(directory, per_site=200, seed=0):
+    """Isi `directory/{kompas,cnbc}` dengan halaman sintetis jika masih kosong."""
+    rng = random.Random(seed)
+    for site in ("kompas", "cnbc"):
+        site_dir = os.path.join(directory, site)
+        os.makedirs(site_dir, exist_ok=True)
+        if any(name.endswith(".html") for name in os.listdir(site_dir)):
+            continue
+        for i in range(per_site):
+            with open(os.path.join(site_dir, f"{site}_{i:04d}.html"), "w", encoding="utf-8") as f:
+                f.write(make_page(site, rng))
+    return directory
+
+
+def load_fixtures(directory, site):
+    site_dir = os.path.join(directory, site)
+    pages = []
+    for name in sorted(os.listdir(site_dir)):
+        if name.endswith(".html"):
+            with open(os.path.join(site_dir, name), "rb") as f:
+                pages.append((name, f.read()))
+    return pages
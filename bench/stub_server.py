@@ -0,0 +1,107 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+KOMPAS_INDEX = """<html><body><div class="articleList -list">{items}</div></body></html>"""
+KOMPAS_ITEM = """<div class="articleItem"><a class="article-link" href="{link}">{title}</a></div>"""
+KOMPAS_ARTICLE = """<html><head><title>{title}</title></head><body>
+<h1 class="read__title">{title}</h1>
+<div class="read__time">Kompas.com - 0{day}/01/2024, 10:{minute:02d} WIB</div>
+<div class="read__content">{paragraphs}</div>
+</body></html>"""
+PARAGRAPH = "<p>Paragraf {i} berita investasi: bank indonesia mempertahankan suku bunga acuan dan ihsg menguat.</p>"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Handler situs tiruan berformat Kompas untuk benchmark crawler offline."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        self._send_bytes(status, body.encode("utf-8"), headers)
+
+    def _send_bytes(self, status, data, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        parsed = urlparse(self.path)
+        with server.lock:
+            server.hits += 1
+            throttled = server.throttle_every and server.hits % server.throttle_every == 0
+        if throttled:
+            self._send(429, "slow down", {"Retry-After": "0"})
+            return
+        if parsed.path.startswith("/fixture/") and server.fixtures:
+            # Halaman fixture (bench/fixtures.py) disajikan apa adanya: /fixture/<site>/<nama file>
+            _, _, site, name = parsed.path.split("/", 3)
+            body = server.fixtures.get(site, {}).get(name)
+            if body is None:
+                self._send(404, "not found")
+            else:
+                self._send_bytes(200, body)
+        elif parsed.path.startswith("/tag/"):
+            page = int(parse_qs(parsed.query).get("page", ["1"])[0])
+            items = "".join(
+                KOMPAS_ITEM.format(link=f"{server.base_url}/read/{page}/{i}", title=f"Berita {page}-{i}")
+                for i in range(server.per_page)
+            )
+            self._send(200, KOMPAS_INDEX.format(items=items))
+        elif parsed.path.startswith("/read/"):
+            _, _, page, i = parsed.path.split("/")
+            etag = f'"{page}-{i}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            paragraphs = "".join(PARAGRAPH.format(i=j) for j in range(server.paragraphs))
+            self._send(200, KOMPAS_ARTICLE.format(title=f"Berita {page}-{i}", day=int(page) % 9 + 1,
+                                                  minute=int(i) % 60, paragraphs=paragraphs),
+                       {"ETag": etag})
+        else:
+            self._send(404, "not found")
+
+
+class StubServer:
+    """Server HTTP lokal di thread latar belakang; dipakai sebagai context manager."""
+
+    def __init__(self, per_page=20, paragraphs=12, latency=0.0, throttle_every=0, fixtures=None):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.per_page = per_page
+        self.httpd.paragraphs = paragraphs
+        self.httpd.latency = latency
+        self.httpd.throttle_every = throttle_every
+        # {site: {nama file: bytes}}, mis. dari fixtures.load_fixtures
+        self.httpd.fixtures = fixtures or {}
+        self.httpd.hits = 0
+        self.httpd.lock = threading.Lock()
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.httpd.base_url = self.base_url
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    @property
+    def hits(self):
+        return self.httpd.hits
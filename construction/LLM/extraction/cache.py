@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+import numpy as np
+from extraction.schema import SCHEMA_VERSION, system_prompt
+from extraction.scheduler import estimate_tokens
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def normalize_text(text):
+    """Normalisasi teks artikel sebelum di-hash: Unicode NFKC dan whitespace dirapatkan."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+def _digest(*parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        data = part.encode("utf-8")
+        h.update(len(data).to_bytes(8, "little"))
+        h.update(data)
+    return h.hexdigest()
+
+
+class MinHasher:
+    """Signature MinHash dari shingle kata (`shingle_size` kata) untuk deteksi near-duplicate."""
+
+    def __init__(self, num_perm=64, shingle_size=5, seed=1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self.b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def shingles(self, text):
+        words = text.casefold().split()
+        size = min(self.shingle_size, len(words)) or 1
+        hashes = {int.from_bytes(hashlib.blake2b(" ".join(words[i:i + size]).encode("utf-8"),
+                                                 digest_size=4).digest(), "little")
+                  for i in range(max(1, len(words) - size + 1))}
+        return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+    def signature(self, text):
+        hashes = self.shingles(text)
+        # (a * h + b) mod p dengan h < 2^32 dan a, b < 2^31 tidak overflow di uint64
+        permuted = (np.outer(hashes, self.a) + self.b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    @staticmethod
+    def similarity(sig_a, sig_b):
+        return float(np.mean(sig_a == sig_b))
+
+
+class CacheHit:
+    """Hasil lookup cache; `kind` adalah "exact", "near", atau "duplicate" (near-duplicate yang dilewati)."""
+
+    def __init__(self, kind, key, result, tokens, similarity=1.0):
+        self.kind = kind
+        self.key = key
+        self.result = result
+        self.tokens = tokens
+        self.similarity = similarity
+
+
+class ExtractionCache:
+    """
+    Cache hasil ekstraksi LLM persisten berbasis SQLite, content-addressed.
+
+    Key adalah hash dari (teks ternormalisasi, system prompt, nama model,
+    versi schema), sehingga artikel yang sama tidak dikirim ulang selama
+    prompt/model/schema tidak berubah. Hasil disimpan terkompresi zlib,
+    total ukuran dibatasi `max_bytes` dengan eviction LRU.
+
+    `near_duplicates="reuse"` memakai hasil salinan yang mirip (estimasi
+    Jaccard MinHash >= `threshold`, kandidat dicari via LSH `bands`), dan
+    `near_duplicates="skip"` melewati salinan tersebut tanpa hasil.
+    """
+
+    def __init__(self, path, model, prompt=system_prompt, schema_version=SCHEMA_VERSION,
+                 max_bytes=256 * 1024 * 1024, near_duplicates=None, threshold=0.9, num_perm=64, bands=16,
+                 shingle_size=5):
+        if near_duplicates not in (None, "reuse", "skip"):
+            raise ValueError("near_duplicates harus None, 'reuse', atau 'skip'")
+        if num_perm % bands:
+            raise ValueError("num_perm harus kelipatan bands")
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.namespace = _digest(prompt, model, schema_version)
+        self.prompt_tokens = estimate_tokens(prompt)
+        self.max_bytes = max_bytes
+        self.near_duplicates = near_duplicates
+        self.threshold = threshold
+        self.bands = bands
+        self.minhasher = MinHasher(num_perm, shingle_size) if near_duplicates else None
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                result BLOB NOT NULL,
+                tokens INTEGER NOT NULL,
+                signature BLOB,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS extractions_accessed ON extractions (accessed)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS lsh_buckets (
+                bucket INTEGER NOT NULL,
+                key TEXT NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS lsh_buckets_bucket ON lsh_buckets (bucket)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS lsh_buckets_key ON lsh_buckets (key)")
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()[0]
+
+    def key(self, text):
+        return _digest(self.namespace, normalize_text(text))
+
+    def _buckets(self, signature):
+        rows = len(signature) // self.bands
+        buckets = []
+        for band in range(self.bands):
+            # Namespace ikut di-hash agar bucket model/prompt lain tidak tercampur
+            digest = hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8,
+                                     key=self.namespace[:16].encode("ascii") + band.to_bytes(2, "little"))
+            buckets.append(int.from_bytes(digest.digest(), "little", signed=True))
+        return buckets
+
+    def _near_lookup(self, signature):
+        buckets = self._buckets(signature)
+        placeholders = ",".join("?" * len(buckets))
+        candidates = [row[0] for row in self.conn.execute(
+            f"SELECT DISTINCT key FROM lsh_buckets WHERE bucket IN ({placeholders})", buckets)]
+        best = None
+        for key in candidates:
+            row = self.conn.execute("SELECT signature, result, tokens FROM extractions WHERE key = ?",
+                                    (key,)).fetchone()
+            if row is None or row[0] is None:
+                continue
+            similarity = MinHasher.similarity(signature, np.frombuffer(row[0], dtype=np.uint32))
+            if similarity >= self.threshold and (best is None or similarity > best[0]):
+                best = (similarity, key, row[1], row[2])
+        return best
+
+    def lookup(self, text):
+        """Return CacheHit untuk `text`, atau None jika harus dikirim ke LLM."""
+        key = self.key(text)
+        with self.lock:
+            row = self.conn.execute("SELECT result, tokens FROM extractions WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.conn.execute("UPDATE extractions SET accessed = ? WHERE key = ?", (time.time(), key))
+                self.hits += 1
+                self.tokens_saved += row[1]
+                return CacheHit("exact", key, json.loads(zlib.decompress(row[0])), row[1])
+            if self.minhasher is not None:
+                best = self._near_lookup(self.minhasher.signature(normalize_text(text)))
+                if best is not None:
+                    similarity, near_key, result, tokens = best
+                    self.conn.execute("UPDATE extractions SET accessed = ? WHERE key = ?", (time.time(), near_key))
+                    self.near_hits += 1
+                    self.tokens_saved += tokens
+                    if self.near_duplicates == "skip":
+                        return CacheHit("duplicate", near_key, None, tokens, similarity)
+                    return CacheHit("near", near_key, json.loads(zlib.decompress(result)), tokens, similarity)
+            self.misses += 1
+            return None
+
+    def record_shared(self, text):
+        """Catat lookup yang gagal sebagai hit karena memakai hasil request identik yang sedang berjalan."""
+        with self.lock:
+            self.misses -= 1
+            self.hits += 1
+            self.tokens_saved += self.prompt_tokens + estimate_tokens(normalize_text(text))
+
+    def put(self, text, result, tokens=None):
+        """Simpan hasil ekstraksi; `tokens` default = estimasi token prompt + teks + output."""
+        normalized = normalize_text(text)
+        key = _digest(self.namespace, normalized)
+        payload = json.dumps(result, ensure_ascii=False)
+        if tokens is None:
+            tokens = self.prompt_tokens + estimate_tokens(normalized) + estimate_tokens(payload)
+        compressed = zlib.compress(payload.encode("utf-8"), 6)
+        signature = self.minhasher.signature(normalized) if self.minhasher is not None else None
+        now = time.time()
+        with self.lock:
+            old = self.conn.execute("SELECT size FROM extractions WHERE key = ?", (key,)).fetchone()
+            self.conn.execute("BEGIN")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, compressed, tokens, signature.tobytes() if signature is not None else None,
+                 len(compressed), now, now))
+            if signature is not None:
+                self.conn.execute("DELETE FROM lsh_buckets WHERE key = ?", (key,))
+                self.conn.executemany("INSERT INTO lsh_buckets VALUES (?, ?)",
+                                      ((bucket, key) for bucket in self._buckets(signature)))
+            self.conn.execute("COMMIT")
+            self.total_bytes += len(compressed) - (old[0] if old else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+        return key
+
+    def _evict(self):
+        target = int(self.max_bytes * 0.9)
+        evicted = []
+        for key, size in self.conn.execute("SELECT key, size FROM extractions ORDER BY accessed"):
+            if self.total_bytes <= target:
+                break
+            evicted.append((key,))
+            self.total_bytes -= size
+        self.conn.execute("BEGIN")
+        self.conn.executemany("DELETE FROM extractions WHERE key = ?", evicted)
+        self.conn.executemany("DELETE FROM lsh_buckets WHERE key = ?", evicted)
+        self.conn.execute("COMMIT")
+
+    def stats(self):
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "lookups": lookups,
+            "exact_hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+            "tokens_saved": self.tokens_saved,
+            "entries": self.conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0],
+            "size_bytes": self.total_bytes,
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,130 @@
+import json
+import os
+import time
+
+
+def compress_ids(ids):
+    """Set ID integer -> list range `[start, end)` yang terurut, agar checkpoint tetap kecil."""
+    ranges = []
+    for i in sorted(ids):
+        if ranges and ranges[-1][1] == i:
+            ranges[-1][1] = i + 1
+        else:
+            ranges.append([i, i + 1])
+    return ranges
+
+
+def expand_ids(ranges):
+    ids = set()
+    for start, end in ranges:
+        ids.update(range(start, end))
+    return ids
+
+
+def _fsync_dir(directory):
+    # Rename baru durable setelah direktori di-fsync (tidak didukung di Windows)
+    if os.name == "nt":
+        return
+    fd = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class ExtractionJournal:
+    """
+    Journal output ekstraksi (JSONL) dengan group commit yang crash-safe.
+
+    Baris hasil ditampung di memori dan ditulis sekaligus setiap
+    `commit_every` artikel atau `commit_interval` detik: data di-append lalu
+    di-fsync, kemudian checkpoint ditulis ke file sementara dan di-rename
+    secara atomik. Checkpoint menyimpan set ID artikel yang selesai (bukan
+    offset baris) dan panjang output yang sudah di-commit; saat resume,
+    byte di luar panjang itu dipotong sehingga setiap artikel tertulis
+    tepat sekali meskipun selesai tidak berurutan.
+    """
+
+    def __init__(self, output_path, checkpoint_path, commit_every=256, commit_interval=5.0, fsync=True):
+        directory = os.path.dirname(output_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.fsync = fsync
+        self.completed = set()
+        self.committed_bytes = None
+        self._load_checkpoint()
+        self.file = open(output_path, "ab")
+        if self.committed_bytes is None:
+            self.committed_bytes = self.file.tell()
+        elif self.file.tell() > self.committed_bytes:
+            # Sisa tulisan sebelum crash yang belum tercatat di checkpoint
+            self.file.truncate(self.committed_bytes)
+        self.file.seek(0, os.SEEK_END)
+        self.buffer = []
+        self.pending_ids = []
+        self.last_commit = time.monotonic()
+        self.commits = 0
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if "completed" in checkpoint:
+            self.completed = expand_ids(checkpoint["completed"])
+            self.committed_bytes = checkpoint.get("output_bytes")
+        elif "last_processed_index" in checkpoint:
+            # Format lama: semua baris sebelum last_processed_index dianggap selesai
+            self.completed = set(range(checkpoint["last_processed_index"]))
+
+    def __contains__(self, article_id):
+        return article_id in self.completed
+
+    def write(self, article_id, records):
+        """Tambahkan baris hasil satu artikel; artikel baru dianggap selesai setelah commit berikutnya."""
+        for record in records:
+            self.buffer.append(json.dumps(record, ensure_ascii=False) + "\n")
+        self.pending_ids.append(article_id)
+        if (len(self.pending_ids) >= self.commit_every
+                or time.monotonic() - self.last_commit >= self.commit_interval):
+            self.commit()
+
+    def commit(self):
+        if not self.pending_ids and not self.buffer:
+            return
+        self.file.write("".join(self.buffer).encode("utf-8"))
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+        self.committed_bytes = self.file.tell()
+        self.completed.update(self.pending_ids)
+        self._write_checkpoint()
+        self.buffer = []
+        self.pending_ids = []
+        self.last_commit = time.monotonic()
+        self.commits += 1
+
+    def _write_checkpoint(self):
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"completed": compress_ids(self.completed), "output_bytes": self.committed_bytes}, f)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        if self.fsync:
+            _fsync_dir(os.path.dirname(self.checkpoint_path))
+
+    def close(self):
+        self.commit()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,217 @@
+import re
+from collections import deque
+from extraction.scheduler import estimate_tokens
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n|\n")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+ARTICLE_MARKER = "[ARTIKEL {}]"
+
+
+def make_token_counter(model="gpt-4o-mini"):
+    """Penghitung token lokal; memakai tiktoken jika terpasang, selain itu estimasi ~4 karakter per token."""
+    try:
+        import tiktoken
+    except ImportError:
+        return estimate_tokens
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("o200k_base")
+    return lambda text: len(encoding.encode(text or "", disallowed_special=()))
+
+
+def _units(text, max_tokens, counter):
+    # Paragraf -> kalimat -> kata, sampai setiap unit muat dalam max_tokens
+    for paragraph in PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if counter(paragraph) <= max_tokens:
+            yield paragraph
+            continue
+        for sentence in SENTENCE_END.split(paragraph):
+            if counter(sentence) <= max_tokens:
+                yield sentence
+                continue
+            words = sentence.split()
+            step = max(1, len(words) * max_tokens // max(1, counter(sentence)))
+            for i in range(0, len(words), step):
+                yield " ".join(words[i:i + step])
+
+
+def split_article(text, max_tokens, overlap_tokens=0, counter=estimate_tokens):
+    """
+    Pecah teks panjang menjadi chunk <= `max_tokens` pada batas paragraf (atau kalimat).
+
+    Unit terakhir dari chunk sebelumnya, sampai `overlap_tokens`, diulang di
+    awal chunk berikutnya agar hubungan yang melintasi batas tidak hilang.
+    """
+    if counter(text) <= max_tokens:
+        return [text]
+    chunks = []
+    current = []
+    current_tokens = 0
+    for unit in _units(text, max_tokens, counter):
+        tokens = counter(unit)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(" ".join(u for u, _ in current))
+            overlap = []
+            overlap_size = 0
+            for u, t in reversed(current):
+                if overlap_size + t > overlap_tokens or overlap_size + t + tokens > max_tokens:
+                    break
+                overlap.insert(0, (u, t))
+                overlap_size += t
+            current, current_tokens = overlap, overlap_size
+        current.append((unit, tokens))
+        current_tokens += tokens
+    if current:
+        chunks.append(" ".join(u for u, _ in current))
+    return chunks
+
+
+def quad_key(entity):
+    return tuple(" ".join(str(entity.get(field, "")).casefold().split())
+                 for field in ("subject", "subject_type", "relation", "object", "object_type"))
+
+
+def merge_quads(entity_lists):
+    """Gabungkan hasil beberapa chunk; quad yang sama (case/whitespace-insensitive) hanya disimpan sekali."""
+    seen = set()
+    merged = []
+    for entities in entity_lists:
+        for entity in entities:
+            key = quad_key(entity)
+            if key not in seen:
+                seen.add(key)
+                merged.append(entity)
+    return merged
+
+
+def result_entities(result):
+    if isinstance(result, dict):
+        return result.get("entities") or []
+    if isinstance(result, list):
+        return result
+    return []
+
+
+class ArticlePacker:
+    """
+    Menyusun request LLM dari artikel: artikel panjang dipecah (`max_tokens`,
+    `overlap_tokens`) dan artikel pendek digabung sampai `pack_tokens` /
+    `max_articles` per request dengan penanda [ARTIKEL n].
+
+    `pack_tokens=0` mematikan penggabungan (satu artikel per request,
+    kecuali yang dipecah).
+    """
+
+    def __init__(self, max_tokens=6000, overlap_tokens=200, pack_tokens=0, max_articles=8, token_counter=None):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.pack_tokens = pack_tokens
+        self.max_articles = max_articles
+        self.counter = token_counter or make_token_counter()
+
+    def _pack_request(self, members):
+        if len(members) == 1:
+            return {"text": members[0][0]["text"], "parts": [(members[0][0], 0, 1)]}
+        text = "\n\n".join(f"{ARTICLE_MARKER.format(n + 1)}\n{item['text']}" for n, (item, _) in enumerate(members))
+        return {"text": text, "packed": True, "parts": [(item, 0, 1) for item, _ in members]}
+
+    def plan(self, items):
+        """Generator request `{"text", "parts": [(item, part, total)], "packed"?}` dari item artikel."""
+        pack = []
+        pack_size = 0
+        for item in items:
+            text = item.get("text") or ""
+            tokens = self.counter(text)
+            if tokens > self.max_tokens:
+                chunks = split_article(text, self.max_tokens, self.overlap_tokens, self.counter)
+                for part, chunk in enumerate(chunks):
+                    yield {"text": chunk, "parts": [(item, part, len(chunks))]}
+                continue
+            if self.pack_tokens <= 0 or tokens > self.pack_tokens:
+                yield {"text": text, "parts": [(item, 0, 1)]}
+                continue
+            if pack and (pack_size + tokens > self.pack_tokens or len(pack) >= self.max_articles):
+                yield self._pack_request(pack)
+                pack, pack_size = [], 0
+            pack.append((item, tokens))
+            pack_size += tokens
+        if pack:
+            yield self._pack_request(pack)
+
+
+def split_packed_result(result, count):
+    """Kelompokkan entitas hasil request gabungan per artikel berdasarkan `article_id` (1..count)."""
+    grouped = [[] for _ in range(count)]
+    for entity in result_entities(result):
+        try:
+            article = int(entity.get("article_id")) - 1
+        except (TypeError, ValueError):
+            continue
+        if 0 <= article < count:
+            entity = {k: v for k, v in entity.items() if k != "article_id"}
+            grouped[article].append(entity)
+    return grouped
+
+
+async def run_packed(scheduler, items, packer, cache=None):
+    """
+    Jalankan artikel lewat `packer` dan `scheduler`, lalu susun kembali hasil
+    per artikel sebagai `(item, result, error)` dalam urutan selesai.
+
+    Cache (ExtractionCache) diperiksa dan diisi per artikel, sehingga
+    scheduler sebaiknya dibuat tanpa cache.
+    """
+    pending = {}
+    # Item yang kena cache dikeluarkan langsung; sisanya dipecah / digabung oleh packer
+    cached_results = deque()
+
+    def items_with_hits():
+        for item in items:
+            if cache is not None:
+                hit = cache.lookup(item.get("text"))
+                if hit is not None:
+                    item["cache"] = hit.kind
+                    cached_results.append((item, hit.result, None))
+                    continue
+            yield item
+
+    async for request, result, error in scheduler.run(packer.plan(items_with_hits())):
+        while cached_results:
+            yield cached_results.popleft()
+        parts = request["parts"]
+        if not request.get("packed") and parts[0][2] == 1:
+            # Satu artikel utuh: hasil diteruskan apa adanya seperti tanpa packing
+            if error is None and result is not None and cache is not None:
+                cache.put(parts[0][0].get("text"), result)
+            yield parts[0][0], result, error
+            continue
+        if request.get("packed"):
+            results = split_packed_result(result, len(parts)) if error is None else [None] * len(parts)
+        else:
+            results = [result_entities(result) if error is None else None]
+        for (item, part, total), entities in zip(parts, results):
+            if total == 1:
+                merged = {"entities": entities} if error is None else None
+                if merged is not None and cache is not None:
+                    cache.put(item.get("text"), merged)
+                yield item, merged, error
+                continue
+            state = pending.setdefault(id(item), {"parts": [None] * total, "error": None, "done": 0})
+            state["parts"][part] = entities
+            state["error"] = state["error"] or error
+            state["done"] += 1
+            if state["done"] == total:
+                del pending[id(item)]
+                if state["error"] is not None:
+                    yield item, None, state["error"]
+                    continue
+                merged = {"entities": merge_quads(state["parts"])}
+                if cache is not None:
+                    cache.put(item.get("text"), merged)
+                yield item, merged, None
+    while cached_results:
+        yield cached_results.popleft()
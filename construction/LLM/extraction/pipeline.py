@@ -0,0 +1,198 @@
+import json
+import logging
+import os
+from contextlib import nullcontext
+from extraction.schema import system_prompt
+from extraction.scheduler import ExtractionScheduler
+from extraction.cache import ExtractionCache
+from extraction.journal import ExtractionJournal
+from extraction.packing import ArticlePacker, make_token_counter, run_packed
+
+MODEL_NAME = "gpt-4o-mini"
+MAX_IN_FLIGHT = 32          # Maximum concurrent requests (adaptive window upper bound)
+RPM_LIMIT = 500             # Requests-per-minute budget for the account tier
+TPM_LIMIT = 200000          # Tokens-per-minute budget for the account tier
+MAX_ARTICLE_RETRIES = 5     # Maximum retries per article
+TIMEOUT_PER_ARTICLE = 300   # 5 minutes timeout per article
+NEAR_DUPLICATES = None      # Syndicated copies: None always extracts; opt in to "reuse" cached quads or "skip" them
+COMMIT_EVERY = 256          # Articles per journal group commit (fsync + checkpoint rename)
+MAX_REQUEST_TOKENS = 6000   # Longer articles are split at paragraph/sentence boundaries
+CHUNK_OVERLAP_TOKENS = 200  # Tokens repeated between consecutive chunks of one article
+PACK_TOKENS = 0             # Pack short articles into one request up to this many tokens (0 = off)
+MAX_PACKED_ARTICLES = 8     # Maximum articles per packed request
+
+
+def make_langchain_worker(model_name=MODEL_NAME):
+    """
+    Buat `worker` ExtractionScheduler dari chain LangChain + ChatOpenAI: satu
+    chain untuk artikel tunggal dan satu untuk permintaan yang menggabungkan
+    beberapa artikel. LangChain baru di-import di sini, sehingga modul ini
+    tetap bisa di-import tanpa dependensi tersebut.
+    """
+    from langchain.output_parsers.openai_tools import JsonOutputKeyToolsParser
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_openai import ChatOpenAI
+    from extraction.schema import (InvestmentNewsEntities, PackedInvestmentNewsEntities, PACKED_TOOL_NAME,
+                                   packed_system_prompt)
+    from extraction.workers import make_chain_worker
+
+    model = ChatOpenAI(model=model_name, include_response_headers=True).bind_tools([InvestmentNewsEntities])
+    prompt = ChatPromptTemplate.from_messages([("system", system_prompt), ("user", "{input}")])
+    parser = JsonOutputKeyToolsParser(key_name="InvestmentNewsEntities", first_tool_only=True)
+    # Chain for requests that pack several short articles, each entity tagged with its article_id.
+    packed_model = ChatOpenAI(model=model_name, include_response_headers=True).bind_tools(
+        [PackedInvestmentNewsEntities])
+    packed_prompt = ChatPromptTemplate.from_messages([("system", packed_system_prompt), ("user", "{input}")])
+    packed_parser = JsonOutputKeyToolsParser(key_name=PACKED_TOOL_NAME, first_tool_only=True)
+    return make_chain_worker(prompt, model, parser, packed=(packed_prompt, packed_model, packed_parser))
+
+
+def filter_relevant(relevance, rows, texts, journal, stem, min_score=None, workers=1,
+                    max_request_tokens=MAX_REQUEST_TOKENS, token_counter=None, metrics=None):
+    """
+    Hitung skor relevansi `texts` (baris `rows`) dengan RelevanceModel
+    `relevance`. Artikel dengan skor di bawah ambang langsung dicatat selesai
+    di `journal` tanpa baris hasil; teks kosong (artikel yang gagal diambil)
+    tidak pernah disaring. Skor semua artikel ditambahkan ke
+    `<stem>_relevance.csv`. Mengembalikan array boolean yang bernilai True
+    untuk artikel yang tetap dikirim ke LLM.
+    """
+    import numpy as np
+    import pandas as pd
+
+    with metrics.stage("relevance") if metrics is not None else nullcontext():
+        scores = relevance.score(texts, workers=workers)
+    # Failed scrapes (empty text) score 0 but must still reach the LLM path and end up as error records for refetch
+    keep = relevance.keep(scores, min_score) | np.array([not text.strip() for text in texts], dtype=bool)
+    threshold = relevance.threshold if min_score is None else min_score
+    calls_saved = 0
+    for row, text, score, kept in zip(rows, texts, scores, keep):
+        if metrics is not None:
+            metrics.observe("relevance_score", float(score))
+            metrics.inc("relevance_total", decision="kept" if kept else "filtered")
+        if not kept:
+            # One request per MAX_REQUEST_TOKENS chunk would have been sent for this article
+            calls_saved += max(1, -(-token_counter(text) // max_request_tokens)) if token_counter else 1
+            logging.debug(f"Relevance filter: article {row} skipped, score {score:.4f} < {threshold:.4f}")
+            journal.write(row, [])
+    if metrics is not None:
+        metrics.inc("relevance_calls_saved_total", calls_saved)
+    scores_path = stem + "_relevance.csv"
+    pd.DataFrame({"row": rows, "score": scores, "keep": keep}).to_csv(
+        scores_path, mode="a", header=not os.path.exists(scores_path), index=False)
+    filtered = int(np.count_nonzero(~keep))
+    logging.info(f"Relevance filter: {filtered} of {len(rows)} articles filtered (threshold {threshold:.4f}), "
+                 f"~{calls_saved} LLM calls saved; scores in {scores_path}")
+    return keep
+
+
+async def extract_articles(data, output_path, checkpoint_path, cache_path, worker=None, model_name=MODEL_NAME,
+                           start_row=0, end_row=None, alias_map=None, max_in_flight=MAX_IN_FLIGHT, rpm=RPM_LIMIT,
+                           tpm=TPM_LIMIT, max_retries=MAX_ARTICLE_RETRIES, timeout=TIMEOUT_PER_ARTICLE,
+                           near_duplicates=NEAR_DUPLICATES, commit_every=COMMIT_EVERY,
+                           max_request_tokens=MAX_REQUEST_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS,
+                           pack_tokens=PACK_TOKENS, max_packed=MAX_PACKED_ARTICLES, relevance=None, min_score=None,
+                           relevance_workers=1, metrics=None, progress=True):
+    """
+    Ekstraksi quadruple dari baris `start_row`..`end_row` DataFrame artikel
+    (kolom `isi`, `tanggal`) ke file JSONL `output_path`.
+
+    ExtractionJournal melanjutkan dari ID artikel yang sudah selesai menurut
+    `checkpoint_path`. File itu tetap disimpan setelah proses selesai,
+    sehingga menjalankan ulang tidak menulis artikel dua kali; hapus bersama
+    `output_path` untuk mengulang dari awal. ExtractionCache melewati artikel
+    yang pernah diekstraksi, dan `alias_map` (kgprep.alias_map.AliasMap)
+    menormalkan nama subject/object sebelum ditulis.
+
+    `worker` default adalah chain LangChain untuk `model_name`; worker lain
+    (mis. ChatCompletionsWorker) bisa dipakai ulang oleh proses yang berjalan
+    lama. `relevance` (kgprep.relevance.RelevanceModel) menyaring artikel
+    non-investasi sebelum dikirim ke LLM: artikel dengan skor di bawah
+    `min_score` (default: ambang model) dicatat selesai tanpa baris hasil,
+    dan semua skor ditulis ke `<output>_relevance.csv`.
+
+    Mengembalikan `(statistik scheduler, statistik cache)`.
+    """
+    if alias_map is not None:
+        from kgprep.alias_map import normalize_records
+    stage = metrics.stage if metrics is not None else lambda name: nullcontext()
+    end_row = len(data) if end_row is None else min(end_row, len(data))
+    # The journal appends to the existing output and resumes from the completed article IDs in the checkpoint.
+    journal = ExtractionJournal(output_path, checkpoint_path, commit_every=commit_every)
+    if journal.completed:
+        logging.info(f"Resuming extraction, {len(journal.completed)} articles already completed")
+    pending_rows = [row for row in range(start_row, end_row) if row not in journal]
+    data_to_process = data.iloc[pending_rows]
+    # Failed scrapes leave `isi` empty (NaN in the CSV); they go through as empty text and end up as error records
+    texts = [text if isinstance(text, str) else "" for text in data_to_process["isi"]]
+
+    token_counter = make_token_counter(model_name)
+    if relevance is not None and pending_rows:
+        keep = filter_relevant(relevance, pending_rows, texts, journal, os.path.splitext(output_path)[0],
+                               min_score, relevance_workers, max_request_tokens, token_counter, metrics)
+        pending_rows = [row for row, kept in zip(pending_rows, keep) if kept]
+        texts = [text for text, kept in zip(texts, keep) if kept]
+        data_to_process = data_to_process[keep]
+
+    cache = ExtractionCache(cache_path, model_name, system_prompt, near_duplicates=near_duplicates)
+    # The cache is checked per article by run_packed, not per request by the scheduler.
+    scheduler = ExtractionScheduler(
+        worker or make_langchain_worker(model_name), max_in_flight=max_in_flight, rpm=rpm, tpm=tpm,
+        max_retries=max_retries, timeout=timeout, token_counter=token_counter, metrics=metrics,
+    )
+    packer = ArticlePacker(max_request_tokens, overlap_tokens, pack_tokens, max_packed, token_counter)
+    items = ({"index": index, "text": text, "date": date}
+             for index, text, date in zip(pending_rows, texts, data_to_process["tanggal"]))
+
+    if progress:
+        from tqdm import tqdm
+        bar = tqdm(total=len(data_to_process), desc="Processing articles", unit="article")
+    else:
+        bar = None
+    try:
+        async for item, result, error in run_packed(scheduler, items, packer, cache):
+            pub_date = item["date"]
+            records = []
+            # Near-duplicates skipped by the cache have nothing new to write.
+            if item.get("cache") != "duplicate":
+                if error is not None:
+                    logging.error(f"Error: {error}, giving up on article with pub_date {pub_date}")
+                    result = {"error": f"Failed after {max_retries} attempts", "content": item["text"]}
+                if isinstance(result, dict) and "entities" in result:
+                    entities = result["entities"]
+                elif isinstance(result, list):
+                    entities = result
+                else:
+                    entities = []
+                if entities:
+                    for entity in entities:
+                        entity["date"] = pub_date
+                        records.append(entity)
+                    if metrics is not None:
+                        metrics.inc("extraction_records_total", len(entities), kind="quad")
+                else:
+                    records.append({"error": "parsing error", "date": pub_date, "content": result})
+                    if metrics is not None:
+                        metrics.inc("extraction_records_total", kind="error")
+            if alias_map is not None:
+                # Subjects and objects are mapped to their canonical names before they land in the output
+                with stage("normalize"):
+                    records = list(normalize_records(records, alias_map))
+            with stage("journal_write"):
+                journal.write(item["index"], records)
+            if bar is not None:
+                bar.update(1)
+    finally:
+        if bar is not None:
+            bar.close()
+        with stage("journal_close"):
+            journal.close()
+        cache_stats = cache.stats()
+        cache.close()
+
+    stats = scheduler.stats()
+    logging.info("Scheduler stats: " + json.dumps(stats))
+    logging.info(f"Cache hit rate: {cache_stats['hit_rate']:.1%}, tokens saved: {cache_stats['tokens_saved']}")
+    # The checkpoint is kept: it records which rows are already in the appended output, so a rerun writes nothing twice
+    logging.info(f"Process completed. Data saved to: {output_path} (completed rows in {checkpoint_path})")
+    return stats, cache_stats
@@ -0,0 +1,316 @@
+import asyncio
+import copy
+import random
+import re
+import time
+from collections import deque
+
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value):
+    """Ubah durasi dari header rate-limit OpenAI (mis. '6m0s', '1.5s', '20ms') menjadi detik."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(number) * DURATION_SECONDS[unit] for number, unit in parts)
+
+
+def estimate_tokens(text):
+    # Perkiraan kasar ~4 karakter per token, cukup untuk kuota TPM
+    return max(1, len(text or "") // 4)
+
+
+def rate_limit_details(exc):
+    """Mengembalikan `(is_rate_limited, retry_after)` dari exception klien HTTP / OpenAI."""
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+    if status != 429:
+        return False, None
+    headers = getattr(response, "headers", None) or {}
+    return True, parse_duration(headers.get("retry-after"))
+
+
+class AdaptiveLimiter:
+    """
+    Jendela permintaan yang boleh berjalan bersamaan, menyesuaikan diri
+    dengan kuota RPM/TPM.
+
+    Jendela bertambah satu setelah `limit` permintaan berturut-turut berhasil
+    dan dibagi dua setiap respons 429 (AIMD). Kuota per menit dihitung dengan
+    jendela geser 60 detik, dan header `x-ratelimit-remaining-*` /
+    `x-ratelimit-reset-*` menahan pengiriman sampai kuota diperbarui.
+    """
+
+    def __init__(self, max_in_flight=32, initial_in_flight=8, rpm=500, tpm=200000, min_in_flight=1):
+        self.max_in_flight = max_in_flight
+        self.min_in_flight = min_in_flight
+        self.limit = max(min_in_flight, min(initial_in_flight, max_in_flight))
+        self.rpm = rpm
+        self.tpm = tpm
+        self.in_flight = 0
+        self.successes = 0
+        self.window = deque()
+        self.window_tokens = 0
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self.cond = asyncio.Condition()
+
+    def _wait_time(self, tokens, now):
+        while self.window and now - self.window[0][0] >= 60:
+            self.window_tokens -= self.window.popleft()[1]
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.in_flight >= self.limit:
+            return None
+        if self.window and (len(self.window) >= self.rpm or self.window_tokens + tokens > self.tpm):
+            return self.window[0][0] + 60 - now
+        return 0
+
+    async def acquire(self, tokens):
+        async with self.cond:
+            while True:
+                now = time.monotonic()
+                wait = self._wait_time(tokens, now)
+                if wait == 0:
+                    self.in_flight += 1
+                    self.window.append((now, tokens))
+                    self.window_tokens += tokens
+                    return
+                try:
+                    await asyncio.wait_for(self.cond.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _apply_headers(self, headers, now):
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            if remaining is not None and reset is not None and float(remaining) <= 0:
+                self.blocked_until = max(self.blocked_until, now + reset)
+
+    async def release(self, success, throttled=False, retry_after=None, headers=None):
+        async with self.cond:
+            now = time.monotonic()
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                self.successes = 0
+                self.limit = max(self.min_in_flight, self.limit // 2)
+                self.blocked_until = max(self.blocked_until, now + (retry_after if retry_after is not None else 1.0))
+            elif success:
+                self.successes += 1
+                if self.successes >= self.limit:
+                    self.successes = 0
+                    self.limit = min(self.max_in_flight, self.limit + 1)
+            if headers:
+                self._apply_headers(headers, now)
+            self.cond.notify_all()
+
+
+class ExtractionScheduler:
+    """
+    Antrean kerja asyncio berkelanjutan untuk ekstraksi LLM.
+
+    Setiap item diproses begitu jendela AdaptiveLimiter mengizinkan, artikel
+    yang gagal dicoba ulang dengan jeda eksponensial yang diacak, dan hasil
+    dikeluarkan segera setelah selesai (tidak menunggu satu kelompok penuh).
+
+    `worker(item)` adalah coroutine yang mengembalikan `(result, headers)`.
+    Jika `cache` (ExtractionCache) diberikan, artikel yang sudah pernah
+    diekstrak langsung dikeluarkan tanpa memakai kuota RPM/TPM; jenis
+    kecocokannya dicatat di `item["cache"]`.
+
+    `metrics` (kgprep.metrics.Metrics, opsional) mencatat latensi setiap
+    permintaan dan setiap artikel, waktu tunggu limiter, hasil permintaan
+    (ok/throttled/timeout/error), percobaan ulang, estimasi token prompt, dan
+    kecocokan cache.
+    """
+
+    def __init__(self, worker, max_in_flight=32, initial_in_flight=8, rpm=500, tpm=200000, max_retries=5,
+                 base_delay=1.0, max_delay=60.0, timeout=300, max_pending=None, token_counter=estimate_tokens,
+                 cache=None, metrics=None):
+        self.worker = worker
+        self.limiter = AdaptiveLimiter(max_in_flight, initial_in_flight, rpm, tpm)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.max_pending = max_pending or max_in_flight * 4
+        self.token_counter = token_counter
+        self.cache = cache
+        self.metrics = metrics
+        self.pending_keys = {}
+        self.latencies = []
+        self.request_latencies = []
+        self.retries = 0
+        self.failures = 0
+        self.completed = 0
+        self.cached = 0
+        self.started_at = None
+        self.finished_at = None
+
+    def _count(self, name, value=1, **labels):
+        if self.metrics is not None:
+            self.metrics.inc(name, value, **labels)
+
+    def _observe(self, name, value):
+        if self.metrics is not None:
+            self.metrics.observe(name, value)
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def _process(self, item):
+        if self.cache is None:
+            return await self._extract(item)
+        hit = self.cache.lookup(item.get("text"))
+        if hit is not None:
+            item["cache"] = hit.kind
+            self.cached += 1
+            self._count("llm_cache_total", result=hit.kind)
+            return item, hit.result, None
+        # Salinan yang sedang diekstrak menunggu permintaan yang sama, bukan mengirim ulang
+        key = self.cache.key(item.get("text"))
+        pending = self.pending_keys.get(key)
+        if pending is not None:
+            result, error = await asyncio.shield(pending)
+            if error is None:
+                item["cache"] = "exact"
+                self.cached += 1
+                self._count("llm_cache_total", result="shared")
+                self.cache.record_shared(item.get("text"))
+                return item, copy.deepcopy(result), None
+            return await self._extract(item)
+        pending = self.pending_keys[key] = asyncio.get_running_loop().create_future()
+        try:
+            item, result, error = await self._extract(item)
+            pending.set_result((copy.deepcopy(result), error))
+            return item, result, error
+        finally:
+            if not pending.done():
+                pending.set_result((None, RuntimeError("extraction cancelled")))
+            del self.pending_keys[key]
+
+    async def _extract(self, item):
+        started = time.monotonic()
+        tokens = self.token_counter(item.get("text"))
+        error = None
+        for attempt in range(self.max_retries):
+            wait_started = time.monotonic()
+            await self.limiter.acquire(tokens)
+            request_started = time.monotonic()
+            self._observe("llm_wait_seconds", request_started - wait_started)
+            self._count("llm_prompt_tokens_total", tokens)
+            try:
+                result, headers = await asyncio.wait_for(self.worker(item), timeout=self.timeout)
+            except Exception as e:
+                throttled, retry_after = rate_limit_details(e)
+                await self.limiter.release(False, throttled, retry_after)
+                timed_out = isinstance(e, asyncio.TimeoutError)
+                self._count("llm_requests_total",
+                            outcome="throttled" if throttled else "timeout" if timed_out else "error")
+                error = e if not timed_out else TimeoutError(f"Article processing exceeded {self.timeout} seconds")
+                if attempt + 1 < self.max_retries:
+                    self.retries += 1
+                    self._count("llm_retries_total")
+                    delay = retry_after if throttled and retry_after is not None else self._backoff(attempt)
+                    await asyncio.sleep(delay)
+                continue
+            self.request_latencies.append(time.monotonic() - request_started)
+            self._observe("llm_request_seconds", self.request_latencies[-1])
+            self._count("llm_requests_total", outcome="ok")
+            await self.limiter.release(True, headers=headers)
+            self.latencies.append(time.monotonic() - started)
+            self._observe("llm_article_seconds", self.latencies[-1])
+            self.completed += 1
+            if self.cache is not None and result is not None:
+                self.cache.put(item.get("text"), result)
+            return item, result, None
+        self.failures += 1
+        self._count("llm_failures_total")
+        self.latencies.append(time.monotonic() - started)
+        self._observe("llm_article_seconds", self.latencies[-1])
+        return item, None, error
+
+    async def run(self, items):
+        """Generator async yang menghasilkan `(item, result, error)` sesuai urutan selesai."""
+        self.started_at = time.monotonic()
+        done = asyncio.Queue()
+        slots = asyncio.Semaphore(self.max_pending)
+        finished = object()
+
+        async def run_one(item):
+            try:
+                await done.put(await self._process(item))
+            finally:
+                slots.release()
+
+        tasks = set()
+
+        async def produce():
+            # `finished` atau exception selalu dikirim, supaya consumer tidak menunggu `done` selamanya
+            try:
+                for item in items:
+                    await slots.acquire()
+                    task = asyncio.create_task(run_one(item))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if tasks:
+                    await asyncio.gather(*tasks)
+            except Exception as error:
+                done.put_nowait(error)
+            else:
+                done.put_nowait(finished)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                entry = await done.get()
+                if entry is finished:
+                    break
+                if isinstance(entry, Exception):
+                    raise entry
+                yield entry
+        finally:
+            # Task run_one dibuat oleh producer, jadi tidak ikut batal oleh producer.cancel()
+            producer.cancel()
+            for task in list(tasks):
+                task.cancel()
+            self.finished_at = time.monotonic()
+
+    def stats(self):
+        elapsed = (self.finished_at or time.monotonic()) - (self.started_at or time.monotonic())
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))]
+
+        stats = {
+            "completed": self.completed,
+            "cached": self.cached,
+            "failed": self.failures,
+            "retries": self.retries,
+            "throttled": self.limiter.throttled,
+            "final_window": self.limiter.limit,
+            "elapsed_sec": elapsed,
+            "articles_per_min": (60 * (self.completed + self.cached + self.failures) / elapsed
+                                 if elapsed > 0 else 0.0),
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_p99": percentile(0.99),
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
@@ -0,0 +1,94 @@
+import hashlib
+import json
+from typing import List
+from pydantic import BaseModel, Field
+
+ENTITY_TYPES = [
+    "ORGANISASI", "PEMERINTAHAN", "BADAN_REGULATOR", "NEGARA", "KOTA", "WILAYAH", "ORANG", "PERUSAHAAN",
+    "PRODUK", "EVENT", "SEKTOR", "INDIKATOR_EKONOMI", "INSTRUMEN_FINANSIAL", "KONSEP",
+]
+
+RELATIONS = [
+    "Memiliki", "Mengumumkan", "BeroperasiDi", "Memperkenalkan", "Menghasilkan", "Mengendalikan",
+    "Berpartisipasi", "Mempengaruhi", "BerdampakPositif", "BerdampakNegatif", "Mengaitkan", "AnggotaDari",
+    "BerinvestasiDi", "Meningkatkan", "Menurunkan",
+]
+
+
+# Define the extraction models.
+class InvestmentNewsEntity(BaseModel):
+    subject: str = Field(description="Entitas utama, contoh: 'Bank Indonesia'")
+    subject_type: str = Field(description=f"Tipe entitas, pilih dari: {', '.join(ENTITY_TYPES)}")
+    relation: str = Field(description=f"Hubungan, pilih dari: {', '.join(RELATIONS)}")
+    object: str = Field(description="Entitas target")
+    object_type: str = Field(description="Tipe entitas target")
+
+
+class InvestmentNewsEntities(BaseModel):
+    entities: List[InvestmentNewsEntity] = Field(description="Daftar hubungan entitas dari berita")
+
+
+TOOL_NAME = "InvestmentNewsEntities"
+
+# Berubah otomatis setiap kali field / deskripsi model diubah, sehingga hasil cache lama tidak dipakai lagi
+SCHEMA_VERSION = hashlib.blake2b(
+    json.dumps(InvestmentNewsEntities.model_json_schema(), sort_keys=True).encode("utf-8"), digest_size=8).hexdigest()
+
+system_prompt = f"""
+Anda adalah ahli ekstraksi entitas dari berita investasi Indonesia.
+Tugas Anda adalah mengekstrak SEMUA hubungan entitas yang ada di dalam teks dan mengembalikannya dalam format JSON sesuai dengan model berikut:
+
+Setiap hubungan harus memiliki field:
+- subject: Entitas utama (contoh: "bank indonesia").
+- subject_type: Tipe entitas, pilih salah satu dari [{', '.join(ENTITY_TYPES)}]. Gunakan huruf kapital semua.
+- relation: Hubungan antar entitas, pilih salah satu dari [{', '.join(RELATIONS)}].
+- object: Entitas target.
+- object_type: Tipe entitas target, dengan pilihan yang sama seperti subject_type.
+
+Aturan:
+1. Jangan menambah field atau mengganti nama field.
+2. Hanya keluarkan data yang ada dalam teks tanpa menciptakan informasi baru.
+3. Jika tidak ada hubungan yang terdeteksi, keluarkan "[]" (sebuah array kosong).
+4. Pastikan semua nilai sesuai dengan daftar yang telah disediakan dan menggunakan huruf kapital.
+
+Contoh output:
+[{{{{ 
+  "subject": "bank indonesia", 
+  "subject_type": "BADAN_REGULATOR",
+  "relation": "Mengendalikan",
+  "object": "suku bunga",
+  "object_type": "INSTRUMEN_FINANSIAL"
+}}}}]
+
+Pastikan output yang Anda kembalikan adalah JSON yang valid.
+""".strip()
+
+
+# Model untuk request yang memuat beberapa artikel sekaligus (lihat extraction.packing).
+class PackedInvestmentNewsEntity(InvestmentNewsEntity):
+    article_id: int = Field(description="Nomor artikel sumber, sesuai penanda [ARTIKEL n]")
+
+
+class PackedInvestmentNewsEntities(BaseModel):
+    entities: List[PackedInvestmentNewsEntity] = Field(description="Daftar hubungan entitas dari semua artikel")
+
+
+PACKED_TOOL_NAME = "PackedInvestmentNewsEntities"
+
+packed_system_prompt = system_prompt + """
+
+Input dapat berisi beberapa artikel, masing-masing diawali penanda [ARTIKEL n].
+Ekstrak hubungan dari setiap artikel secara terpisah dan isi field article_id dengan nomor n artikel sumbernya.
+Jangan menggabungkan hubungan dari artikel yang berbeda."""
+
+
+def tool_definition(model=InvestmentNewsEntities, name=TOOL_NAME):
+    """Definisi tool OpenAI (function calling) untuk InvestmentNewsEntities (atau model lain)."""
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": model.__doc__ or "Daftar hubungan entitas dari berita",
+            "parameters": model.model_json_schema(),
+        },
+    }
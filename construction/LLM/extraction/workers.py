@@ -0,0 +1,71 @@
+import json
+import httpx
+from extraction.schema import (TOOL_NAME, PACKED_TOOL_NAME, PackedInvestmentNewsEntities, packed_system_prompt,
+                               system_prompt, tool_definition)
+
+
+def make_chain_worker(prompt, model, parser, packed=None):
+    """
+    Worker ExtractionScheduler dari chain LangChain `prompt | model | parser`.
+
+    Model dipanggil tanpa parser agar header respons (ChatOpenAI dengan
+    `include_response_headers=True`) bisa dibaca limiter, lalu pesan
+    di-parse secara terpisah. `packed` adalah tuple `(prompt, model, parser)`
+    untuk request multi-artikel (`item["packed"]`).
+    """
+    chains = {False: (prompt | model, parser)}
+    if packed is not None:
+        chains[True] = (packed[0] | packed[1], packed[2])
+
+    async def worker(item):
+        llm_chain, item_parser = chains[bool(item.get("packed"))]
+        message = await llm_chain.ainvoke({"input": item["text"]})
+        headers = message.response_metadata.get("headers", {}) if hasattr(message, "response_metadata") else {}
+        return item_parser.invoke(message), headers
+
+    return worker
+
+
+class ChatCompletionsWorker:
+    """
+    Worker langsung ke endpoint `/chat/completions` kompatibel OpenAI via httpx.
+
+    Dipakai untuk benchmark terhadap server tiruan lokal, atau sebagai
+    alternatif ringan tanpa LangChain. Error HTTP dilempar sebagai
+    httpx.HTTPStatusError sehingga 429 dikenali scheduler.
+    """
+
+    def __init__(self, base_url, model="gpt-4o-mini", api_key=None, prompt=system_prompt, timeout=300,
+                 max_connections=64, packed_prompt=packed_system_prompt):
+        self.model = model
+        self.prompt = prompt.replace("{{", "{").replace("}}", "}")
+        self.packed_prompt = packed_prompt.replace("{{", "{").replace("}}", "}")
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.client = httpx.AsyncClient(base_url=base_url.rstrip("/"), headers=headers, timeout=timeout,
+                                        limits=httpx.Limits(max_connections=max_connections))
+        self.tool = tool_definition()
+        self.packed_tool = tool_definition(PackedInvestmentNewsEntities, PACKED_TOOL_NAME)
+
+    async def __call__(self, item):
+        packed = bool(item.get("packed"))
+        tool_name = PACKED_TOOL_NAME if packed else TOOL_NAME
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "system", "content": self.packed_prompt if packed else self.prompt},
+                         {"role": "user", "content": item["text"]}],
+            "tools": [self.packed_tool if packed else self.tool],
+            "tool_choice": {"type": "function", "function": {"name": tool_name}},
+        }
+        resp = await self.client.post("/chat/completions", json=payload)
+        resp.raise_for_status()
+        body = resp.json()
+        tool_calls = body["choices"][0]["message"].get("tool_calls") or []
+        result = {}
+        for call in tool_calls:
+            if call["function"]["name"] == tool_name:
+                result = json.loads(call["function"]["arguments"])
+                break
+        return result, dict(resp.headers)
+
+    async def aclose(self):
+        await self.client.aclose()
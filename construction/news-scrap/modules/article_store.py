@@ -0,0 +1,144 @@
+import csv
+import os
+import sqlite3
+import threading
+import pandas as pd
+
+COLUMNS = ["tanggal", "judul", "link", "isi"]
+
+UPSERT_SQL = """
+    INSERT INTO articles (link, tanggal, judul, isi) VALUES (:link, :tanggal, :judul, :isi)
+    ON CONFLICT(link) DO UPDATE SET tanggal = excluded.tanggal, judul = excluded.judul, isi = excluded.isi
+"""
+
+
+class ArticleStore:
+    """
+    Penyimpanan artikel berbasis SQLite dengan `link` sebagai unique key.
+
+    Artikel ditambahkan lewat `add` (buffer, di-commit per `batch_size`) atau
+    `upsert_many`, sehingga merge hanya O(artikel baru) dan tidak perlu
+    membaca ulang / menulis ulang seluruh CSV. CSV tetap bisa dihasilkan
+    dengan `export_csv` untuk tahap cleaning dan ekstraksi.
+    """
+
+    def __init__(self, path, batch_size=500):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.batch_size = batch_size
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                link TEXT NOT NULL UNIQUE,
+                tanggal TEXT,
+                judul TEXT,
+                isi TEXT
+            )""")
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def __contains__(self, link):
+        return self.conn.execute("SELECT 1 FROM articles WHERE link = ?", (link,)).fetchone() is not None
+
+    def has_article(self, link):
+        """True jika `link` tersimpan dengan isi hasil parse (bukan baris gagal yang kosong / "error")."""
+        return self.conn.execute(
+            "SELECT 1 FROM articles WHERE link = ? AND isi IS NOT NULL AND isi NOT IN ('', 'error')",
+            (link,)).fetchone() is not None
+
+    def add(self, news):
+        """Tambahkan satu artikel ke buffer; buffer di-upsert setiap `batch_size` artikel."""
+        with self.lock:
+            self.buffer.append(news)
+            if len(self.buffer) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if self.buffer:
+            self._upsert(self.buffer)
+            self.buffer = []
+
+    def _upsert(self, news_list):
+        with self.conn:
+            self.conn.executemany(UPSERT_SQL, ({col: news.get(col) for col in COLUMNS} for news in news_list))
+
+    def upsert_many(self, news_list):
+        with self.lock:
+            self._flush()
+            self._upsert(news_list)
+
+    def missing_links(self, links):
+        """Return link yang belum ada di store, urutan input dipertahankan."""
+        known = set()
+        links = list(links)
+        for i in range(0, len(links), 900):
+            chunk = links[i:i + 900]
+            placeholders = ",".join("?" * len(chunk))
+            known.update(row[0] for row in self.conn.execute(
+                f"SELECT link FROM articles WHERE link IN ({placeholders})", chunk))
+        return [link for link in links if link not in known]
+
+    def import_csv(self, file_path, chunksize=50000):
+        """Migrasi CSV lama (`tanggal;judul;link;isi`) ke store secara bertahap."""
+        for chunk in pd.read_csv(file_path, sep=";", chunksize=chunksize):
+            chunk = chunk.reindex(columns=COLUMNS).astype(object)
+            self.upsert_many(chunk.where(chunk.notna(), None).to_dict(orient="records"))
+
+    def iter_links(self, fetch_size=10000):
+        self.flush()
+        cursor = self.conn.execute("SELECT link FROM articles ORDER BY seq")
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row[0]
+
+    def iter_articles(self, fetch_size=10000):
+        cursor = self.conn.execute("SELECT tanggal, judul, link, isi FROM articles ORDER BY seq")
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield from rows
+
+    def export_csv(self, file_path):
+        """Tulis seluruh artikel ke CSV `;` secara streaming."""
+        self.flush()
+        directory = os.path.dirname(file_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter=";", lineterminator="\n")
+            writer.writerow(COLUMNS)
+            writer.writerows(self.iter_articles())
+        os.replace(tmp_path, file_path)
+        return file_path
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def open_store(csv_path, batch_size=500):
+    """Buka store di samping `csv_path`; CSV lama diimpor sekali saat store baru dibuat."""
+    store_path = os.path.splitext(csv_path)[0] + ".sqlite"
+    is_new = not os.path.exists(store_path)
+    store = ArticleStore(store_path, batch_size=batch_size)
+    if is_new and os.path.exists(csv_path):
+        store.import_csv(csv_path)
+    return store
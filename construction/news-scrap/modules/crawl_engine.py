@@ -0,0 +1,321 @@
+import asyncio
+import importlib.util
+import logging
+import random
+import time
+from contextlib import nullcontext
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import httpx
+from modules.response_cache import CachedResponse
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/85.0.4183.121 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/88.0.4324.96 Safari/537.36"
+]
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Token bucket politeness limiter: `rate` request/detik dengan burst `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def parse_retry_after(value):
+    """Return delay (detik) dari header Retry-After, atau None jika tidak valid."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class CrawlEngine:
+    """
+    Asyncio crawl engine bersama untuk semua site adapter.
+
+    Satu httpx.AsyncClient (HTTP/2 jika `h2` terpasang, keep-alive pooling)
+    dipakai untuk semua request. Setiap host dibatasi oleh semaphore
+    `per_host` dan token bucket `rate`/`burst`, menggantikan sleep acak.
+
+    `metrics` (kgprep.metrics.Metrics, opsional) mencatat latency dan status
+    setiap request HTTP, retry, byte yang diunduh, hasil cache, dan waktu
+    parsing indeks/artikel.
+    """
+
+    def __init__(self, max_connections=32, per_host=8, rate=4.0, burst=8, max_retries=3,
+                 timeout=10, backoff_base=1.0, backoff_max=60.0, http2=True, cache=None,
+                 skip_unchanged=False, index_workers=4, article_workers=16, queue_size=256, metrics=None):
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        # ResponseCache opsional untuk conditional request antar run
+        self.cache = cache
+        # True, atau callable `link -> bool` (mis. ArticleStore.has_article): artikel 304 tidak di-parse ulang
+        self.skip_unchanged = skip_unchanged
+        self.index_workers = index_workers
+        self.article_workers = article_workers
+        self.queue_size = queue_size
+        self.metrics = metrics
+        self.client = None
+        self.host_slots = {}
+        self.host_buckets = {}
+
+    async def __aenter__(self):
+        limits = httpx.Limits(max_connections=self.max_connections,
+                              max_keepalive_connections=self.max_connections)
+        self.client = httpx.AsyncClient(timeout=self.timeout, limits=limits, http2=self.http2,
+                                        follow_redirects=True)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+        self.client = None
+
+    def _host_limits(self, url):
+        host = urlparse(url).netloc
+        if host not in self.host_slots:
+            self.host_slots[host] = asyncio.Semaphore(self.per_host)
+            self.host_buckets[host] = TokenBucket(self.rate, self.burst)
+        return self.host_slots[host], self.host_buckets[host]
+
+    def _count(self, name, value=1, **labels):
+        if self.metrics is not None:
+            self.metrics.inc(name, value, **labels)
+
+    def _stage(self, stage):
+        return self.metrics.stage(stage) if self.metrics is not None else nullcontext()
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        delay = self.backoff_base * (2 ** attempt)
+        return min(self.backoff_max, delay) * random.uniform(0.5, 1.0)
+
+    async def fetch(self, url, headers=None):
+        """Fetch `url`, return httpx.Response sukses atau None setelah `max_retries` gagal."""
+        slots, bucket = self._host_limits(url)
+        request_headers = {
+            "User-Agent": random.choice(USER_AGENTS),
+            "Accept-Language": "en-US,en;q=0.9",
+        }
+        if headers:
+            request_headers.update(headers)
+        for attempt in range(self.max_retries):
+            retry_after = None
+            await bucket.acquire()
+            try:
+                async with slots:
+                    started = time.perf_counter()
+                    resp = await self.client.get(url, headers=request_headers)
+                if self.metrics is not None:
+                    self.metrics.observe("http_request_seconds", time.perf_counter() - started)
+                    self.metrics.inc("http_responses_total", status=resp.status_code)
+                    self.metrics.inc("http_bytes_total", len(resp.content))
+                if resp.status_code < 400:
+                    return resp
+                if resp.status_code not in RETRY_STATUS:
+                    logging.warning(f"Status code {resp.status_code} on {url}, not retrying.")
+                    return None
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                logging.warning(f"Status code {resp.status_code} on {url}. Attempt {attempt+1}/{self.max_retries}")
+            except httpx.RequestError as e:
+                self._count("http_errors_total", error=type(e).__name__)
+                logging.warning(f"Error on {url}: {e}. Attempt {attempt+1}/{self.max_retries}")
+            if attempt + 1 < self.max_retries:
+                self._count("http_retries_total")
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+        self._count("http_failures_total")
+        return None
+
+    async def fetch_page(self, url):
+        """Fetch `url` lewat cache, return CachedResponse (flag `not_modified` untuk 304) atau None."""
+        cached = self.cache.get(url) if self.cache else None
+        if cached is not None and self.cache.is_fresh(cached):
+            self._count("http_cache_total", result="fresh")
+            return cached
+        resp = await self.fetch(url, cached.validators() if cached is not None else None)
+        if resp is None:
+            return None
+        self._count("http_cache_total", result="revalidated" if resp.status_code == 304 else "miss")
+        if resp.status_code == 304 and cached is None:
+            return None
+        if self.cache:
+            return self.cache.store_response(url, resp, cached)
+        return CachedResponse(url, resp.content, resp.encoding)
+
+    def _skip_unchanged(self, link):
+        return self.skip_unchanged(link) if callable(self.skip_unchanged) else bool(self.skip_unchanged)
+
+    async def fetch_text(self, url):
+        page = await self.fetch_page(url)
+        return page.text if page is not None else None
+
+    async def get_news_data(self, site, link, article_number, total_articles):
+        logging.info(f"Processing article {article_number} of {total_articles}: {link}")
+        page = await self.fetch_page(link)
+        if page is not None and page.not_modified and self._skip_unchanged(link):
+            # Artikel tidak berubah sejak run sebelumnya, tidak perlu di-parse ulang
+            self._count("articles_total", result="unchanged")
+            return None
+        if page is not None:
+            with self._stage("parse_article"):
+                news = site.parse_article(page.body, link)
+            self._count("articles_total", result="ok")
+            return news
+        logging.info(f"Failed processing article {article_number} of {total_articles}: {link}")
+        self._count("articles_total", result="failed")
+        return site.failed_article(link)
+
+    async def _article_worker(self, site, queue, state, on_article, known):
+        while True:
+            link = await queue.get()
+            if link is None:
+                queue.task_done()
+                return
+            try:
+                state["fetched"] += 1
+                try:
+                    news = await self.get_news_data(site, link, state["fetched"], state["queued"])
+                except Exception:
+                    # Satu artikel yang gagal di-parse tidak boleh mematikan worker (crawl akan macet)
+                    logging.exception(f"Error processing article {link}")
+                    self._count("articles_total", result="error")
+                    news = site.failed_article(link)
+                if news is None:
+                    continue
+                state["results"].append(news)
+                if hasattr(known, "remember") and news != site.failed_article(link):
+                    known.remember(link)
+                if on_article is not None:
+                    try:
+                        on_article(news)
+                    except Exception:
+                        logging.exception(f"Error storing article {link}")
+                        self._count("articles_total", result="error")
+                        state["results"][-1] = site.failed_article(link)
+            finally:
+                queue.task_done()
+
+    async def _run_pipeline(self, site, produce, on_article, known):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        state = {"queued": 0, "fetched": 0, "results": []}
+        workers = [asyncio.create_task(self._article_worker(site, queue, state, on_article, known))
+                   for _ in range(self.article_workers)]
+
+        async def feed():
+            await produce(queue, state)
+            for _ in workers:
+                await queue.put(None)
+
+        tasks = [asyncio.create_task(feed())] + workers
+        try:
+            # Error fatal di worker atau producer membatalkan yang lain dan di-raise ulang,
+            # bukan membuat producer menunggu selamanya di queue.put
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+        return state["results"]
+
+    async def fetch_articles(self, site, links, on_article=None):
+        """Fetch daftar artikel lewat worker pool; `on_article` dipanggil segera setiap artikel selesai."""
+        async def produce(queue, state):
+            state["queued"] = len(links)
+            for link in links:
+                await queue.put(link)
+        return await self._run_pipeline(site, produce, on_article, None)
+
+    async def crawl(self, site, start_page, end_page, on_article=None, known=None, stop_on_known=False):
+        """
+        Crawl pipeline: halaman indeks di-fetch paralel dan link barunya langsung
+        masuk ke antrian terbatas yang dikonsumsi worker artikel.
+
+        Link yang sudah ada di `known` (SeenLinks / ArticleStore) atau sudah
+        diantrikan dilewati. Dengan `stop_on_known`, indeks berhenti pada
+        halaman pertama yang hanya berisi link lama (indeks terbaru-dulu).
+        """
+        pages = iter(range(start_page, end_page + 1))
+        queued = set()
+        stop = False
+
+        async def index_worker(queue, state):
+            nonlocal stop
+            for page in pages:
+                if stop:
+                    return
+                text = await self.fetch_text(site.index_url(page))
+                if text is None:
+                    logging.warning(f"Failed to retrieve content on page {page}.")
+                    continue
+                with self._stage("parse_index"):
+                    links = site.parse_index(text)
+                new_links = [link for link in dict.fromkeys(links)
+                             if link not in queued and (known is None or link not in known)]
+                logging.info(f"Processed page {page} ({start_page} to {end_page}) with {len(links)} articles, "
+                             f"{len(new_links)} new.")
+                if stop_on_known and links and not new_links:
+                    logging.info(f"Page {page} only has known links, stopping index crawl.")
+                    stop = True
+                    return
+                queued.update(new_links)
+                state["queued"] += len(new_links)
+                for link in new_links:
+                    await queue.put(link)
+
+        async def produce(queue, state):
+            await asyncio.gather(*(index_worker(queue, state) for _ in range(self.index_workers)))
+            logging.info(f"Total links collected: {len(queued)}")
+
+        return await self._run_pipeline(site, produce, on_article, known)
+
+
+def run_crawl(site, start_page, end_page, on_article=None, known=None, stop_on_known=False, **engine_kwargs):
+    """Jalankan crawl halaman indeks `start_page`..`end_page` secara sinkron."""
+    async def _run():
+        async with CrawlEngine(**engine_kwargs) as engine:
+            return await engine.crawl(site, start_page, end_page, on_article, known, stop_on_known)
+    return asyncio.run(_run())
+
+
+def run_fetch_articles(site, links, on_article=None, **engine_kwargs):
+    """Fetch daftar link artikel secara sinkron (tanpa fase indeks)."""
+    async def _run():
+        async with CrawlEngine(**engine_kwargs) as engine:
+            return await engine.fetch_articles(site, links, on_article)
+    return asyncio.run(_run())
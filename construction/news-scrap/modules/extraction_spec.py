@@ -0,0 +1,112 @@
+import re
+from selectolax.parser import HTMLParser
+
+
+class ExtractionSpec:
+    """
+    Spesifikasi ekstraksi artikel per situs (selector judul/tanggal/isi).
+
+    Spec dibuat sekali per situs dan dijalankan dengan satu backend
+    (selectolax) untuk semua situs. Jika `body_marker` diberikan, dokumen
+    dipotong di level byte tepat setelah tag penutup container isi sehingga
+    bagian halaman setelah artikel (komentar, rekomendasi, script) tidak
+    pernah di-parse. Bila hasil potongan tidak lengkap, dokumen penuh
+    di-parse ulang.
+    """
+
+    def __init__(self, title, date, body, body_item="p", first_container=False, separator=" ",
+                 strip=False, missing="N/A", body_marker=None, body_tag="div"):
+        self.title = title
+        self.date = date
+        self.body = body
+        self.body_item = body_item
+        self.first_container = first_container
+        self.separator = separator
+        self.strip = strip
+        self.missing = missing
+        self.body_marker = body_marker.encode() if isinstance(body_marker, str) else body_marker
+        self.tag_pattern = re.compile(rb"<(/?)" + body_tag.encode() + rb"[\s>/]", re.IGNORECASE)
+
+    def truncate(self, data):
+        """Return `data` sampai akhir container isi, atau None jika batasnya tidak ditemukan."""
+        if self.body_marker is None:
+            return None
+        position = data.find(self.body_marker)
+        while position != -1:
+            start = data.rfind(b"<", 0, position)
+            opening = self.tag_pattern.match(data, start) if start != -1 else None
+            if opening is not None and not opening.group(1):
+                break
+            # Marker muncul di luar tag container (mis. di CSS/script), cari berikutnya
+            position = data.find(self.body_marker, position + 1)
+        else:
+            return None
+        depth = 0
+        for match in self.tag_pattern.finditer(data, start):
+            depth += -1 if match.group(1) else 1
+            if depth == 0:
+                end = data.find(b">", match.end() - 1)
+                return data[:end + 1] if end != -1 else None
+        return None
+
+    def _text(self, node):
+        return node.text(strip=self.strip) if node is not None else None
+
+    def _body(self, html):
+        if self.first_container:
+            container = html.css_first(self.body)
+            if container is None:
+                return None
+            nodes = container.css(self.body_item)
+        else:
+            nodes = html.css(f"{self.body} {self.body_item}")
+            if not nodes:
+                return None
+        return self.separator.join(node.text(strip=self.strip) for node in nodes)
+
+    def _extract_fields(self, html):
+        return self._text(html.css_first(self.title)), self._text(html.css_first(self.date)), self._body(html)
+
+    def extract(self, data, link):
+        """Ekstrak artikel dari HTML (bytes atau str) menjadi dict `tanggal/judul/link/isi`."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        fields = None
+        head = self.truncate(data)
+        if head is not None:
+            fields = self._extract_fields(HTMLParser(head))
+            if None in fields:
+                fields = None
+        if fields is None:
+            fields = self._extract_fields(HTMLParser(data))
+        return self._article(fields, link)
+
+    def extract_tree(self, html, link):
+        """Ekstrak artikel dari dokumen yang sudah di-parse."""
+        return self._article(self._extract_fields(html), link)
+
+    def _article(self, fields, link):
+        judul, tanggal, isi = (self.missing if value is None else value for value in fields)
+        return {"tanggal": tanggal, "judul": judul, "link": link, "isi": isi}
+
+
+KOMPAS_SPEC = ExtractionSpec(
+    title="h1.read__title",
+    date="div.read__time",
+    body="div.read__content",
+    separator=" ",
+    missing="N/A",
+    body_marker=b'class="read__content"',
+)
+
+# Selector atribut `[class="..."]` meniru pencocokan class_ persis dari BeautifulSoup
+CNBC_SPEC = ExtractionSpec(
+    title='h1[class="mb-4 text-32 font-extrabold"]',
+    date='div[class="text-cm text-gray"]',
+    body="div.detail-text",
+    first_container=True,
+    separator="\n",
+    strip=True,
+    missing="",
+    body_marker=b"detail-text",
+)
@@ -1,21 +1,34 @@
 import httpx
 import logging
-from selectolax.parser import HTMLParser
-from urllib.parse import urljoin
 import time
 import random
+from contextlib import nullcontext
+from modules.sites import KompasSite
+from modules.response_cache import CachedResponse
 
 class NewsExtractor:
-    def __init__(self, base_url, max_retries=3, timeout=10):
+    def __init__(self, base_url, max_retries=3, timeout=10, cache=None, skip_unchanged=False, metrics=None):
         self.base_url = base_url
         self.max_retries = max_retries
         self.timeout = timeout
         self.client = httpx.Client(timeout=timeout)
-        self.cache = {}
+        # ResponseCache opsional; tanpa cache setiap URL selalu di-download ulang
+        self.cache = cache
+        # True, atau callable `link -> bool`: artikel yang dijawab 304 tidak di-parse ulang
+        self.skip_unchanged = skip_unchanged
+        # kgprep.metrics.Metrics opsional: latency/status request, retry, byte, dan waktu parsing
+        self.metrics = metrics
+        self.site = KompasSite(base_url)
 
-    def get_html(self, url):
-        if url in self.cache:
-            return self.cache[url]
+    def _count(self, name, value=1, **labels):
+        if self.metrics is not None:
+            self.metrics.inc(name, value, **labels)
+
+    def fetch(self, url):
+        cached = self.cache.get(url) if self.cache else None
+        if cached is not None and self.cache.is_fresh(cached):
+            self._count("http_cache_total", result="fresh")
+            return cached
         # Rotasi user-agent dan delay acak untuk mengurangi kemungkinan blokir
         user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/85.0.4183.121 Safari/537.36",
@@ -28,46 +41,64 @@ class NewsExtractor:
             "Accept-Encoding": "gzip, deflate, br",
             "Connection": "keep-alive"
         }
+        if cached is not None:
+            headers.update(cached.validators())
         time.sleep(random.uniform(1, 3))
         for attempt in range(self.max_retries):
             try:
+                started = time.perf_counter()
                 resp = self.client.get(url, headers=headers)
+                if self.metrics is not None:
+                    self.metrics.observe("http_request_seconds", time.perf_counter() - started)
+                    self.metrics.inc("http_responses_total", status=resp.status_code)
+                    self.metrics.inc("http_bytes_total", len(resp.content))
+                if resp.status_code == 304 and cached is not None:
+                    return self.cache.store_response(url, resp, cached)
                 resp.raise_for_status()
-                parser = HTMLParser(resp.text)
-                self.cache[url] = parser
-                return parser
+                if self.cache:
+                    return self.cache.store_response(url, resp)
+                return CachedResponse(url, resp.content, resp.encoding,
+                                      resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
             except (httpx.HTTPStatusError, httpx.RequestError) as e:
+                if isinstance(e, httpx.RequestError):
+                    self._count("http_errors_total", error=type(e).__name__)
                 logging.warning(f"Error on {url}: {e}. Attempt {attempt+1}/{self.max_retries}")
+                self._count("http_retries_total")
                 time.sleep(2 * (attempt + 1))
-        self.cache[url] = None
+        self._count("http_failures_total")
         return None
 
+    def get_html(self, url):
+        # Parse tree dibuat saat dibutuhkan dan tidak disimpan di memori
+        response = self.fetch(url)
+        return response.html if response is not None else None
+
     def get_news_data(self, link, article_number, total_articles):
         logging.info(f"Processing article {article_number} of {total_articles}: {link}")
-        html = self.get_html(link)
+        response = self.fetch(link)
+        if response is not None and response.not_modified and (
+                self.skip_unchanged(link) if callable(self.skip_unchanged) else self.skip_unchanged):
+            # Artikel tidak berubah sejak run sebelumnya, tidak perlu di-parse ulang
+            self._count("articles_total", result="unchanged")
+            return None
+        html = response.html if response is not None else None
         if html:
-            tanggal = html.css_first("div.read__time").text() if html.css_first("div.read__time") else "N/A"
-            judul = html.css_first("h1.read__title").text() if html.css_first("h1.read__title") else "N/A"
-            paragraphs = html.css("div.read__content p")
-            isi = " ".join(p.text() for p in paragraphs) if paragraphs else "N/A"
-            return {"tanggal": tanggal, "judul": judul, "link": link, "isi": isi}
+            with self.metrics.stage("parse_article") if self.metrics is not None else nullcontext():
+                news = self.site.extract_article(html, link)
+            self._count("articles_total", result="ok")
+            return news
         logging.info(f"Failed processing article {article_number} of {total_articles}: {link}")
-        return {"tanggal": "error", "judul": "error", "link": link, "isi": "error"}
+        self._count("articles_total", result="failed")
+        return self.site.failed_article(link)
 
     def collect_links(self, start_page, end_page):
         all_links = []
         for page in range(start_page, end_page + 1):
-            url = urljoin(self.base_url, f"?sort=asc&page={page}")
-            html = self.get_html(url)
+            html = self.get_html(self.site.index_url(page))
             if html:
-                items = html.css("div.articleList.-list div.articleItem")
-                for item in items:
-                    a_tag = item.css_first("a.article-link")
-                    if a_tag:
-                        link = a_tag.attributes.get("href", "")
-                        if link:
-                            all_links.append(link.replace("http://", "https://"))
-                logging.info(f"Processed page {page} ({start_page} to {end_page}) with {len(items)} articles.")
+                links = self.site.extract_links(html)
+                all_links.extend(links)
+                logging.info(f"Processed page {page} ({start_page} to {end_page}) with {len(links)} articles.")
             else:
                 logging.warning(f"Failed to retrieve content on page {page}.")
         return all_links
@@ -0,0 +1,102 @@
+import logging
+import os
+import time
+from contextlib import nullcontext
+import pandas as pd
+from modules.redundant_cleaning import clean_articles_csv
+from modules.crawl_engine import run_crawl, run_fetch_articles
+from modules.sites import KompasSite, CNBCSite
+from modules.response_cache import ResponseCache
+from modules.article_store import open_store
+from modules.link_filter import open_seen_links
+
+# Indeks default per situs: (kelas adapter, URL indeks, berhenti di halaman yang seluruh link-nya sudah dikenal)
+# Kompas diurutkan sort=asc (terlama dulu) sehingga crawl tidak boleh berhenti di halaman lama;
+# indeks CNBC terbaru-dulu sehingga halaman yang sudah dikenal berarti sisanya juga sudah dikenal.
+SITES = {
+    "kompas": (KompasSite, "https://www.kompas.com/tag/investasi", False),
+    "cnbc": (CNBCSite, "https://www.cnbcindonesia.com/market/indeks/5?tipe=artikel&page=2", True),
+}
+
+
+def make_site(name, base_url=None, **options):
+    """Adapter situs `name`; `options` diteruskan ke konstruktor (mis. `force_https=False` untuk Kompas)."""
+    site_class, default_url, _ = SITES[name]
+    return site_class(base_url or default_url, **options)
+
+
+def crawl_site(site, csv_path, start_page, end_page, cache_path=None, resume=True, stop_on_known=False,
+               clean=True, metrics=None, skip_unchanged=True, **engine_kwargs):
+    """
+    Crawl halaman indeks `start_page`..`end_page` ke ArticleStore di samping
+    `csv_path`, export ke CSV lalu (opsional) bersihkan.
+
+    Dengan `resume`, link yang sudah tersimpan dilewati sehingga crawl ulang
+    hanya mengambil artikel baru. Dengan `skip_unchanged`, artikel yang
+    dijawab 304 oleh server dan sudah tersimpan lengkap di store tidak
+    di-parse ulang (butuh `cache_path`). Return jumlah artikel yang di-fetch.
+    """
+    start_time = time.time()
+    stage = metrics.stage if metrics is not None else lambda name: nullcontext()
+    cache = ResponseCache(cache_path) if cache_path else None
+    store = open_store(csv_path)
+    seen = open_seen_links(store) if resume else None
+    try:
+        with stage("crawl"):
+            news_list = run_crawl(site, start_page, end_page, cache=cache, on_article=store.add, known=seen,
+                                  stop_on_known=stop_on_known, skip_unchanged=skip_unchanged and store.has_article,
+                                  metrics=metrics, **engine_kwargs)
+    finally:
+        if cache is not None:
+            cache.close()
+        if seen is not None:
+            seen.close()
+    with stage("export_csv"):
+        result_path = store.export_csv(csv_path)
+    store.close()
+    if not news_list:
+        logging.error("No new articles collected.")
+        return 0
+    if clean:
+        with stage("clean"):
+            clean_articles_csv(csv_path, metrics=metrics)
+    logging.info(f"Data saved to {os.path.abspath(result_path)}")
+    logging.info(f"Execution Time: {time.time() - start_time:.2f} seconds")
+    return len(news_list)
+
+
+def refetch_links(site, links, csv_path, cache_path=None, clean=True, metrics=None, skip_unchanged=True,
+                  **engine_kwargs):
+    """
+    Fetch ulang daftar link (mis. baris CSV yang kosong) ke store `csv_path`,
+    tanpa fase indeks. `skip_unchanged` seperti pada `crawl_site`.
+    """
+    start_time = time.time()
+    if not links:
+        logging.error("No links to scrape.")
+        return 0
+    stage = metrics.stage if metrics is not None else lambda name: nullcontext()
+    cache = ResponseCache(cache_path) if cache_path else None
+    store = open_store(csv_path)
+    try:
+        with stage("fetch_articles"):
+            news_list = run_fetch_articles(site, links, cache=cache, on_article=store.add,
+                                           skip_unchanged=skip_unchanged and store.has_article, metrics=metrics,
+                                           **engine_kwargs)
+    finally:
+        if cache is not None:
+            cache.close()
+    with stage("export_csv"):
+        store.export_csv(csv_path)
+    store.close()
+    if clean:
+        with stage("clean"):
+            clean_articles_csv(csv_path, metrics=metrics)
+    logging.info(f"Execution Time: {time.time() - start_time:.2f} seconds")
+    return len(news_list)
+
+
+def missing_links(csv_path, sep=";"):
+    """Link dari baris CSV artikel yang memiliki kolom kosong (hasil scrape yang gagal)."""
+    df = pd.read_csv(csv_path, sep=sep, on_bad_lines="skip")
+    return df.loc[df.isna().any(axis=1), "link"].dropna().tolist()
@@ -1,4 +1,6 @@
+import os
 import re
+from contextlib import nullcontext
 from datetime import datetime
 import pandas as pd
 
@@ -39,3 +41,92 @@ def remove_redundancy(text):
         cleaned_text = cleaned_text[:start_index] + cleaned_text[end_index:]
         start_index = 0
     return cleaned_text
+
+
+# Versi vectorized dari fungsi di atas; fungsi lama tetap ada sebagai referensi output
+DATE_PATTERN = re.compile(r'(\d{2}/\d{2}/\d{4}, \d{2}:\d{2}) WIB')
+DATE_FORMAT = '%d/%m/%Y, %H:%M'
+PREFIX_LENGTH = 100
+
+
+def clean_dates(dates):
+    """Vectorized `clean_and_convert_date`: satu `to_datetime` dengan format WIB eksplisit."""
+    matched = dates.astype(str).str.extract(DATE_PATTERN, expand=False)
+    return pd.to_datetime(matched, format=DATE_FORMAT, errors='coerce')
+
+
+def collapse_whitespace(text):
+    # Setara re.sub(r'\s+', ' ', text).strip(), tanpa regex
+    return ' '.join(text.split())
+
+
+def normalize_text(texts):
+    texts = texts.where(texts.notna(), '').astype(str)
+    return [collapse_whitespace(text).lower() for text in texts]
+
+
+def remove_titles(df):
+    """Vectorized `remove_title_from_isi` untuk seluruh DataFrame."""
+    if 'judul' not in df or 'isi' not in df:
+        return df['isi'] if 'isi' in df else pd.Series('', index=df.index)
+    juduls = normalize_text(df['judul'])
+    isis = normalize_text(df['isi'])
+    # Keduanya sudah lowercase, jadi str.replace setara re.sub(re.escape(judul), flags=IGNORECASE)
+    cleaned = [collapse_whitespace(isi.replace(judul, '')) if judul else isi for isi, judul in zip(isis, juduls)]
+    return pd.Series(cleaned, index=df.index, dtype=object)
+
+
+def remove_redundancy_fast(text):
+    """
+    Versi linear dari `remove_redundancy`.
+
+    Loop lama selalu memotong dari kemunculan pertama prefix (100 karakter
+    awal) pada posisi >= 100 sampai kemunculan berikutnya, lalu mengulang
+    dari awal, sehingga hasil akhirnya adalah teks sebelum pengulangan
+    pertama prefix. Itu dihitung dengan satu `str.find`.
+    """
+    if len(text) < PREFIX_LENGTH:
+        return text
+    start = text.find(text[:PREFIX_LENGTH], PREFIX_LENGTH)
+    return text if start == -1 else text[:start]
+
+
+def clean_articles(df):
+    """Bersihkan satu DataFrame artikel: tanggal, judul di dalam isi, dan blok duplikat."""
+    df = df.copy()
+    if 'tanggal' in df:
+        df['tanggal'] = clean_dates(df['tanggal'])
+    if 'isi' in df:
+        df['isi'] = remove_titles(df)
+        df['isi'] = [remove_redundancy_fast(text) for text in df['isi']]
+    return df
+
+
+def clean_articles_csv(input_path, output_path=None, chunksize=10000, sep=';', metrics=None):
+    """
+    Bersihkan CSV artikel per chunk sehingga memori konstan; default menimpa `input_path`.
+
+    Dengan `metrics` (kgprep.metrics.Metrics), waktu baca / bersihkan / tulis
+    setiap chunk dicatat sebagai stage `clean_read`, `clean_transform`, `clean_write`.
+    """
+    output_path = output_path or input_path
+    tmp_path = output_path + '.cleaning'
+    stage = metrics.stage if metrics is not None else lambda name: nullcontext()
+    header = True
+    chunks = iter(pd.read_csv(input_path, sep=sep, chunksize=chunksize))
+    while True:
+        with stage('clean_read'):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+        with stage('clean_transform'):
+            cleaned = clean_articles(chunk)
+        with stage('clean_write'):
+            cleaned.to_csv(tmp_path, sep=sep, index=False, header=header, mode='w' if header else 'a')
+        if metrics is not None:
+            metrics.inc('articles_cleaned_total', len(chunk))
+        header = False
+    if header:
+        pd.read_csv(input_path, sep=sep, nrows=0).to_csv(tmp_path, sep=sep, index=False)
+    os.replace(tmp_path, output_path)
+    return output_path
@@ -0,0 +1,149 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from selectolax.parser import HTMLParser
+
+
+class CachedResponse:
+    """Respons dari cache; HTML di-parse hanya saat `html` diakses dan tidak disimpan."""
+
+    def __init__(self, url, body, encoding=None, etag=None, last_modified=None,
+                 fetched_at=0.0, not_modified=False):
+        self.url = url
+        self.body = body
+        self.encoding = encoding or "utf-8"
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.not_modified = not_modified
+
+    @property
+    def text(self):
+        return self.body.decode(self.encoding, errors="replace")
+
+    @property
+    def html(self):
+        return HTMLParser(self.text)
+
+    def validators(self):
+        """Header conditional request (If-None-Match / If-Modified-Since)."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Cache respons HTTP persisten berbasis SQLite, dengan key URL.
+
+    Body disimpan terkompresi zlib bersama ETag/Last-Modified. Total ukuran
+    dibatasi `max_bytes` dengan eviction LRU (kolom `accessed`), dan tier
+    memori berisi paling banyak `hot_items` respons terakhir.
+    """
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024, hot_items=256, max_age=0):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hot_items = hot_items
+        self.max_age = max_age
+        self.hot = OrderedDict()
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed REAL NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _remember(self, entry):
+        self.hot[entry.url] = entry
+        self.hot.move_to_end(entry.url)
+        while len(self.hot) > self.hot_items:
+            self.hot.popitem(last=False)
+
+    def get(self, url):
+        with self.lock:
+            entry = self.hot.get(url)
+            if entry is not None:
+                self.hot.move_to_end(url)
+                return entry
+            row = self.conn.execute(
+                "SELECT body, encoding, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+                (url,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET accessed = ? WHERE url = ?", (time.time(), url))
+            entry = CachedResponse(url, zlib.decompress(row[0]), row[1], row[2], row[3], row[4])
+            self._remember(entry)
+            return entry
+
+    def is_fresh(self, entry):
+        return self.max_age > 0 and time.time() - entry.fetched_at < self.max_age
+
+    def put(self, url, body, encoding=None, etag=None, last_modified=None):
+        compressed = zlib.compress(body, 6)
+        now = time.time()
+        entry = CachedResponse(url, body, encoding, etag, last_modified, now)
+        with self.lock:
+            old = self.conn.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, compressed, encoding, etag, last_modified, len(compressed), now, now))
+            self.total_bytes += len(compressed) - (old[0] if old else 0)
+            self._remember(entry)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+        return entry
+
+    def touch(self, url):
+        """Tandai entry masih valid (respons 304)."""
+        now = time.time()
+        with self.lock:
+            self.conn.execute("UPDATE responses SET fetched_at = ?, accessed = ? WHERE url = ?", (now, now, url))
+            entry = self.hot.get(url)
+            if entry is not None:
+                entry.fetched_at = now
+
+    def _evict(self):
+        target = int(self.max_bytes * 0.9)
+        evicted = []
+        for url, size in self.conn.execute("SELECT url, size FROM responses ORDER BY accessed"):
+            if self.total_bytes <= target:
+                break
+            evicted.append((url,))
+            self.total_bytes -= size
+            self.hot.pop(url, None)
+        self.conn.executemany("DELETE FROM responses WHERE url = ?", evicted)
+
+    def store_response(self, url, resp, cached=None):
+        """Simpan httpx.Response ke cache; untuk 304 kembalikan entry lama dengan flag `not_modified`."""
+        if resp.status_code == 304 and cached is not None:
+            self.touch(url)
+            return CachedResponse(url, cached.body, cached.encoding, cached.etag, cached.last_modified,
+                                  time.time(), not_modified=True)
+        return self.put(url, resp.content, resp.encoding, resp.headers.get("ETag"),
+                        resp.headers.get("Last-Modified"))
+
+    def close(self):
+        with self.lock:
+            self.hot.clear()
+            self.conn.close()
@@ -0,0 +1,72 @@
+from urllib.parse import urljoin, urlparse, parse_qs, urlencode, urlunparse
+from selectolax.parser import HTMLParser
+from modules.extraction_spec import KOMPAS_SPEC, CNBC_SPEC
+
+
+class KompasSite:
+    """Adapter Kompas: URL halaman indeks dan selector artikel."""
+
+    def __init__(self, base_url, force_https=True, spec=KOMPAS_SPEC):
+        self.base_url = base_url
+        self.force_https = force_https
+        self.spec = spec
+
+    def index_url(self, page):
+        return urljoin(self.base_url, f"?sort=asc&page={page}")
+
+    def parse_index(self, text):
+        return self.extract_links(HTMLParser(text))
+
+    def extract_links(self, html):
+        links = []
+        for item in html.css("div.articleList.-list div.articleItem"):
+            a_tag = item.css_first("a.article-link")
+            if a_tag:
+                link = a_tag.attributes.get("href", "")
+                if link:
+                    links.append(link.replace("http://", "https://") if self.force_https else link)
+        return links
+
+    def parse_article(self, data, link):
+        return self.spec.extract(data, link)
+
+    def extract_article(self, html, link):
+        return self.spec.extract_tree(html, link)
+
+    def failed_article(self, link):
+        return {"tanggal": "error", "judul": "error", "link": link, "isi": "error"}
+
+
+class CNBCSite:
+    """Adapter CNBC Indonesia: URL halaman indeks dan selector artikel."""
+
+    def __init__(self, base_url, link_prefix="https://www.cnbcindonesia.com/", spec=CNBC_SPEC):
+        self.base_url = base_url
+        self.link_prefix = link_prefix
+        self.spec = spec
+
+    def index_url(self, page):
+        # Parsing base_url untuk menangani query parameters dengan benar
+        parsed_url = urlparse(self.base_url)
+        query_params = parse_qs(parsed_url.query)
+        query_params["page"] = page
+        new_query = urlencode(query_params, doseq=True)
+        return urlunparse((parsed_url.scheme, parsed_url.netloc, parsed_url.path,
+                           parsed_url.params, new_query, parsed_url.fragment))
+
+    def parse_index(self, text):
+        links = []
+        for art in HTMLParser(text).css("article"):
+            # Cari tag <a> dengan class spesifik (sesuai contoh HTML CNBC)
+            a_tag = art.css_first('a[class="group flex gap-4 items-center"]')
+            if a_tag:
+                link = a_tag.attributes.get("href")
+                if link and link.startswith(self.link_prefix):
+                    links.append(link)
+        return links
+
+    def parse_article(self, data, link):
+        return self.spec.extract(data, link)
+
+    def failed_article(self, link):
+        return {"tanggal": "", "judul": "", "link": link, "isi": ""}
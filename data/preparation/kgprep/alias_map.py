@@ -0,0 +1,369 @@
+"""
+Compiled alias -> canonical entity map for IndovestDKG normalization.
+
+`entity_normalization_log.json` (written by `SmartEntityNormalizer` in
+`cleaning.ipynb`) is an audit log of timestamped updates. This module
+replays those updates into a flat alias -> canonical mapping with every
+chain already resolved, persists it as an open-addressing hash table that
+is memory-mapped on load, and applies it as a streaming stage to JSONL
+quadruple batches so new extractions are normalized per entity without a
+pass over the full dataset.
+
+    python -m kgprep.alias_map compile notebooks/entity_normalization_log.json aliases.amap
+    python -m kgprep.alias_map apply aliases.amap new_batch.jsonl normalized.jsonl
+"""
+import argparse
+import ast
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from collections import defaultdict
+import numpy as np
+
+MAGIC = b'KGALIAS1'
+HEADER = struct.Struct('<8sQQQQQ')  # magic, flags, aliases, strings, table size, blob length
+FLAG_FOLD = 1
+UPDATE_KEYS = ('general_updates', 'specific_updates')
+
+
+def fold_name(name):
+    """Lookup key for an entity name: casefolded, whitespace collapsed."""
+    return ' '.join(str(name).casefold().split())
+
+
+def _key_function(fold):
+    return fold_name if fold else str
+
+
+def name_hash(key):
+    """Stable 64-bit hash of a lookup key (never 0, which marks an empty slot)."""
+    value = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+    return value or 1
+
+
+def _as_list(value):
+    # Older logs were written with str() of the list instead of the list itself
+    if isinstance(value, str):
+        try:
+            value = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return [value]
+    return list(value or [])
+
+
+def load_updates(path):
+    """Update records of a normalization log, oldest first (general and specific merged)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        log = json.load(f)
+    updates = []
+    for section in UPDATE_KEYS:
+        for update in _as_list(log.get(section)):
+            if isinstance(update, str):
+                update = ast.literal_eval(update)
+            if update.get('type', 'update') != 'update' or not update.get('canonical_name'):
+                continue
+            updates.append(dict(update, entities_updated=_as_list(update.get('entities_updated'))))
+    # Stable sort keeps the log order for updates with the same timestamp
+    updates.sort(key=lambda update: update.get('timestamp') or '')
+    return updates
+
+
+def compile_alias_map(updates, base=None, fold=True):
+    """
+    Replay normalization updates into a flat alias -> canonical dict.
+
+    Updates are applied in order, and every alias points directly at its
+    final canonical name: when a canonical is itself renamed later, all of
+    its aliases follow. A later update that names an existing alias as
+    canonical makes it a root again, so the latest decision wins and the
+    map can never contain a cycle. `base` is an existing mapping (e.g.
+    `AliasMap.to_dict()`) to extend incrementally. Keys are `fold_name`
+    keys when `fold` is set.
+    """
+    key = _key_function(fold)
+    target = {}
+    members = defaultdict(set)
+    for alias, canonical in (base or {}).items():
+        if key(alias) != key(canonical):
+            target[key(alias)] = canonical
+            members[key(canonical)].add(key(alias))
+    for update in updates:
+        canonical = update['canonical_name']
+        canonical_key = key(canonical)
+        previous = target.pop(canonical_key, None)
+        if previous is not None:
+            members[key(previous)].discard(canonical_key)
+        group = members[canonical_key]
+        for name in update['entities_updated']:
+            name_key = key(name)
+            if name_key == canonical_key or not name_key:
+                continue
+            previous = target.get(name_key)
+            if previous is not None:
+                members[key(previous)].discard(name_key)
+            group.add(name_key)
+            group.update(members.pop(name_key, ()))
+        for alias in group:
+            target[alias] = canonical
+    return target
+
+
+class AliasMap:
+    """
+    Read-only alias -> canonical map backed by a memory-mapped hash table.
+
+    The file holds a linear-probing table of 64-bit name hashes with alias
+    and canonical string ids, plus a UTF-8 string table, so opening it costs
+    no parsing and a lookup is a hash plus a few array reads. Canonical names
+    are stored as their own keys too, so case variants of a canonical name
+    are mapped to its stored spelling when the map is folded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, flags, self.alias_count, strings, table_size, blob_length = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not an alias map file')
+        self.fold = bool(flags & FLAG_FOLD)
+        self._key = _key_function(self.fold)
+        self._mask = table_size - 1
+        offset = HEADER.size
+        self._hashes = np.frombuffer(self._mm, dtype=np.uint64, count=table_size, offset=offset)
+        offset += 8 * table_size
+        self._keys = np.frombuffer(self._mm, dtype=np.uint32, count=table_size, offset=offset)
+        offset += 4 * table_size
+        self._values = np.frombuffer(self._mm, dtype=np.uint32, count=table_size, offset=offset)
+        offset += 4 * table_size
+        self._offsets = np.frombuffer(self._mm, dtype=np.uint64, count=strings + 1, offset=offset)
+        self._blob = offset + 8 * (strings + 1)
+        self._strings = {}
+
+    @staticmethod
+    def build(mapping, path, fold=True):
+        """Write `mapping` (alias key -> canonical, e.g. from `compile_alias_map`) to `path`."""
+        key = _key_function(fold)
+        entries = dict(mapping)
+        for canonical in set(entries.values()):
+            entries.setdefault(key(canonical), canonical)
+        strings = {}
+        for name in list(entries) + list(entries.values()):
+            strings.setdefault(name, len(strings))
+        encoded = [name.encode('utf-8') for name in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+        table_size = 1 << max(4, (2 * len(entries) - 1).bit_length())
+        mask = np.uint64(table_size - 1)
+        hashes = np.fromiter((name_hash(alias) for alias in entries), dtype=np.uint64, count=len(entries))
+        alias_ids = np.fromiter((strings[alias] for alias in entries), dtype=np.uint32, count=len(entries))
+        value_ids = np.fromiter((strings[value] for value in entries.values()), dtype=np.uint32, count=len(entries))
+        table_hashes = np.zeros(table_size, dtype=np.uint64)
+        table_keys = np.zeros(table_size, dtype=np.uint32)
+        table_values = np.zeros(table_size, dtype=np.uint32)
+        # Vectorized linear probing: each round places the first claimant of every free slot
+        pending = np.arange(len(entries))
+        slots = hashes & mask
+        while pending.size:
+            candidate = slots[pending]
+            free = table_hashes[candidate] == 0
+            _, first = np.unique(candidate[free], return_index=True)
+            placed = pending[free][first]
+            table_hashes[slots[placed]] = hashes[placed]
+            table_keys[slots[placed]] = alias_ids[placed]
+            table_values[slots[placed]] = value_ids[placed]
+            placed_mask = np.zeros(len(entries), dtype=bool)
+            placed_mask[placed] = True
+            pending = pending[~placed_mask[pending]]
+            slots[pending] = (slots[pending] + np.uint64(1)) & mask
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FLAG_FOLD if fold else 0, len(mapping), len(encoded), table_size,
+                                int(offsets[-1])))
+            for array in (table_hashes, table_keys, table_values, offsets):
+                f.write(array.tobytes())
+            f.write(b''.join(encoded))
+        os.replace(tmp_path, path)
+        return AliasMap(path)
+
+    def _string(self, index):
+        value = self._strings.get(index)
+        if value is None:
+            start = self._blob + int(self._offsets[index])
+            end = self._blob + int(self._offsets[index + 1])
+            value = self._strings[index] = self._mm[start:end].decode('utf-8')
+        return value
+
+    def _probe(self, key, slot=None):
+        h = name_hash(key)
+        slot = h & self._mask if slot is None else slot
+        while True:
+            stored = int(self._hashes[slot])
+            if stored == 0:
+                return None
+            if stored == h and self._string(int(self._keys[slot])) == key:
+                return self._string(int(self._values[slot]))
+            slot = (slot + 1) & self._mask
+
+    def get(self, name, default=None):
+        if name is None:
+            return default
+        value = self._probe(self._key(name))
+        return default if value is None else value
+
+    def __getitem__(self, name):
+        value = self.get(name)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __len__(self):
+        return self.alias_count
+
+    def resolve(self, name):
+        """Canonical name of `name`, or `name` itself when it is not an alias."""
+        return self.get(name, name)
+
+    def resolve_many(self, names):
+        """Vectorized `resolve` over a list of names (probing runs on the whole batch at once)."""
+        keys = [self._key(name) if name is not None else '' for name in names]
+        hashes = np.fromiter((name_hash(key) for key in keys), dtype=np.uint64, count=len(keys))
+        slots = hashes & np.uint64(self._mask)
+        found = np.full(len(keys), -1, dtype=np.int64)
+        active = np.arange(len(keys))
+        while active.size:
+            stored = self._hashes[slots[active]]
+            hit = stored == hashes[active]
+            found[active[hit]] = slots[active[hit]].astype(np.int64)
+            active = active[~hit & (stored != 0)]
+            slots[active] = (slots[active] + np.uint64(1)) & np.uint64(self._mask)
+        resolved = list(names)
+        for i in np.flatnonzero(found >= 0).tolist():
+            slot = int(found[i])
+            if self._string(int(self._keys[slot])) == keys[i]:
+                resolved[i] = self._string(int(self._values[slot]))
+            else:
+                # 64-bit hash collision with a different key: continue probing for this name only
+                value = self._probe(keys[i], (slot + 1) & self._mask)
+                if value is not None:
+                    resolved[i] = value
+        return resolved
+
+    def to_dict(self):
+        """alias key -> canonical for every real alias (canonical self-entries excluded)."""
+        mapping = {}
+        for slot in np.flatnonzero(self._hashes).tolist():
+            alias = self._string(int(self._keys[slot]))
+            canonical = self._string(int(self._values[slot]))
+            if alias != self._key(canonical):
+                mapping[alias] = canonical
+        return mapping
+
+    def close(self):
+        self._hashes = self._keys = self._values = self._offsets = None
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def normalize_records(records, alias_map, fields=('subject', 'object'), batch_size=4096):
+    """
+    Streaming stage: yield `records` (quadruple dicts) with `fields` mapped to canonical names.
+
+    Records are resolved in batches of `batch_size` with `AliasMap.resolve_many`.
+    """
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield from _normalize_batch(batch, alias_map, fields)
+            batch = []
+    if batch:
+        yield from _normalize_batch(batch, alias_map, fields)
+
+
+def _normalize_batch(batch, alias_map, fields):
+    slots = [(record, field) for record in batch for field in fields
+             if isinstance(record, dict) and isinstance(record.get(field), str)]
+    resolved = alias_map.resolve_many([record[field] for record, field in slots])
+    for (record, field), name in zip(slots, resolved):
+        record[field] = name
+    return batch
+
+
+def _write_batch(batch, dst, alias_map, fields):
+    before = [[record.get(field) for field in fields] if isinstance(record, dict) else [] for record in batch]
+    _normalize_batch(batch, alias_map, fields)
+    dst.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in batch))
+    return sum(old != record.get(field) for names, record in zip(before, batch) for old, field in zip(names, fields))
+
+
+def normalize_jsonl(source, destination, alias_map, fields=('subject', 'object'), batch_size=4096):
+    """Apply the alias map to a JSONL file (or '-' for stdin/stdout); returns (records, names changed)."""
+    src = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    dst = sys.stdout if destination == '-' else open(destination, 'w', encoding='utf-8')
+    records = changed = 0
+    try:
+        batch = []
+        for line in src:
+            if line.strip():
+                batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                changed += _write_batch(batch, dst, alias_map, fields)
+                records += len(batch)
+                batch = []
+        if batch:
+            changed += _write_batch(batch, dst, alias_map, fields)
+            records += len(batch)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    return records, changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile and apply the entity alias map')
+    commands = parser.add_subparsers(dest='command', required=True)
+    compile_parser = commands.add_parser('compile', help='normalization log -> alias map file')
+    compile_parser.add_argument('log', help='entity_normalization_log.json')
+    compile_parser.add_argument('output', help='alias map file to write')
+    compile_parser.add_argument('--base', help='existing alias map to extend with the log')
+    compile_parser.add_argument('--exact', action='store_true', help='match names exactly instead of casefolded')
+    apply_parser = commands.add_parser('apply', help='normalize subject/object of a JSONL batch')
+    apply_parser.add_argument('map', help='alias map file')
+    apply_parser.add_argument('input', help="JSONL quadruples, or '-' for stdin")
+    apply_parser.add_argument('output', nargs='?', default='-', help="normalized JSONL, or '-' for stdout")
+    args = parser.parse_args()
+
+    if args.command == 'compile':
+        base = None
+        if args.base:
+            with AliasMap(args.base) as existing:
+                base = existing.to_dict()
+        updates = load_updates(args.log)
+        mapping = compile_alias_map(updates, base, fold=not args.exact)
+        with AliasMap.build(mapping, args.output, fold=not args.exact) as alias_map:
+            print(f'{len(updates)} updates -> {len(alias_map)} aliases, '
+                  f'{len(set(mapping.values()))} canonical names: {args.output}', file=sys.stderr)
+    else:
+        with AliasMap(args.map) as alias_map:
+            records, changed = normalize_jsonl(args.input, args.output, alias_map)
+        print(f'{records} records, {changed} names normalized', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
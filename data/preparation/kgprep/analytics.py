@@ -0,0 +1,336 @@
+"""
+Sparse-matrix graph analytics for IndovestDKG quadruples.
+
+The dataset analyzers in `cleaning.ipynb` (`IndovestDKGAnalyzer`,
+`SparsityAnalyzer`) and `evaluate-construction-llm.ipynb` derive degrees,
+relation diversity, connected components, hubs, temporal gaps and spans
+with Counters, sets, `iterrows` and a recursive DFS, and count date parse
+errors with one `pd.to_datetime` call per row. `IncidenceGraph` factorizes
+the quadruples once and builds three `scipy.sparse` matrices:
+
+- `adjacency`: symmetric entity x entity co-occurrence counts;
+- `entity_relation`: entity x relation incidence (as subject or object);
+- `entity_time`: entity x time-bucket incidence (days for raw CSVs,
+  `temporal_id` for encoded splits).
+
+Every statistic is then a vectorized reduction over them: `bincount`
+degrees, `csgraph.connected_components`, row nnz for diversity, first /
+last column per CSR row for temporal spans, and run-length encoding of the
+empty time buckets for gaps.
+
+    python -m kgprep.analytics notebooks/raw/IndovestDKG_FORCEDROP.csv
+    python -m kgprep.analytics ../IndovestDKG --json report.json
+"""
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse import csgraph
+from kgprep.dataset import SPLITS, load_dataset, load_text
+
+PERCENTILES = (10, 25, 50, 75, 90, 95, 99)
+
+
+def parse_dates(values):
+    """
+    Vectorized `pd.to_datetime` with the per-row parse error count of the
+    notebooks: returns `(dates, errors)`, where unparseable values are NaT
+    and `errors` counts non-null values that fail to parse on their own.
+    """
+    values = pd.Series(values)
+    dates = pd.to_datetime(values, errors='coerce')
+    retry = dates.isna() & values.notna()
+    if retry.any():
+        # Formats that differ from the inferred one are retried element-wise, as a scalar call would parse them
+        dates[retry] = pd.to_datetime(values[retry], errors='coerce', format='mixed')
+    return dates, int((dates.isna() & values.notna()).sum())
+
+
+def run_lengths(mask):
+    """Lengths of the runs of True in a 1-d boolean array, in order."""
+    edges = np.diff(np.r_[0, np.asarray(mask, dtype=np.int8), 0])
+    return np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+
+
+def describe(values):
+    """Mean / median / std / min / max of an array (zeros when it is empty)."""
+    values = np.asarray(values)
+    if not len(values):
+        return {'mean': 0.0, 'median': 0.0, 'std': 0.0, 'min': 0, 'max': 0}
+    return {'mean': float(values.mean()), 'median': float(np.median(values)), 'std': float(values.std()),
+            'min': values.min().item(), 'max': values.max().item()}
+
+
+class IncidenceGraph:
+    """
+    Integer-coded quadruples plus the sparse adjacency and incidence
+    matrices they induce. `entities`, `relations` and `times` label the
+    matrix rows / columns (`times` are dates for `from_frame`).
+    """
+
+    def __init__(self, s, r, o, t, entities, relations, times):
+        self.s = np.asarray(s, dtype=np.int64)
+        self.r = np.asarray(r, dtype=np.int64)
+        self.o = np.asarray(o, dtype=np.int64)
+        self.t = np.asarray(t, dtype=np.int64)
+        self.entities = entities
+        self.relations = relations
+        self.times = times
+        n, num_relations, num_times = len(entities), len(relations), len(times)
+
+        rows = np.concatenate([self.s, self.o])
+        ones = np.ones(len(rows), dtype=np.int32)
+        self.adjacency = sp.csr_matrix((ones, (rows, np.concatenate([self.o, self.s]))), shape=(n, n))
+        self.entity_relation = sp.csr_matrix((ones, (rows, np.concatenate([self.r, self.r]))),
+                                             shape=(n, num_relations))
+        # Rows without a valid time (t < 0, e.g. unparseable dates) stay out of the time incidence only
+        dated = np.concatenate([self.t, self.t]) >= 0
+        self.entity_time = sp.csr_matrix((ones[dated], (rows[dated], np.concatenate([self.t, self.t])[dated])),
+                                         shape=(n, num_times))
+        for matrix in (self.adjacency, self.entity_relation, self.entity_time):
+            matrix.sum_duplicates()
+
+    @classmethod
+    def from_frame(cls, df, subject='subject', relation='relation', object='object', date='date'):
+        """Build from a raw quadruple DataFrame; times are calendar days from the earliest date."""
+        n = len(df)
+        codes, entities = pd.factorize(pd.concat([df[subject], df[object]], ignore_index=True),
+                                       use_na_sentinel=False)
+        r, relations = pd.factorize(df[relation], use_na_sentinel=False)
+        dates = df[date]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates, _ = parse_dates(dates)
+        days = pd.Series(dates).to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+        valid = ~np.isnat(days)
+        if valid.any():
+            first, last = days[valid].min(), days[valid].max()
+            t = np.where(valid, (days - first).astype(np.int64), -1)
+            times = pd.date_range(first, last, freq='D')
+        else:
+            t, times = np.full(n, -1, dtype=np.int64), pd.DatetimeIndex([])
+        return cls(codes[:n], r, codes[n:], t, entities, relations, times)
+
+    @classmethod
+    def from_quads(cls, quads, num_entities, num_relations, num_times=None, entities=None, relations=None):
+        """Build from an (n, 4) `s, r, o, t` id array; labels default to the ids."""
+        quads = np.asarray(quads, dtype=np.int64)
+        if num_times is None:
+            num_times = int(quads[:, 3].max()) + 1 if len(quads) else 0
+        entities = np.arange(num_entities) if entities is None else entities
+        relations = np.arange(num_relations) if relations is None else relations
+        return cls(quads[:, 0], quads[:, 1], quads[:, 2], quads[:, 3], entities, relations, np.arange(num_times))
+
+    @classmethod
+    def from_dataset(cls, dataset, splits=SPLITS):
+        quads = np.concatenate([np.asarray(dataset[split]) for split in splits if split in dataset.splits])
+        return cls.from_quads(quads, dataset.num_entities, dataset.num_relations, dataset.num_timestamps,
+                              dataset.entities.names(), dataset.relations.names())
+
+    def __len__(self):
+        return len(self.s)
+
+    def degrees(self):
+        """Appearances per entity as subject or object (the notebooks' entity degree / frequency)."""
+        n = len(self.entities)
+        return np.bincount(self.s, minlength=n) + np.bincount(self.o, minlength=n)
+
+    def occurrences(self):
+        """Quadruples each entity takes part in (a self-loop counts once)."""
+        loops = self.s[self.s == self.o]
+        return self.degrees() - np.bincount(loops, minlength=len(self.entities))
+
+    def active(self):
+        return self.degrees() > 0
+
+    def neighbor_counts(self):
+        """Distinct neighbours per entity (a self-loop counts as one neighbour)."""
+        return np.diff(self.adjacency.indptr)
+
+    def relation_diversity(self):
+        """Distinct relations per entity, as subject or object."""
+        return np.diff(self.entity_relation.indptr)
+
+    def components(self):
+        """`(count, labels, sizes)` of the connected components of the entities that occur."""
+        active = self.active()
+        _, labels = csgraph.connected_components(self.adjacency, directed=False)
+        # Entities without any quadruple would be singleton components; they are not part of the graph
+        _, labels[active] = np.unique(labels[active], return_inverse=True)
+        labels[~active] = -1
+        sizes = np.bincount(labels[active]) if active.any() else np.zeros(0, dtype=np.int64)
+        return len(sizes), labels, sizes
+
+    def ranked(self, values, k=None, mask=None):
+        """Entity ids ordered by descending `values` (ties by id), optionally within `mask` and cut to `k`."""
+        ids = np.flatnonzero(self.active() if mask is None else mask)
+        ids = ids[np.argsort(-values[ids], kind='stable')]
+        return ids if k is None else ids[:k]
+
+    def time_counts(self):
+        """Quadruples per time bucket (days for `from_frame`, temporal ids for `from_quads`)."""
+        dated = self.t >= 0
+        return np.bincount(self.t[dated], minlength=len(self.times))
+
+    def gaps(self):
+        """Lengths of the runs of empty time buckets between the first and last one."""
+        return run_lengths(self.time_counts() == 0)
+
+    def entity_spans(self):
+        """Last minus first time bucket per entity (-1 where the entity has no dated quadruple)."""
+        matrix = self.entity_time
+        if not matrix.has_sorted_indices:
+            matrix.sort_indices()
+        starts, ends = matrix.indptr[:-1], matrix.indptr[1:]
+        present = ends > starts
+        spans = np.full(len(starts), -1, dtype=np.int64)
+        spans[present] = matrix.indices[ends[present] - 1] - matrix.indices[starts[present]]
+        return spans
+
+    def relation_spans(self):
+        """Last minus first time bucket per relation (-1 where the relation has no dated quadruple)."""
+        dated = self.t >= 0
+        r, t = self.r[dated], self.t[dated]
+        first = np.full(len(self.relations), np.iinfo(np.int64).max)
+        last = np.full(len(self.relations), -1, dtype=np.int64)
+        np.minimum.at(first, r, t)
+        np.maximum.at(last, r, t)
+        return np.where(last >= 0, last - first, -1)
+
+    def entity_pairs(self):
+        """Distinct unordered (subject, object) pairs, self-pairs included."""
+        return sp.triu(self.adjacency).nnz
+
+    def clustering(self, block_rows=4096):
+        """
+        Local clustering coefficient per entity (self-loops ignored, as in
+        `networkx.clustering`); triangles come from `(A @ A) * A` in row blocks.
+        """
+        simple = (self.adjacency - sp.diags(self.adjacency.diagonal(), dtype=self.adjacency.dtype)).tocsr()
+        simple.eliminate_zeros()
+        simple.data = np.ones_like(simple.data)
+        triangles = np.zeros(simple.shape[0])
+        for start in range(0, simple.shape[0], block_rows):
+            block = simple[start:start + block_rows]
+            triangles[start:start + block.shape[0]] = np.asarray((block @ simple).multiply(block).sum(axis=1)).ravel()
+        degree = np.diff(simple.indptr)
+        possible = degree * (degree - 1.0)
+        # triangles counts each triangle twice per node, matching 2T / (d (d - 1))
+        return np.divide(triangles, possible, out=np.zeros_like(triangles), where=possible > 0)
+
+
+def sparsity_report(graph, top=10, hub_percentile=99, isolated_percentile=10, clustering=True):
+    """
+    Every statistic of the notebook analyzers as one JSON-serializable dict:
+    overall density, temporal gaps, degree / diversity distributions, hubs,
+    isolated entities, components and graph structure.
+    """
+    active = graph.active()
+    num_entities, num_relations, num_facts = int(active.sum()), len(graph.relations), len(graph)
+    degrees = graph.degrees()
+    active_degrees = degrees[active]
+    diversity = graph.relation_diversity()
+    count, _, sizes = graph.components()
+    largest = int(sizes.max()) if len(sizes) else 0
+    time_counts = graph.time_counts()
+    gaps = graph.gaps()
+    used_buckets = int(np.count_nonzero(time_counts))
+    entity_spans = graph.entity_spans()
+    spanned = graph.occurrences() > 1
+    relation_spans = graph.relation_spans()
+    relation_counts = np.bincount(graph.r, minlength=num_relations)
+
+    percentiles = np.percentile(active_degrees, PERCENTILES) if num_entities else np.zeros(len(PERCENTILES))
+    hub_threshold = float(np.percentile(active_degrees, hub_percentile)) if num_entities else 0.0
+    isolated_threshold = float(np.percentile(active_degrees, isolated_percentile)) if num_entities else 0.0
+    hubs = graph.ranked(degrees, mask=active & (degrees >= hub_threshold))
+    isolated = active & (degrees <= isolated_threshold)
+    # Graph degree as networkx counts it: distinct neighbours, a self-loop adding two
+    graph_degrees = (graph.neighbor_counts() + (graph.adjacency.diagonal() > 0))[active]
+    pairs = graph.entity_pairs()
+    max_facts = num_entities * num_relations * num_entities
+
+    def named(ids, values):
+        return [[str(graph.entities[i]), int(values[i])] for i in ids]
+
+    report = {
+        'overall': {
+            'quadruplets': num_facts, 'entities': num_entities, 'relations': num_relations,
+            'density': num_facts / max_facts if max_facts else 0.0,
+            'entity_relation_pairs': int(graph.entity_relation.nnz),
+            'entity_relation_density': graph.entity_relation.nnz / (num_entities * num_relations)
+            if num_entities and num_relations else 0.0,
+            'entity_pairs': int(pairs),
+            'entity_pair_coverage': pairs / (num_entities * (num_entities - 1) // 2) if num_entities > 1 else 0.0,
+            'singleton_entities': int(np.count_nonzero(active_degrees == 1)),
+            'entities_over_10': int(np.count_nonzero(active_degrees > 10)),
+            'entities_over_100': int(np.count_nonzero(active_degrees > 100)),
+            'relations_single_occurrence': int(np.count_nonzero(relation_counts == 1)),
+        },
+        'temporal': {
+            'buckets': len(graph.times), 'buckets_with_data': used_buckets,
+            'coverage': used_buckets / len(graph.times) if len(graph.times) else 0.0,
+            'empty_buckets': int(len(graph.times) - used_buckets),
+            'gap_periods': int(len(gaps)), 'average_gap_length': float(gaps.mean()) if len(gaps) else 0.0,
+            'max_gap_length': int(gaps.max()) if len(gaps) else 0,
+            'peak_bucket_events': int(time_counts.max()) if len(time_counts) else 0,
+            'bucket_events': {
+                'single': int(np.count_nonzero(time_counts == 1)),
+                'low': int(np.count_nonzero((time_counts >= 2) & (time_counts <= 10))),
+                'medium': int(np.count_nonzero((time_counts >= 11) & (time_counts <= 50))),
+                'high': int(np.count_nonzero(time_counts > 50)),
+            },
+            'entity_spans': dict(describe(entity_spans[spanned]), entities=int(spanned.sum())),
+            'relation_spans': dict(describe(relation_spans[relation_counts > 1]),
+                                   relations=int(np.count_nonzero(relation_counts > 1))),
+        },
+        'connectivity': {
+            'degree': describe(active_degrees),
+            'degree_percentiles': {str(p): float(v) for p, v in zip(PERCENTILES, percentiles)},
+            'hub_threshold': hub_threshold, 'hubs': named(hubs[:2 * top], degrees),
+            'isolated_threshold': isolated_threshold, 'isolated_entities': int(isolated.sum()),
+            'relation_diversity': describe(diversity[active]),
+            'high_diversity_entities': named(graph.ranked(diversity, top), diversity),
+            'components': count, 'largest_component_size': largest,
+            'connectivity_ratio': largest / num_entities if num_entities else 0.0,
+        },
+        'structure': {
+            'nodes': num_entities, 'edges': int(pairs),
+            'average_degree': float(graph_degrees.mean()) if num_entities else 0.0,
+            'degree_std': float(graph_degrees.std()) if num_entities else 0.0,
+            'graph_density': 2 * pairs / (num_entities * (num_entities - 1)) if num_entities > 1 else 0.0,
+        },
+    }
+    if clustering:
+        report['structure']['clustering_coefficient'] = float(graph.clustering()[active].mean()) \
+            if num_entities else 0.0
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sparse graph / sparsity report of an IndovestDKG dataset')
+    parser.add_argument('source', help='quadruple CSV (subject, relation, object, date, ...), data/IndovestDKG '
+                                       '(text layout) or a kgprep.dataset binary directory')
+    parser.add_argument('--splits', nargs='+', default=list(SPLITS), help='splits of a dataset directory')
+    parser.add_argument('--top', type=int, default=10, help='hubs / diverse entities listed')
+    parser.add_argument('--no-clustering', action='store_true', help='skip the triangle count')
+    parser.add_argument('--json', help='write the report here instead of stdout')
+    args = parser.parse_args()
+
+    if os.path.isdir(args.source):
+        binary = os.path.exists(os.path.join(args.source, 'meta.json'))
+        dataset = load_dataset(args.source) if binary else load_text(args.source, args.splits)
+        graph = IncidenceGraph.from_dataset(dataset, args.splits)
+    else:
+        graph = IncidenceGraph.from_frame(pd.read_csv(args.source))
+    report = sparsity_report(graph, args.top, clustering=not args.no_clustering)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""
+Single command-line entry point of the pipeline: crawl, clean, extract, encode, split.
+
+Deployment settings (paths, page range, model, rate limits, LLM endpoint)
+default to the INDOVESTDKG_* environment variables named in each
+subcommand's --help; encode and split pass their arguments through to
+kgprep.encoding / kgprep.splitting. Run from data/preparation, or with it
+on PYTHONPATH.
+
+    python -m kgprep.cli crawl kompas --start-page 3 --end-page 5 --output result/kompas.csv
+    python -m kgprep.cli crawl kompas --refetch-missing result/kompas.csv --output result/kompas.csv
+    python -m kgprep.cli clean result/kompas.csv
+    python -m kgprep.cli --metrics run.json extract result/kompas.csv --output graph/kompas.jsonl
+    python -m kgprep.cli extract result/kompas.csv --output graph/kompas.jsonl --relevance relevance.npz
+    python -m kgprep.cli encode graph/quadruples.csv --out preprocessed/stable
+    python -m kgprep.cli split preprocessed/stable/norm_IndovestDKG_encoded_indovest.csv splited --kfold 4
+"""
+import argparse
+import os
+import sys
+from contextlib import nullcontext
+
+ENV_PREFIX = 'INDOVESTDKG_'
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..')
+SCRAPER_DIR = os.path.join(ROOT, 'construction', 'news-scrap')
+EXTRACTION_DIR = os.path.join(ROOT, 'construction', 'LLM')
+PASS_THROUGH = {'encode': 'kgprep.encoding', 'split': 'kgprep.splitting'}
+
+
+def env(name, default=None):
+    """Default of an option from `INDOVESTDKG_<name>` (argparse applies the option's `type` to it)."""
+    return os.environ.get(ENV_PREFIX + name, default)
+
+
+def _import_path(directory):
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+
+
+def _options(args, *names):
+    """Keyword arguments for the options that were given, so library defaults apply to the rest."""
+    return {name: getattr(args, name) for name in names if getattr(args, name) is not None}
+
+
+def crawl(args, metrics):
+    _import_path(SCRAPER_DIR)
+    from modules.pipeline import SITES, crawl_site, make_site, missing_links, refetch_links
+
+    site = make_site(args.site, args.base_url, **({'force_https': False} if args.keep_scheme else {}))
+    engine = _options(args, 'per_host', 'rate', 'max_retries', 'timeout')
+    if args.refetch_missing:
+        return refetch_links(site, missing_links(args.refetch_missing), args.output, args.http_cache,
+                             not args.no_clean, metrics, not args.reparse_unchanged, **engine)
+    stop_on_known = SITES[args.site][2] if args.stop_on_known is None else args.stop_on_known
+    return crawl_site(site, args.output, args.start_page, args.end_page, args.http_cache, not args.no_resume,
+                      stop_on_known, not args.no_clean, metrics, not args.reparse_unchanged, **engine)
+
+
+def clean(args, metrics):
+    _import_path(SCRAPER_DIR)
+    from modules.redundant_cleaning import clean_articles_csv
+
+    return clean_articles_csv(args.input, args.output, args.chunksize, args.sep, metrics)
+
+
+def extract(args, metrics):
+    _import_path(EXTRACTION_DIR)
+    import asyncio
+    import pandas as pd
+    from extraction.pipeline import extract_articles
+
+    if args.env_file and os.path.exists(args.env_file):
+        from dotenv import load_dotenv
+        load_dotenv(args.env_file)
+    worker = None
+    if args.base_url:
+        from extraction.workers import ChatCompletionsWorker
+        worker = ChatCompletionsWorker(args.base_url, args.model, os.environ.get('OPENAI_API_KEY'))
+    alias_map = None
+    if args.alias_map:
+        from kgprep.alias_map import AliasMap
+        alias_map = AliasMap(args.alias_map)
+    relevance = None
+    if args.relevance:
+        from kgprep.relevance import RelevanceModel
+        relevance = RelevanceModel.load(args.relevance)
+    data = pd.read_csv(args.input, sep=args.sep)
+    stem = os.path.splitext(args.output)[0]
+    options = _options(args, 'rpm', 'tpm', 'max_in_flight', 'pack_tokens', 'near_duplicates')
+
+    async def run():
+        try:
+            return await extract_articles(data, args.output, args.checkpoint or stem + '_checkpoint.json',
+                                          args.cache or stem + '_cache.sqlite', worker, args.model, args.start,
+                                          args.end, alias_map, relevance=relevance, min_score=args.min_score,
+                                          relevance_workers=args.relevance_workers or None, metrics=metrics,
+                                          progress=not args.quiet, **options)
+        finally:
+            if worker is not None:
+                await worker.aclose()
+    try:
+        return asyncio.run(run())
+    finally:
+        if alias_map is not None:
+            alias_map.close()
+
+
+def encode(args, metrics):
+    from kgprep.encoding import main as encoding_main
+    return encoding_main(args.args)
+
+
+def split(args, metrics):
+    from kgprep.splitting import main as splitting_main
+    return splitting_main(args.args)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m kgprep.cli', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--metrics', default=env('METRICS'),
+                        help='write a kgprep.metrics snapshot here (.json, or .prom); env INDOVESTDKG_METRICS')
+    parser.add_argument('--profile', help='cProfile stats of the command to this path')
+    parser.add_argument('--log-level', default=env('LOG_LEVEL', 'INFO'))
+    commands = parser.add_subparsers(dest='command', metavar='command')
+
+    p = commands.add_parser('crawl', help='crawl a news site into its article store and CSV')
+    p.add_argument('site', choices=('kompas', 'cnbc'))
+    p.add_argument('--output', default=env('CRAWL_OUTPUT'), required=env('CRAWL_OUTPUT') is None,
+                   help='article CSV (the SQLite store and seen-link filter live next to it); '
+                        'env INDOVESTDKG_CRAWL_OUTPUT')
+    p.add_argument('--start-page', type=int, default=env('START_PAGE', 1), help='env INDOVESTDKG_START_PAGE')
+    p.add_argument('--end-page', type=int, default=env('END_PAGE', 1), help='env INDOVESTDKG_END_PAGE')
+    p.add_argument('--base-url', help='index URL (default: the site adapter default)')
+    p.add_argument('--keep-scheme', action='store_true', help='kompas: keep http:// article links (local mirrors)')
+    p.add_argument('--refetch-missing', metavar='CSV',
+                   help='no index crawl: re-fetch the links of the rows of CSV with empty fields')
+    p.add_argument('--http-cache', default=env('HTTP_CACHE'),
+                   help='SQLite response cache for conditional requests; env INDOVESTDKG_HTTP_CACHE')
+    p.add_argument('--no-resume', action='store_true', help='fetch links that are already stored again')
+    p.add_argument('--reparse-unchanged', action='store_true',
+                   help='parse articles again even when the server answers 304 and the stored copy is complete')
+    p.add_argument('--stop-on-known', action=argparse.BooleanOptionalAction,
+                   help='stop at the first index page without new links (default: cnbc yes, kompas no)')
+    p.add_argument('--no-clean', action='store_true', help='skip clean_articles_csv after the crawl')
+    p.add_argument('--per-host', type=int)
+    p.add_argument('--rate', type=float, help='requests per second per host')
+    p.add_argument('--max-retries', type=int, default=3)
+    p.add_argument('--timeout', type=float, default=10)
+    p.set_defaults(run=crawl)
+
+    p = commands.add_parser('clean', help='clean an article CSV in chunks (in place by default)')
+    p.add_argument('input')
+    p.add_argument('--output')
+    p.add_argument('--chunksize', type=int, default=10000)
+    p.add_argument('--sep', default=';')
+    p.set_defaults(run=clean)
+
+    p = commands.add_parser('extract', help='LLM quadruple extraction of an article CSV to JSONL')
+    p.add_argument('input', help="cleaned article CSV ('isi' and 'tanggal' columns)")
+    p.add_argument('--output', default=env('EXTRACTION_OUTPUT'), required=env('EXTRACTION_OUTPUT') is None,
+                   help='JSONL output, appended to and resumed; env INDOVESTDKG_EXTRACTION_OUTPUT')
+    p.add_argument('--checkpoint', help='default: <output>_checkpoint.json')
+    p.add_argument('--cache', default=env('EXTRACTION_CACHE'),
+                   help='extraction cache (default: <output>_cache.sqlite); env INDOVESTDKG_EXTRACTION_CACHE')
+    p.add_argument('--alias-map', default=env('ALIAS_MAP'), help='compiled kgprep.alias_map; env INDOVESTDKG_ALIAS_MAP')
+    p.add_argument('--model', default=env('MODEL', 'gpt-4o-mini'), help='env INDOVESTDKG_MODEL')
+    p.add_argument('--base-url', default=env('LLM_BASE_URL'),
+                   help='OpenAI-compatible /v1 endpoint called directly over httpx instead of LangChain; '
+                        'env INDOVESTDKG_LLM_BASE_URL')
+    p.add_argument('--env-file', default='.env', help='dotenv file with OPENAI_API_KEY, loaded if it exists')
+    p.add_argument('--rpm', type=int, default=env('RPM'), help='env INDOVESTDKG_RPM')
+    p.add_argument('--tpm', type=int, default=env('TPM'), help='env INDOVESTDKG_TPM')
+    p.add_argument('--max-in-flight', type=int)
+    p.add_argument('--near-duplicates', choices=('reuse', 'skip'), default=env('NEAR_DUPLICATES'),
+                   help="syndicated copies of an extracted article: reuse its quads under the copy's date, or skip "
+                        'them (default: extract every article); env INDOVESTDKG_NEAR_DUPLICATES')
+    p.add_argument('--pack-tokens', type=int, help='pack short articles into one request up to this many tokens')
+    p.add_argument('--relevance', default=env('RELEVANCE'),
+                   help='kgprep.relevance model: articles scoring below its threshold are not sent to the LLM; '
+                        'env INDOVESTDKG_RELEVANCE')
+    p.add_argument('--min-score', type=float, help='relevance threshold (default: the calibrated one in the model)')
+    p.add_argument('--relevance-workers', type=int, default=1, help='scoring processes (0 = CPU count)')
+    p.add_argument('--start', type=int, default=0, help='first article row')
+    p.add_argument('--end', type=int, help='end article row (exclusive)')
+    p.add_argument('--sep', default=';')
+    p.add_argument('--quiet', action='store_true', help='no progress bar')
+    p.set_defaults(run=extract)
+
+    for name, target in PASS_THROUGH.items():
+        p = commands.add_parser(name, add_help=False, help=f'{target} (arguments are passed through; see {name} -h)')
+        p.add_argument('args', nargs=argparse.REMAINDER)
+        p.set_defaults(run=encode if name == 'encode' else split)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    # encode / split take their own options, which the pass-through parser would reject
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command in PASS_THROUGH:
+        args.args = extra + args.args
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    if args.command is None:
+        parser.print_help()
+        return None
+    import logging
+    logging.basicConfig(format='%(levelname)s [%(asctime)s] %(name)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S',
+                        level=args.log_level.upper())
+    metrics = None
+    if args.metrics or args.profile:
+        from kgprep.metrics import Metrics
+        metrics = Metrics()
+    with metrics.profile(args.profile) if args.profile else nullcontext():
+        with metrics.stage(args.command) if metrics is not None else nullcontext():
+            result = args.run(args, metrics)
+    if args.metrics:
+        logging.info(f'Metrics written to {metrics.write(args.metrics)}')
+    return result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""
+Binary, memory-mapped format for the IndovestDKG quadruple splits.
+
+`data/IndovestDKG` stores `{train,valid,test}.txt` (`s r o t` per line)
+and `entity2id.txt` / `relation2id.txt` (`name<TAB>id`) as text that every
+consumer re-parses line by line. `export_binary` writes the same dataset
+as one directory of flat files:
+
+    meta.json                   counts, splits, format version
+    {split}.npy                 int32 array of shape (n, 4): s, r, o, t
+    entities.bin / .offsets.npy UTF-8 names concatenated + int64 offsets (id -> name)
+    relations.bin / .offsets.npy
+
+`load_dataset` memory-maps all of it, so splits come back as NumPy views
+of the page cache and names are decoded only when asked for. The text
+layout stays available through `export_text`.
+
+    python -m kgprep.dataset to-binary ../IndovestDKG ../IndovestDKG/binary
+    python -m kgprep.dataset to-text ../IndovestDKG/binary out_txt
+"""
+import argparse
+import codecs
+import json
+import os
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+SPLITS = ('train', 'valid', 'test')
+QUAD_DTYPE = np.int32
+
+
+class StringTable:
+    """Id -> name table over a UTF-8 blob and an offsets array (both may be memory-mapped)."""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+        self._index = None
+
+    @classmethod
+    def load(cls, prefix, mmap=True):
+        mode = 'r' if mmap else None
+        offsets = np.load(prefix + '.offsets.npy', mmap_mode=mode)
+        if mmap and os.path.getsize(prefix + '.bin'):
+            blob = np.memmap(prefix + '.bin', dtype=np.uint8, mode='r')
+        else:
+            blob = np.fromfile(prefix + '.bin', dtype=np.uint8)
+        return cls(blob, offsets)
+
+    @classmethod
+    def from_names(cls, names):
+        encoded = [str(name).encode('utf-8') for name in names]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets)
+
+    def write(self, prefix):
+        """Write the table as `{prefix}.bin` and `{prefix}.offsets.npy`."""
+        with open(prefix + '.bin', 'wb') as f:
+            f.write(self.blob.tobytes())
+        np.save(prefix + '.offsets.npy', np.asarray(self.offsets))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return self.blob[start:end].tobytes().decode('utf-8')
+
+    def names(self, ids=None):
+        """Decode names for `ids` (default: all) as a list."""
+        ids = range(len(self)) if ids is None else np.asarray(ids).tolist()
+        return [self[i] for i in ids]
+
+    def id_of(self, name):
+        """Reverse lookup; the name -> id dict is built on first use."""
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.names())}
+        return self._index[name]
+
+
+class QuadrupleDataset:
+    """Splits as (n, 4) int32 arrays (`s, r, o, t`) plus entity/relation string tables."""
+
+    def __init__(self, splits, entities, relations, meta=None):
+        self.splits = splits
+        self.entities = entities
+        self.relations = relations
+        self.meta = meta or {}
+
+    def __getitem__(self, split):
+        return self.splits[split]
+
+    @property
+    def num_entities(self):
+        return len(self.entities)
+
+    @property
+    def num_relations(self):
+        return len(self.relations)
+
+    @property
+    def num_timestamps(self):
+        return max((int(q[:, 3].max()) + 1 for q in self.splits.values() if len(q)), default=0)
+
+    def columns(self, split):
+        """`(s, r, o, t)` column views of one split."""
+        quads = self.splits[split]
+        return quads[:, 0], quads[:, 1], quads[:, 2], quads[:, 3]
+
+
+def read_id_map(path):
+    """Names in id order from a `name<TAB>id` file (ids must be 0..n-1, in any order)."""
+    table = pd.read_csv(path, sep='\t', header=None, names=['name', 'id'], quoting=3, dtype={'name': object},
+                        keep_default_na=False, na_filter=False)
+    names = np.empty(len(table), dtype=object)
+    ids = table['id'].to_numpy()
+    if len(ids) and (ids.min() < 0 or ids.max() >= len(ids) or len(np.unique(ids)) != len(ids)):
+        raise ValueError(f'{path}: ids are not a permutation of 0..{len(ids) - 1}')
+    names[ids] = table['name'].to_numpy(dtype=object)
+    return names
+
+
+def write_id_map(names, path, ids=None):
+    """Write `name<TAB>id` lines (the format of `entity2id.txt` / `relation2id.txt`)."""
+    ids = range(len(names)) if ids is None else ids
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(''.join(f'{name}\t{i}\n' for name, i in zip(names, ids)))
+
+
+def read_quads(path):
+    """(n, 4) int32 array from a whitespace-separated `s r o t [...]` file (extra columns are ignored)."""
+    quads = pd.read_csv(path, sep=r'\s+', header=None, usecols=[0, 1, 2, 3], dtype=np.int64, engine='c')
+    return quads.to_numpy().astype(QUAD_DTYPE)
+
+
+def write_quads(quads, path, sep='\t'):
+    pd.DataFrame(np.asarray(quads)).to_csv(path, sep=sep, header=False, index=False)
+
+
+def _check_int32(array, path):
+    if len(array) and (array.min() < np.iinfo(QUAD_DTYPE).min or array.max() > np.iinfo(QUAD_DTYPE).max):
+        raise ValueError(f'{path}: ids do not fit in int32')
+
+
+def load_text(directory, splits=SPLITS):
+    """Read the text layout of `data/IndovestDKG` into a QuadrupleDataset (arrays in memory)."""
+    quads = {}
+    for split in splits:
+        path = os.path.join(directory, f'{split}.txt')
+        if os.path.exists(path):
+            quads[split] = read_quads(path)
+    entities = read_id_map(os.path.join(directory, 'entity2id.txt'))
+    relations = read_id_map(os.path.join(directory, 'relation2id.txt'))
+    return QuadrupleDataset(quads, StringTable.from_names(entities), StringTable.from_names(relations))
+
+
+def export_binary(dataset, directory):
+    """Write `dataset` (a QuadrupleDataset or a text-layout directory) in the binary layout."""
+    if isinstance(dataset, str):
+        dataset = load_text(dataset)
+    os.makedirs(directory, exist_ok=True)
+    counts = {}
+    for split, quads in dataset.splits.items():
+        quads = np.asarray(quads)
+        _check_int32(quads, split)
+        np.save(os.path.join(directory, f'{split}.npy'), np.ascontiguousarray(quads, dtype=QUAD_DTYPE))
+        counts[split] = int(len(quads))
+    dataset.entities.write(os.path.join(directory, 'entities'))
+    dataset.relations.write(os.path.join(directory, 'relations'))
+    meta = {'format_version': FORMAT_VERSION, 'splits': counts, 'num_entities': dataset.num_entities,
+            'num_relations': dataset.num_relations, 'num_timestamps': dataset.num_timestamps}
+    # meta.json is written last: its presence marks a complete export
+    tmp_path = os.path.join(directory, 'meta.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(directory, 'meta.json'))
+    return meta
+
+
+def load_dataset(directory, mmap=True):
+    """
+    Load the binary layout. With `mmap` (default) nothing is copied: splits
+    are read-only `np.memmap` views and names are decoded lazily.
+    """
+    with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"{directory}: unsupported format version {meta.get('format_version')}")
+    mode = 'r' if mmap else None
+    splits = {split: np.load(os.path.join(directory, f'{split}.npy'), mmap_mode=mode) for split in meta['splits']}
+    entities = StringTable.load(os.path.join(directory, 'entities'), mmap)
+    relations = StringTable.load(os.path.join(directory, 'relations'), mmap)
+    return QuadrupleDataset(splits, entities, relations, meta)
+
+
+def export_text(dataset, directory, sep='\t'):
+    """Write the text layout (`{split}.txt`, `entity2id.txt`, `relation2id.txt`) of a dataset or binary directory."""
+    if isinstance(dataset, str):
+        dataset = load_dataset(dataset)
+    os.makedirs(directory, exist_ok=True)
+    for split, quads in dataset.splits.items():
+        write_quads(quads, os.path.join(directory, f'{split}.txt'), sep)
+    write_id_map(dataset.entities.names(), os.path.join(directory, 'entity2id.txt'))
+    write_id_map(dataset.relations.names(), os.path.join(directory, 'relation2id.txt'))
+
+
+def separator(value):
+    """argparse type for `--sep`: escapes are decoded (a shell passes `'\\t'` as backslash, t); `tab` also works."""
+    return '\t' if value == 'tab' else codecs.decode(value, 'unicode_escape')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert IndovestDKG between the text and binary layouts')
+    parser.add_argument('command', choices=['to-binary', 'to-text'])
+    parser.add_argument('source', help='text-layout directory (to-binary) or binary directory (to-text)')
+    parser.add_argument('destination')
+    parser.add_argument('--sep', type=separator, default='\t',
+                        help="separator for to-text quadruples, escapes decoded: '\\t' or tab (split.ipynb uses ' ')")
+    args = parser.parse_args()
+
+    if args.command == 'to-binary':
+        meta = export_binary(args.source, args.destination)
+        print(json.dumps(meta, indent=2))
+    else:
+        export_text(args.source, args.destination, args.sep)
+
+
+if __name__ == '__main__':
+    main()
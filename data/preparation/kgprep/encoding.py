@@ -0,0 +1,244 @@
+"""
+Incremental, stable ID encoding of IndovestDKG quadruples.
+
+`prep.ipynb` rebuilds entity, relation and temporal IDs from scratch on
+every run, with `temporal_id` counted in weeks back from the newest date,
+so each new week of news renumbers everything. `StableEncoder` persists
+its vocabularies next to the encoded output (in the notebook's CSV
+formats), only ever appends IDs for unseen entities and relations, and
+counts weekly time buckets forward from a fixed epoch. Encoding is
+vectorized with `pd.Index.get_indexer` and works chunk by chunk, so
+encoding a new crawl costs O(new rows).
+
+    python -m kgprep.encoding new_quadruples.csv --out preprocessed/stable
+"""
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+
+DEFAULT_EPOCH = '2010-01-04'  # A Monday, before the earliest IndovestDKG article
+DEFAULT_PREFIX = 'norm_IndovestDKG'
+QUAD_COLUMNS = ['subject_entity_id', 'relation_id', 'object_entity_id', 'temporal_id']
+
+
+class Vocabulary:
+    """
+    Append-only name -> id vocabulary.
+
+    Lookups run against a `pd.Index` of the persisted names (its hash table
+    is built once); names added since the last `merge` live in a small dict,
+    so a chunk costs O(chunk + new names) rather than O(vocabulary).
+    """
+
+    def __init__(self, names=()):
+        self.base = pd.Index(list(names), dtype=object)
+        if not self.base.is_unique:
+            raise ValueError('vocabulary names must be unique')
+        self.added = {}
+        self.saved = len(self.base)
+
+    def __len__(self):
+        return len(self.base) + len(self.added)
+
+    def encode(self, values, grow=True):
+        """Ids of `values` (array-like of names); unseen names get new ids when `grow`, else -1."""
+        values = np.asarray(values, dtype=object)
+        ids = self.base.get_indexer(values).astype(np.int64)
+        missing = ids < 0
+        if missing.any():
+            inverse, uniques = pd.factorize(values[missing])
+            new_ids = np.empty(len(uniques), dtype=np.int64)
+            for i, name in enumerate(uniques):
+                index = self.added.get(name)
+                if index is None:
+                    if not grow:
+                        index = -1
+                    else:
+                        index = self.added[name] = len(self)
+                new_ids[i] = index
+            ids[missing] = new_ids[inverse]
+            if len(self.added) > max(4096, len(self.base)):
+                # Geometric merging keeps the total rebuild cost linear in the vocabulary size
+                self.merge()
+        return ids
+
+    def merge(self):
+        """Fold the added names into the base index (rebuilds its hash table once)."""
+        if self.added:
+            self.base = self.base.append(pd.Index(list(self.added), dtype=object))
+            self.added = {}
+
+    def names(self, ids):
+        self.merge()
+        return self.base.take(np.asarray(ids)).to_numpy()
+
+    def unsaved(self):
+        """Names (in id order) added since the vocabulary was last saved."""
+        if self.saved >= len(self.base):
+            return list(self.added)[self.saved - len(self.base):]
+        return list(self.base[self.saved:]) + list(self.added)
+
+
+class StableEncoder:
+    """
+    Encoder for (subject, relation, object, date) quadruples with stable ids.
+
+    State lives in `directory` as `{prefix}_encoded_entity_id.csv` and
+    `{prefix}_relation_id.csv` (the `prep.ipynb` formats, appended to on
+    `save`) plus `{prefix}_encoder.json` holding the epoch and bucket size.
+    A directory with the notebook's files but no `_encoder.json` is refused
+    (its temporal ids count backwards).
+    Entity types are assigned from an entity's first occurrence, as in the
+    notebook. `temporal_id` is `(date - epoch) // bucket_days` days, so
+    existing ids never change when newer weeks arrive.
+    """
+
+    def __init__(self, directory, prefix=DEFAULT_PREFIX, epoch=DEFAULT_EPOCH, bucket_days=7):
+        self.directory = directory
+        self.prefix = prefix
+        self.entity_path = os.path.join(directory, f'{prefix}_encoded_entity_id.csv')
+        self.relation_path = os.path.join(directory, f'{prefix}_relation_id.csv')
+        self.meta_path = os.path.join(directory, f'{prefix}_encoder.json')
+        self.output_path = os.path.join(directory, f'{prefix}_encoded_indovest.csv')
+        if not os.path.exists(self.meta_path):
+            # prep.ipynb output (e.g. notebooks/preprocessed/experiments/result) counts temporal_id in weeks back
+            # from the newest date; appending epoch-forward ids to it would mix two opposite time axes
+            legacy = [os.path.basename(path) for path in (self.entity_path, self.relation_path, self.output_path)
+                      if os.path.exists(path)]
+            if legacy:
+                raise ValueError(f'{directory} has {", ".join(legacy)} but no {prefix}_encoder.json: these are '
+                                 'prep.ipynb files with weeks-back temporal ids; encode into a fresh directory')
+        else:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            epoch, bucket_days = meta['epoch'], meta['bucket_days']
+        self.epoch = np.datetime64(pd.Timestamp(epoch).normalize().date(), 'D')
+        self.bucket_days = bucket_days
+
+        entities = pd.DataFrame(columns=['entity_name', 'entity_id', 'relation', 'relation_id'])
+        if os.path.exists(self.entity_path):
+            entities = pd.read_csv(self.entity_path, keep_default_na=False).sort_values('entity_id')
+        relations = pd.DataFrame(columns=['relation', 'relation_id'])
+        if os.path.exists(self.relation_path):
+            relations = pd.read_csv(self.relation_path, keep_default_na=False).sort_values('relation_id')
+        self.entities = Vocabulary(entities['entity_name'])
+        self.relations = Vocabulary(relations['relation'])
+        # The notebook stores the entity type as relation / relation_id in the entity file
+        type_order = entities.drop_duplicates('relation_id').sort_values('relation_id')['relation']
+        self.types = Vocabulary(type_order)
+        self.entity_types = list(entities['relation_id'].astype(np.int64))
+
+    def temporal_ids(self, dates):
+        dates = pd.Series(dates)
+        parsed = pd.to_datetime(dates, errors='coerce')
+        # NaT would otherwise turn into a huge negative offset and be reported as a date before the epoch
+        missing = parsed.isna()
+        if missing.any():
+            bad = dates[missing]
+            rows = ', '.join(f'{row}: {value!r}' for row, value in bad.head(10).items())
+            raise ValueError(f'{len(bad)} missing or unparseable dates (row: value) {rows}')
+        days = parsed.to_numpy().astype('datetime64[D]')
+        offsets = (days - self.epoch).astype(np.int64)
+        if (offsets < 0).any():
+            early = dates[offsets < 0]
+            rows = ', '.join(f'{row}: {value!r}' for row, value in early.head(10).items())
+            raise ValueError(f'{len(early)} dates before the encoder epoch {self.epoch} (row: value) {rows}')
+        return offsets // self.bucket_days
+
+    def encode(self, df):
+        """
+        Encode a chunk with columns subject, subject_type, relation, object,
+        object_type, date; returns a DataFrame with QUAD_COLUMNS.
+        """
+        subjects = self.entities.encode(df['subject'].to_numpy(dtype=object))
+        objects = self.entities.encode(df['object'].to_numpy(dtype=object))
+        new_entities = len(self.entities) - len(self.entity_types)
+        if new_entities:
+            # First occurrence of each new id, subjects before objects (as in prep.ipynb)
+            ids = np.concatenate([subjects, objects])
+            names = np.concatenate([df['subject_type'].to_numpy(dtype=object),
+                                    df['object_type'].to_numpy(dtype=object)])
+            unique_ids, first = np.unique(ids, return_index=True)
+            fresh = unique_ids >= len(self.entity_types)
+            types = self.types.encode(names[first[fresh]])
+            self.entity_types.extend(types[np.argsort(unique_ids[fresh])].tolist())
+        relations = self.relations.encode(df['relation'].to_numpy(dtype=object))
+        columns = [subjects, relations, objects, self.temporal_ids(df['date'])]
+        return pd.DataFrame(dict(zip(QUAD_COLUMNS, columns)), index=df.index)
+
+    def encode_csv(self, path, output=None, chunksize=1_000_000):
+        """
+        Encode a quadruple CSV chunk by chunk, appending to `output` (default
+        `{prefix}_encoded_indovest.csv` in the state directory). The
+        vocabularies are saved before each chunk is written, so an
+        interrupted run never leaves ids without names.
+        """
+        output = output or self.output_path
+        rows = 0
+        for chunk in pd.read_csv(path, chunksize=chunksize, keep_default_na=False):
+            encoded = self.encode(chunk)
+            self.save()
+            header = not os.path.exists(output) or os.path.getsize(output) == 0
+            encoded.to_csv(output, mode='a', header=header, index=False)
+            rows += len(encoded)
+        return rows
+
+    def save(self):
+        """Append new vocabulary rows and rewrite the encoder metadata."""
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        start = self.entities.saved
+        names = self.entities.unsaved()
+        if len(names):
+            type_ids = np.asarray(self.entity_types[start:], dtype=np.int64)
+            rows = pd.DataFrame({'entity_name': names, 'entity_id': np.arange(start, start + len(names)),
+                                 'relation': self.types.names(type_ids), 'relation_id': type_ids})
+            rows.to_csv(self.entity_path, mode='a', header=start == 0, index=False)
+            self.entities.saved = len(self.entities)
+        start = self.relations.saved
+        names = self.relations.unsaved()
+        if len(names):
+            rows = pd.DataFrame({'relation': names, 'relation_id': np.arange(start, start + len(names))})
+            rows.to_csv(self.relation_path, mode='a', header=start == 0, index=False)
+            self.relations.saved = len(self.relations)
+        self.types.saved = len(self.types)
+        meta = {'epoch': str(self.epoch), 'bucket_days': self.bucket_days, 'entities': len(self.entities),
+                'relations': len(self.relations), 'entity_types': len(self.types)}
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, self.meta_path)
+
+    def entity_names(self, ids):
+        return self.entities.names(ids)
+
+    def relation_names(self, ids):
+        return self.relations.names(ids)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Incrementally encode quadruples with stable ids')
+    parser.add_argument('input', nargs='+', help='quadruple CSVs (subject, subject_type, relation, object, '
+                                                 'object_type, date), encoded in order')
+    parser.add_argument('--out', default='.', help='state / output directory')
+    parser.add_argument('--prefix', default=DEFAULT_PREFIX)
+    parser.add_argument('--epoch', default=DEFAULT_EPOCH, help='start of temporal_id 0 (new state only)')
+    parser.add_argument('--bucket-days', type=int, default=7)
+    parser.add_argument('--chunksize', type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    try:
+        encoder = StableEncoder(args.out, args.prefix, args.epoch, args.bucket_days)
+    except ValueError as e:
+        parser.error(str(e))
+    before = (len(encoder.entities), len(encoder.relations))
+    for path in args.input:
+        rows = encoder.encode_csv(path, chunksize=args.chunksize)
+        print(f'{path}: {rows} quadruples')
+    print(f'entities {before[0]} -> {len(encoder.entities)}, relations {before[1]} -> {len(encoder.relations)}')
+
+
+if __name__ == '__main__':
+    main()
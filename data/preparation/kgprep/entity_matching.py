@@ -0,0 +1,553 @@
+"""
+Blocked fuzzy entity matching for IndovestDKG normalization.
+
+Replaces the all-pairs `SequenceMatcher` loops of `cleaning.ipynb`
+(`EntityConsistencyAnalyzer`, `PreprocessingInspector`,
+`Phase2AggressiveCleaner`) with candidate generation over the full
+vocabulary: MinHash-LSH on character n-grams, sorted neighbourhood on
+several name keys, and key blocks for shared tokens, acronyms, and
+initials. Candidate pairs are scored with vectorized sparse n-gram and
+token overlaps, and only the survivors are verified with the notebook's
+original rules.
+"""
+import argparse
+import json
+import re
+from collections import Counter, defaultdict
+from datetime import datetime
+from difflib import SequenceMatcher
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+PERSON_TYPES = ['ORANG', 'INDIVIDU', 'PEOPLE', 'PEPERSON']
+ORG_TYPES = ['PERUSAHAAN', 'ORGANISASI', 'BADAN_REGULATOR', 'PEMERINTAHAN',
+             'BANK', 'LEMBAGA', 'INSTANSI', 'KEMENTERIAN']
+CATEGORIES = ['persons', 'organizations', 'general']
+
+PERSON_TITLE_PATTERNS = [re.compile(p) for p in [
+    r'^(dr\.?|prof\.?|ir\.?|h\.?|hj\.?|kh\.?)\s+',
+    r'^(menteri|direktur|presiden|wakil|gubernur|bupati|walikota|ketua|sekretaris)\s+.*?',
+    r'^(kepala|plt|pjs|pj)\s+.*?',
+    r'\s+(s\.h\.?|s\.e\.?|s\.t\.?|m\.m\.?|ph\.d\.?)$',
+]]
+PERSON_SUFFIX_PATTERNS = [re.compile(p) for p in [
+    r'\s+(bkpm|ojk|bi|sri|kemenkeu|kementerian).*$',
+    r'\s+(dan|kepala|direktur).*$',
+]]
+ORG_PREFIXES = ['pt ', 'cv ', 'ud ', 'koperasi ']
+ORG_SUFFIXES = [' tbk', ' persero', ' (persero)', ' indonesia', ' ri', ' cabang', ' pusat']
+PARENTHETICAL = re.compile(r'\([^)]*\)')
+INITIAL_NAME = re.compile(r'^(\w+)\s+(\w)\.?\s+(\w+)$')
+FULL_NAME = re.compile(r'^(\w+)\s+(\w+)\s+(\w+)$')
+
+# Same acceptance rules as EntityConsistencyAnalyzer._are_same_person / _are_same_organization
+RULES = {
+    'persons': {'ratio': 0.8, 'overlap': 0.6, 'contain': 8, 'initials': True, 'acronym': False},
+    'organizations': {'ratio': 0.85, 'overlap': 0.7, 'contain': 3, 'initials': False, 'acronym': True},
+    'general': {'ratio': 0.85, 'overlap': None, 'contain': None, 'initials': False, 'acronym': False},
+}
+
+
+def core_person_name(full_name):
+    """Core person name with titles and positions removed (as in the notebook)."""
+    name = str(full_name).lower().strip()
+    for pattern in PERSON_TITLE_PATTERNS:
+        name = pattern.sub('', name).strip()
+    for pattern in PERSON_SUFFIX_PATTERNS:
+        name = pattern.sub('', name).strip()
+    return ' '.join(name.split())
+
+
+def core_org_name(full_name):
+    """Core organization name without legal prefixes/suffixes and parentheticals."""
+    name = str(full_name).lower().strip()
+    for prefix in ORG_PREFIXES:
+        if name.startswith(prefix):
+            name = name[len(prefix):].strip()
+            break
+    for suffix in ORG_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)].strip()
+    name = PARENTHETICAL.sub('', name).strip()
+    return ' '.join(name.split())
+
+
+def core_name(name, category):
+    if category == 'persons':
+        return core_person_name(name)
+    if category == 'organizations':
+        return core_org_name(name)
+    return str(name).lower()
+
+
+def acronym(name):
+    return ''.join(word[0] for word in name.split() if len(word) > 2)
+
+
+def is_acronym_match(name1, name2):
+    if len(name1) <= 5 and len(name2) > 10 and name1.replace(' ', '').replace('.', '') == acronym(name2):
+        return True
+    return len(name2) <= 5 and len(name1) > 10 and name2.replace(' ', '').replace('.', '') == acronym(name1)
+
+
+def is_initial_match(name1, name2):
+    """'rosan p. roeslani' vs 'rosan perkasa roeslani'."""
+    for short, full in ((name1, name2), (name2, name1)):
+        match1 = INITIAL_NAME.match(short)
+        match2 = FULL_NAME.match(full)
+        if match1 and match2:
+            first1, initial1, last1 = match1.groups()
+            first2, middle2, last2 = match2.groups()
+            if first1 == first2 and last1 == last2 and initial1 == middle2[0]:
+                return True
+    return False
+
+
+def _vocab_matrix(rows):
+    """Binary CSR matrix from an iterable of feature lists, with a deterministic vocabulary."""
+    vocab = {}
+    indptr = [0]
+    indices = []
+    for features in rows:
+        ids = {vocab.setdefault(f, len(vocab)) for f in features}
+        indices.extend(sorted(ids))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float32)
+    matrix = sp.csr_matrix((data, np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+                           shape=(len(indptr) - 1, max(1, len(vocab))))
+    return matrix, vocab
+
+
+def char_ngrams(text, n=3):
+    padded = f' {text} '
+    return [padded[i:i + n] for i in range(max(1, len(padded) - n + 1))]
+
+
+def minhash_signatures(matrix, num_perm=48, seed=7):
+    """MinHash signatures (rows x num_perm) of the feature sets of a binary CSR matrix, fully vectorized."""
+    prime = np.uint64((1 << 61) - 1)
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+    b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+    features = matrix.indices.astype(np.uint64)
+    starts = matrix.indptr[:-1]
+    signatures = np.empty((matrix.shape[0], num_perm), dtype=np.uint64)
+    for p in range(num_perm):
+        hashed = (a[p] * features + b[p]) % prime
+        signatures[:, p] = np.minimum.reduceat(hashed, starts)
+    return signatures
+
+
+def _labels(keys):
+    """Integer label per key (-1 for None)."""
+    labels = np.full(len(keys), -1, dtype=np.int64)
+    ids = {}
+    for i, key in enumerate(keys):
+        if key is not None:
+            labels[i] = ids.setdefault(key, len(ids))
+    return labels
+
+
+def block_pairs(labels, members=None, rank=None, max_block=64, window=4):
+    """
+    Candidate pairs (i < j) of members sharing a block label.
+
+    Blocks up to `max_block` members produce all their pairs; larger blocks
+    fall back to a sorted neighbourhood of `window` along `rank`. `members`
+    allows one entity to appear in several blocks (exploded keys).
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    members = np.arange(len(labels)) if members is None else np.asarray(members, dtype=np.int64)
+    keep = labels >= 0
+    labels, members = labels[keep], members[keep]
+    if len(labels) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    rank = members if rank is None else np.asarray(rank)[members]
+    order = np.lexsort((rank, labels))
+    labels, members = labels[order], members[order]
+    _, block_size = np.unique(labels, return_counts=True)
+    size = np.repeat(block_size, block_size)
+    pairs = []
+    for d in range(1, max(max_block, window + 1)):
+        same = labels[:-d] == labels[d:]
+        if d > window:
+            same &= size[:-d] <= max_block
+        if not same.any():
+            if d > window:
+                break
+            continue
+        pairs.append(np.stack([members[:-d][same], members[d:][same]], axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.concatenate(pairs)
+
+
+def neighbourhood_pairs(keys, window=4):
+    """Sorted-neighbourhood pairs: entities within `window` positions after sorting by `keys`."""
+    order = np.argsort(np.asarray(keys, dtype=object), kind='stable')
+    pairs = [np.stack([order[:-d], order[d:]], axis=1) for d in range(1, window + 1) if d < len(order)]
+    return np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)
+
+
+def _rowwise_overlap(matrix, left, right, chunk=500000):
+    out = np.empty(len(left), dtype=np.float32)
+    for start in range(0, len(left), chunk):
+        end = start + chunk
+        out[start:end] = np.asarray(
+            matrix[left[start:end]].multiply(matrix[right[start:end]]).sum(axis=1)).ravel()
+    return out
+
+
+class EntityMatcher:
+    """
+    Finds name variations within one entity category over the whole vocabulary.
+
+    Candidate generation unions several cheap blocking schemes so that every
+    rule of the notebook has a chance to fire, then pairs are accepted with
+    the same rules: `SequenceMatcher` ratio on core names, word overlap,
+    substring containment, acronyms (organizations) and initials (persons).
+    Groups are formed greedily from the most frequent entity, like the
+    notebook's `processed` loop, so chains do not merge into giant clusters.
+    """
+
+    def __init__(self, category='general', ratio=None, ngram=3, num_perm=48, bands=16, max_block=64, window=4,
+                 prefilter=0.5, max_token_block=64):
+        if category not in RULES:
+            raise ValueError(f"Unknown category: {category}")
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.category = category
+        self.rules = dict(RULES[category])
+        if ratio is not None:
+            self.rules['ratio'] = ratio
+        self.ngram = ngram
+        self.num_perm = num_perm
+        self.bands = bands
+        self.max_block = max_block
+        self.window = window
+        self.prefilter = prefilter
+        self.max_token_block = max_token_block
+        self.stats = {}
+
+    def candidate_pairs(self, cores):
+        n = len(cores)
+        grams, _ = _vocab_matrix(char_ngrams(core, self.ngram) for core in cores)
+        self.grams = grams
+        rank = np.argsort(np.argsort(np.asarray(cores, dtype=object), kind='stable'))
+        sources = {}
+
+        signatures = minhash_signatures(grams, self.num_perm)
+        rows = self.num_perm // self.bands
+        lsh = []
+        for band in range(self.bands):
+            band_rows = signatures[:, band * rows:(band + 1) * rows]
+            _, labels = np.unique(band_rows, axis=0, return_inverse=True)
+            lsh.append(block_pairs(labels.ravel(), rank=rank, max_block=self.max_block, window=self.window))
+        sources['minhash_lsh'] = np.concatenate(lsh)
+
+        sources['sorted_neighbourhood'] = np.concatenate([
+            neighbourhood_pairs(cores, self.window),
+            neighbourhood_pairs([' '.join(sorted(core.split())) for core in cores], self.window),
+            neighbourhood_pairs([core[::-1] for core in cores], self.window),
+        ])
+        sources['core_key'] = block_pairs(_labels(cores), rank=rank, max_block=self.max_block,
+                                          window=self.window)
+
+        if self.rules['overlap'] is not None or self.rules['contain'] is not None:
+            members, tokens = [], []
+            for i, core in enumerate(cores):
+                for token in set(core.split()):
+                    if len(token) > 2:
+                        members.append(i)
+                        tokens.append(token)
+            sources['token_block'] = block_pairs(_labels(tokens), members, rank, self.max_token_block, self.window)
+
+        if self.rules['acronym']:
+            members, keys = [], []
+            for i, core in enumerate(cores):
+                if len(core) <= 5:
+                    members.append(i)
+                    keys.append(core.replace(' ', '').replace('.', ''))
+                elif len(core) > 10:
+                    members.append(i)
+                    keys.append(acronym(core))
+            sources['acronym'] = block_pairs(_labels(keys), members, rank, self.max_block, self.window)
+
+        if self.rules['initials']:
+            keys = []
+            for core in cores:
+                words = core.replace('.', ' ').split()
+                keys.append((words[0], words[-1]) if len(words) == 3 else None)
+            sources['initials'] = block_pairs(_labels(keys), rank=rank, max_block=self.max_block, window=self.window)
+
+        pairs = np.concatenate([p for p in sources.values() if len(p)]) if sources else np.empty((0, 2))
+        pairs = np.sort(pairs, axis=1)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        keys = np.unique(pairs[:, 0].astype(np.int64) * n + pairs[:, 1])
+        self.stats['candidates'] = {name: int(len(p)) for name, p in sources.items()}
+        self.stats['unique_candidates'] = int(len(keys))
+        return np.stack([keys // n, keys % n], axis=1)
+
+    def match_pairs(self, cores, pairs):
+        """Accepted pairs among candidates, using vectorized overlaps to decide what to verify."""
+        left, right = pairs[:, 0], pairs[:, 1]
+        lengths = np.fromiter((len(c) for c in cores), dtype=np.int64, count=len(cores))
+        gram_counts = np.diff(self.grams.indptr)
+        inter = _rowwise_overlap(self.grams, left, right)
+        cosine = inter / np.sqrt(gram_counts[left] * gram_counts[right])
+        la, lb = lengths[left], lengths[right]
+        # SequenceMatcher.ratio() <= 2 * min(len) / (len_a + len_b)
+        ratio_bound = 2 * np.minimum(la, lb) / np.maximum(1, la + lb)
+        accepted = np.zeros(len(pairs), dtype=bool)
+
+        verify = np.flatnonzero((cosine >= self.prefilter) & (ratio_bound > self.rules['ratio']))
+        for k in verify:
+            if SequenceMatcher(None, cores[left[k]], cores[right[k]]).ratio() > self.rules['ratio']:
+                accepted[k] = True
+
+        if self.rules['overlap'] is not None:
+            tokens, _ = _vocab_matrix(core.split() for core in cores)
+            token_counts = np.diff(tokens.indptr)
+            overlap = _rowwise_overlap(tokens, left, right)
+            both_multi = (token_counts[left] > 1) & (token_counts[right] > 1)
+            smaller = np.maximum(1, np.minimum(token_counts[left], token_counts[right]))
+            accepted |= both_multi & (overlap / smaller > self.rules['overlap'])
+
+        if self.rules['contain'] is not None:
+            # Every n-gram of the shorter name appears in the longer one
+            shorter = np.where(la < lb, left, right)
+            longer = np.where(la < lb, right, left)
+            maybe = (la != lb) & (lengths[shorter] > self.rules['contain']) & (inter >= gram_counts[shorter] - 2)
+            for k in np.flatnonzero(maybe & ~accepted):
+                if cores[shorter[k]] in cores[longer[k]]:
+                    accepted[k] = True
+
+        if self.rules['acronym']:
+            maybe = ((la <= 5) & (lb > 10)) | ((lb <= 5) & (la > 10))
+            for k in np.flatnonzero(maybe & ~accepted):
+                if is_acronym_match(cores[left[k]], cores[right[k]]):
+                    accepted[k] = True
+
+        if self.rules['initials']:
+            word_counts = np.fromiter((len(c.split()) for c in cores), dtype=np.int64, count=len(cores))
+            maybe = (word_counts[left] == 3) & (word_counts[right] == 3)
+            for k in np.flatnonzero(maybe & ~accepted):
+                if is_initial_match(cores[left[k]], cores[right[k]]):
+                    accepted[k] = True
+
+        self.stats['verified'] = int(len(verify))
+        self.stats['accepted'] = int(accepted.sum())
+        return pairs[accepted]
+
+    def find_variations(self, entities, frequencies=None):
+        """Return `{base_name: [variations]}` like EntityConsistencyAnalyzer._find_*_variations."""
+        entities = sorted({str(e) for e in entities if str(e).strip()})
+        if len(entities) < 2:
+            return {}
+        frequencies = frequencies or {}
+        cores = [core_name(e, self.category) for e in entities]
+        matched = self.match_pairs(cores, self.candidate_pairs(cores))
+
+        neighbours = defaultdict(list)
+        for i, j in matched:
+            neighbours[i].append(j)
+            neighbours[j].append(i)
+        order = sorted(neighbours, key=lambda i: (-frequencies.get(entities[i], 0), entities[i]))
+        processed = set()
+        groups = {}
+        for seed in order:
+            if seed in processed:
+                continue
+            members = [seed] + sorted(j for j in neighbours[seed] if j not in processed)
+            processed.update(members)
+            if len(members) > 1:
+                names = [entities[i] for i in members]
+                base = select_base_name(names, self.category)
+                groups[base] = [name for name in names if name != base]
+        self.stats['groups'] = len(groups)
+        return groups
+
+
+def similar_pairs(names, threshold=0.8, **matcher_options):
+    """
+    `(name1, name2, ratio)` for every pair of lowercased names with
+    `SequenceMatcher` ratio above `threshold`, most similar first.
+    """
+    names = [str(n) for n in names if str(n).strip()]
+    cores = [n.lower() for n in names]
+    matcher = EntityMatcher('general', ratio=threshold, **matcher_options)
+    pairs = []
+    for i, j in matcher.match_pairs(cores, matcher.candidate_pairs(cores)):
+        if cores[i].strip() != cores[j].strip():
+            pairs.append((names[i], names[j], SequenceMatcher(None, cores[i], cores[j]).ratio()))
+    pairs.sort(key=lambda x: x[2], reverse=True)
+    return pairs
+
+
+def select_base_name(names, category):
+    """Representative name of a group (EntityConsistencyAnalyzer._select_best_*_name)."""
+    if category == 'general':
+        return min(names, key=len)
+    scored = []
+    for name in names:
+        score = 0
+        lower = name.lower()
+        if category == 'persons':
+            if any(title in lower for title in ['menteri', 'direktur', 'presiden', 'kepala']):
+                score -= 10
+            score -= len(name) * 0.1
+            if re.match(r'^[a-z\s\.]+$', lower) and 2 <= len(name.split()) <= 4:
+                score += 5
+        else:
+            if len(name) < 5:
+                score -= 5
+            elif len(name) > 50:
+                score -= 3
+            if lower.startswith(('pt ', 'bank ', 'kementerian ')):
+                score += 2
+            if '(' in name:
+                score -= 1
+        scored.append((score, name))
+    scored.sort(reverse=True)
+    return scored[0][1]
+
+
+def select_canonical_name(names, category, frequencies):
+    """Canonical name of a group (SmartEntityNormalizer._select_canonical_name)."""
+    max_freq = max((frequencies.get(name, 0) for name in names), default=0) or 1
+    scored = []
+    for name in names:
+        freq = frequencies.get(name, 0)
+        score = (freq / max_freq) * 40
+        if category == 'persons':
+            word_count = len(name.split())
+            score += 20 if 2 <= word_count <= 4 else (5 if word_count == 1 else -10)
+            if any(kw in name.lower() for kw in ['menteri', 'direktur', 'presiden', 'gubernur']):
+                score -= 15
+        elif category == 'organizations':
+            if len(name) <= 5:
+                score += 10 if freq > max_freq * 0.7 else -15
+            else:
+                score += 15
+            if name.lower().startswith(('pt ', 'bank ', 'kementerian ')):
+                score += 10
+        if re.match(r'^[a-z\s\.\-]+$', name.lower()):
+            score += 20
+        score += -20 if len(name) > 60 else (-10 if len(name) > 40 else 20)
+        scored.append((score, name))
+    scored.sort(reverse=True)
+    return scored[0][1]
+
+
+def entity_frequencies(df):
+    freq = Counter(str(e) for e in df['subject'].dropna())
+    freq.update(str(e) for e in df['object'].dropna())
+    return freq
+
+
+def categorize_entities(df):
+    """Split the entities of a quadruple DataFrame into notebook categories by their types."""
+    entities = {}
+    for column, type_column in (('subject', 'subject_type'), ('object', 'object_type')):
+        part = df[[column, type_column]].dropna(subset=[column])
+        is_person = part[type_column].isin(PERSON_TYPES)
+        is_org = part[type_column].isin(ORG_TYPES)
+        entities.setdefault('persons', set()).update(part.loc[is_person, column].astype(str))
+        entities.setdefault('organizations', set()).update(part.loc[is_org, column].astype(str))
+        entities.setdefault('general', set()).update(part.loc[~is_person & ~is_org, column].astype(str))
+    return entities
+
+
+def consistency_report(df, **matcher_options):
+    """
+    Same structure as EntityConsistencyAnalyzer.generate_comprehensive_report,
+    computed over every entity instead of a sample.
+    """
+    frequencies = entity_frequencies(df)
+    details = {}
+    stats = {}
+    for category, entities in categorize_entities(df).items():
+        matcher = EntityMatcher(category, **matcher_options)
+        details[category] = matcher.find_variations(entities, frequencies)
+        stats[category] = dict(matcher.stats, entities=len(entities))
+    return {
+        'summary': {
+            'person_issues': len(details['persons']),
+            'org_issues': len(details['organizations']),
+            'general_issues': len(details['general']),
+            'total_variations': sum(len(v) for groups in details.values() for v in groups.values()),
+        },
+        'details': details,
+        'matching_stats': stats,
+    }
+
+
+def _confidence(total_freq, dominance, variant_count, has_case_variations):
+    # SmartEntityNormalizer._determine_recommendation_type
+    if (dominance > 0.8 and total_freq > 10) or (variant_count <= 3 and dominance > 0.6):
+        confidence = 'high_confidence'
+    elif (dominance > 0.5 and total_freq > 5) or (variant_count <= 5 and has_case_variations):
+        confidence = 'medium_confidence'
+    else:
+        confidence = 'low_confidence'
+    if total_freq <= 2 and variant_count >= 3:
+        return 'medium_confidence', 'delete'
+    return confidence, 'update'
+
+
+def normalization_groups(details, frequencies):
+    """
+    Records with the `canonical_name` / `entities_updated` fields of
+    entity_normalization_log.json, one per variation group.
+
+    `entities_updated` lists every member except the canonical name, so
+    applying the mapping also rewrites the group's base name.
+    """
+    records = []
+    for category in CATEGORIES:
+        for base, variants in details.get(category, {}).items():
+            names = [base] + list(variants)
+            freqs = {name: frequencies.get(name, 0) for name in names}
+            total = sum(freqs.values())
+            dominance = max(freqs.values()) / total if total else 0
+            canonical = select_canonical_name(names, category, freqs)
+            confidence, action = _confidence(total, dominance, len(variants),
+                                             len({n.lower() for n in names}) < len(names))
+            records.append({
+                'timestamp': datetime.now().isoformat(),
+                'type': action,
+                'category': category,
+                'canonical_name': canonical,
+                'entities_updated': [name for name in names if name != canonical],
+                'confidence': confidence,
+                'frequency_info': {'total_frequency': total, 'frequency_dominance': dominance,
+                                   'variant_count': len(variants)},
+            })
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blocked fuzzy entity matching over a quadruple CSV")
+    parser.add_argument("input", help="CSV with subject, subject_type, object, object_type columns")
+    parser.add_argument("--report", help="write the consistency report (JSON)")
+    parser.add_argument("--groups", help="write canonical_name / entities_updated groups (JSON)")
+    parser.add_argument("--confidence", nargs="*", default=None, help="keep only these confidence levels")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.input)
+    report = consistency_report(df)
+    print(json.dumps({'summary': report['summary'], 'matching_stats': report['matching_stats']}, indent=2))
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.groups:
+        groups = normalization_groups(report['details'], entity_frequencies(df))
+        if args.confidence:
+            groups = [g for g in groups if g['confidence'] in args.confidence]
+        with open(args.groups, 'w', encoding='utf-8') as f:
+            json.dump(groups, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Time-aware filtered ranking evaluation (MRR / Hits@k) for TKGC link prediction.
+
+Filtered ranking removes every other true object of a query before ranking
+the target among all entities: the time-aware setting filters the objects
+of (s, r, t), the static setting those of (s, r) at any time. The filter
+sets are precomputed once from all splits as sorted keys with CSR offsets,
+and `RankingEvaluator` consumes score matrices in row chunks: raw ranks
+are one vectorized comparison per chunk, and the filtered corrections only
+touch the (query, true object) entries, so the full queries x entities
+matrix never exists.
+
+    python -m kgprep.evaluation ../IndovestDKG scores.npy --split test
+"""
+import argparse
+import json
+import numpy as np
+from kgprep.dataset import SPLITS, load_dataset, load_text
+
+HITS = (1, 3, 10)
+SETTINGS = ('raw', 'static', 'time')
+
+
+def _pack(s, r, t, num_entities, num_relations):
+    # One int64 key per (s, r, t) / (s, r) query; t = 0 for the static key
+    return (np.asarray(t, dtype=np.int64) * num_relations + r) * num_entities + s
+
+
+def count_where(compare, scores, target_scores, block_rows=32):
+    """
+    Per-row count of `compare(scores, target)` (e.g. `np.greater`) without a
+    full boolean matrix: rows are compared in cache-sized blocks and counted
+    with the 1-d `np.count_nonzero`, which is much faster than `sum(axis=1)`.
+    """
+    counts = np.empty(len(scores), dtype=np.int64)
+    buffer = np.empty((min(block_rows, len(scores)), scores.shape[1]), dtype=bool)
+    for start in range(0, len(scores), block_rows):
+        block = scores[start:start + block_rows]
+        mask = compare(block, target_scores[start:start + block_rows, None], out=buffer[:len(block)])
+        for i in range(len(block)):
+            counts[start + i] = np.count_nonzero(mask[i])
+    return counts
+
+
+class FilterSets:
+    """
+    True objects per query key as a CSR structure: sorted unique `keys`,
+    `offsets` into `objects`. `rows(keys)` returns the CSR row of each query.
+    """
+
+    def __init__(self, keys, objects):
+        order = np.lexsort((objects, keys))
+        keys, objects = keys[order], objects[order]
+        # Duplicate (key, object) rows count once
+        distinct = np.r_[True, (keys[1:] != keys[:-1]) | (objects[1:] != objects[:-1])]
+        keys, self.objects = keys[distinct], objects[distinct]
+        self.keys, starts = np.unique(keys, return_index=True)
+        self.offsets = np.r_[starts, len(keys)].astype(np.int64)
+
+    def rows(self, keys):
+        if not len(self.keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        return np.where(self.keys[rows] == keys, rows, -1)
+
+    def entries(self, rows):
+        """`(query, object)` index pairs of the filter sets of `rows` (queries with row -1 have none)."""
+        valid = rows >= 0
+        starts = np.where(valid, self.offsets[np.maximum(rows, 0)], 0)
+        counts = np.where(valid, self.offsets[np.maximum(rows, 0) + 1] - starts, 0)
+        query = np.repeat(np.arange(len(rows)), counts)
+        position = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return query, self.objects[np.repeat(starts, counts) + position]
+
+
+class TimeAwareFilter:
+    """Time-aware (s, r, t) and static (s, r) filter sets built from all known quadruples."""
+
+    def __init__(self, quads, num_entities, num_relations, inverse=True):
+        quads = np.asarray(quads, dtype=np.int64)
+        s, r, o, t = quads[:, 0], quads[:, 1], quads[:, 2], quads[:, 3]
+        if inverse:
+            s, r, o, t = (np.concatenate([s, o]), np.concatenate([r, r + num_relations]),
+                          np.concatenate([o, s]), np.concatenate([t, t]))
+        self.num_entities = num_entities
+        self.num_relations = 2 * num_relations if inverse else num_relations
+        self.base_relations = num_relations
+        self.time = FilterSets(_pack(s, r, t, num_entities, self.num_relations), o)
+        self.static = FilterSets(_pack(s, r, 0, num_entities, self.num_relations), o)
+
+    @classmethod
+    def from_dataset(cls, dataset, splits=SPLITS, inverse=True):
+        quads = np.concatenate([np.asarray(dataset[split]) for split in splits if split in dataset.splits])
+        return cls(quads, dataset.num_entities, dataset.num_relations, inverse)
+
+    def queries(self, quads, inverse=True):
+        """Evaluation queries (s, r, o, t) of a split, with the inverse (o, r + R, s, t) appended."""
+        quads = np.asarray(quads, dtype=np.int64)
+        if not inverse:
+            return quads
+        inverted = np.stack([quads[:, 2], quads[:, 1] + self.base_relations, quads[:, 0], quads[:, 3]], axis=1)
+        return np.concatenate([quads, inverted])
+
+    def rows(self, queries):
+        s, r, t = queries[:, 0], queries[:, 1], queries[:, 3]
+        return (self.static.rows(_pack(s, r, 0, self.num_entities, self.num_relations)),
+                self.time.rows(_pack(s, r, t, self.num_entities, self.num_relations)))
+
+
+class RankingEvaluator:
+    """
+    Streaming raw / static-filtered / time-aware-filtered ranks for `queries`.
+
+    Call `update(scores, start)` with score rows for `queries[start:start + len(scores)]`
+    (shape `(b, num_entities)`, higher is better), in any order and chunk size,
+    then `metrics()`. `ties` is "optimistic" (rank = 1 + #strictly higher, as
+    in the RE-NET / xERTE evaluation code), "pessimistic", or "average".
+    """
+
+    def __init__(self, filters, queries, ties='optimistic'):
+        if ties not in ('optimistic', 'pessimistic', 'average'):
+            raise ValueError("ties must be 'optimistic', 'pessimistic' or 'average'")
+        self.filters = filters
+        self.queries = np.asarray(queries, dtype=np.int64)
+        self.ties = ties
+        self.static_rows, self.time_rows = filters.rows(self.queries)
+        self.ranks = {setting: np.zeros(len(self.queries), dtype=np.float64) for setting in SETTINGS}
+        self.done = np.zeros(len(self.queries), dtype=bool)
+
+    def _rank(self, higher, equal):
+        if self.ties == 'optimistic':
+            return higher + 1.0
+        if self.ties == 'pessimistic':
+            return higher + equal + 1.0
+        return higher + equal / 2.0 + 1.0
+
+    def _filtered_counts(self, filter_sets, rows, scores, targets, target_scores):
+        # Other true objects scoring above (or tied with) the target are removed from its rank
+        query, objects = filter_sets.entries(rows)
+        keep = objects != targets[query]
+        query, objects = query[keep], objects[keep]
+        values = scores[query, objects]
+        higher = np.bincount(query[values > target_scores[query]], minlength=len(rows))
+        equal = np.bincount(query[values == target_scores[query]], minlength=len(rows))
+        return higher, equal
+
+    def update(self, scores, start=0):
+        scores = np.asarray(scores)
+        end = start + len(scores)
+        queries = self.queries[start:end]
+        targets = queries[:, 2]
+        target_scores = scores[np.arange(len(scores)), targets]
+        higher = count_where(np.greater, scores, target_scores)
+        # Ties only matter for the pessimistic / average ranks; skip the second pass otherwise
+        equal = count_where(np.equal, scores, target_scores) - 1 if self.ties != 'optimistic' else 0
+        self.ranks['raw'][start:end] = self._rank(higher, equal)
+        for setting, filter_sets, rows in (('static', self.filters.static, self.static_rows[start:end]),
+                                           ('time', self.filters.time, self.time_rows[start:end])):
+            removed_higher, removed_equal = self._filtered_counts(filter_sets, rows, scores, targets, target_scores)
+            self.ranks[setting][start:end] = self._rank(higher - removed_higher, equal - removed_equal)
+        self.done[start:end] = True
+
+    def evaluate(self, score_fn, batch_size=512):
+        """Drive `update` with `score_fn(queries_batch) -> (b, num_entities)` scores; returns `metrics()`."""
+        for start in range(0, len(self.queries), batch_size):
+            self.update(score_fn(self.queries[start:start + batch_size]), start)
+        return self.metrics()
+
+    def metrics(self, hits=HITS):
+        if not self.done.all():
+            raise ValueError(f'{int((~self.done).sum())} queries have no scores yet')
+        results = {}
+        for setting, ranks in self.ranks.items():
+            results[setting] = {'mrr': float(np.mean(1.0 / ranks)) if len(ranks) else 0.0}
+            for k in hits:
+                results[setting][f'hits@{k}'] = float(np.mean(ranks <= k)) if len(ranks) else 0.0
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time-aware filtered MRR / Hits@k of a saved score matrix')
+    parser.add_argument('data', help='data/IndovestDKG (text layout) or a kgprep.dataset binary directory')
+    parser.add_argument('scores', help='.npy of shape (queries, entities); read with mmap in row chunks')
+    parser.add_argument('--split', default='test')
+    parser.add_argument('--no-inverse', action='store_true', help='scores cover only (s, r, ?, t) queries')
+    parser.add_argument('--ties', default='optimistic', choices=['optimistic', 'pessimistic', 'average'])
+    parser.add_argument('--batch-size', type=int, default=512)
+    args = parser.parse_args()
+
+    try:
+        dataset = load_dataset(args.data)
+    except FileNotFoundError:
+        dataset = load_text(args.data)
+    filters = TimeAwareFilter.from_dataset(dataset)
+    queries = filters.queries(dataset[args.split], inverse=not args.no_inverse)
+    scores = np.load(args.scores, mmap_mode='r')
+    if scores.shape != (len(queries), dataset.num_entities):
+        raise ValueError(f'scores have shape {scores.shape}, expected {(len(queries), dataset.num_entities)}')
+    evaluator = RankingEvaluator(filters, queries, args.ties)
+    for start in range(0, len(queries), args.batch_size):
+        evaluator.update(scores[start:start + args.batch_size], start)
+    print(json.dumps(evaluator.metrics(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
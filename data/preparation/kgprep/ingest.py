@@ -0,0 +1,304 @@
+"""
+Streaming ingestion of the LLM extraction JSONL into a partitioned Parquet dataset.
+
+`dynamic-graph-construction.py` appends one JSON object per quadruple to
+its JSONL output, mixed with `{"error": "parsing error", ...}` records, and
+the cleaning notebooks read a hand-assembled `IndovestDKG_FULL.csv` in full
+with `pd.read_csv` in every analyzer. `ingest_jsonl` instead:
+
+- reads the JSONL line by line (orjson when installed) from the byte offset
+  the previous run stopped at, so re-running it only ingests new lines;
+- validates `subject_type`, `relation` and `object_type` against the enums
+  of `InvestmentNewsEntity` (`construction/LLM/extraction/schema.py`) with
+  precompiled Arrow lookup tables, one `index_in` per column and batch;
+- routes error records, invalid enum values, missing fields and
+  unparseable dates to a side file (`_errors.jsonl`) with the line number
+  and reason;
+- appends the valid rows to a Parquet dataset partitioned by year
+  (`year=YYYY`), with the enum columns dictionary-encoded and a `week`
+  column (the Monday of the article's week, as in `kgprep.encoding`).
+
+Weekly partitions would hold ~110 rows each, and opening ~400 tiny files
+costs more than reading the data, so the partitions are yearly. `read_quads`
+loads the dataset back with column projection and a `date` filter that
+skips whole years before any file is opened.
+
+    python -m kgprep.ingest ingest 10rev-IndovestDKompasNews.jsonl notebooks/raw/IndovestDKG_parquet
+    python -m kgprep.ingest read notebooks/raw/IndovestDKG_parquet --since 2025-01-01 --csv raw/IndovestDKG_FULL.csv
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from operator import itemgetter
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from kgprep.analytics import parse_dates
+
+try:
+    import orjson
+    loads, dumps = orjson.loads, orjson.dumps
+except ImportError:
+    loads = json.loads
+
+    def dumps(obj):
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'construction', 'LLM')
+FIELDS = ('subject', 'subject_type', 'relation', 'object', 'object_type', 'date')
+ENUM_FIELDS = ('subject_type', 'relation', 'object_type')
+ENUM_TYPE = pa.dictionary(pa.int8(), pa.string())
+SCHEMA = pa.schema([
+    ('subject', pa.string()), ('subject_type', ENUM_TYPE), ('relation', ENUM_TYPE), ('object', pa.string()),
+    ('object_type', ENUM_TYPE), ('date', pa.timestamp('us')), ('week', pa.date32()), ('year', pa.int16()),
+])
+PARTITIONING = ds.partitioning(pa.schema([('year', pa.int16())]), flavor='hive')
+STATE_FILE = '_ingest_state.json'
+ERRORS_FILE = '_errors.jsonl'
+
+
+def schema_enums():
+    """Allowed values per enum column, from `construction/LLM/extraction/schema.py`."""
+    if SCHEMA_DIR not in sys.path:
+        sys.path.insert(0, SCHEMA_DIR)
+    from extraction.schema import ENTITY_TYPES, RELATIONS
+    return {'subject_type': ENTITY_TYPES, 'relation': RELATIONS, 'object_type': ENTITY_TYPES}
+
+
+class EnumTable:
+    """
+    Precompiled lookup of one enum: case-insensitive, whitespace-trimmed
+    values map to dictionary indices, anything else to null.
+    """
+
+    def __init__(self, values):
+        self.dictionary = pa.array(list(values), pa.string())
+        self.options = pc.SetLookupOptions(value_set=pc.utf8_lower(self.dictionary))
+
+    def encode(self, values):
+        indices = pc.index_in(pc.utf8_lower(pc.utf8_trim_whitespace(values)), options=self.options)
+        return pa.DictionaryArray.from_arrays(indices.cast(pa.int8()), self.dictionary)
+
+
+def week_of(dates):
+    """Monday of the week of each timestamp, as date32."""
+    return pc.floor_temporal(dates, unit='week', week_starts_monday=True).cast(pa.date32())
+
+
+def _strings(values):
+    """A string array of `values` with null for anything that is not a string."""
+    try:
+        return pa.array(values, pa.string())
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([value if type(value) is str else None for value in values], pa.string())
+
+
+def _nulls(array):
+    return array.is_null().to_numpy(zero_copy_only=False)
+
+
+def _reject(errors, reasons, line, reason, record):
+    errors.write(dumps({'line': line, 'reason': reason, 'record': record}) + b'\n')
+    reasons[reason] += 1
+
+
+def _convert(rows, lines, tables, errors, reasons):
+    """One RecordBatch of the valid rows (tuples in FIELDS order); the others go to `errors`."""
+    raw = dict(zip(FIELDS, zip(*rows)))
+    columns = {field: _strings(raw[field]) for field in FIELDS}
+    bad = np.zeros(len(rows), dtype=bool)
+    why = np.empty(len(rows), dtype=object)
+    checks = [(f'missing {field}', _nulls(columns[field])) for field in FIELDS]
+    for field in ENUM_FIELDS:
+        columns[field] = tables[field].encode(columns[field])
+        checks.append((f'invalid {field}', _nulls(columns[field].indices)))
+    dates, _ = parse_dates(columns.pop('date').to_pandas())
+    checks.append(('unparseable date', dates.isna().to_numpy()))
+    for reason, invalid in checks:
+        invalid = invalid & ~bad
+        why[invalid] = reason
+        bad |= invalid
+    for i in np.flatnonzero(bad).tolist():
+        _reject(errors, reasons, lines[i], why[i], dict(zip(FIELDS, rows[i])))
+    columns['date'] = pa.array(dates.to_numpy(dtype='datetime64[us]'), pa.timestamp('us'))
+    columns['week'] = week_of(columns['date'])
+    columns['year'] = pc.year(columns['date']).cast(pa.int16())
+    batch = pa.RecordBatch.from_arrays([columns[field.name] for field in SCHEMA], schema=SCHEMA)
+    return batch.filter(pa.array(~bad)) if bad.any() else batch
+
+
+def _batches(src, batch_size, tables, errors, progress):
+    """RecordBatches of the complete lines of `src`; `progress` tracks the offset, lines, rows and reasons."""
+    fields = itemgetter(*FIELDS)
+    offset, number, reasons = progress['offset'], progress['lines'], progress['reasons']
+    rows, lines = [], []
+    for line in src:
+        if line[-1:] != b'\n':
+            break  # A line still being written: picked up by the next run
+        number += 1
+        offset += len(line)
+        try:
+            record = loads(line)
+            rows.append(fields(record))
+            lines.append(number)
+        except ValueError:
+            if line.strip():
+                _reject(errors, reasons, number, 'invalid json', line.decode('utf-8', 'replace').rstrip('\n'))
+            continue
+        except (KeyError, TypeError):
+            # Extraction error records, and quadruples without one of the fields
+            if isinstance(record, dict):
+                reason = str(record['error']) if 'error' in record else 'missing ' + next(
+                    field for field in FIELDS if field not in record)
+            else:
+                reason = 'not an object'
+            _reject(errors, reasons, number, reason, record)
+            continue
+        if len(rows) >= batch_size:
+            batch = _convert(rows, lines, tables, errors, reasons)
+            progress.update(offset=offset, lines=number, rows=progress['rows'] + batch.num_rows)
+            yield batch
+            rows, lines = [], []
+    if rows:
+        batch = _convert(rows, lines, tables, errors, reasons)
+        progress['rows'] += batch.num_rows
+        yield batch
+    progress.update(offset=offset, lines=number)
+
+
+def _read_state(output):
+    path = os.path.join(output, STATE_FILE)
+    if not os.path.exists(path):
+        return {'sources': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_state(output, state):
+    tmp_path = os.path.join(output, STATE_FILE + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, os.path.join(output, STATE_FILE))
+
+
+def _forget_source(output, state, key):
+    """Delete the Parquet files ingested from `key` and reset its offset, so it is read again from the start."""
+    for name in state['sources'].get(key, {}).get('files', []):
+        path = os.path.join(output, name)
+        if os.path.exists(path):
+            os.remove(path)
+    state['sources'][key] = {'offset': 0, 'lines': 0, 'files': []}
+    # Saved before anything is re-ingested: a crash from here on starts the source over instead of resuming
+    _write_state(output, state)
+
+
+def ingest_jsonl(source, output, errors_path=None, batch_size=65536, enums=None, restart=False):
+    """
+    Append the new complete lines of `source` (extraction JSONL) to the
+    Parquet dataset in `output`; returns a summary with the rows written
+    and the rejected records per reason. With `restart` (and when the
+    source is shorter than the stored offset) the Parquet files ingested
+    from `source` are deleted and it is read from the beginning; the rows of
+    other sources are kept, and its rejected records are appended to the
+    errors file again.
+    """
+    os.makedirs(output, exist_ok=True)
+    tables = {field: EnumTable(values) for field, values in (enums or schema_enums()).items()}
+    state = _read_state(output)
+    key = os.path.abspath(source)
+    previous = state['sources'].get(key, {})
+    if restart or previous.get('offset', 0) > os.path.getsize(source):
+        # Restarted, or the source was truncated or replaced: its rows are written again from scratch
+        _forget_source(output, state, key)
+        previous = state['sources'][key]
+    written = []
+    progress = {'offset': previous.get('offset', 0), 'lines': previous.get('lines', 0), 'rows': 0,
+                'reasons': Counter()}
+    # Unique per run: a name reused within the same second would overwrite the earlier run's files
+    run = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:12]}"
+    with open(source, 'rb') as src, open(errors_path or os.path.join(output, ERRORS_FILE), 'ab') as errors:
+        src.seek(progress['offset'])
+        batches = _batches(src, batch_size, tables, errors, progress)
+        ds.write_dataset(pa.RecordBatchReader.from_batches(SCHEMA, batches), output, format='parquet',
+                         partitioning=PARTITIONING, basename_template=f'part-{run}-{{i}}.parquet',
+                         existing_data_behavior='overwrite_or_ignore', max_partitions=100_000,
+                         file_visitor=lambda file: written.append(os.path.relpath(file.path, output)),
+                         file_options=ds.ParquetFileFormat().make_write_options(compression='zstd'))
+    # The files of each source are recorded so that a restart can delete exactly its rows
+    state['sources'][key] = {'offset': progress['offset'], 'lines': progress['lines'],
+                             'files': previous.get('files', []) + written}
+    # The state is written last: a crash before it re-ingests this run's lines instead of skipping them
+    _write_state(output, state)
+    return {'source': source, 'lines': progress['lines'] - previous.get('lines', 0), 'rows': progress['rows'],
+            'rejected': dict(progress['reasons'])}
+
+
+def quads_dataset(directory):
+    """The Parquet dataset as a `pyarrow.dataset.Dataset` (files starting with '_' are not part of it)."""
+    return ds.dataset(directory, format='parquet', partitioning=PARTITIONING)
+
+
+def date_filter(start=None, end=None):
+    """Filter expression for `start <= date < end`, including the year-partition bounds that prune files."""
+    expression = None
+    for bound, op in ((start, 'ge'), (end, 'lt')):
+        if bound is None:
+            continue
+        bound = pa.scalar(pd.Timestamp(bound).to_datetime64().astype('datetime64[us]'), pa.timestamp('us'))
+        year = pc.year(bound).cast(pa.int16())
+        if op == 'ge':
+            part = (ds.field('year') >= year) & (ds.field('date') >= bound)
+        else:
+            part = (ds.field('year') <= year) & (ds.field('date') < bound)
+        expression = part if expression is None else expression & part
+    return expression
+
+
+def read_quads(directory, columns=None, start=None, end=None):
+    """
+    Ingested quadruples as a DataFrame (enum columns as categoricals),
+    reading only `columns` and only the years that overlap `[start, end)`.
+    """
+    table = quads_dataset(directory).to_table(columns=columns, filter=date_filter(start, end))
+    return table.to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ingest extraction JSONL into a partitioned Parquet dataset')
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest_parser = commands.add_parser('ingest', help='append the new lines of extraction JSONL files')
+    ingest_parser.add_argument('sources', nargs='+', help='JSONL written by dynamic-graph-construction.py')
+    ingest_parser.add_argument('output', help='Parquet dataset directory')
+    ingest_parser.add_argument('--errors', help=f'side file for rejected records (default: OUTPUT/{ERRORS_FILE})')
+    ingest_parser.add_argument('--batch-size', type=int, default=65536)
+    ingest_parser.add_argument('--restart', action='store_true',
+                               help='delete the rows ingested from the sources and read them from the beginning')
+    read_parser = commands.add_parser('read', help='summarize (or export) a date range of the dataset')
+    read_parser.add_argument('directory')
+    read_parser.add_argument('--columns', nargs='+')
+    read_parser.add_argument('--since', help='first date (inclusive)')
+    read_parser.add_argument('--until', help='last date (exclusive)')
+    read_parser.add_argument('--csv', help='write the rows as CSV (the IndovestDKG_FULL.csv layout)')
+    args = parser.parse_args()
+
+    if args.command == 'ingest':
+        for source in args.sources:
+            summary = ingest_jsonl(source, args.output, args.errors, args.batch_size, restart=args.restart)
+            print(json.dumps(summary, indent=2))
+        return
+    df = read_quads(args.directory, args.columns, args.since, args.until)
+    if args.csv:
+        df.drop(columns=['week', 'year'], errors='ignore').to_csv(args.csv, index=False)
+    print(f'{len(df)} rows')
+    if 'date' in df:
+        print(f"dates {df['date'].min()} .. {df['date'].max()}")
+
+
+if __name__ == '__main__':
+    main()
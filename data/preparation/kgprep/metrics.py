@@ -0,0 +1,252 @@
+"""
+Lightweight pipeline instrumentation: counters, gauges, histograms and stage timers.
+
+The scrapers only log one `Execution Time` and the extraction script only
+shows a tqdm bar, so a slow nightly run can't be attributed to HTTP,
+parsing, CSV merging, LLM latency or retries. A `Metrics` registry is
+passed to `CrawlEngine` / `NewsExtractor`, `clean_articles_csv` and
+`ExtractionScheduler` (each takes `metrics=None` and records nothing
+without one) and written at the end of a run:
+
+- `path.prom`: Prometheus text exposition format (for node_exporter's
+  textfile collector), histograms with cumulative `le` buckets;
+- anything else: JSON with one flat `name{labels}` key per series and
+  p50 / p95 / p99 estimated from the buckets, so two runs diff key by key.
+
+`profile()` and `trace_memory()` are opt-in cProfile / tracemalloc hooks.
+
+    python -m kgprep.metrics result/kompas_metrics.json
+    python -m kgprep.metrics bench_pipeline.json --compare bench_pipeline.previous.json
+"""
+import argparse
+import bisect
+import cProfile
+import json
+import math
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+NAMESPACE = 'indovestdkg'
+# Geometric buckets (x1.5) from 0.5 ms to ~10 min cover parse times and LLM tails alike
+DEFAULT_BUCKETS = tuple(round(0.0005 * 1.5 ** i, 6) for i in range(35))
+
+
+def series_key(name, labels):
+    """`name{a="x",b="y"}` (labels sorted), the key of a series in the JSON and Prometheus output."""
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+class Histogram:
+    """Bucket counts plus count / sum / min / max of the observed values."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Linear interpolation inside the bucket (as Prometheus' histogram_quantile), clamped to min / max."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / count
+                return min(self.max, max(self.min, estimate))
+            seen += count
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {'count': 0, 'sum': 0.0}
+        return {'count': self.count, 'sum': self.sum, 'mean': self.sum / self.count, 'min': self.min,
+                'p50': self.quantile(0.5), 'p95': self.quantile(0.95), 'p99': self.quantile(0.99), 'max': self.max}
+
+
+class Metrics:
+    """
+    Thread-safe registry of counters, gauges and histograms keyed by name and
+    labels. Names are written with the `namespace` prefix; a histogram keeps
+    the buckets it was first observed with.
+    """
+
+    def __init__(self, namespace=NAMESPACE, buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = buckets
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def observe(self, name, value, buckets=None, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets or self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the wall time of the block (seconds) into histogram `name`, also when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def stage(self, stage):
+        """Timer of one pipeline stage: histogram `stage_seconds{stage=...}`."""
+        return self.timer('stage_seconds', stage=stage)
+
+    @contextmanager
+    def profile(self, path):
+        """cProfile the block and dump the stats to `path` (read with `pstats` or snakeviz)."""
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+
+    @contextmanager
+    def trace_memory(self, stage, top=0):
+        """
+        tracemalloc over the block: gauges `memory_peak_bytes` / `memory_net_bytes`
+        for `stage`, and with `top` the largest allocation sites as
+        `memory_top_bytes{stage,site}`. Tracing slows Python code down several times.
+        """
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.set('memory_peak_bytes', peak - before, stage=stage)
+            self.set('memory_net_bytes', current - before, stage=stage)
+            if top:
+                for stat in tracemalloc.take_snapshot().statistics('lineno')[:top]:
+                    frame = stat.traceback[0]
+                    self.set('memory_top_bytes', stat.size, stage=stage, site=f'{frame.filename}:{frame.lineno}')
+            if started:
+                tracemalloc.stop()
+
+    def snapshot(self):
+        """JSON-ready dict of counters, gauges and histogram summaries by series key."""
+        with self.lock:
+            counters = {series_key(name, labels): value for (name, labels), value in sorted(self.counters.items())}
+            gauges = {series_key(name, labels): value for (name, labels), value in sorted(self.gauges.items())}
+            histograms = {}
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                histograms[series_key(name, labels)] = histogram.summary()
+        return {'namespace': self.namespace, 'started_at': self.started_at, 'written_at': time.time(),
+                'counters': counters, 'gauges': gauges, 'histograms': histograms}
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self.lock:
+            for kind, series in (('counter', self.counters), ('gauge', self.gauges)):
+                for name in sorted({name for name, _ in series}):
+                    full = f'{self.namespace}_{name}'
+                    lines.append(f'# TYPE {full} {kind}')
+                    lines += [f'{series_key(full, labels)} {value}' for (n, labels), value in sorted(series.items())
+                              if n == name]
+            for name in sorted({name for name, _ in self.histograms}):
+                full = f'{self.namespace}_{name}'
+                lines.append(f'# TYPE {full} histogram')
+                for (n, labels), histogram in sorted(self.histograms.items()):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(list(histogram.bounds) + ['+Inf'], histogram.counts):
+                        cumulative += count
+                        lines.append(f"{series_key(full + '_bucket', labels + (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{series_key(full + '_sum', labels)} {histogram.sum}")
+                    lines.append(f"{series_key(full + '_count', labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write Prometheus text (`.prom`) or JSON (any other extension), replacing `path` atomically."""
+        text = self.to_prometheus() if path.endswith('.prom') else json.dumps(self.snapshot(), indent=2)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        # Collectors may read at any moment: the old file stays in place until the new one is complete
+        os.replace(tmp_path, path)
+        return path
+
+
+def load_snapshot(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def summary_rows(snapshot):
+    """`(series, count, total, p50, p95, p99)` of every histogram in a JSON snapshot, largest total first."""
+    rows = [(key, h['count'], h['sum'], h.get('p50', 0.0), h.get('p95', 0.0), h.get('p99', 0.0))
+            for key, h in snapshot['histograms'].items()]
+    return sorted(rows, key=lambda row: -row[2])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize (or compare) JSON metrics snapshots of pipeline runs')
+    parser.add_argument('snapshot', help='JSON file written by Metrics.write')
+    parser.add_argument('--compare', help='earlier snapshot (e.g. of the previous commit) to show p50 / total ratios')
+    args = parser.parse_args()
+
+    snapshot = load_snapshot(args.snapshot)
+    baseline = load_snapshot(args.compare)['histograms'] if args.compare else {}
+    print(f"{'series':<56} {'count':>7} {'total s':>9} {'p50':>9} {'p95':>9} {'p99':>9}"
+          + (f" {'p50 vs base':>11} {'total vs base':>13}" if baseline else ''))
+    for key, count, total, p50, p95, p99 in summary_rows(snapshot):
+        line = f'{key:<56} {count:>7} {total:>9.3f} {p50:>9.4f} {p95:>9.4f} {p99:>9.4f}'
+        if key in baseline and baseline[key]['count']:
+            base = baseline[key]
+            line += f" {p50 / base['p50'] if base['p50'] else math.nan:>10.2f}x {total / base['sum']:>12.2f}x"
+        print(line)
+    for key, value in snapshot['counters'].items():
+        print(f'{key:<56} {value:>7}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,360 @@
+"""
+Read-only temporal query index over the constructed IndovestDKG graph.
+
+Analyst questions ("what did `bank indonesia` Mengendalikan in the newest 8
+weeks", "timeline of `ihsg`") used to mean loading the full CSV into pandas
+and boolean-filtering every row per query. `QueryIndex` builds, once, from
+the encoded splits and `entity2id.txt` / `relation2id.txt`:
+
+- per-entity posting lists: all quadruples sorted by (subject, t) and by
+  (object, t), each with an int64 key `entity * num_timestamps + t`, so an
+  entity's facts inside a time window are one `searchsorted` on the keys
+  and one contiguous slice;
+- the folded entity names (`alias_map.fold_name`) in sorted order with
+  their ids, so exact and prefix lookups are binary searches;
+- k-hop neighbourhoods within a time window, expanded a whole frontier at
+  a time over the same posting lists.
+
+Everything is saved as flat `.npy` / string-table files that `load`
+memory-maps. Time windows are `[start, end)` in `temporal_id` units. The
+direction of `temporal_id` is stored with the index: `backward` when it
+counts weeks back from the newest date (prep.ipynb, data/IndovestDKG:
+t=0 is the newest week), `forward` when it counts weeks since an epoch
+(kgprep.encoding). `newest(n)` / `--last` and the oldest-first order of
+`facts` follow it.
+
+    python -m kgprep.query ../IndovestDKG ../IndovestDKG/query_index timeline ihsg
+    python -m kgprep.query ../IndovestDKG ../IndovestDKG/query_index timeline 2024 --name
+    python -m kgprep.query ../IndovestDKG ../IndovestDKG/query_index facts "bank indonesia" \\
+        --relation Mengendalikan --last 8
+"""
+import argparse
+import bisect
+import json
+import os
+import numpy as np
+import pandas as pd
+from kgprep.alias_map import fold_name
+from kgprep.dataset import SPLITS, StringTable, load_dataset, load_text
+from kgprep.snapshots import source_fingerprint
+
+QUERY_VERSION = 1
+ARRAYS = ('subject_quads', 'subject_keys', 'object_quads', 'object_keys', 'name_ids')
+TABLES = ('entities', 'relations', 'names')
+ROLES = ('subject', 'object', 'both')
+LAST_NAME = chr(0x10FFFF)  # sorts after every name with a given prefix
+TIME_ORDERS = ('backward', 'forward')
+DEFAULT_TIME_ORDER = 'backward'  # prep.ipynb / data/IndovestDKG: temporal_id 0 is the newest week
+
+
+def _ranges(lo, hi):
+    """Concatenated `arange(lo[i], hi[i])` for all i."""
+    counts = hi - lo
+    total = int(counts.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.repeat(lo - np.r_[0, np.cumsum(counts)[:-1]], counts)
+    return starts + np.arange(total)
+
+
+class QueryIndex:
+    """Posting lists and sorted entity names of a quadruple dataset; see the module docstring."""
+
+    def __init__(self, arrays, tables, meta):
+        self.meta = meta
+        for name in ARRAYS:
+            # Plain ndarray views of the memmaps: same shared pages, much cheaper slicing
+            setattr(self, name, np.asarray(arrays[name]))
+        self.entities = tables['entities']
+        self.relations = tables['relations']
+        self.names = tables['names']
+        self.num_entities = meta['num_entities']
+        self.num_relations = meta['num_relations']
+        self.num_timestamps = meta['num_timestamps']
+        self.time_order = meta.get('time_order', DEFAULT_TIME_ORDER)
+        self._relation_ids = {fold_name(name): i for i, name in enumerate(self.relations.names())}
+
+    @classmethod
+    def build(cls, quads, entities, relations, num_timestamps=None, meta=None, time_order=DEFAULT_TIME_ORDER):
+        """
+        Build from an (n, 4) `s, r, o, t` array and the entity / relation
+        StringTables; `time_order` says whether `t` grows towards the past
+        (`backward`) or the future (`forward`).
+        """
+        if time_order not in TIME_ORDERS:
+            raise ValueError(f'time_order must be one of {TIME_ORDERS}')
+        quads = np.asarray(quads, dtype=np.int64)
+        s, r, o, t = quads[:, 0], quads[:, 1], quads[:, 2], quads[:, 3]
+        if num_timestamps is None:
+            num_timestamps = int(t.max()) + 1 if len(t) else 1
+        arrays = {}
+        for role, entity, other in (('subject', s, o), ('object', o, s)):
+            order = np.lexsort((other, r, t, entity))
+            arrays[f'{role}_quads'] = quads[order].astype(np.int32)
+            arrays[f'{role}_keys'] = entity[order] * num_timestamps + t[order]
+
+        folded = [fold_name(name) for name in entities.names()]
+        name_ids = np.array(sorted(range(len(folded)), key=folded.__getitem__), dtype=np.int32)
+        arrays['name_ids'] = name_ids
+        tables = {'entities': entities, 'relations': relations,
+                  'names': StringTable.from_names([folded[i] for i in name_ids.tolist()])}
+        meta = dict(meta or {}, version=QUERY_VERSION, num_entities=len(entities), num_relations=len(relations),
+                    num_timestamps=int(num_timestamps), quads=int(len(quads)), time_order=time_order)
+        return cls(arrays, tables, meta)
+
+    @classmethod
+    def from_dataset(cls, dataset, splits=SPLITS, time_order=DEFAULT_TIME_ORDER):
+        splits = [split for split in splits if split in dataset.splits]
+        quads = np.concatenate([np.asarray(dataset[split]) for split in splits])
+        return cls.build(quads, dataset.entities, dataset.relations, dataset.num_timestamps, {'splits': splits},
+                         time_order)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+        for name in TABLES:
+            getattr(self, name).write(os.path.join(directory, name))
+        # meta.json is written last: its presence marks a complete index
+        tmp_path = os.path.join(directory, 'meta.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(tmp_path, os.path.join(directory, 'meta.json'))
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Open a saved index; with `mmap` nothing is read until a query touches it."""
+        with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != QUERY_VERSION:
+            raise ValueError(f"{directory}: unsupported query index version {meta.get('version')}")
+        mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mode) for name in ARRAYS}
+        tables = {name: StringTable.load(os.path.join(directory, name), mmap) for name in TABLES}
+        return cls(arrays, tables, meta)
+
+    def search(self, prefix, limit=20):
+        """`(name, id)` of up to `limit` entities whose folded name starts with `prefix`, in name order."""
+        prefix = fold_name(prefix)
+        lo = bisect.bisect_left(self.names, prefix)
+        hi = bisect.bisect_left(self.names, prefix + LAST_NAME, lo)
+        positions = range(lo, hi if limit is None else min(hi, lo + limit))
+        return [(self.entities[int(self.name_ids[i])], int(self.name_ids[i])) for i in positions]
+
+    def entity_ids(self, name):
+        """Ids of every entity whose folded name equals the folded `name` (usually one)."""
+        key = fold_name(name)
+        lo = bisect.bisect_left(self.names, key)
+        hi = bisect.bisect_right(self.names, key, lo)
+        return self.name_ids[lo:hi]
+
+    def entity_id(self, entity):
+        """Id of `entity` (an id or a name; an exact spelling wins over other case variants)."""
+        if isinstance(entity, (int, np.integer)):
+            return int(entity)
+        ids = self.entity_ids(entity)
+        if not len(ids):
+            raise KeyError(entity)
+        for i in ids.tolist():
+            if self.entities[i] == entity:
+                return i
+        return int(ids[0])
+
+    def relation_ids(self, relations):
+        """Relation ids for names and / or ids (None stays None: no relation filter)."""
+        if relations is None:
+            return None
+        if isinstance(relations, (str, int, np.integer)):
+            relations = [relations]
+        ids = []
+        for relation in relations:
+            if isinstance(relation, (int, np.integer)):
+                ids.append(int(relation))
+            else:
+                if fold_name(relation) not in self._relation_ids:
+                    raise KeyError(relation)
+                ids.append(self._relation_ids[fold_name(relation)])
+        return np.array(ids, dtype=np.int64)
+
+    def newest(self, n):
+        """`(start, end)` window of the newest `n` temporal ids."""
+        if self.time_order == 'backward':
+            return 0, n
+        return self.num_timestamps - n, self.num_timestamps
+
+    def _chronological(self, quads):
+        # Stable, so facts of one timestamp keep their posting-list order
+        t = quads[:, 3].astype(np.int64)
+        return quads[np.argsort(t if self.time_order == 'forward' else -t, kind='stable')]
+
+    def _window(self, start, end):
+        start = 0 if start is None else max(0, int(start))
+        end = self.num_timestamps if end is None else min(self.num_timestamps, int(end))
+        return start, max(start, end)
+
+    def _postings(self, role, entities, start, end, relations):
+        # Postings are sorted by (entity, t), so each entity's window is one key range
+        keys, quads = getattr(self, f'{role}_keys'), getattr(self, f'{role}_quads')
+        base = np.asarray(entities, dtype=np.int64) * self.num_timestamps
+        lo, hi = keys.searchsorted(base + start), keys.searchsorted(base + end)
+        if base.ndim == 0:
+            found = quads[lo:hi]
+        else:
+            found = quads[_ranges(lo, hi)]
+        if relations is not None:
+            found = found[np.isin(found[:, 1], relations)]
+        return found
+
+    def facts(self, entity, role='both', relations=None, start=None, end=None):
+        """
+        Quadruples (an (n, 4) int32 array, oldest first) with `entity` as
+        subject, object or either, optionally restricted to `relations` and
+        to timestamps `[start, end)`.
+        """
+        if role not in ROLES:
+            raise ValueError(f'role must be one of {ROLES}')
+        entity = self.entity_id(entity)
+        relations = self.relation_ids(relations)
+        start, end = self._window(start, end)
+        if role != 'both':
+            return self._chronological(self._postings(role, entity, start, end, relations))
+        as_subject = self._postings('subject', entity, start, end, relations)
+        as_object = self._postings('object', entity, start, end, relations)
+        # Self-loops are in both posting lists; keep them once
+        return self._chronological(np.concatenate([as_subject, as_object[as_object[:, 0] != entity]]))
+
+    def timeline(self, entity, relations=None, start=None, end=None):
+        """`facts(entity, 'both', ...)` as a named DataFrame, oldest first."""
+        return self.frame(self.facts(entity, 'both', relations, start, end))
+
+    def neighbors(self, entities, relations=None, start=None, end=None, direction='both'):
+        """Distinct entities one edge away from any of `entities` within the window."""
+        entities = np.atleast_1d(np.asarray([self.entity_id(e) for e in np.atleast_1d(entities).tolist()]))
+        start, end = self._window(start, end)
+        return self._expand(entities, self.relation_ids(relations), start, end, direction)
+
+    def _expand(self, nodes, relations, start, end, direction):
+        found = []
+        if direction in ('out', 'both'):
+            found.append(self._postings('subject', nodes, start, end, relations)[:, 2])
+        if direction in ('in', 'both'):
+            found.append(self._postings('object', nodes, start, end, relations)[:, 0])
+        return np.unique(np.concatenate(found)).astype(np.int64)
+
+    def k_hop(self, entity, k=2, relations=None, start=None, end=None, direction='both', max_nodes=None):
+        """
+        Entities within `k` edges of `entity` using only facts inside the
+        window: `(nodes, hops)` arrays, the seed at hop 0. `direction` is
+        'out' (subject -> object), 'in' or 'both'; `max_nodes` stops the
+        expansion once that many entities are reached.
+        """
+        seed = self.entity_id(entity)
+        relations = self.relation_ids(relations)
+        start, end = self._window(start, end)
+        visited = np.zeros(self.num_entities, dtype=bool)
+        visited[seed] = True
+        nodes, hops = [np.array([seed])], [np.zeros(1, dtype=np.int64)]
+        frontier, reached = nodes[0], 1
+        for hop in range(1, k + 1):
+            if not len(frontier) or (max_nodes is not None and reached >= max_nodes):
+                break
+            frontier = self._expand(frontier, relations, start, end, direction)
+            frontier = frontier[~visited[frontier]]
+            visited[frontier] = True
+            reached += len(frontier)
+            nodes.append(frontier)
+            hops.append(np.full(len(frontier), hop, dtype=np.int64))
+        return np.concatenate(nodes), np.concatenate(hops)
+
+    def subgraph(self, nodes, relations=None, start=None, end=None):
+        """Quadruples inside the window whose subject and object are both in `nodes`."""
+        nodes = np.unique(np.asarray(nodes, dtype=np.int64))
+        start, end = self._window(start, end)
+        found = self._postings('subject', nodes, start, end, self.relation_ids(relations))
+        return found[np.isin(found[:, 2], nodes)]
+
+    def frame(self, quads):
+        """Quadruples with entity and relation names, as the analysis notebooks display them."""
+        quads = np.asarray(quads)
+        return pd.DataFrame({
+            'subject': self.entities.names(quads[:, 0]),
+            'relation': self.relations.names(quads[:, 1]),
+            'object': self.entities.names(quads[:, 2]),
+            'temporal_id': quads[:, 3].astype(np.int64),
+        })
+
+
+def load_or_build(source, cache_dir, splits=SPLITS, time_order=DEFAULT_TIME_ORDER):
+    """
+    Cached QueryIndex for `source` (a text-layout or binary-layout dataset
+    directory): memory-mapped from `cache_dir` when it matches the source
+    and `time_order`, otherwise built and saved there first.
+    """
+    fingerprint = source_fingerprint(source)
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if (meta.get('version') == QUERY_VERSION and meta.get('source') == fingerprint
+                and meta.get('splits') == list(splits) and meta.get('time_order') == time_order):
+            return QueryIndex.load(cache_dir)
+    binary = os.path.exists(os.path.join(source, 'meta.json'))
+    dataset = load_dataset(source) if binary else load_text(source, splits)
+    index = QueryIndex.from_dataset(dataset, splits, time_order)
+    index.meta['source'] = fingerprint
+    index.save(cache_dir)
+    return QueryIndex.load(cache_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the IndovestDKG graph by entity, relation and time window')
+    parser.add_argument('source', help='data/IndovestDKG (text layout) or a kgprep.dataset binary directory')
+    parser.add_argument('cache', help='query index directory (built on first use)')
+    parser.add_argument('command', choices=['search', 'facts', 'timeline', 'khop'])
+    parser.add_argument('entity', help='entity name (a name prefix for search) or id')
+    kind = parser.add_mutually_exclusive_group()
+    kind.add_argument('--id', dest='kind', action='store_const', const='id', help='ENTITY is an entity id')
+    kind.add_argument('--name', dest='kind', action='store_const', const='name',
+                      help='ENTITY is a name, even when it is all digits (default: all digits means an id)')
+    parser.add_argument('--role', default='both', choices=ROLES)
+    parser.add_argument('--relation', nargs='+', help='relation names or ids')
+    parser.add_argument('--since', type=int, help='first temporal_id of the window')
+    parser.add_argument('--until', type=int, help='temporal_id after the window')
+    parser.add_argument('--last', type=int, help='window of the newest N temporal ids (overrides --since/--until)')
+    parser.add_argument('--time-order', default=DEFAULT_TIME_ORDER, choices=TIME_ORDERS,
+                        help='backward: temporal_id counts weeks back from the newest date (prep.ipynb, '
+                             'data/IndovestDKG); forward: weeks since an epoch (kgprep.encoding)')
+    parser.add_argument('--hops', type=int, default=2)
+    parser.add_argument('--limit', type=int, default=50, help='rows / names printed')
+    args = parser.parse_args()
+
+    index = load_or_build(args.source, args.cache, time_order=args.time_order)
+    start, end = args.since, args.until
+    if args.last is not None:
+        start, end = index.newest(args.last)
+    kind = args.kind or ('id' if args.entity.isdigit() else 'name')
+    if kind == 'id' and not args.entity.isdigit():
+        parser.error(f'--id: {args.entity!r} is not an entity id')
+    entity = int(args.entity) if kind == 'id' else args.entity
+    relations = None
+    if args.relation:
+        relations = [int(r) if r.isdigit() else r for r in args.relation]
+
+    if args.command == 'search':
+        for name, i in index.search(args.entity, args.limit):
+            print(f'{i}\t{name}')
+        return
+    if args.command == 'khop':
+        nodes, hops = index.k_hop(entity, args.hops, relations, start, end)
+        print(f'{len(nodes)} entities within {args.hops} hops ({np.bincount(hops).tolist()} per hop)')
+        for i, hop in zip(nodes[:args.limit].tolist(), hops[:args.limit].tolist()):
+            print(f'{hop}\t{i}\t{index.entities[i]}')
+        return
+    quads = index.facts(entity, args.role if args.command == 'facts' else 'both', relations, start, end)
+    print(f'{len(quads)} facts')
+    with pd.option_context('display.max_rows', args.limit, 'display.width', 160):
+        print(index.frame(quads[:args.limit]).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
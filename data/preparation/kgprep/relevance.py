@@ -0,0 +1,311 @@
+"""
+Local relevance pre-filter: skip non-investment articles before LLM extraction.
+
+The crawled indexes (CNBC `/market/indeks/5`, Kompas `tag/investasi`)
+include many articles that yield empty or junk extractions, and each one
+still costs a full LLM call (plus retries when parsing fails).
+`RelevanceModel` scores articles on the CPU with a hashed TF-IDF
+gazetteer built from the graph itself:
+
+- every entity name in `entity2id.txt` and every relation name in
+  `relation2id.txt` (camel case split) contributes its unigrams and
+  bigrams, hashed into `2**bits` buckets; a term's weight is its salience
+  (log facts of the entities / relations that contain it) times its
+  specificity (log inverse frequency among the names), and with an
+  article corpus also its corpus IDF;
+- an article is featurized into the same buckets as sublinear term
+  counts, and its score is `x . w / |x|`, the density of graph vocabulary
+  in its text.
+
+Featurizing tokenizes each text once and hashes each distinct token of a
+batch once; bigram hashes, the sparse matrix and the scores are NumPy /
+SciPy operations, and large backlogs are scored in batches by a process
+pool. The threshold is calibrated on labelled articles: an article is
+relevant when its cached extraction (construction/LLM ExtractionCache)
+has at least one quadruple, the threshold is the highest score that keeps
+`--recall` of the relevant articles in one half of the sample, and it is
+reported on the other, held-out half.
+
+Run from data/preparation (or with it on `PYTHONPATH`); `evaluate` reads
+the cache with construction/LLM's `extraction` package, which it adds to
+`sys.path` from this file's location.
+
+    python -m kgprep.relevance build ../IndovestDKG relevance.npz --corpus articles.csv
+    python -m kgprep.relevance evaluate relevance.npz articles.csv --cache extraction_cache.sqlite --save
+    python -m kgprep.relevance score relevance.npz articles.csv --out scores.csv
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from kgprep.dataset import load_text
+
+EXTRACTION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'construction', 'LLM')
+DEFAULT_BITS = 20
+BATCH_SIZE = 2048
+TOKEN = re.compile(r'[^\W_]+')
+CAMEL = re.compile(r'(?<=[a-z])(?=[A-Z])')
+BIGRAM_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def featurize(texts, bits=DEFAULT_BITS, numbers=True):
+    """
+    CSR matrix (texts x 2**bits) of sublinear counts `1 + log(tf)` of the
+    casefolded unigrams and bigrams of `texts` (non-strings count as empty).
+    `numbers=False` drops all-digit tokens.
+    """
+    docs = [TOKEN.findall(text.casefold()) if isinstance(text, str) else [] for text in texts]
+    if not numbers:
+        docs = [[token for token in doc if not token.isdigit()] for doc in docs]
+    lengths = np.fromiter(map(len, docs), dtype=np.int64, count=len(docs))
+    vocabulary = {}
+    ids = np.fromiter((vocabulary.setdefault(token, len(vocabulary)) for doc in docs for token in doc),
+                      dtype=np.int64, count=int(lengths.sum()))
+    # Each distinct token of the batch is hashed once; crc32 is stable across processes and runs
+    hashes = np.fromiter((zlib.crc32(token.encode('utf-8')) for token in vocabulary), dtype=np.uint64,
+                         count=len(vocabulary))
+    unigrams = hashes[ids]
+    rows = np.repeat(np.arange(len(docs), dtype=np.int64), lengths)
+    same_doc = rows[1:] == rows[:-1]
+    bigrams = unigrams[:-1][same_doc] * BIGRAM_MULTIPLIER + unigrams[1:][same_doc] + np.uint64(1)
+    bigrams ^= bigrams >> np.uint64(31)
+    mask = np.uint64((1 << bits) - 1)
+    columns = np.concatenate([unigrams & mask, bigrams & mask]).astype(np.int64)
+    rows = np.concatenate([rows, rows[1:][same_doc]])
+    matrix = sp.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, columns)), shape=(len(docs), 1 << bits))
+    matrix.sum_duplicates()
+    np.log(matrix.data, out=matrix.data)
+    matrix.data += 1
+    return matrix
+
+
+def _term_weights(names, salience, bits):
+    """Per-bucket salience x specificity of the unigrams / bigrams of `names`."""
+    present = featurize(names, bits, numbers=False)
+    present.data[:] = 1
+    df = np.asarray(present.sum(axis=0)).ravel()
+    weights = np.asarray(present.T @ np.log1p(salience).astype(np.float32)).ravel()
+    nonzero = df > 0
+    weights[nonzero] *= np.log1p(len(names) / df[nonzero])
+    return weights
+
+
+def _density(matrix, dense):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    return np.divide(matrix @ dense, norms, out=np.zeros(matrix.shape[0], dtype=np.float32), where=norms > 0)
+
+
+def _score_batch(buckets, weights, bits, texts):
+    # Process-pool task: only the sparse weights are pickled, the dense vector is rebuilt per batch
+    dense = np.zeros(1 << bits, dtype=np.float32)
+    dense[buckets] = weights
+    return _density(featurize(texts, bits), dense)
+
+
+class RelevanceModel:
+    """
+    Hashed gazetteer weights (sorted `buckets` with their `weights`) and a
+    `threshold`; articles scoring below it are not sent to the LLM. The
+    threshold is 0 (keep everything) until `calibrate` sets it.
+    """
+
+    def __init__(self, buckets, weights, bits=DEFAULT_BITS, threshold=0.0, meta=None):
+        self.buckets = np.asarray(buckets, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bits = bits
+        self.threshold = float(threshold)
+        self.meta = meta or {}
+        self.dense = np.zeros(1 << bits, dtype=np.float32)
+        self.dense[self.buckets] = self.weights
+
+    @classmethod
+    def build(cls, dataset, corpus=None, bits=DEFAULT_BITS, relation_weight=0.5):
+        """
+        Weights from a QuadrupleDataset (or a text-layout directory): entity
+        and relation names weighted by the facts they occur in. `corpus`
+        (article texts) adds a corpus IDF factor, which demotes words common
+        to all news.
+        """
+        if isinstance(dataset, str):
+            dataset = load_text(dataset)
+        quads = np.concatenate([dataset[split] for split in dataset.splits])
+        entity_facts = np.bincount(quads[:, [0, 2]].ravel(), minlength=dataset.num_entities)
+        relation_facts = np.bincount(quads[:, 1], minlength=dataset.num_relations)
+        relations = [CAMEL.sub(' ', name) for name in dataset.relations.names()]
+        weights = _term_weights(dataset.entities.names(), entity_facts, bits)
+        weights += relation_weight * _term_weights(relations, relation_facts, bits)
+        meta = {'entities': dataset.num_entities, 'relations': dataset.num_relations, 'corpus_articles': 0}
+        if corpus is not None:
+            df = np.zeros(1 << bits, dtype=np.int64)
+            count = 0
+            for start in range(0, len(corpus), BATCH_SIZE):
+                batch = featurize(corpus[start:start + BATCH_SIZE], bits)
+                df += np.bincount(batch.indices, minlength=1 << bits)
+                count += batch.shape[0]
+            weights *= np.log((1 + count) / (1 + df)) + 1
+            meta['corpus_articles'] = count
+        buckets = np.flatnonzero(weights > 0)
+        weights = weights[buckets]
+        return cls(buckets, weights / weights.max(), bits, meta=meta)
+
+    def save(self, path):
+        tmp_path = path + '.tmp.npz'
+        np.savez_compressed(tmp_path, buckets=self.buckets, weights=self.weights,
+                            meta=np.array(json.dumps(dict(self.meta, bits=self.bits, threshold=self.threshold))))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            bits, threshold = meta.pop('bits'), meta.pop('threshold')
+            return cls(data['buckets'], data['weights'], bits, threshold, meta)
+
+    def score(self, texts, batch_size=BATCH_SIZE, workers=1):
+        """Scores of `texts` (float32), in batches; `workers > 1` scores the batches in a process pool."""
+        texts = list(texts)
+        starts = range(0, len(texts), batch_size)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1 and len(starts) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(starts))) as pool:
+                futures = [pool.submit(_score_batch, self.buckets, self.weights, self.bits,
+                                       texts[start:start + batch_size]) for start in starts]
+                parts = [future.result() for future in futures]
+        else:
+            parts = [_density(featurize(texts[start:start + batch_size], self.bits), self.dense) for start in starts]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+
+    def keep(self, scores, threshold=None):
+        return np.asarray(scores) >= (self.threshold if threshold is None else threshold)
+
+
+def calibrate(scores, labels, recall=0.98):
+    """Highest threshold that keeps at least `recall` of the relevant (`labels` true) articles."""
+    relevant = np.sort(np.asarray(scores)[np.asarray(labels, dtype=bool)])
+    if not len(relevant):
+        return 0.0
+    missed = int(np.floor((1 - recall) * len(relevant) + 1e-9))
+    return float(relevant[min(missed, len(relevant) - 1)])
+
+
+def filter_report(scores, labels, threshold, calls=None):
+    """
+    Articles kept / filtered, LLM calls saved (`calls`: requests per article,
+    default 1) and recall / precision of the kept set against `labels`.
+    """
+    scores = np.asarray(scores)
+    labels = np.asarray(labels, dtype=bool)
+    kept = scores >= threshold
+    calls = np.ones(len(scores), dtype=np.int64) if calls is None else np.asarray(calls)
+    relevant = int(labels.sum())
+    return {
+        'articles': int(len(scores)), 'relevant': relevant, 'kept': int(kept.sum()), 'filtered': int((~kept).sum()),
+        'filtered_fraction': float((~kept).mean()) if len(scores) else 0.0,
+        'calls_saved': int(calls[~kept].sum()), 'calls_total': int(calls.sum()),
+        'recall': float((kept & labels).sum() / relevant) if relevant else 1.0,
+        'precision': float((kept & labels).sum() / kept.sum()) if kept.any() else 1.0,
+        'threshold': float(threshold),
+    }
+
+
+def cached_labels(texts, cache_path, model='gpt-4o-mini'):
+    """
+    Labels from existing extractions: True when the ExtractionCache result
+    for a text has at least one quadruple, False when it has none, None when
+    the text was never extracted.
+    """
+    if EXTRACTION_DIR not in sys.path:
+        sys.path.insert(0, EXTRACTION_DIR)
+    from extraction.cache import ExtractionCache
+    from extraction.packing import result_entities
+
+    cache = ExtractionCache(cache_path, model)
+    labels = []
+    try:
+        for text in texts:
+            hit = cache.lookup(text) if isinstance(text, str) and text else None
+            labels.append(None if hit is None or hit.result is None else bool(result_entities(hit.result)))
+    finally:
+        cache.close()
+    return labels
+
+
+def holdout_evaluation(scores, labels, recall=0.98, holdout=0.5, seed=0):
+    """Calibrate the threshold on one part of the labelled sample and report it on the held-out rest."""
+    order = np.random.default_rng(seed).permutation(len(scores))
+    cut = int(round(len(order) * (1 - holdout)))
+    calibration, held_out = order[:cut], order[cut:]
+    threshold = calibrate(scores[calibration], labels[calibration], recall)
+    return threshold, filter_report(scores[held_out], labels[held_out], threshold)
+
+
+def read_articles(path, column='isi', sep=';'):
+    return pd.read_csv(path, sep=sep, usecols=[column])[column].tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local relevance pre-filter for LLM extraction')
+    commands = parser.add_subparsers(dest='command', required=True)
+    p = commands.add_parser('build', help='build the gazetteer model from the graph (and an article corpus)')
+    p.add_argument('dataset', help='text layout directory (entity2id.txt, relation2id.txt, splits)')
+    p.add_argument('model')
+    p.add_argument('--corpus', help="article CSV ('isi' column) for the corpus IDF")
+    p.add_argument('--bits', type=int, default=DEFAULT_BITS)
+    p.add_argument('--relation-weight', type=float, default=0.5)
+    p = commands.add_parser('evaluate', help='calibrate on extracted articles and report on a held-out sample')
+    p.add_argument('model')
+    p.add_argument('articles', help="article CSV ('isi' column)")
+    p.add_argument('--cache', required=True, help='ExtractionCache of earlier runs (the labels)')
+    p.add_argument('--llm-model', default='gpt-4o-mini', help='model the cache entries were extracted with')
+    p.add_argument('--recall', type=float, default=0.98, help='target recall of relevant articles')
+    p.add_argument('--holdout', type=float, default=0.5)
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--save', action='store_true', help='store the calibrated threshold in the model')
+    p = commands.add_parser('score', help='score articles')
+    p.add_argument('model')
+    p.add_argument('articles', help="article CSV ('isi' column)")
+    p.add_argument('--out', help='CSV of row, score, keep (default: summary only)')
+    p.add_argument('--threshold', type=float)
+    p.add_argument('--workers', type=int, default=1, help='processes (0 = CPU count)')
+    for p in commands.choices.values():
+        p.add_argument('--sep', default=';')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        corpus = read_articles(args.corpus, sep=args.sep) if args.corpus else None
+        model = RelevanceModel.build(args.dataset, corpus, args.bits, args.relation_weight)
+        model.save(args.model)
+        print(f'{args.model}: {len(model.buckets)} weighted buckets ({model.meta})')
+        return
+    model = RelevanceModel.load(args.model)
+    texts = read_articles(args.articles, sep=args.sep)
+    if args.command == 'score':
+        scores = model.score(texts, workers=args.workers or None)
+        keep = model.keep(scores, args.threshold)
+        if args.out:
+            pd.DataFrame({'row': np.arange(len(texts)), 'score': scores, 'keep': keep}).to_csv(args.out, index=False)
+        print(f'{len(texts)} articles, {int(keep.sum())} kept, {int((~keep).sum())} filtered '
+              f'(threshold {model.threshold if args.threshold is None else args.threshold:.4f})')
+        return
+    labels = cached_labels(texts, args.cache, args.llm_model)
+    known = np.array([label is not None for label in labels], dtype=bool)
+    scores = model.score([text for text, ok in zip(texts, known) if ok])
+    labels = np.array([label for label in labels if label is not None], dtype=bool)
+    threshold, report = holdout_evaluation(scores, labels, args.recall, args.holdout, args.seed)
+    print(json.dumps(dict(report, labelled=int(known.sum()), unlabelled=int((~known).sum())), indent=2))
+    if args.save:
+        model.threshold = threshold
+        model.save(args.model)
+        print(f'threshold {threshold:.4f} saved to {args.model}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+"""
+Time-aware negative sampling and a prefetching mini-batch loader for TKG training.
+
+Every model environment in `config/YAMLs` (diachronic embeddings, RE-NET,
+CEN, EvoKG, RETemp) trains on corrupted quadruples, and filtering them
+against the true facts with per-sample Python set lookups costs more than
+the forward pass at ~45k entities. Here corruption is one vectorized draw
+per batch: each quadruple is packed into one int64 key, the known keys go
+into an open-addressing hash set probed with NumPy gathers, and false
+negatives (corruptions that are true facts at the same timestamp) are
+redrawn in place.
+
+`BatchLoader` shuffles a split and yields `(positives, negatives)` batches
+of shape `(b, 4)` and `(b, k, 4)`; batches are produced by a background
+thread into a bounded queue, so at most `prefetch` batches are in memory.
+
+    python -m kgprep.sampling ../IndovestDKG --k 64 --batch-size 1024
+"""
+import argparse
+import queue
+import threading
+import time
+import numpy as np
+from kgprep.dataset import SPLITS, load_dataset, load_text
+
+MODES = ('both', 'head', 'tail')
+
+
+def pack_quads(s, r, o, t, num_entities, num_relations):
+    """One int64 key per (s, r, o, t); keys sort by t, then r, s, o."""
+    t = np.asarray(t, dtype=np.int64)
+    return ((t * num_relations + r) * num_entities + s) * num_entities + o
+
+
+class KeySet:
+    """
+    Hash set of non-negative int64 keys: a power-of-two table with linear
+    probing, built and queried a whole array at a time. Most queries of a
+    sampler are misses, so they finish after one gather into the table.
+    """
+
+    EMPTY = -1
+    MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)  # Fibonacci hashing
+
+    def __init__(self, keys, load=0.25):
+        keys = np.unique(np.asarray(keys, dtype=np.int64))
+        bits = max(4, int(np.ceil(np.log2(max(1, len(keys)) / load))))
+        self.mask = (1 << bits) - 1
+        self.shift = np.uint64(64 - bits)
+        self.table = np.full(1 << bits, self.EMPTY, dtype=np.int64)
+        slots = self._slots(keys)
+        pending = np.arange(len(keys))
+        while len(pending):
+            # Each round places the first pending key of every free slot; the rest move one slot on
+            candidate = slots[pending]
+            free = np.flatnonzero(self.table[candidate] == self.EMPTY)
+            _, first = np.unique(candidate[free], return_index=True)
+            placed = free[first]
+            self.table[candidate[placed]] = keys[pending[placed]]
+            keep = np.ones(len(pending), dtype=bool)
+            keep[placed] = False
+            pending = pending[keep]
+            slots[pending] = (slots[pending] + 1) & self.mask
+        self.size = len(keys)
+
+    def __len__(self):
+        return self.size
+
+    def _slots(self, keys):
+        return ((keys.astype(np.uint64) * self.MULTIPLIER) >> self.shift).astype(np.int64)
+
+    def contains(self, keys):
+        keys = np.asarray(keys, dtype=np.int64)
+        flat = keys.ravel()
+        found = np.zeros(len(flat), dtype=bool)
+        active = np.arange(len(flat))
+        slots = self._slots(flat)
+        while len(active):
+            stored = self.table[slots]
+            hit = stored == flat[active]
+            found[active[hit]] = True
+            probing = (stored != self.EMPTY) & ~hit
+            active, slots = active[probing], (slots[probing] + 1) & self.mask
+        return found.reshape(keys.shape)
+
+
+class KnownFacts:
+    """Hash sets of the true quadruples (time-aware) and of their (s, r, o) triples (static) as int64 keys."""
+
+    def __init__(self, quads, num_entities, num_relations, num_timestamps=None):
+        quads = np.asarray(quads, dtype=np.int64)
+        if num_timestamps is None:
+            num_timestamps = int(quads[:, 3].max()) + 1 if len(quads) else 1
+        if num_timestamps * num_relations * num_entities * num_entities >= 2 ** 63:
+            raise ValueError('entity / relation / timestamp counts are too large for int64 keys')
+        self.num_entities = num_entities
+        self.num_relations = num_relations
+        s, r, o, t = quads[:, 0], quads[:, 1], quads[:, 2], quads[:, 3]
+        self.time = KeySet(pack_quads(s, r, o, t, num_entities, num_relations))
+        self.static = KeySet(pack_quads(s, r, o, 0, num_entities, num_relations))
+
+    @classmethod
+    def from_dataset(cls, dataset, splits=SPLITS):
+        quads = np.concatenate([np.asarray(dataset[split]) for split in splits if split in dataset.splits])
+        return cls(quads, dataset.num_entities, dataset.num_relations, dataset.num_timestamps)
+
+    def contains(self, s, r, o, t=None):
+        """Boolean mask of the quadruples (or, with `t=None`, the triples at any time) that are known."""
+        keys = self.static if t is None else self.time
+        return keys.contains(pack_quads(s, r, o, 0 if t is None else t, self.num_entities, self.num_relations))
+
+
+class NegativeSampler:
+    """
+    `k` corrupted quadruples per positive, heads or tails replaced by
+    uniformly drawn entities (`mode` 'both' picks one side per negative).
+
+    With `filtered`, negatives that are known facts are redrawn up to
+    `max_rounds` times: at the same timestamp when `time_aware`, otherwise
+    at any timestamp. The few that are still true afterwards are reported
+    in the mask returned by `sample`.
+    """
+
+    def __init__(self, num_entities, k=1, known=None, mode='both', time_aware=True, filtered=True,
+                 max_rounds=10, seed=None):
+        if mode not in MODES:
+            raise ValueError(f'mode must be one of {MODES}')
+        if filtered and known is None:
+            raise ValueError('a filtered sampler needs the known facts')
+        self.num_entities = num_entities
+        self.k = k
+        self.known = known
+        self.mode = mode
+        self.time_aware = time_aware
+        self.filtered = filtered
+        self.max_rounds = max_rounds
+        self.rng = np.random.default_rng(seed)
+
+    def _false(self, negatives):
+        s, r, o, t = negatives[..., 0], negatives[..., 1], negatives[..., 2], negatives[..., 3]
+        return self.known.contains(s, r, o, t if self.time_aware else None)
+
+    def sample(self, positives):
+        """`(negatives, valid)`: an (b, k, 4) int64 array and a (b, k) mask of the true negatives."""
+        positives = np.asarray(positives, dtype=np.int64)
+        shape = (len(positives), self.k)
+        if self.mode == 'both':
+            head = self.rng.random(shape) < 0.5
+        else:
+            head = np.full(shape, self.mode == 'head')
+        draws = self.rng.integers(0, self.num_entities, shape)
+        negatives = np.empty(shape + (4,), dtype=np.int64)
+        negatives[..., 0] = np.where(head, draws, positives[:, None, 0])
+        negatives[..., 1] = positives[:, None, 1]
+        negatives[..., 2] = np.where(head, positives[:, None, 2], draws)
+        negatives[..., 3] = positives[:, None, 3]
+        column = np.where(head, 0, 2)
+        if not self.filtered:
+            return negatives, np.ones(column.shape, dtype=bool)
+
+        invalid = np.flatnonzero(self._false(negatives))
+        flat, flat_column = negatives.reshape(-1, 4), column.ravel()
+        for _ in range(self.max_rounds):
+            if not len(invalid):
+                break
+            # Only the rejected slots are redrawn and checked again
+            flat[invalid, flat_column[invalid]] = self.rng.integers(0, self.num_entities, len(invalid))
+            invalid = invalid[self._false(flat[invalid])]
+        valid = np.ones(len(flat), dtype=bool)
+        valid[invalid] = False
+        return negatives, valid.reshape(column.shape)
+
+
+class BatchLoader:
+    """
+    Shuffled `(positives, negatives, valid)` mini-batches of a quadruple
+    split, produced by a background thread. `prefetch` bounds the queue,
+    so memory stays at a few batches whatever the split size. Iterating
+    starts a new epoch; breaking out early stops the worker.
+    """
+
+    def __init__(self, quads, sampler, batch_size=1024, shuffle=True, drop_last=False, prefetch=4, seed=None):
+        self.quads = np.asarray(quads)
+        self.sampler = sampler
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.prefetch = prefetch
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        if self.drop_last:
+            return len(self.quads) // self.batch_size
+        return -(-len(self.quads) // self.batch_size)
+
+    def batches(self, order):
+        """Synchronous batches for a given row order (what the worker thread runs)."""
+        for i in range(len(self)):
+            positives = self.quads[order[i * self.batch_size:(i + 1) * self.batch_size]].astype(np.int64)
+            negatives, valid = self.sampler.sample(positives)
+            yield positives, negatives, valid
+
+    def __iter__(self):
+        order = self.rng.permutation(len(self.quads)) if self.shuffle else np.arange(len(self.quads))
+        batches = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        done = object()
+
+        def put(item):
+            # Timed puts, so a consumer that stopped early (queue full) never leaves the worker blocked
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for batch in self.batches(order):
+                    if not put(batch):
+                        return
+                put(done)
+            except BaseException as error:
+                put(error)
+
+        worker = threading.Thread(target=produce, daemon=True)
+        worker.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is done:
+                    return
+                if isinstance(batch, BaseException):
+                    raise batch
+                yield batch
+        finally:
+            stop.set()
+            worker.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput of the filtered negative sampler / batch loader')
+    parser.add_argument('data', help='data/IndovestDKG (text layout) or a kgprep.dataset binary directory')
+    parser.add_argument('--split', default='train')
+    parser.add_argument('--k', type=int, default=64)
+    parser.add_argument('--batch-size', type=int, default=1024)
+    parser.add_argument('--mode', default='both', choices=MODES)
+    parser.add_argument('--static', action='store_true', help='filter against facts at any time')
+    parser.add_argument('--prefetch', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        dataset = load_dataset(args.data)
+    except FileNotFoundError:
+        dataset = load_text(args.data)
+    known = KnownFacts.from_dataset(dataset)
+    sampler = NegativeSampler(dataset.num_entities, args.k, known, args.mode, not args.static, seed=args.seed)
+    loader = BatchLoader(dataset[args.split], sampler, args.batch_size, prefetch=args.prefetch, seed=args.seed)
+    started = time.perf_counter()
+    negatives = rejected = 0
+    for _, batch_negatives, valid in loader:
+        negatives += valid.size
+        rejected += int(valid.size - valid.sum())
+    elapsed = time.perf_counter() - started
+    print(f'{len(loader)} batches, {negatives} negatives in {elapsed:.2f} s '
+          f'({negatives / elapsed:,.0f} negatives/s, {rejected} still true after redraws)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""
+Per-timestamp snapshot index and (s, r) history store for TKGC models.
+
+RE-NET, CEN/CENET, EvoKG, HisMatch and RETemp (see `config/YAMLs`) all
+need, for every `temporal_id`, the snapshot graph and the objects each
+(subject, relation) pair had in the preceding timestamps, and each of them
+rebuilds this with dict loops at startup. `GraphIndex` builds it once from
+`data/IndovestDKG` with NumPy sorts and caches it as flat `.npy` arrays
+that every process memory-maps read-only:
+
+- edges (with inverse relations `r + num_relations`) sorted by (t, s, r, o)
+  and a time offset table, so `snapshot(t)` is two array slices;
+- per snapshot, the distinct sources and their edge offsets (a CSR over
+  the active nodes), expanded to a full `scipy.sparse.csr_matrix` on demand;
+- the same edges sorted by ((s, r), t), so `history(s, r, t, k)` is a
+  binary search, and a pair id per edge so the history vocabulary matrix of
+  any window `[t - k, t)` is built from one contiguous slice.
+
+    python -m kgprep.snapshots ../IndovestDKG ../IndovestDKG/graph_index
+"""
+import argparse
+import hashlib
+import json
+import os
+import numpy as np
+import scipy.sparse as sp
+from kgprep.dataset import SPLITS, load_dataset, load_text
+
+INDEX_VERSION = 1
+ARRAYS = ('src', 'rel', 'dst', 'pair', 'time_offsets', 'nodes', 'node_offsets', 'node_ptr',
+          'pair_keys', 'pair_offsets', 'history_time', 'history_dst')
+
+
+class Snapshot:
+    """Edges of one timestamp as views: `src`, `rel`, `dst`, plus `nodes` / `indptr` over the active sources."""
+
+    def __init__(self, t, src, rel, dst, nodes, indptr):
+        self.t = t
+        self.src = src
+        self.rel = rel
+        self.dst = dst
+        self.nodes = nodes
+        self.indptr = indptr
+
+    def __len__(self):
+        return len(self.src)
+
+    def neighbors(self, s):
+        """`(rel, dst)` of the edges leaving `s` in this snapshot."""
+        i = np.searchsorted(self.nodes, s)
+        if i == len(self.nodes) or self.nodes[i] != s:
+            return self.rel[:0], self.dst[:0]
+        return self.rel[self.indptr[i]:self.indptr[i + 1]], self.dst[self.indptr[i]:self.indptr[i + 1]]
+
+
+class GraphIndex:
+    """Snapshot and history index over a quadruple dataset; see the module docstring for the layout."""
+
+    def __init__(self, arrays, meta):
+        self.meta = meta
+        for name in ARRAYS:
+            # Plain ndarray views of the memmaps: same shared pages, much cheaper slicing
+            setattr(self, name, np.asarray(arrays[name]))
+        # Offset tables are small; Python ints keep per-query overhead low
+        self._time_offsets = self.time_offsets.tolist()
+        self._node_offsets = self.node_offsets.tolist()
+        self.num_entities = meta['num_entities']
+        self.num_relations = meta['num_relations']
+        self.num_timestamps = len(self.time_offsets) - 1
+
+    @classmethod
+    def build(cls, quads, num_entities, num_relations, inverse=True, meta=None):
+        """Build from an (n, 4) `s, r, o, t` array; `inverse` adds (o, r + num_relations, s, t)."""
+        quads = np.asarray(quads, dtype=np.int64)
+        s, r, o, t = quads[:, 0], quads[:, 1], quads[:, 2], quads[:, 3]
+        if inverse:
+            s, r, o, t = (np.concatenate([s, o]), np.concatenate([r, r + num_relations]),
+                          np.concatenate([o, s]), np.concatenate([t, t]))
+        total_relations = 2 * num_relations if inverse else num_relations
+        num_timestamps = int(t.max()) + 1 if len(t) else 0
+
+        order = np.lexsort((o, r, s, t))
+        src, rel, dst, time = s[order], r[order], o[order], t[order]
+        time_offsets = np.searchsorted(time, np.arange(num_timestamps + 1))
+        # Active sources per snapshot: a new node segment starts wherever (t, s) changes
+        starts = np.flatnonzero(np.r_[True, (time[1:] != time[:-1]) | (src[1:] != src[:-1])])
+        node_ptr = np.r_[starts, len(src)]
+        nodes = src[starts]
+        node_offsets = np.searchsorted(time[starts], np.arange(num_timestamps + 1))
+
+        keys = src * total_relations + rel
+        pair_keys, pair = np.unique(keys, return_inverse=True)
+        history_order = np.lexsort((time, pair))
+        pair_offsets = np.searchsorted(pair[history_order], np.arange(len(pair_keys) + 1))
+
+        arrays = {
+            'src': src.astype(np.int32), 'rel': rel.astype(np.int32), 'dst': dst.astype(np.int32),
+            'pair': pair.astype(np.int32), 'time_offsets': time_offsets.astype(np.int64),
+            'nodes': nodes.astype(np.int32), 'node_offsets': node_offsets.astype(np.int64),
+            'node_ptr': node_ptr.astype(np.int64), 'pair_keys': pair_keys.astype(np.int64),
+            'pair_offsets': pair_offsets.astype(np.int64),
+            'history_time': time[history_order].astype(np.int32), 'history_dst': dst[history_order].astype(np.int32),
+        }
+        meta = dict(meta or {}, version=INDEX_VERSION, num_entities=int(num_entities),
+                    num_relations=int(total_relations), base_relations=int(num_relations), inverse=bool(inverse),
+                    edges=int(len(src)))
+        return cls(arrays, meta)
+
+    @classmethod
+    def from_dataset(cls, dataset, splits=SPLITS, inverse=True):
+        splits = [split for split in splits if split in dataset.splits]
+        quads = np.concatenate([np.asarray(dataset[split]) for split in splits])
+        return cls.build(quads, dataset.num_entities, dataset.num_relations, inverse, {'splits': splits})
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+        # meta.json is written last: its presence marks a complete index
+        tmp_path = os.path.join(directory, 'meta.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(tmp_path, os.path.join(directory, 'meta.json'))
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Open a saved index; with `mmap` the arrays are read-only views shared through the page cache."""
+        with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != INDEX_VERSION:
+            raise ValueError(f"{directory}: unsupported index version {meta.get('version')}")
+        mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mode) for name in ARRAYS}
+        return cls(arrays, meta)
+
+    def snapshot(self, t):
+        start, end = self._time_offsets[t], self._time_offsets[t + 1]
+        node_start, node_end = self._node_offsets[t], self._node_offsets[t + 1]
+        return Snapshot(t, self.src[start:end], self.rel[start:end], self.dst[start:end],
+                        self.nodes[node_start:node_end], self.node_ptr[node_start:node_end + 1] - start)
+
+    def snapshot_csr(self, t):
+        """Snapshot `t` as an (entities x entities) CSR matrix with relation ids as data (parallel edges kept)."""
+        snapshot = self.snapshot(t)
+        indptr = np.searchsorted(snapshot.src, np.arange(self.num_entities + 1))
+        return sp.csr_matrix((snapshot.rel, snapshot.dst, indptr), shape=(self.num_entities, self.num_entities))
+
+    def pair_id(self, s, r):
+        """Row of (s, r) in the history store / history matrices, or -1 if the pair never occurs."""
+        key = int(s) * self.num_relations + int(r)
+        i = int(self.pair_keys.searchsorted(key))
+        return i if i < len(self.pair_keys) and self.pair_keys[i] == key else -1
+
+    def history(self, s, r, t, k=None):
+        """`(objects, times)` of (s, r) in timestamps `[t - k, t)` (all earlier timestamps when `k` is None)."""
+        i = self.pair_id(s, r)
+        if i < 0:
+            return self.history_dst[:0], self.history_time[:0]
+        start, end = self.pair_offsets[i:i + 2].tolist()
+        times = self.history_time[start:end]
+        lo, hi = times.searchsorted((0 if k is None else t - k, t)).tolist()
+        return self.history_dst[start + lo:start + hi], times[lo:hi]
+
+    def history_matrix(self, t, k=None):
+        """
+        History vocabulary of window `[t - k, t)`: a (pairs x entities) CSR
+        matrix counting how often each object followed each (s, r) pair.
+        """
+        start = self._time_offsets[0 if k is None else max(0, t - k)]
+        end = self._time_offsets[min(t, self.num_timestamps)]
+        pair, dst = self.pair[start:end], self.dst[start:end]
+        counts = sp.csr_matrix((np.ones(len(pair), dtype=np.float32), (pair, dst)),
+                               shape=(len(self.pair_keys), self.num_entities))
+        counts.sum_duplicates()
+        return counts
+
+
+def source_fingerprint(directory):
+    """Hash of the sizes and modification times of the dataset files (invalidates a stale cache)."""
+    h = hashlib.blake2b(digest_size=16)
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            h.update(f'{name}:{stat.st_size}:{stat.st_mtime_ns}'.encode('utf-8'))
+    return h.hexdigest()
+
+
+def load_or_build(source, cache_dir, splits=SPLITS, inverse=True):
+    """
+    Cached GraphIndex for `source` (a text-layout or binary-layout dataset
+    directory): loaded with mmap from `cache_dir` when it matches the
+    source, otherwise built and saved there first.
+    """
+    fingerprint = source_fingerprint(source)
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if (meta.get('version') == INDEX_VERSION and meta.get('source') == fingerprint
+                and meta.get('splits') == list(splits) and meta.get('inverse') == inverse):
+            return GraphIndex.load(cache_dir)
+    binary = os.path.exists(os.path.join(source, 'meta.json'))
+    dataset = load_dataset(source) if binary else load_text(source, splits)
+    index = GraphIndex.from_dataset(dataset, splits, inverse)
+    index.meta['source'] = fingerprint
+    index.save(cache_dir)
+    return GraphIndex.load(cache_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the snapshot / history index of a quadruple dataset')
+    parser.add_argument('source', help='data/IndovestDKG (text layout) or a kgprep.dataset binary directory')
+    parser.add_argument('cache', help='index directory')
+    parser.add_argument('--splits', nargs='+', default=list(SPLITS))
+    parser.add_argument('--no-inverse', action='store_true', help='do not add inverse relations')
+    args = parser.parse_args()
+
+    index = load_or_build(args.source, args.cache, args.splits, not args.no_inverse)
+    print(json.dumps(index.meta, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+"""
+Out-of-core temporal splits of encoded quadruples, exported in every layout at once.
+
+`split.ipynb` loads the whole encoded CSV, sorts it, cuts it by row ratio
+(so one `temporal_id` can straddle train and valid), writes the CSVs with
+pandas and re-reads them for the text export. Here the input is read in
+chunks twice and never held in memory:
+
+1. a histogram over `temporal_id` (one column only) gives the rows per
+   timestamp, and every cut point is placed on a timestamp boundary;
+2. a counting sort places each chunk's rows at their final position in a
+   time-sorted scratch `.npy` (memory-mapped), so any split of any scheme
+   is a contiguous row range of it.
+
+The ratio split, rolling windows and forward-chaining k-fold splits are all
+planned from the same histogram, and their CSV / text / binary outputs are
+written from the scratch array by a pool of worker processes in bounded
+chunks. Each plan directory mirrors `splited/`: `{split}.csv`,
+`final_txt_format/` and `final_binary_format/` (the `kgprep.dataset`
+layout).
+
+    python -m kgprep.splitting norm_IndovestDKG_encoded_indovest.csv splited --rolling 156 13 13 26 --kfold 4
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from kgprep.dataset import QUAD_DTYPE, QuadrupleDataset, StringTable, export_binary, separator, write_id_map
+from kgprep.encoding import QUAD_COLUMNS
+
+FORMATS = ('csv', 'txt', 'binary')
+SPLIT_NAMES = ('train', 'valid', 'test')
+CHUNK_ROWS = 1 << 20
+SCRATCH = '.sorted_quads.npy'
+
+
+def _read_chunks(path, chunksize, usecols=None):
+    """Chunks of an encoded CSV (QUAD_COLUMNS header) or a headerless whitespace `s r o t` file."""
+    if path.endswith('.csv'):
+        columns = QUAD_COLUMNS if usecols is None else [QUAD_COLUMNS[i] for i in usecols]
+        return pd.read_csv(path, usecols=columns, dtype=np.int64, chunksize=chunksize)
+    return pd.read_csv(path, sep=r'\s+', header=None, usecols=usecols or [0, 1, 2, 3], dtype=np.int64,
+                       chunksize=chunksize, engine='c')
+
+
+def timestamp_counts(path, chunksize=CHUNK_ROWS):
+    """Rows per `temporal_id` (index = id), reading only the temporal column."""
+    counts = np.zeros(0, dtype=np.int64)
+    for chunk in _read_chunks(path, chunksize, usecols=[3]):
+        t = chunk.to_numpy().ravel()
+        if len(t) and t.min() < 0:
+            raise ValueError(f'{path}: negative temporal_id')
+        chunk_counts = np.bincount(t)
+        if len(chunk_counts) > len(counts):
+            counts = np.pad(counts, (0, len(chunk_counts) - len(counts)))
+        counts[:len(chunk_counts)] += chunk_counts
+    return counts
+
+
+def ratio_cuts(counts, ratios=(0.8, 0.1, 0.1)):
+    """
+    Timestamp boundaries `[t0, ..., tk]` of consecutive splits with row
+    shares closest to `ratios` (normalized); no timestamp is cut in two.
+    """
+    ratios = np.asarray(ratios, dtype=np.float64)
+    if (ratios < 0).any() or ratios.sum() <= 0:
+        raise ValueError('ratios must be non-negative with a positive sum')
+    active = np.flatnonzero(counts)
+    if not len(active):
+        return [0] * (len(ratios) + 1)
+    first, last = int(active[0]), int(active[-1]) + 1
+    # rows_before[i] = rows with temporal_id < first + i, for every candidate boundary
+    rows_before = np.r_[0, np.cumsum(counts[first:last])]
+    targets = np.cumsum(ratios / ratios.sum())[:-1] * rows_before[-1]
+    cuts = [first]
+    for target in targets:
+        candidate = int(np.argmin(np.abs(rows_before - target)))
+        cuts.append(max(first + candidate, cuts[-1]))
+    cuts.append(last)
+    return cuts
+
+
+def ratio_plan(counts, ratios=(0.8, 0.1, 0.1)):
+    cuts = ratio_cuts(counts, ratios)
+    return {name: (cuts[i], cuts[i + 1]) for i, name in enumerate(SPLIT_NAMES)}
+
+
+def rolling_plans(counts, train, valid, test, step=None):
+    """
+    Sliding windows of `train` / `valid` / `test` timestamps, advanced by
+    `step` (default `test`) until the test span passes the last timestamp.
+    """
+    step = step or test
+    active = np.flatnonzero(counts)
+    if not len(active):
+        return {}
+    first, last = int(active[0]), int(active[-1]) + 1
+    plans = {}
+    start = first
+    while start + train + valid + test <= last:
+        edges = np.cumsum([start, train, valid, test]).tolist()
+        plans[f'window_{len(plans):02d}'] = {name: (edges[i], edges[i + 1]) for i, name in enumerate(SPLIT_NAMES)}
+        start += step
+    return plans
+
+
+def kfold_plans(counts, k):
+    """
+    Forward-chaining temporal k-fold: the timestamps are cut into `k + 2`
+    blocks of about equal rows; fold i trains on blocks `0..i` and
+    validates / tests on blocks `i + 1` / `i + 2`.
+    """
+    cuts = ratio_cuts(counts, np.ones(k + 2))
+    return {f'fold_{i}': {'train': (cuts[0], cuts[i + 1]), 'valid': (cuts[i + 1], cuts[i + 2]),
+                          'test': (cuts[i + 2], cuts[i + 3])} for i in range(k)}
+
+
+def sort_by_time(path, counts, scratch_path, chunksize=CHUNK_ROWS):
+    """
+    Stable counting sort of the quadruples by `temporal_id` into an (n, 4)
+    int32 `.npy` at `scratch_path`, one chunk in memory at a time. Returns
+    the row offset of every timestamp (`offsets[t]:offsets[t + 1]`).
+    """
+    offsets = np.r_[0, np.cumsum(counts)].astype(np.int64)
+    quads = np.lib.format.open_memmap(scratch_path, mode='w+', dtype=QUAD_DTYPE, shape=(int(offsets[-1]), 4))
+    cursor = offsets[:-1].copy()
+    for chunk in _read_chunks(path, chunksize):
+        chunk = chunk.to_numpy()
+        if len(chunk) and chunk.max() > np.iinfo(QUAD_DTYPE).max:
+            raise ValueError(f'{path}: ids do not fit in int32')
+        t = chunk[:, 3]
+        order = np.argsort(t, kind='stable')
+        sorted_t = t[order]
+        # Rank of each row among the rows of its timestamp in this chunk
+        group_start = np.searchsorted(sorted_t, sorted_t, side='left')
+        quads[cursor[sorted_t] + np.arange(len(order)) - group_start] = chunk[order]
+        cursor += np.bincount(t, minlength=len(cursor))
+    quads.flush()
+    del quads
+    return offsets
+
+
+def _write_text(scratch_path, start, end, targets, chunk_rows):
+    """Write rows `[start, end)` to every `(path, sep, header)` target; each chunk is formatted once."""
+    quads = np.load(scratch_path, mmap_mode='r')
+    files = [open(path, 'w', encoding='utf-8', newline='') for path, _, _ in targets]
+    try:
+        for f, (_, sep, header) in zip(files, targets):
+            if header:
+                f.write(sep.join(QUAD_COLUMNS) + '\n')
+        for chunk_start in range(start, end, chunk_rows):
+            chunk = quads[chunk_start:min(end, chunk_start + chunk_rows)]
+            text = pd.DataFrame(chunk).to_csv(header=False, index=False)
+            for f, (_, sep, _) in zip(files, targets):
+                f.write(text if sep == ',' else text.replace(',', sep))
+    finally:
+        for f in files:
+            f.close()
+    return [path for path, _, _ in targets]
+
+
+def _write_binary(scratch_path, ranges, directory, entities, relations):
+    quads = np.load(scratch_path, mmap_mode='r')
+    splits = {name: quads[start:end] for name, (start, end) in ranges.items()}
+    entities = entities if entities is not None else StringTable.from_names([])
+    relations = relations if relations is not None else StringTable.from_names([])
+    export_binary(QuadrupleDataset(splits, entities, relations), directory)
+    return directory
+
+
+def read_vocabulary(path, name_column, id_column):
+    """Names in id order from a `StableEncoder` / `prep.ipynb` vocabulary CSV."""
+    table = pd.read_csv(path, keep_default_na=False).drop_duplicates(id_column).sort_values(id_column)
+    ids = table[id_column].to_numpy()
+    if not np.array_equal(ids, np.arange(len(ids))):
+        raise ValueError(f'{path}: ids are not 0..{len(ids) - 1}')
+    return table[name_column].astype(str).tolist()
+
+
+def split_and_export(source, output, ratios=(0.8, 0.1, 0.1), rolling=None, kfold=None, formats=FORMATS,
+                     sep=' ', entities=None, relations=None, workers=None, chunksize=CHUNK_ROWS):
+    """
+    Plan and write every requested split of `source` under `output`.
+
+    `ratios` (or None) is the main split, written to `output` itself;
+    `rolling=(train, valid, test, step)` windows go to `output/rolling/window_XX`
+    and `kfold=k` folds to `output/kfold/fold_i`. `entities` / `relations`
+    are name lists in id order (see `read_vocabulary`); they are written as
+    `entity2id.txt` / `relation2id.txt` and into the binary string tables.
+    Returns the plan summary, also saved as `output/splits.json` (last).
+    """
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        raise ValueError(f'unknown formats: {sorted(unknown)}')
+    counts = timestamp_counts(source, chunksize)
+    plans = {}
+    if ratios is not None:
+        plans['.'] = ratio_plan(counts, ratios)
+    if rolling:
+        plans.update({os.path.join('rolling', name): plan for name, plan in rolling_plans(counts, *rolling).items()})
+    if kfold:
+        plans.update({os.path.join('kfold', name): plan for name, plan in kfold_plans(counts, kfold).items()})
+
+    os.makedirs(output, exist_ok=True)
+    scratch_path = os.path.join(output, SCRATCH)
+    offsets = sort_by_time(source, counts, scratch_path, chunksize)
+    entity_table = StringTable.from_names(entities) if entities is not None else None
+    relation_table = StringTable.from_names(relations) if relations is not None else None
+
+    tasks, summary = [], {'source': os.path.abspath(source), 'rows': int(offsets[-1]), 'plans': {}}
+    for name, plan in plans.items():
+        directory = os.path.normpath(os.path.join(output, name))
+        text_dir = os.path.join(directory, 'final_txt_format')
+        os.makedirs(text_dir if 'txt' in formats else directory, exist_ok=True)
+        ranges = {split: (int(offsets[t0]), int(offsets[t1])) for split, (t0, t1) in plan.items()}
+        summary['plans'][name] = {split: {'temporal_ids': [int(t0), int(t1)],
+                                          'rows': ranges[split][1] - ranges[split][0]}
+                                  for split, (t0, t1) in plan.items()}
+        for split, (start, end) in ranges.items():
+            targets = []
+            if 'csv' in formats:
+                targets.append((os.path.join(directory, f'{split}.csv'), ',', True))
+            if 'txt' in formats:
+                targets.append((os.path.join(text_dir, f'{split}.txt'), sep, False))
+            if targets:
+                tasks.append((_write_text, scratch_path, start, end, targets, CHUNK_ROWS))
+        if 'txt' in formats:
+            if entities is not None:
+                write_id_map(entities, os.path.join(text_dir, 'entity2id.txt'))
+            if relations is not None:
+                write_id_map(relations, os.path.join(text_dir, 'relation2id.txt'))
+        if 'binary' in formats:
+            tasks.append((_write_binary, scratch_path, ranges, os.path.join(directory, 'final_binary_format'),
+                          entity_table, relation_table))
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            for future in [pool.submit(*task) for task in tasks]:
+                future.result()
+    else:
+        for task in tasks:
+            task[0](*task[1:])
+    os.remove(scratch_path)
+
+    # splits.json is written last: its presence marks a complete export
+    tmp_path = os.path.join(output, 'splits.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    os.replace(tmp_path, os.path.join(output, 'splits.json'))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Timestamp-aligned, out-of-core temporal split and export')
+    parser.add_argument('source', help='encoded quadruple CSV (subject_entity_id, relation_id, object_entity_id, '
+                                       'temporal_id) or a whitespace-separated s r o t file')
+    parser.add_argument('output', help='output directory (the splited/ layout)')
+    parser.add_argument('--ratios', type=float, nargs=3, default=[0.8, 0.1, 0.1], metavar=('TRAIN', 'VALID', 'TEST'))
+    parser.add_argument('--no-ratio-split', action='store_true', help='only write rolling / k-fold splits')
+    parser.add_argument('--rolling', type=int, nargs=4, metavar=('TRAIN', 'VALID', 'TEST', 'STEP'),
+                        help='rolling windows, in timestamps')
+    parser.add_argument('--kfold', type=int, help='forward-chaining temporal folds')
+    parser.add_argument('--formats', nargs='+', default=list(FORMATS), choices=FORMATS)
+    parser.add_argument('--sep', type=separator, default=' ',
+                        help="text layout separator, escapes decoded (data/IndovestDKG uses '\\t' or tab)")
+    parser.add_argument('--entities', help='entity vocabulary CSV (default: *_encoded_entity_id.csv next to source)')
+    parser.add_argument('--relations', help='relation vocabulary CSV (default: *_relation_id.csv next to source)')
+    parser.add_argument('--workers', type=int, help='writer processes (default: CPU count)')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    directory = os.path.dirname(os.path.abspath(args.source))
+    prefix = os.path.basename(args.source).split('_encoded_')[0]
+    entity_path = args.entities or os.path.join(directory, f'{prefix}_encoded_entity_id.csv')
+    relation_path = args.relations or os.path.join(directory, f'{prefix}_relation_id.csv')
+    entities = read_vocabulary(entity_path, 'entity_name', 'entity_id') if os.path.exists(entity_path) else None
+    relations = read_vocabulary(relation_path, 'relation', 'relation_id') if os.path.exists(relation_path) else None
+
+    summary = split_and_export(args.source, args.output, None if args.no_ratio_split else args.ratios,
+                               args.rolling, args.kfold, args.formats, args.sep, entities, relations,
+                               args.workers, args.chunksize)
+    for name, plan in summary['plans'].items():
+        print(name, ', '.join(f"{split} {info['rows']} rows t[{info['temporal_ids'][0]}, {info['temporal_ids'][1]})"
+                              for split, info in plan.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The pipeline packages are imported from their own directories, as the scripts and kgprep.cli do
+for directory in ("data/preparation", "construction/LLM", "construction/news-scrap", "bench"):
+    path = os.path.join(ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
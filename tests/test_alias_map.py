@@ -0,0 +1,60 @@
+import json
+import pytest
+from kgprep.alias_map import AliasMap, compile_alias_map, load_updates, normalize_jsonl
+
+
+def update(canonical, *aliases, timestamp=None, kind='update'):
+    return {'timestamp': timestamp, 'type': kind, 'canonical_name': canonical, 'entities_updated': list(aliases)}
+
+
+def test_chains_resolve_to_the_latest_canonical():
+    mapping = compile_alias_map([
+        update('Bank Central Asia', 'BCA', 'bank BCA'),
+        update('PT Bank Central Asia Tbk', 'bank central asia'),
+    ])
+    # Aliases of a renamed canonical follow it, and the old canonical becomes an alias too
+    assert mapping == {'bca': 'PT Bank Central Asia Tbk', 'bank bca': 'PT Bank Central Asia Tbk',
+                       'bank central asia': 'PT Bank Central Asia Tbk'}
+    # Naming an alias as canonical makes it a root again; no alias maps to another alias
+    mapping = compile_alias_map([update('bca', 'BCA Syariah')], base=mapping)
+    assert mapping['bca syariah'] == 'bca' and 'bca' not in mapping
+    assert not set(map(str.casefold, mapping.values())) & set(mapping)
+
+
+def test_log_sections_are_merged_in_timestamp_order(tmp_path):
+    path = tmp_path / 'entity_normalization_log.json'
+    path.write_text(json.dumps({
+        'general_updates': [update('Telkom', 'telkom indonesia', timestamp='2024-02-01T00:00:00'),
+                            update('dropped', 'x', timestamp='2024-01-01T00:00:00', kind='delete')],
+        # Older logs stored the records and their lists with str()
+        'specific_updates': [str(dict(update('Telkom Indonesia', timestamp='2024-01-01T00:00:00'),
+                                      entities_updated=str(['PT Telkom'])))],
+    }), encoding='utf-8')
+    updates = load_updates(str(path))
+    assert [u['canonical_name'] for u in updates] == ['Telkom Indonesia', 'Telkom']
+    assert compile_alias_map(updates) == {'pt telkom': 'Telkom', 'telkom indonesia': 'Telkom'}
+
+
+@pytest.mark.parametrize('fold', [True, False])
+def test_file_round_trip(tmp_path, fold):
+    updates = [update(f'Canonical {i}', *(f'Alias {i}-{j}' for j in range(i % 4 + 1))) for i in range(300)]
+    mapping = compile_alias_map(updates, fold=fold)
+    with AliasMap.build(mapping, str(tmp_path / 'aliases.amap'), fold=fold) as alias_map:
+        assert len(alias_map) == len(mapping) and alias_map.to_dict() == mapping
+        names = ['Alias 7-3', 'alias  7-3 ', 'Canonical 7', 'canonical 7', 'unknown', None]
+        expected = (['Canonical 7'] * 4 if fold else ['Canonical 7', 'alias  7-3 ', 'Canonical 7', 'canonical 7'])
+        assert alias_map.resolve_many(names) == expected + ['unknown', None]
+        assert [alias_map.resolve(name) for name in names[:5]] == expected + ['unknown']
+        assert ('Alias 7-3' in alias_map) and ('unknown' not in alias_map)
+
+
+def test_normalize_jsonl_counts_changed_names(tmp_path):
+    alias_map = AliasMap.build(compile_alias_map([update('Bank Indonesia', 'BI')]), str(tmp_path / 'a.amap'))
+    source, destination = tmp_path / 'in.jsonl', tmp_path / 'out.jsonl'
+    records = [{'subject': 'bi', 'object': 'BI rate'}, {'error': 'parsing error'}, {'subject': 'BI', 'object': 'BI'}]
+    source.write_text(''.join(json.dumps(r) + '\n' for r in records), encoding='utf-8')
+    assert normalize_jsonl(str(source), str(destination), alias_map, batch_size=2) == (3, 3)
+    lines = [json.loads(line) for line in destination.read_text(encoding='utf-8').splitlines()]
+    assert lines == [{'subject': 'Bank Indonesia', 'object': 'BI rate'}, {'error': 'parsing error'},
+                     {'subject': 'Bank Indonesia', 'object': 'Bank Indonesia'}]
+    alias_map.close()
@@ -0,0 +1,70 @@
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+from kgprep.analytics import IncidenceGraph, parse_dates, run_lengths, sparsity_report
+
+
+def test_parse_dates_retries_mixed_formats_and_counts_errors():
+    dates, errors = parse_dates(['2024-01-02', '2024-01-05 10:30:00', 'kemarin', None, '03/01/2024'])
+    assert errors == 1
+    assert dates.isna().tolist() == [False, False, True, True, False]
+    assert dates[1] == pd.Timestamp('2024-01-05 10:30:00')
+
+
+def test_run_lengths():
+    assert run_lengths([True, True, False, True, False, False, True, True, True]).tolist() == [2, 1, 3]
+    assert run_lengths([False, False]).tolist() == []
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'subject': ['bca', 'bca', 'bri', 'ojk', 'bca', 'telkom'],
+        'relation': ['MEMBELI', 'MENJUAL', 'MEMBELI', 'MENGATUR', 'MEMBELI', 'MENJUAL'],
+        'object': ['bri', 'saham', 'saham', 'bca', 'bca', 'indosat'],
+        'date': ['2024-01-01', '2024-01-03', '2024-01-03', '2024-01-08', 'kemarin', '2024-01-02'],
+    })
+
+
+def test_frame_statistics(frame):
+    graph = IncidenceGraph.from_frame(frame)
+    ids = {name: i for i, name in enumerate(graph.entities)}
+
+    def per_entity(values):
+        return {name: int(values[i]) for name, i in ids.items()}
+
+    assert per_entity(graph.degrees()) == {'bca': 5, 'bri': 2, 'ojk': 1, 'saham': 2, 'telkom': 1, 'indosat': 1}
+    # The self-loop bca -> bca counts twice in the degree but once as a quadruple and as a neighbour
+    assert per_entity(graph.occurrences())['bca'] == 4
+    assert per_entity(graph.neighbor_counts())['bca'] == 4
+    assert per_entity(graph.relation_diversity())['bca'] == 3
+    count, labels, sizes = graph.components()
+    assert count == 2 and sorted(sizes.tolist()) == [2, 4]
+    assert labels[ids['telkom']] == labels[ids['indosat']] != labels[ids['bca']]
+    # Days 2024-01-01 .. 2024-01-08; the unparseable date stays out of the time statistics
+    assert graph.time_counts().tolist() == [1, 1, 2, 0, 0, 0, 0, 1]
+    assert graph.gaps().tolist() == [4]
+    assert per_entity(graph.entity_spans()) == {'bca': 7, 'bri': 2, 'ojk': 0, 'saham': 0, 'telkom': 0, 'indosat': 0}
+    relation_spans = dict(zip(graph.relations, graph.relation_spans().tolist()))
+    assert relation_spans == {'MEMBELI': 2, 'MENJUAL': 1, 'MENGATUR': 0}
+    report = sparsity_report(graph, top=2)
+    assert report['overall']['entity_pairs'] == 6
+    assert report['temporal']['max_gap_length'] == 4
+    assert report['connectivity']['high_diversity_entities'][0] == ['bca', 3]
+
+
+def test_clustering_matches_triangle_count():
+    rng = np.random.default_rng(2)
+    n = 15
+    quads = np.stack([rng.integers(0, n, 60), np.zeros(60, dtype=int), rng.integers(0, n, 60), np.zeros(60, dtype=int)],
+                     axis=1)
+    graph = IncidenceGraph.from_quads(quads, n, 1)
+    edges = {frozenset((s, o)) for s, _, o, _ in quads.tolist() if s != o}
+    neighbours = {v: {u for edge in edges if v in edge for u in edge if u != v} for v in range(n)}
+    expected = []
+    for v in range(n):
+        d = len(neighbours[v])
+        links = sum(frozenset(pair) in edges for pair in itertools.combinations(neighbours[v], 2))
+        expected.append(2 * links / (d * (d - 1)) if d > 1 else 0.0)
+    assert np.allclose(graph.clustering(block_rows=4), expected)
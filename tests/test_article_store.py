@@ -0,0 +1,52 @@
+import pandas as pd
+from modules.article_store import ArticleStore, open_store
+
+
+def article(link, isi="isi", tanggal="2024-01-01"):
+    return {"tanggal": tanggal, "judul": f"judul {link}", "link": link, "isi": isi}
+
+
+def test_upsert_keeps_one_row_per_link_in_first_seen_order(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.sqlite"), batch_size=2)
+    store.add(article("a", "error"))
+    assert len(store) == 0  # Still buffered
+    store.add(article("b"))
+    assert len(store) == 2
+    store.upsert_many([article("a", "isi baru"), article("c")])
+    store.add(article("b", "isi b2"))
+    store.flush()
+    assert list(store.iter_links()) == ["a", "b", "c"]
+    assert [row[3] for row in store.iter_articles()] == ["isi baru", "isi b2", "isi"]
+    store.close()
+
+
+def test_missing_links_and_has_article(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.sqlite"))
+    links = [f"https://news.test/{i}" for i in range(2000)]
+    store.upsert_many([article(link) for link in links[::3]])
+    store.upsert_many([article("https://news.test/1", "error"), article("https://news.test/2", "")])
+    known = set(links[::3]) | {"https://news.test/1", "https://news.test/2"}
+    # Queried in chunks of 900 links, input order preserved
+    assert store.missing_links(reversed(links)) == [link for link in reversed(links) if link not in known]
+    assert "https://news.test/1" in store and not store.has_article("https://news.test/1")
+    assert not store.has_article("https://news.test/2") and store.has_article("https://news.test/3")
+    store.close()
+
+
+def test_legacy_csv_is_imported_once_and_exported_back(tmp_path):
+    csv_path = tmp_path / "kompas.csv"
+    pd.DataFrame([article("a", 'isi; dengan "kutipan"\nbaris dua'), article("b", None)]).to_csv(
+        csv_path, sep=";", index=False)
+    store = open_store(str(csv_path))
+    assert list(store.iter_links()) == ["a", "b"] and not store.has_article("b")
+    store.add(article("c"))
+    store.export_csv(str(csv_path))
+    store.close()
+
+    exported = pd.read_csv(csv_path, sep=";")
+    assert exported["link"].tolist() == ["a", "b", "c"]
+    assert exported["isi"][0] == 'isi; dengan "kutipan"\nbaris dua' and pd.isna(exported["isi"][1])
+    # The store already exists: the CSV is not imported a second time
+    store = open_store(str(csv_path))
+    assert len(store) == 3
+    store.close()
@@ -0,0 +1,111 @@
+import asyncio
+import httpx
+import pytest
+from modules.article_store import ArticleStore
+from modules.crawl_engine import CrawlEngine
+from modules.response_cache import CachedResponse, ResponseCache
+
+
+class FakeSite:
+    def __init__(self, bad=()):
+        self.bad = set(bad)
+        self.parsed = []
+
+    def index_url(self, page):
+        return f"index/{page}"
+
+    def parse_index(self, text):
+        return text.split()
+
+    def parse_article(self, data, link):
+        self.parsed.append(link)
+        if link in self.bad:
+            raise ValueError(f"unexpected layout: {link}")
+        return {"tanggal": "2024-01-01", "judul": link, "link": link, "isi": data.decode()}
+
+    def failed_article(self, link):
+        return {"tanggal": "error", "judul": "error", "link": link, "isi": "error"}
+
+
+class OfflineEngine(CrawlEngine):
+    async def fetch_page(self, url):
+        if url.startswith("index/"):
+            page = int(url.split("/")[1])
+            body = " ".join(f"a{page}-{i}" for i in range(10))
+        else:
+            body = f"isi {url}"
+        return CachedResponse(url, body.encode(), "utf-8")
+
+
+def run(coroutine, timeout=10):
+    return asyncio.run(asyncio.wait_for(coroutine, timeout))
+
+
+def test_article_errors_are_recorded_as_failed():
+    site = FakeSite(bad={"a1-3", "a2-5"})
+    stored = []
+
+    def on_article(news):
+        if news["link"] == "a1-7":
+            raise OSError("disk full")
+        stored.append(news["link"])
+
+    engine = OfflineEngine(article_workers=2, queue_size=2)
+    results = run(engine.crawl(site, 1, 3, on_article))
+    assert len(results) == 30
+    failed = {news["link"] for news in results if news["isi"] == "error"}
+    assert failed == {"a1-3", "a2-5", "a1-7"}
+    assert len(stored) == 29
+
+
+def test_fatal_worker_error_is_raised_not_hung():
+    class BrokenKnown(set):
+        def remember(self, link):
+            raise RuntimeError("store closed")
+
+    # With the workers dead the producer would block on the full queue forever
+    engine = OfflineEngine(article_workers=2, queue_size=1)
+    with pytest.raises(RuntimeError, match="store closed"):
+        run(engine.crawl(FakeSite(), 1, 20, known=BrokenKnown()))
+
+
+def conditional_server(request):
+    # Every article has ETag "v1"; a request that already carries it is answered 304 without a body
+    if request.headers.get("If-None-Match") == '"v1"':
+        return httpx.Response(304, headers={"ETag": '"v1"'})
+    return httpx.Response(200, content=f"isi {request.url.path}".encode(), headers={"ETag": '"v1"'})
+
+
+async def fetch_with(engine, site, links, on_article):
+    engine.client = httpx.AsyncClient(transport=httpx.MockTransport(conditional_server))
+    try:
+        return await engine.fetch_articles(site, links, on_article)
+    finally:
+        await engine.client.aclose()
+
+
+def test_not_modified_stored_article_is_not_parsed(tmp_path):
+    links = ["https://news.test/ok", "https://news.test/broken"]
+    cache = ResponseCache(str(tmp_path / "http_cache.sqlite"))
+    store = ArticleStore(str(tmp_path / "articles.sqlite"))
+
+    first = FakeSite(bad={links[1]})
+    run(fetch_with(CrawlEngine(cache=cache, skip_unchanged=store.has_article), first, links, store.add))
+    store.flush()
+    assert sorted(first.parsed) == sorted(links)
+    assert store.has_article(links[0]) and not store.has_article(links[1])
+
+    # Both answers are 304 now: only the article whose stored copy failed is parsed again
+    second = FakeSite()
+    results = run(fetch_with(CrawlEngine(cache=cache, skip_unchanged=store.has_article), second, links, store.add))
+    store.flush()
+    assert second.parsed == [links[1]]
+    assert [news["link"] for news in results] == [links[1]]
+    assert store.has_article(links[1])
+
+    # Without the skip a 304 is still parsed from the cached body
+    third = FakeSite()
+    run(fetch_with(CrawlEngine(cache=cache), third, links, None))
+    assert sorted(third.parsed) == sorted(links)
+    cache.close()
+    store.close()
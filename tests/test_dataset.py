@@ -0,0 +1,23 @@
+import numpy as np
+from kgprep.dataset import export_binary, export_text, load_text, separator, write_id_map, write_quads
+
+
+def test_separator_decodes_shell_escapes():
+    assert separator('\\t') == '\t'
+    assert separator('tab') == '\t'
+    assert separator(' ') == ' '
+    assert separator(',') == ','
+
+
+def test_text_round_trip(tmp_path):
+    source, destination = tmp_path / 'source', tmp_path / 'destination'
+    source.mkdir()
+    write_id_map(['bank indonesia', 'pt astra'], str(source / 'entity2id.txt'))
+    write_id_map(['BerinvestasiDi'], str(source / 'relation2id.txt'))
+    quads = np.array([[0, 0, 1, 0], [1, 0, 0, 3]])
+    for split in ('train', 'valid', 'test'):
+        write_quads(quads, str(source / f'{split}.txt'))
+    export_binary(str(source), str(tmp_path / 'binary'))
+    export_text(str(tmp_path / 'binary'), str(destination), separator('\\t'))
+    assert (destination / 'train.txt').read_text().splitlines() == ['0\t0\t1\t0', '1\t0\t0\t3']
+    assert np.array_equal(load_text(str(destination))['test'], quads)
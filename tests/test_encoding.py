@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from kgprep.encoding import StableEncoder
+
+
+def test_temporal_ids_are_weeks_from_the_epoch(tmp_path):
+    encoder = StableEncoder(str(tmp_path), epoch='2024-01-01')
+    assert np.array_equal(encoder.temporal_ids(['2024-01-01', '2024-01-07', '2024-01-08']), [0, 0, 1])
+
+
+def test_unparseable_dates_are_reported_by_row(tmp_path):
+    encoder = StableEncoder(str(tmp_path), epoch='2024-01-01')
+    with pytest.raises(ValueError, match=r"2 missing or unparseable dates .*1: '', 3: 'kemarin'"):
+        encoder.temporal_ids(['2024-01-01', '', '2024-02-01', 'kemarin'])
+    with pytest.raises(ValueError, match=r"before the encoder epoch 2024-01-01 .*0: '2023-12-31'"):
+        encoder.temporal_ids(['2023-12-31', '2024-02-01'])
+
+
+def write_quadruples(path, rows):
+    columns = ['subject', 'subject_type', 'relation', 'object', 'object_type', 'date']
+    pd.DataFrame(rows, columns=columns).to_csv(path, index=False)
+
+
+def test_reopened_state_keeps_ids_and_appends(tmp_path):
+    first, second = tmp_path / 'first.csv', tmp_path / 'second.csv'
+    write_quadruples(first, [['bank indonesia', 'Institusi', 'Mengendalikan', 'bi rate', 'Indikator', '2024-01-02']])
+    write_quadruples(second, [['pt astra', 'Perusahaan', 'BerinvestasiDi', 'bank indonesia', 'Institusi',
+                               '2024-01-09']])
+    state = tmp_path / 'state'
+    StableEncoder(str(state), epoch='2024-01-01').encode_csv(str(first))
+    encoder = StableEncoder(str(state))
+    assert str(encoder.epoch) == '2024-01-01'
+    encoder.encode_csv(str(second))
+    encoded = pd.read_csv(state / 'norm_IndovestDKG_encoded_indovest.csv')
+    assert encoded.values.tolist() == [[0, 0, 1, 0], [2, 1, 0, 1]]
+
+
+def test_legacy_notebook_directory_is_refused(tmp_path):
+    # prep.ipynb output: vocabularies and weeks-back encoded quadruples, no _encoder.json
+    pd.DataFrame({'entity_name': ['ihsg'], 'entity_id': [0], 'relation': ['Indikator'], 'relation_id': [0]}).to_csv(
+        tmp_path / 'norm_IndovestDKG_encoded_entity_id.csv', index=False)
+    pd.DataFrame({'relation': ['Naik'], 'relation_id': [0]}).to_csv(
+        tmp_path / 'norm_IndovestDKG_relation_id.csv', index=False)
+    with pytest.raises(ValueError, match='no norm_IndovestDKG_encoder.json'):
+        StableEncoder(str(tmp_path))
+    assert not (tmp_path / 'norm_IndovestDKG_encoder.json').exists()
@@ -0,0 +1,53 @@
+import random
+from difflib import SequenceMatcher
+from kgprep.entity_matching import EntityMatcher, core_org_name, core_person_name, similar_pairs
+
+WORDS = 'bank mandiri central asia rakyat negara indonesia telkom astra adaro energi pertamina garuda semen'.split()
+
+
+def vocabulary(count, seed=0):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        name = ' '.join(rng.sample(WORDS, rng.randint(1, 3)))
+        if rng.random() < 0.5:
+            i = rng.randrange(len(name))
+            name = name[:i] + rng.choice('aeiouxyz') + name[i + 1:]
+        names.add(name)
+    return sorted(names)
+
+
+def test_similar_pairs_agree_with_all_pairs_sequence_matcher():
+    names = vocabulary(150)
+    expected = {(a, b) for i, a in enumerate(names) for b in names[i + 1:]
+                if SequenceMatcher(None, a, b).ratio() > 0.8}
+    found = similar_pairs(names, 0.8)
+    pairs = {tuple(sorted(pair[:2])) for pair in found}
+    # Blocking may miss a few pairs, but never accepts one the all-pairs loop would reject
+    assert pairs <= expected
+    assert len(pairs) >= 0.8 * len(expected)
+    assert all(ratio == SequenceMatcher(None, a, b).ratio() for a, b, ratio in found)
+    assert [ratio for _, _, ratio in found] == sorted((ratio for _, _, ratio in found), reverse=True)
+
+
+def test_core_names_drop_titles_and_legal_forms():
+    assert core_person_name('Dr. Sri Mulyani S.E.') == 'sri mulyani'
+    assert core_org_name('PT Bank Mandiri (Persero) Tbk') == 'bank mandiri'
+
+
+def test_organization_rules_group_legal_forms_and_acronyms():
+    matcher = EntityMatcher('organizations')
+    groups = matcher.find_variations(['pt bank central asia tbk', 'bank central asia', 'bca', 'pt astra international',
+                                      'astra international tbk', 'garuda'])
+    assert {base: sorted(variants) for base, variants in groups.items()} == {
+        'pt bank central asia tbk': ['bank central asia', 'bca'],
+        'pt astra international': ['astra international tbk'],
+    }
+
+
+def test_person_rules_match_initials_and_titles():
+    matcher = EntityMatcher('persons')
+    groups = matcher.find_variations(['rosan p. roeslani', 'rosan perkasa roeslani', 'menteri sri mulyani',
+                                      'sri mulyani', 'joko widodo'])
+    members = sorted(sorted([base] + variants) for base, variants in groups.items())
+    assert members == [['menteri sri mulyani', 'sri mulyani'], ['rosan p. roeslani', 'rosan perkasa roeslani']]
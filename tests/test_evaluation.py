@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from kgprep.evaluation import RankingEvaluator, TimeAwareFilter
+
+ENTITIES, RELATIONS = 12, 2
+
+
+def brute_force_ranks(all_quads, queries, scores, ties):
+    """Ranks by the definition: one Python loop per query over every entity."""
+    known = [tuple(q) for q in all_quads.tolist()]
+    known += [(o, r + RELATIONS, s, t) for s, r, o, t in known]
+    ranks = {'raw': [], 'static': [], 'time': []}
+    for (s, r, o, t), row in zip(queries.tolist(), scores):
+        true_static = {k[2] for k in known if k[0] == s and k[1] == r} - {o}
+        true_time = {k[2] for k in known if k[0] == s and k[1] == r and k[3] == t} - {o}
+        for setting, removed in (('raw', set()), ('static', true_static), ('time', true_time)):
+            others = [e for e in range(ENTITIES) if e != o and e not in removed]
+            higher = sum(row[e] > row[o] for e in others)
+            equal = sum(row[e] == row[o] for e in others)
+            ranks[setting].append({'optimistic': higher + 1, 'pessimistic': higher + equal + 1,
+                                   'average': higher + equal / 2 + 1}[ties])
+    return ranks
+
+
+def test_filtered_rank_of_a_hand_made_query():
+    # (0, 0, ?, 0) has true objects 1 and 2 at t = 0, and 3 at t = 1
+    quads = np.array([[0, 0, 1, 0], [0, 0, 2, 0], [0, 0, 3, 1]])
+    filters = TimeAwareFilter(quads, 5, 1)
+    evaluator = RankingEvaluator(filters, filters.queries(quads[:1], inverse=False))
+    # Scores: 2 and 3 (other true objects) and 4 (a false one) beat the target 1
+    evaluator.update(np.array([[0.0, 0.5, 0.9, 0.8, 0.7]]))
+    ranks = {setting: evaluator.ranks[setting][0] for setting in ('raw', 'static', 'time')}
+    assert ranks == {'raw': 4, 'static': 2, 'time': 3}
+
+
+@pytest.mark.parametrize('ties', ['optimistic', 'pessimistic', 'average'])
+def test_chunked_ranks_match_brute_force(ties):
+    rng = np.random.default_rng(1)
+    quads = np.stack([rng.integers(0, 4, 120), rng.integers(0, RELATIONS, 120), rng.integers(0, ENTITIES, 120),
+                      rng.integers(0, 5, 120)], axis=1)
+    filters = TimeAwareFilter(quads, ENTITIES, RELATIONS)
+    queries = filters.queries(quads[:30])
+    # Small integer scores make ties common
+    scores = rng.integers(0, 4, (len(queries), ENTITIES)).astype(np.float32)
+    evaluator = RankingEvaluator(filters, queries, ties)
+    for start in rng.permutation(np.arange(0, len(queries), 7)):
+        evaluator.update(scores[start:start + 7], start)
+    expected = brute_force_ranks(quads, queries, scores, ties)
+    for setting in ('raw', 'static', 'time'):
+        assert np.array_equal(evaluator.ranks[setting], expected[setting]), setting
+    metrics = evaluator.metrics()
+    assert metrics['time']['mrr'] == pytest.approx(np.mean(1 / np.array(expected['time'])))
+    assert metrics['static']['hits@3'] == pytest.approx(np.mean(np.array(expected['static']) <= 3))
+
+
+def test_metrics_require_every_query_scored():
+    quads = np.array([[0, 0, 1, 0], [1, 0, 2, 0]])
+    filters = TimeAwareFilter(quads, 3, 1)
+    evaluator = RankingEvaluator(filters, filters.queries(quads))
+    evaluator.update(np.zeros((2, 3)), 0)
+    with pytest.raises(ValueError, match='2 queries have no scores'):
+        evaluator.metrics()
@@ -0,0 +1,70 @@
+import time
+import pytest
+from extraction.cache import ExtractionCache, MinHasher, normalize_text
+
+WORDS = ("Bank Indonesia menahan suku bunga acuan sementara investor asing kembali masuk ke pasar saham "
+         "dan obligasi pemerintah setelah rupiah menguat terhadap dolar AS pada perdagangan pekan ini").split()
+ARTICLE = " ".join(f"{word} {i}" for i, word in enumerate(WORDS * 6))
+# A syndicated copy: the same article with one word changed
+COPY = ARTICLE.replace("menguat", "melemah", 1)
+RESULT = {"entities": [{"subject": "Bank Indonesia", "relation": "Mengendalikan", "object": "suku bunga"}]}
+
+
+def test_exact_hits_are_keyed_by_normalized_text_prompt_and_model(tmp_path):
+    path = str(tmp_path / "extraction_cache.sqlite")
+    cache = ExtractionCache(path, "gpt-4o-mini", "prompt")
+    assert cache.lookup(ARTICLE) is None
+    cache.put(ARTICLE, RESULT, tokens=1500)
+    cache.close()
+
+    cache = ExtractionCache(path, "gpt-4o-mini", "prompt")
+    hit = cache.lookup("  " + ARTICLE.replace(" ", "\n", 3) + " ")
+    assert hit.kind == "exact" and hit.result == RESULT and hit.tokens == 1500
+    stats = cache.stats()
+    assert stats["exact_hits"] == 1 and stats["entries"] == 1 and stats["tokens_saved"] == 1500
+    cache.close()
+    # Another prompt or model never reuses the stored result
+    for model, prompt in (("gpt-4o", "prompt"), ("gpt-4o-mini", "prompt baru")):
+        other = ExtractionCache(path, model, prompt)
+        assert other.lookup(ARTICLE) is None
+        other.close()
+
+
+def test_near_duplicates_are_extracted_unless_reuse_is_opted_in(tmp_path):
+    assert MinHasher().similarity(MinHasher().signature(normalize_text(ARTICLE)),
+                                  MinHasher().signature(normalize_text(COPY))) >= 0.9
+    hits = {}
+    for mode in (None, "reuse", "skip"):
+        cache = ExtractionCache(str(tmp_path / f"cache_{mode}.sqlite"), "gpt-4o-mini", "prompt",
+                                near_duplicates=mode)
+        cache.put(ARTICLE, RESULT)
+        hits[mode] = cache.lookup(COPY)
+        assert cache.lookup("Berita lain tentang harga emas hari ini") is None
+        cache.close()
+    # The default sends the copy to the LLM
+    assert hits[None] is None
+    assert hits["reuse"].kind == "near" and hits["reuse"].result == RESULT and hits["reuse"].similarity >= 0.9
+    assert hits["skip"].kind == "duplicate" and hits["skip"].result is None
+    with pytest.raises(ValueError):
+        ExtractionCache(str(tmp_path / "cache.sqlite"), "gpt-4o-mini", near_duplicates="merge")
+
+
+def test_eviction_drops_least_recently_used_results(tmp_path):
+    path = str(tmp_path / "extraction_cache.sqlite")
+    cache = ExtractionCache(path, "gpt-4o-mini", "prompt")
+    for name in "abc":
+        cache.put(f"artikel {name}", {"entities": [{"subject": name * 400}]})
+        time.sleep(0.01)
+    size = cache.total_bytes
+    cache.close()
+
+    cache = ExtractionCache(path, "gpt-4o-mini", "prompt", max_bytes=size)
+    assert cache.total_bytes == size
+    cache.lookup("artikel a")  # a is now more recent than b and c
+    time.sleep(0.01)
+    cache.put("artikel d", {"entities": [{"subject": "d" * 400}]})
+    # Four equal entries over a budget of three: evicted down to 90% of max_bytes, oldest first
+    assert [cache.lookup(f"artikel {name}") is not None for name in "abcd"] == [True, False, False, True]
+    stored = cache.conn.execute("SELECT SUM(size) FROM extractions").fetchone()[0]
+    assert cache.total_bytes == stored <= size * 0.9
+    cache.close()
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import numpy as np
+import pandas as pd
+from extraction.pipeline import extract_articles
+from kgprep.dataset import QuadrupleDataset, StringTable
+from kgprep.relevance import RelevanceModel
+
+
+def fake_worker(calls):
+    async def worker(item):
+        calls.append(item["text"])
+        if not item["text"]:
+            return {"entities": []}, {}
+        return {"entities": [{"subject": item["text"].split()[0], "relation": "BerinvestasiDi",
+                              "object": "Indonesia"}]}, {}
+    return worker
+
+
+def run(data, tmp_path, calls, **kwargs):
+    return asyncio.run(extract_articles(data, str(tmp_path / "out.jsonl"), str(tmp_path / "out_checkpoint.json"),
+                                        str(tmp_path / "out_cache.sqlite"), fake_worker(calls), progress=False,
+                                        rpm=10000, tpm=10 ** 9, **kwargs))
+
+
+def read_records(tmp_path):
+    with open(tmp_path / "out.jsonl", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_rerun_after_completion_writes_nothing_twice(tmp_path):
+    data = pd.DataFrame({"isi": [f"Perusahaan{i} berinvestasi di Indonesia" for i in range(6)],
+                         "tanggal": "2024-01-01"})
+    calls = []
+    run(data, tmp_path, calls)
+    first = read_records(tmp_path)
+    assert len(first) == 6 and len(calls) == 6
+
+    run(data, tmp_path, calls)
+    assert read_records(tmp_path) == first
+    assert len(calls) == 6
+
+
+def test_rerun_with_wider_range_only_adds_new_rows(tmp_path):
+    data = pd.DataFrame({"isi": [f"Perusahaan{i} berinvestasi di Indonesia" for i in range(6)],
+                         "tanggal": "2024-01-01"})
+    calls = []
+    run(data, tmp_path, calls, end_row=3)
+    run(data, tmp_path, calls)
+    subjects = sorted(record["subject"] for record in read_records(tmp_path))
+    assert subjects == [f"Perusahaan{i}" for i in range(6)]
+    assert len(calls) == 6
+
+
+def test_relevance_filter_keeps_failed_scrapes(tmp_path):
+    dataset = QuadrupleDataset({"train": np.array([[0, 0, 1, 0], [2, 0, 1, 1]])},
+                               StringTable.from_names(["perusahaan0", "indonesia", "bank mandiri"]),
+                               StringTable.from_names(["BerinvestasiDi"]))
+    relevance = RelevanceModel.build(dataset)
+    relevance.threshold = 0.1
+    data = pd.DataFrame({"isi": ["Perusahaan0 berinvestasi di Indonesia", "resep masakan rendang untuk lebaran",
+                                 "", float("nan")], "tanggal": "2024-01-01"})
+    calls = []
+    run(data, tmp_path, calls, relevance=relevance)
+    assert calls.count("") == 2 and "resep masakan rendang untuk lebaran" not in calls
+    records = read_records(tmp_path)
+    assert len([record for record in records if "error" in record]) == 2
+    scores = pd.read_csv(tmp_path / "out_relevance.csv")
+    assert scores["keep"].tolist() == [True, False, True, True]
+
+
+def test_near_duplicate_copies_are_extracted_by_default(tmp_path):
+    article = " ".join(f"Perusahaan{i} berinvestasi di Indonesia pada kuartal {i}" for i in range(40))
+    data = pd.DataFrame({"isi": [article, article.replace("kuartal 7", "kuartal tujuh")],
+                         "tanggal": ["2024-01-01", "2024-01-02"]})
+    # The original is extracted and cached first, the syndicated copy in a later run
+    for mode, calls in ((None, 2), ("reuse", 1), ("skip", 1)):
+        output = tmp_path / str(mode)
+        made = []
+        kwargs = {"near_duplicates": mode} if mode else {}  # None: the default
+        run(data, output, made, end_row=1, **kwargs)
+        run(data, output, made, **kwargs)
+        assert len(made) == calls
+        dates = [record["date"] for record in read_records(output)]
+        assert dates == (["2024-01-01"] if mode == "skip" else ["2024-01-01", "2024-01-02"])
@@ -0,0 +1,69 @@
+import json
+import pandas as pd
+from kgprep.ingest import ingest_jsonl, read_quads
+
+ENUMS = {'subject_type': ['PERUSAHAAN', 'INSTITUSI'], 'relation': ['MENGENDALIKAN', 'BERINVESTASIDI'],
+         'object_type': ['PERUSAHAAN', 'INSTITUSI']}
+
+
+def quad(subject, date, relation='Mengendalikan', subject_type='Perusahaan'):
+    return {'subject': subject, 'subject_type': subject_type, 'relation': relation, 'object': 'bank indonesia',
+            'object_type': 'INSTITUSI', 'date': date}
+
+
+def append(path, records, partial=None):
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+        if partial is not None:
+            f.write(partial)
+
+
+def test_rows_are_validated_and_rejects_counted(tmp_path):
+    source, output = tmp_path / 'graph.jsonl', tmp_path / 'parquet'
+    append(source, [quad('pt astra', '2024-01-03'), {'error': 'parsing error', 'date': '2024-01-03'},
+                    quad('pt bca', '2024-01-04', relation='Membeli'), quad('pt bri', 'kemarin'),
+                    quad('pt adaro', '2023-12-31 10:00')])
+    summary = ingest_jsonl(str(source), str(output), enums=ENUMS)
+    assert summary['lines'] == 5 and summary['rows'] == 2
+    assert summary['rejected'] == {'parsing error': 1, 'invalid relation': 1, 'unparseable date': 1}
+    df = read_quads(str(output)).sort_values('date')
+    assert df['subject'].tolist() == ['pt adaro', 'pt astra']
+    # Enum values are matched case-insensitively and stored in the schema's spelling
+    assert df['subject_type'].astype(str).tolist() == ['PERUSAHAAN', 'PERUSAHAAN']
+    assert [str(week) for week in df['week']] == ['2023-12-25', '2024-01-01']
+    assert len(read_quads(str(output), start='2024-01-01')) == 1
+    with open(output / '_errors.jsonl', encoding='utf-8') as f:
+        assert [json.loads(line)['line'] for line in f] == [2, 3, 4]
+
+
+def test_reruns_ingest_only_new_complete_lines(tmp_path):
+    source, output = tmp_path / 'graph.jsonl', tmp_path / 'parquet'
+    append(source, [quad('pt astra', '2024-01-03')], partial=json.dumps(quad('pt bca', '2024-01-04'))[:20])
+    assert ingest_jsonl(str(source), str(output), enums=ENUMS)['rows'] == 1
+    # The rest of the half-written line arrives, then one more record
+    append(source, [], partial=json.dumps(quad('pt bca', '2024-01-04'))[20:] + '\n')
+    append(source, [quad('pt bri', '2025-02-03')])
+    summary = ingest_jsonl(str(source), str(output), enums=ENUMS)
+    assert summary['lines'] == 2 and summary['rows'] == 2
+    assert sorted(read_quads(str(output))['subject']) == ['pt astra', 'pt bca', 'pt bri']
+
+
+def test_restart_replaces_the_rows_of_its_source_only(tmp_path):
+    first, second, output = tmp_path / 'kompas.jsonl', tmp_path / 'cnbc.jsonl', tmp_path / 'parquet'
+    append(first, [quad('pt astra', '2024-01-03'), quad('pt bca', '2025-01-06')])
+    append(second, [quad('pt bri', '2024-05-01')])
+    ingest_jsonl(str(first), str(output), enums=ENUMS)
+    ingest_jsonl(str(second), str(output), enums=ENUMS)
+    append(first, [quad('pt adaro', '2024-02-01')])
+    ingest_jsonl(str(first), str(output), enums=ENUMS)
+
+    summary = ingest_jsonl(str(first), str(output), enums=ENUMS, restart=True)
+    assert summary['lines'] == 3 and summary['rows'] == 3
+    assert sorted(read_quads(str(output))['subject']) == ['pt adaro', 'pt astra', 'pt bca', 'pt bri']
+
+    # A source rewritten shorter than the stored offset starts over the same way
+    first.write_text(json.dumps(quad('pt bni', '2024-03-01')) + '\n', encoding='utf-8')
+    ingest_jsonl(str(first), str(output), enums=ENUMS)
+    assert sorted(read_quads(str(output))['subject']) == ['pt bni', 'pt bri']
+    assert isinstance(read_quads(str(output), ['date'])['date'].iloc[0], pd.Timestamp)
@@ -0,0 +1,66 @@
+import json
+from extraction.journal import ExtractionJournal, compress_ids, expand_ids
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_completed_ids_are_stored_as_ranges():
+    ids = {9, 0, 1, 2, 5, 7, 8}
+    assert compress_ids(ids) == [[0, 3], [5, 6], [7, 10]]
+    assert expand_ids(compress_ids(ids)) == ids
+    assert compress_ids(set()) == []
+
+
+def test_group_commit_writes_output_before_checkpoint(tmp_path):
+    output, checkpoint = str(tmp_path / "out.jsonl"), str(tmp_path / "out_checkpoint.json")
+    journal = ExtractionJournal(output, checkpoint, commit_every=3, commit_interval=3600)
+    journal.write(4, [{"subject": "a"}, {"subject": "b"}])
+    journal.write(1, [])
+    # Not committed yet: nothing on disk and the articles are not completed
+    assert 4 not in journal and not (tmp_path / "out_checkpoint.json").exists()
+    assert (tmp_path / "out.jsonl").read_bytes() == b""
+    journal.write(2, [{"subject": "c"}])
+    assert journal.commits == 1 and journal.completed == {1, 2, 4}
+    with open(checkpoint, encoding="utf-8") as f:
+        assert json.load(f) == {"completed": [[1, 3], [4, 5]], "output_bytes": (tmp_path / "out.jsonl").stat().st_size}
+    journal.write(0, [{"subject": "d"}])
+    journal.close()
+    assert [line["subject"] for line in read_lines(output)] == ["a", "b", "c", "d"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_resume_truncates_writes_missing_from_the_checkpoint(tmp_path):
+    output, checkpoint = str(tmp_path / "out.jsonl"), str(tmp_path / "out_checkpoint.json")
+    with ExtractionJournal(output, checkpoint, commit_every=1) as journal:
+        journal.write(0, [{"subject": "a"}])
+        journal.write(1, [{"subject": "b"}])
+    # A crash after the output append but before the checkpoint rename leaves article 2 half-written
+    with open(output, "ab") as f:
+        f.write(b'{"subject": "c"}\n{"subj')
+
+    journal = ExtractionJournal(output, checkpoint, commit_every=1)
+    assert journal.completed == {0, 1} and 2 not in journal
+    journal.write(2, [{"subject": "c"}])
+    journal.close()
+    assert [line["subject"] for line in read_lines(output)] == ["a", "b", "c"]
+
+    # The checkpoint is kept after a completed run, so a rerun skips every article
+    journal = ExtractionJournal(output, checkpoint)
+    assert [row for row in range(3) if row not in journal] == []
+    journal.close()
+    assert len(read_lines(output)) == 3
+
+
+def test_legacy_checkpoint_counts_rows_before_the_last_index(tmp_path):
+    checkpoint = tmp_path / "out_checkpoint.json"
+    checkpoint.write_text(json.dumps({"last_processed_index": 3}), encoding="utf-8")
+    (tmp_path / "out.jsonl").write_text('{"subject": "a"}\n', encoding="utf-8")
+    journal = ExtractionJournal(str(tmp_path / "out.jsonl"), str(checkpoint), fsync=False)
+    assert journal.completed == {0, 1, 2}
+    # Without a recorded length the existing output is kept as it is
+    journal.write(3, [{"subject": "b"}])
+    journal.close()
+    assert [line["subject"] for line in read_lines(tmp_path / "out.jsonl")] == ["a", "b"]
@@ -0,0 +1,66 @@
+import json
+import threading
+import numpy as np
+import pytest
+from kgprep.metrics import Histogram, Metrics
+
+
+def test_quantiles_stay_within_the_bucket_of_the_exact_value():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(-3, 1.5, 5000)
+    histogram = Histogram()
+    for value in values:
+        histogram.observe(float(value))
+    bounds = (0.0,) + histogram.bounds + (float('inf'),)
+    for q in (0.5, 0.95, 0.99):
+        exact = np.quantile(values, q)
+        i = np.searchsorted(bounds, exact)
+        assert bounds[i - 1] <= histogram.quantile(q) <= bounds[i]
+    summary = histogram.summary()
+    assert summary['count'] == 5000 and summary['sum'] == pytest.approx(values.sum())
+    assert summary['min'] == values.min() and summary['max'] == values.max()
+    assert Histogram().summary() == {'count': 0, 'sum': 0.0}
+
+
+def test_counters_are_keyed_by_sorted_labels_and_thread_safe():
+    metrics = Metrics()
+
+    def work():
+        for _ in range(1000):
+            metrics.inc('http_responses_total', status=200, host='kompas')
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics.inc('http_responses_total', 2, host='kompas', status='200')
+    assert metrics.snapshot()['counters'] == {'http_responses_total{host="kompas",status="200"}': 4002}
+
+
+def test_stage_timer_records_when_the_block_raises():
+    metrics = Metrics()
+    with pytest.raises(RuntimeError):
+        with metrics.stage('parse'):
+            raise RuntimeError('layout changed')
+    assert metrics.snapshot()['histograms']['stage_seconds{stage="parse"}']['count'] == 1
+
+
+def test_prometheus_and_json_output(tmp_path):
+    metrics = Metrics(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        metrics.observe('request_seconds', value, host='cnbc')
+    metrics.set('queue_depth', 7)
+    text = metrics.write(str(tmp_path / 'run.prom'))
+    lines = (tmp_path / 'run.prom').read_text(encoding='utf-8').splitlines()
+    assert text.endswith('run.prom')
+    assert '# TYPE indovestdkg_request_seconds histogram' in lines
+    # Bucket counts are cumulative, ending with +Inf = count
+    assert [line.rsplit(' ', 1)[1] for line in lines if '_bucket' in line] == ['1', '3', '4']
+    assert 'indovestdkg_request_seconds_bucket{host="cnbc",le="+Inf"} 4' in lines
+    assert 'indovestdkg_queue_depth 7' in lines
+    metrics.write(str(tmp_path / 'run.json'))
+    snapshot = json.loads((tmp_path / 'run.json').read_text(encoding='utf-8'))
+    assert snapshot['gauges'] == {'queue_depth': 7}
+    assert snapshot['histograms']['request_seconds{host="cnbc"}']['count'] == 4
+    assert not list(tmp_path.glob('*.tmp'))
@@ -0,0 +1,80 @@
+import asyncio
+from extraction.packing import ArticlePacker, merge_quads, run_packed, split_article, split_packed_result
+from extraction.scheduler import ExtractionScheduler
+
+
+def words(text):
+    return len((text or "").split())
+
+
+def paragraph(n, size=10):
+    return " ".join(f"p{n}w{i}" for i in range(size))
+
+
+def test_long_article_splits_on_paragraphs_with_overlap():
+    text = "\n\n".join(paragraph(n) for n in range(5))
+    chunks = split_article(text, 25, overlap_tokens=10, counter=words)
+    assert chunks == [" ".join([paragraph(0), paragraph(1)]), " ".join([paragraph(1), paragraph(2)]),
+                      " ".join([paragraph(2), paragraph(3)]), " ".join([paragraph(3), paragraph(4)])]
+    assert split_article(text, 25, counter=words) == [" ".join([paragraph(0), paragraph(1)]),
+                                                      " ".join([paragraph(2), paragraph(3)]), paragraph(4)]
+    # A paragraph longer than the budget falls back to sentences, then to words
+    sentences = "Saham naik tajam hari ini. Rupiah melemah. " + " ".join(["kata"] * 30)
+    chunks = split_article(sentences, 8, counter=words)
+    assert chunks[0] == "Saham naik tajam hari ini." and chunks[1].startswith("Rupiah melemah. kata")
+    assert all(words(chunk) <= 8 for chunk in chunks) and sum(map(words, chunks)) == words(sentences)
+
+
+def test_short_articles_are_packed_up_to_the_limits():
+    items = [{"index": i, "text": paragraph(i, size)} for i, size in enumerate([10, 10, 10, 30, 4, 4, 4, 4, 60])]
+    packer = ArticlePacker(max_tokens=50, overlap_tokens=0, pack_tokens=25, max_articles=3, token_counter=words)
+    requests = list(packer.plan(items))
+    # Articles too long to pack go out on their own while the open pack keeps filling
+    assert [[item["index"] for item, _, _ in request["parts"]] for request in requests] == [
+        [0, 1], [3], [2, 4, 5], [8], [8], [6, 7]]
+    assert requests[0]["packed"] and requests[0]["text"].startswith("[ARTIKEL 1]\n" + paragraph(0))
+    assert "[ARTIKEL 2]\n" + paragraph(1) in requests[0]["text"]
+    assert not requests[1].get("packed") and requests[1]["text"] == paragraph(3, 30)
+    assert [part for _, part, _ in requests[3]["parts"] + requests[4]["parts"]] == [0, 1]
+    # pack_tokens=0 sends every article on its own
+    unpacked = ArticlePacker(50, 0, 0, token_counter=words)
+    assert [[item["index"] for item, _, _ in request["parts"]] for request in unpacked.plan(items)] == [
+        [0], [1], [2], [3], [4], [5], [6], [7], [8], [8]]
+
+
+def test_results_are_regrouped_per_article():
+    result = {"entities": [{"subject": "A", "relation": "R", "object": "B", "article_id": 2},
+                           {"subject": "C", "relation": "R", "object": "D", "article_id": "1"},
+                           {"subject": "E", "relation": "R", "object": "F", "article_id": 7},
+                           {"subject": "G", "relation": "R", "object": "H"}]}
+    assert split_packed_result(result, 2) == [[{"subject": "C", "relation": "R", "object": "D"}],
+                                              [{"subject": "A", "relation": "R", "object": "B"}]]
+    # Quads repeated in overlapping chunks are kept once
+    merged = merge_quads([[{"subject": "Bank  Indonesia", "relation": "R", "object": "BI rate"}],
+                          [{"subject": "bank indonesia", "relation": "R", "object": "BI Rate"}]])
+    assert merged == [{"subject": "Bank  Indonesia", "relation": "R", "object": "BI rate"}]
+
+
+def test_run_packed_yields_one_result_per_article():
+    async def worker(request):
+        text = request["text"]
+        if request.get("packed"):
+            entities = [{"subject": line.split()[0], "relation": "R", "object": "X", "article_id": n + 1}
+                        for n, line in enumerate(text.split("\n")[1::3])]
+        else:
+            entities = [{"subject": text.split()[0], "relation": "R", "object": "X"}]
+        return {"entities": entities}, {}
+
+    items = [{"index": i, "text": paragraph(i, size)} for i, size in enumerate([5, 5, 60, 5])]
+    packer = ArticlePacker(max_tokens=50, overlap_tokens=0, pack_tokens=20, max_articles=8, token_counter=words)
+    scheduler = ExtractionScheduler(worker, rpm=10000, tpm=10 ** 9, token_counter=words)
+
+    async def collect():
+        return [entry async for entry in run_packed(scheduler, items, packer)]
+
+    entries = asyncio.run(asyncio.wait_for(collect(), 10))
+    results = {item["index"]: result for item, result, error in entries if error is None}
+    assert sorted(results) == [0, 1, 2, 3] and len(entries) == 4
+    assert [entity["subject"] for entity in results[1]["entities"]] == ["p1w0"]
+    # The split article comes back as one result merged from its chunks
+    assert [entity["subject"] for entity in results[2]["entities"]] == ["p2w0", "p2w50"]
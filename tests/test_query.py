@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from kgprep.dataset import StringTable
+from kgprep.query import QueryIndex
+
+
+def make_index(time_order='backward', seed=0):
+    rng = np.random.default_rng(seed)
+    quads = np.column_stack([rng.integers(0, 30, 400), rng.integers(0, 4, 400), rng.integers(0, 30, 400),
+                             rng.integers(0, 20, 400)])
+    names = [f'entity {i}' for i in range(29)] + ['2023']
+    relations = ['Mengendalikan', 'BerinvestasiDi', 'Mempengaruhi', 'TerkaitDengan']
+    index = QueryIndex.build(quads, StringTable.from_names(names), StringTable.from_names(relations),
+                             num_timestamps=20, time_order=time_order)
+    return index, quads
+
+
+def brute_force(quads, entity, role, relations, start, end):
+    s, r, o, t = quads.T
+    match = {'subject': s == entity, 'object': o == entity, 'both': (s == entity) | (o == entity)}[role]
+    match &= (t >= start) & (t < end)
+    if relations is not None:
+        match &= np.isin(r, relations)
+    return quads[match]
+
+
+@pytest.mark.parametrize('role', ['subject', 'object', 'both'])
+def test_facts_match_brute_force(role):
+    index, quads = make_index()
+    for entity in range(30):
+        for relations, start, end in ((None, 0, 20), ([1], 3, 9), ([0, 2], 15, 40)):
+            found = index.facts(entity, role, relations, start, end)
+            expected = brute_force(quads, entity, role, relations, start, end)
+            assert sorted(map(tuple, found.tolist())) == sorted(map(tuple, expected.tolist()))
+
+
+def test_newest_window_and_order_follow_time_order():
+    backward, _ = make_index('backward')
+    forward, _ = make_index('forward')
+    assert backward.newest(8) == (0, 8)
+    assert forward.newest(8) == (12, 20)
+    # Oldest first: decreasing temporal_id when it counts weeks back, increasing when it counts forward
+    assert np.all(np.diff(backward.facts(3)[:, 3]) <= 0)
+    assert np.all(np.diff(forward.facts(3)[:, 3]) >= 0)
+    with pytest.raises(ValueError):
+        make_index('sideways')
+
+
+def test_name_lookup_and_search():
+    index, _ = make_index()
+    assert index.entity_id('2023') == 29
+    assert index.entity_id('ENTITY 7') == 7
+    assert [name for name, _ in index.search('entity 2', 3)] == ['entity 2', 'entity 20', 'entity 21']
+    with pytest.raises(KeyError):
+        index.entity_id('ihsg')
+
+
+def test_k_hop_matches_breadth_first_search():
+    index, quads = make_index(seed=1)
+    window = (5, 12)
+    edges = quads[(quads[:, 3] >= window[0]) & (quads[:, 3] < window[1])]
+    frontier, seen = {4}, {4: 0}
+    for hop in (1, 2):
+        frontier = {int(b) for a, b in np.r_[edges[:, [0, 2]], edges[:, [2, 0]]].tolist() if a in frontier} - set(seen)
+        seen.update(dict.fromkeys(frontier, hop))
+    nodes, hops = index.k_hop(4, 2, start=window[0], end=window[1])
+    assert dict(zip(nodes.tolist(), hops.tolist())) == seen
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index, _ = make_index('forward')
+    index.save(str(tmp_path / 'index'))
+    loaded = QueryIndex.load(str(tmp_path / 'index'))
+    assert loaded.time_order == 'forward'
+    assert np.array_equal(loaded.facts(5, relations='Mempengaruhi'), index.facts(5, relations='Mempengaruhi'))
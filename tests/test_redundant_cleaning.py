@@ -0,0 +1,22 @@
+import random
+from modules.redundant_cleaning import remove_redundancy, remove_redundancy_fast
+
+
+def test_fast_version_matches_reference_loop():
+    rng = random.Random(0)
+    for _ in range(2000):
+        alphabet = rng.choice(["ab", "abc", "a", "abcd "])
+        if rng.random() < 0.5:
+            # Periodic prefixes, where a cut could in principle create a new occurrence at the seam
+            unit = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 8)))
+            base = (unit * 200)[:rng.randint(90, 400)]
+            text = base + "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 50))) + base[:rng.randint(0, 300)]
+        else:
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(100, 400)))
+        assert remove_redundancy_fast(text) == remove_redundancy(text)
+
+
+def test_repeated_article_body_is_cut():
+    body = "Jakarta, Kompas.com - Bank Indonesia menahan suku bunga acuan di level 6 persen pada rapat dewan gubernur. "
+    assert remove_redundancy_fast(body * 3) == body
+    assert remove_redundancy_fast("pendek") == "pendek"
@@ -0,0 +1,58 @@
+import math
+import numpy as np
+import pytest
+from kgprep.dataset import QuadrupleDataset, StringTable
+from kgprep.relevance import RelevanceModel, calibrate, featurize, filter_report
+
+ENTITIES = ['bank indonesia', 'bi rate', 'pt astra international', 'saham', 'inflasi', 'rupiah']
+RELATIONS = ['Mengendalikan', 'BerinvestasiDi', 'Mempengaruhi']
+
+
+@pytest.fixture(scope='module')
+def model():
+    quads = np.array([[0, 0, 1, 0], [0, 2, 4, 0], [2, 1, 3, 1], [1, 2, 5, 1], [0, 2, 5, 2], [4, 2, 5, 2]],
+                     dtype=np.int32)
+    dataset = QuadrupleDataset({'train': quads}, StringTable.from_names(ENTITIES), StringTable.from_names(RELATIONS))
+    return RelevanceModel.build(dataset, bits=16)
+
+
+def test_featurize_counts_unigrams_and_bigrams_sublinearly():
+    matrix = featurize(['Saham saham BCA naik', '', None, '2024 naik'], bits=20, numbers=False)
+    assert matrix.shape == (4, 1 << 20)
+    # saham (tf 2), bca, naik and the bigrams "saham saham", "saham bca", "bca naik"
+    assert sorted(matrix[0].data.tolist()) == pytest.approx([1.0] * 5 + [1 + math.log(2)])
+    assert matrix[1].nnz == matrix[2].nnz == 0
+    assert matrix[3].nnz == 1
+
+
+def test_investment_news_outscores_other_news(model):
+    texts = ['Bank Indonesia menahan BI rate untuk mengendalikan inflasi dan menjaga rupiah',
+             'Pemain baru klub itu mencetak dua gol di babak kedua pertandingan liga',
+             '', float('nan')]
+    scores = model.score(texts, batch_size=1)
+    # The sports text only shares "di" (from the relation BerinvestasiDi) with the graph vocabulary
+    assert scores[0] > 10 * scores[1] > 0 and scores[2] == scores[3] == 0
+    assert np.array_equal(model.score(texts, batch_size=1, workers=2), scores)
+    assert np.array_equal(model.score(texts), scores)
+
+
+def test_saved_model_keeps_weights_and_threshold(model, tmp_path):
+    model.threshold = 0.25
+    loaded = RelevanceModel.load(model.save(str(tmp_path / 'relevance.npz')))
+    assert loaded.threshold == 0.25 and loaded.bits == 16 and loaded.meta == model.meta
+    assert np.array_equal(loaded.dense, model.dense)
+    assert loaded.keep([0.1, 0.25, 0.3]).tolist() == [False, True, True]
+
+
+@pytest.mark.parametrize('recall', [0.9, 0.95, 0.98, 1.0])
+def test_calibrated_threshold_is_the_highest_that_keeps_the_recall(recall):
+    rng = np.random.default_rng(4)
+    scores = rng.random(400).round(2)
+    labels = rng.random(400) < scores
+    threshold = calibrate(scores, labels, recall)
+    kept_recall = filter_report(scores, labels, threshold)['recall']
+    assert kept_recall >= recall
+    # Any higher candidate threshold would drop below the target recall
+    higher = np.unique(scores[labels & (scores > threshold)])
+    if len(higher):
+        assert filter_report(scores, labels, higher[0])['recall'] < recall
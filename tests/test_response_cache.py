@@ -0,0 +1,57 @@
+import os
+import time
+import httpx
+from modules.response_cache import ResponseCache
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "http_cache.sqlite")
+    cache = ResponseCache(path, hot_items=2)
+    for i in range(5):
+        cache.put(f"https://news.test/{i}", f"<p>artikel {i}</p>".encode() * 50, "utf-8", f'"v{i}"')
+    assert len(cache.hot) == 2
+    cache.close()
+
+    cache = ResponseCache(path)
+    entry = cache.get("https://news.test/1")
+    assert entry.text == "<p>artikel 1</p>" * 50 and entry.html.css_first("p").text() == "artikel 1"
+    assert entry.validators() == {"If-None-Match": '"v1"'}
+    assert cache.get("https://news.test/9") is None
+    # Bodies are stored compressed
+    assert cache.total_bytes < 5 * len(entry.body)
+    cache.close()
+
+
+def test_not_modified_returns_the_cached_body_and_refreshes_it(tmp_path):
+    cache = ResponseCache(str(tmp_path / "http_cache.sqlite"), max_age=60)
+    url = "https://news.test/a"
+    first = cache.store_response(url, httpx.Response(200, content=b"isi lama", headers={
+        "ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}))
+    assert not first.not_modified and cache.is_fresh(first)
+    assert first.validators() == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+    stale = cache.get(url)
+    stale.fetched_at = time.time() - 120
+    assert not cache.is_fresh(stale)
+    revalidated = cache.store_response(url, httpx.Response(304), stale)
+    assert revalidated.not_modified and revalidated.body == b"isi lama" and revalidated.etag == '"v1"'
+    assert cache.is_fresh(cache.get(url))
+    cache.close()
+    assert not ResponseCache(str(tmp_path / "other.sqlite")).is_fresh(first)  # max_age 0: always revalidate
+
+
+def test_eviction_drops_least_recently_used_entries(tmp_path):
+    path = str(tmp_path / "http_cache.sqlite")
+    body = os.urandom(1000)  # Incompressible: ~1000 bytes per entry
+    cache = ResponseCache(path, max_bytes=3500, hot_items=0)
+    for name in ("a", "b", "c"):
+        cache.put(f"https://news.test/{name}", body)
+        time.sleep(0.01)
+    cache.get("https://news.test/a")  # a is now more recent than b and c
+    time.sleep(0.01)
+    cache.put("https://news.test/d", body)
+    # Over budget by one entry: only the least recently used one (b) goes, down to 90% of max_bytes
+    assert [cache.get(f"https://news.test/{name}") is not None for name in "abcd"] == [True, False, True, True]
+    stored = cache.conn.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+    assert cache.total_bytes == stored <= 3500 * 0.9
+    cache.close()
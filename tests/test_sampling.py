@@ -0,0 +1,43 @@
+import threading
+import time
+import numpy as np
+from kgprep.sampling import BatchLoader, KnownFacts, NegativeSampler
+
+
+def make_loader(batch_size=10, prefetch=4):
+    rng = np.random.default_rng(0)
+    quads = np.column_stack([rng.integers(0, 20, 50), rng.integers(0, 3, 50), rng.integers(0, 20, 50),
+                             rng.integers(0, 5, 50)])
+    sampler = NegativeSampler(20, 4, KnownFacts(quads, 20, 3, 5), seed=0)
+    return BatchLoader(quads, sampler, batch_size, prefetch=prefetch, seed=0)
+
+
+def test_full_epoch():
+    loader = make_loader()
+    batches = list(loader)
+    assert len(batches) == len(loader) == 5
+    assert sum(len(positives) for positives, _, _ in batches) == 50
+    positives, negatives, valid = batches[0]
+    assert negatives.shape == (10, 4, 4) and valid.shape == (10, 4)
+
+
+def test_early_exit_stops_worker():
+    # The worker fills the queue while the consumer holds one batch; closing must not deadlock
+    before = threading.active_count()
+    for _ in range(3):
+        batches = iter(make_loader())
+        next(batches)
+        time.sleep(0.3)  # let the worker fill the queue and reach the end-of-epoch sentinel
+        closer = threading.Thread(target=batches.close, daemon=True)
+        closer.start()
+        closer.join(timeout=5)
+        assert not closer.is_alive()
+    assert threading.active_count() == before
+
+
+def test_break_out_of_loop():
+    loader = make_loader(batch_size=5, prefetch=1)
+    for count, _ in enumerate(loader):
+        if count == 2:
+            break
+    assert len(list(loader)) == len(loader)
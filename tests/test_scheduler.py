@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from extraction.scheduler import ExtractionScheduler
+
+
+async def collect(scheduler, items):
+    return [entry async for entry in scheduler.run(items)]
+
+
+def test_results_in_completion_order():
+    async def worker(item):
+        await asyncio.sleep(0.01 * (5 - item["index"]))
+        return {"entities": [item["index"]]}, {}
+
+    scheduler = ExtractionScheduler(worker, max_in_flight=8, initial_in_flight=8, rpm=10000, tpm=10 ** 9)
+    items = [{"index": i, "text": f"artikel {i}"} for i in range(5)]
+    entries = asyncio.run(asyncio.wait_for(collect(scheduler, items), 10))
+    assert [item["index"] for item, _, _ in entries] == [4, 3, 2, 1, 0]
+    assert all(error is None for _, _, error in entries)
+
+
+def test_process_exception_is_raised_not_hung():
+    class BrokenCache:
+        def lookup(self, text):
+            if text == "artikel 3":
+                raise RuntimeError("cache database is locked")
+            return None
+
+        def key(self, text):
+            return text
+
+        def put(self, text, result):
+            pass
+
+    async def worker(item):
+        return {"entities": []}, {}
+
+    scheduler = ExtractionScheduler(worker, rpm=10000, tpm=10 ** 9, cache=BrokenCache())
+    items = [{"index": i, "text": f"artikel {i}"} for i in range(10)]
+    with pytest.raises(RuntimeError, match="locked"):
+        asyncio.run(asyncio.wait_for(collect(scheduler, items), 10))
+
+
+def test_closing_early_cancels_outstanding_requests():
+    started, cancelled = [], []
+
+    async def worker(item):
+        started.append(item["index"])
+        try:
+            await asyncio.sleep(0 if item["index"] == 0 else 60)
+        except asyncio.CancelledError:
+            cancelled.append(item["index"])
+            raise
+        return {"entities": []}, {}
+
+    async def first_then_close():
+        scheduler = ExtractionScheduler(worker, max_in_flight=4, initial_in_flight=4, rpm=10000, tpm=10 ** 9,
+                                        max_pending=2)
+        entries = scheduler.run([{"index": i, "text": f"artikel {i}"} for i in range(6)])
+        await entries.__anext__()
+        await entries.aclose()
+        await asyncio.sleep(0.1)  # cancelled requests finish unwinding; orphaned ones would still sleep
+        return [task for task in asyncio.all_tasks() if "run_one" in task.get_coro().__qualname__ and not task.done()]
+
+    assert asyncio.run(asyncio.wait_for(first_then_close(), 10)) == []
+    assert cancelled and sorted(cancelled) == sorted(set(started) - {0})
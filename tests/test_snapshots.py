@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from kgprep.snapshots import GraphIndex
+
+ENTITIES, RELATIONS, TIMESTAMPS = 20, 3, 8
+
+
+def make_quads(count=400, seed=0):
+    rng = np.random.default_rng(seed)
+    quads = np.stack([rng.integers(0, ENTITIES, count), rng.integers(0, RELATIONS, count),
+                      rng.integers(0, ENTITIES, count), rng.integers(0, TIMESTAMPS, count)], axis=1)
+    # Timestamp 5 is left empty
+    return quads[quads[:, 3] != 5]
+
+
+def with_inverse(quads):
+    inverse = np.stack([quads[:, 2], quads[:, 1] + RELATIONS, quads[:, 0], quads[:, 3]], axis=1)
+    return np.concatenate([quads, inverse])
+
+
+@pytest.fixture(scope='module')
+def quads():
+    return make_quads()
+
+
+@pytest.fixture(scope='module')
+def index(quads):
+    return GraphIndex.build(quads, ENTITIES, RELATIONS)
+
+
+def test_snapshots_hold_the_edges_of_their_timestamp(quads, index):
+    edges = with_inverse(quads)
+    assert index.num_timestamps == TIMESTAMPS and index.num_relations == 2 * RELATIONS
+    for t in range(TIMESTAMPS):
+        snapshot = index.snapshot(t)
+        expected = sorted(map(tuple, edges[edges[:, 3] == t, :3].tolist()))
+        assert sorted(zip(snapshot.src.tolist(), snapshot.rel.tolist(), snapshot.dst.tolist())) == expected
+        for s in range(ENTITIES):
+            rel, dst = snapshot.neighbors(s)
+            assert sorted(zip(rel.tolist(), dst.tolist())) == sorted((r, o) for src, r, o in expected if src == s)
+        csr = index.snapshot_csr(t)
+        assert csr.nnz == len(expected)
+    assert len(index.snapshot(5)) == 0
+
+
+@pytest.mark.parametrize('k', [None, 1, 3, 10])
+def test_history_covers_the_window_before_t(quads, index, k):
+    edges = with_inverse(quads)
+    for s, r, t in [(0, 0, 0), (3, 1, 4), (7, 4, 7), (11, 2, 8), (2, 5, 6)]:
+        lo = 0 if k is None else t - k
+        window = edges[(edges[:, 0] == s) & (edges[:, 1] == r) & (edges[:, 3] >= lo) & (edges[:, 3] < t)]
+        objects, times = index.history(s, r, t, k)
+        assert sorted(zip(times.tolist(), objects.tolist())) == sorted(zip(window[:, 3], window[:, 2]))
+        assert np.all(np.diff(times) >= 0)
+    assert index.pair_id(ENTITIES + 1, 0) == -1
+    assert len(index.history(ENTITIES + 1, 0, TIMESTAMPS)[0]) == 0
+
+
+@pytest.mark.parametrize('t, k', [(4, 2), (4, None), (1, 5), (TIMESTAMPS, 3)])
+def test_history_matrix_counts_pairs_in_the_window(quads, index, t, k):
+    edges = with_inverse(quads)
+    lo = 0 if k is None else max(0, t - k)
+    counts = index.history_matrix(t, k).toarray()
+    expected = np.zeros_like(counts)
+    for s, r, o, time in edges.tolist():
+        if lo <= time < t:
+            expected[index.pair_id(s, r), o] += 1
+    assert np.array_equal(counts, expected)
+
+
+def test_saved_index_loads_memory_mapped(index, tmp_path):
+    index.save(str(tmp_path))
+    loaded = GraphIndex.load(str(tmp_path))
+    assert loaded.meta == index.meta
+    assert np.array_equal(loaded.snapshot(3).dst, index.snapshot(3).dst)
+    assert np.array_equal(loaded.history(3, 1, 6, 2)[0], index.history(3, 1, 6, 2)[0])
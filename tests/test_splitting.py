@@ -0,0 +1,75 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from kgprep.dataset import load_dataset, read_id_map, read_quads
+from kgprep.encoding import QUAD_COLUMNS
+from kgprep.splitting import kfold_plans, ratio_cuts, rolling_plans, split_and_export
+
+
+def brute_force_cuts(counts, ratios):
+    """Boundary per target share, searched over every timestamp boundary of the active range."""
+    active = np.flatnonzero(counts)
+    first, last = active[0], active[-1] + 1
+    total = counts.sum()
+    cuts = [first]
+    for share in np.cumsum(np.array(ratios) / sum(ratios))[:-1]:
+        best = min(range(first, last + 1), key=lambda b: (abs(counts[:b].sum() - share * total), b))
+        cuts.append(max(best, cuts[-1]))
+    return cuts + [last]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_ratio_cuts_fall_on_the_closest_timestamp_boundary(seed):
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(0, 30, 40) * (rng.random(40) < 0.7)
+    counts[:3] = 0  # The leading empty timestamps belong to no split
+    assert ratio_cuts(counts, (0.8, 0.1, 0.1)) == brute_force_cuts(counts, (0.8, 0.1, 0.1))
+
+
+def test_rolling_and_kfold_plans_are_contiguous():
+    counts = np.r_[0, 0, np.ones(20, dtype=np.int64)]
+    windows = rolling_plans(counts, 8, 2, 2, step=3)
+    # Windows start at the first active timestamp and stop before the test span passes the last one
+    assert list(windows) == ['window_00', 'window_01', 'window_02']
+    assert windows['window_01'] == {'train': (5, 13), 'valid': (13, 15), 'test': (15, 17)}
+    assert windows['window_02']['test'] == (18, 20)
+    folds = kfold_plans(counts, 3)
+    for fold in folds.values():
+        assert fold['train'][0] == 2 and fold['train'][1] == fold['valid'][0] and fold['valid'][1] == fold['test'][0]
+        assert fold['test'][1] - fold['test'][0] == 4
+    assert folds['fold_2']['test'][1] == 22
+
+
+def test_export_cuts_on_timestamps_in_every_layout(tmp_path):
+    rng = np.random.default_rng(3)
+    quads = np.stack([rng.integers(0, 9, 203), rng.integers(0, 3, 203), rng.integers(0, 9, 203),
+                      rng.integers(0, 12, 203)], axis=1)
+    source = tmp_path / 'norm_IndovestDKG_encoded_indovest.csv'
+    pd.DataFrame(quads, columns=QUAD_COLUMNS).to_csv(source, index=False)
+    entities = [f'entity {i}' for i in range(9)]
+    summary = split_and_export(str(source), str(tmp_path / 'splited'), kfold=2, entities=entities,
+                               relations=['A', 'B', 'C'], workers=1, chunksize=17)
+
+    # Rows in stable temporal order, split only where temporal_id changes
+    expected = quads[np.argsort(quads[:, 3], kind='stable')]
+    output = tmp_path / 'splited'
+    splits = [pd.read_csv(output / f'{split}.csv').to_numpy() for split in ('train', 'valid', 'test')]
+    assert np.array_equal(np.concatenate(splits), expected)
+    for before, after in zip(splits, splits[1:]):
+        assert before[:, 3].max() < after[:, 3].min()
+    plan = summary['plans']['.']
+    assert [plan[split]['rows'] for split in ('train', 'valid', 'test')] == [len(s) for s in splits]
+    assert plan['train']['temporal_ids'][1] == plan['valid']['temporal_ids'][0] == splits[1][0, 3]
+
+    text = output / 'final_txt_format'
+    assert np.array_equal(read_quads(str(text / 'valid.txt')), splits[1])
+    assert read_id_map(str(text / 'entity2id.txt')).tolist() == entities
+    binary = load_dataset(str(output / 'final_binary_format'))
+    assert np.array_equal(np.asarray(binary['test']), splits[2])
+    assert binary.entities.names() == entities
+    fold = pd.read_csv(output / 'kfold' / 'fold_1' / 'train.csv').to_numpy()
+    assert np.array_equal(fold, expected[:len(fold)])
+    with open(output / 'splits.json', encoding='utf-8') as f:
+        assert json.load(f)['rows'] == len(quads)
+    assert not (output / '.sorted_quads.npy').exists()